@@ -22,6 +22,18 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+# Connections the API process keeps open, how long a call waits for a free one, and how long one may sit idle before
+# it is pinged on checkout
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_POOL_TIMEOUT_IN_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_IN_SECONDS", 10))
+DB_POOL_HEALTH_CHECK_INTERVAL_IN_SECONDS = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL_IN_SECONDS", 30))
+
+# How long the match and odds read endpoints cache a response at most, how many responses are kept, and how often the
+# data version the writers bump is checked
+RESPONSE_CACHE_TTL_IN_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_IN_SECONDS", 60))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 512))
+RESPONSE_CACHE_VERSION_CHECK_INTERVAL_IN_SECONDS = float(os.getenv("RESPONSE_CACHE_VERSION_CHECK_INTERVAL_IN_SECONDS", 1))
+
 API_KEYS = os.getenv('API_KEYS')
 ODDS_API_KEY=os.getenv('ODDS_API_KEY')
 
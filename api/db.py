@@ -1,8 +1,19 @@
 import mysql.connector
 import logging
 import datetime as dt
+from contextlib import contextmanager
 from datetime import timezone
-from api.config import IS_PROD, DB_HOST, DB_NAME, DB_USER, DB_PASSWORD
+from api.config import (
+    IS_PROD,
+    DB_HOST,
+    DB_NAME,
+    DB_USER,
+    DB_PASSWORD,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_IN_SECONDS,
+    DB_POOL_HEALTH_CHECK_INTERVAL_IN_SECONDS,
+)
+from api.db_pool import ConnectionPool
 import os
 import time
 
@@ -16,46 +27,11 @@ GET_MATCH_QUERY = """
         mo.awayTeamOdds,
         mo.drawOdds,
         mo.lastUpdated,
-        (SELECT COUNT(*) FROM match_odds mo WHERE mlo.oddsapiMatchId = mo.oddsapiMatchId AND mo.lastUpdated IS NOT NULL) AS odds_count,
-        CASE 
-            WHEN EXISTS (
-                SELECT 1 
-                FROM match_odds mo
-                WHERE mo.oddsapiMatchId = mlo.oddsapiMatchId 
-                AND mo.lastUpdated < DATE_SUB(mlo.matchDate, INTERVAL 24 HOUR)
-            ) THEN TRUE 
-            ELSE FALSE 
-        END AS t_24h,
-        CASE 
-            WHEN EXISTS (
-                SELECT 1 
-                FROM match_odds mo
-                WHERE mo.oddsapiMatchId = mlo.oddsapiMatchId 
-                AND mo.lastUpdated >= DATE_SUB(mlo.matchDate, INTERVAL 24 HOUR)
-                AND mo.lastUpdated < DATE_SUB(mlo.matchDate, INTERVAL 12 HOUR)
-            ) THEN TRUE 
-            ELSE FALSE 
-        END AS t_12h,
-        CASE 
-            WHEN EXISTS (
-                SELECT 1 
-                FROM match_odds mo
-                WHERE mo.oddsapiMatchId = mlo.oddsapiMatchId 
-                AND mo.lastUpdated >= DATE_SUB(mlo.matchDate, INTERVAL 12 HOUR)
-                AND mo.lastUpdated < DATE_SUB(mlo.matchDate, INTERVAL 4 HOUR)
-            ) THEN TRUE 
-            ELSE FALSE 
-        END AS t_4h,
-        CASE 
-            WHEN EXISTS (
-                SELECT 1 
-                FROM match_odds mo
-                WHERE mo.oddsapiMatchId = mlo.oddsapiMatchId 
-                AND mo.lastUpdated >= DATE_SUB(mlo.matchDate, INTERVAL 4 HOUR)
-                AND mo.lastUpdated < DATE_SUB(mlo.matchDate, INTERVAL 10 MINUTE)
-            ) THEN TRUE 
-            ELSE FALSE 
-        END AS t_10m
+        COALESCE(mo.odds_count, 0) AS odds_count,
+        COALESCE(mo.t_24h, FALSE) AS t_24h,
+        COALESCE(mo.t_12h, FALSE) AS t_12h,
+        COALESCE(mo.t_4h, FALSE) AS t_4h,
+        COALESCE(mo.t_10m, FALSE) AS t_10m
     FROM (
         SELECT
             m.matchId,
@@ -73,1263 +49,1423 @@ GET_MATCH_QUERY = """
             END AS awayTeamScore,
             m.matchLeague,
             m.isComplete,
-            ml.oddsapiMatchId
+            m.lastUpdated AS matchLastUpdated,
+            ml.oddsapiMatchId,
+            ml.lastUpdated AS lookupLastUpdated
         FROM matches m
         LEFT JOIN matches_lookup ml ON m.matchId = ml.matchId
     ) mlo
-    LEFT JOIN match_odds mo ON mlo.oddsapiMatchId = mo.oddsapiMatchId AND mo.lastUpdated = (
-        SELECT lastUpdated
-        FROM match_odds AS mo_inner
-        WHERE mo_inner.oddsapiMatchId = mlo.oddsapiMatchId AND mo_inner.lastUpdated < (mlo.matchDate + INTERVAL 5 MINUTE)
-        ORDER BY lastUpdated DESC
-        LIMIT 1
-    ) AND mo.id = (
+    LEFT JOIN match_odds_summary mo ON mlo.matchId = mo.matchId
+"""
+
+# Per match closing odds, odds count and odds window coverage, kept up to date by refresh_match_odds_summary whenever
+# odds, lookups or matches are written, so match reads do not scan match_odds
+MATCH_ODDS_SUMMARY_CREATE = """
+    CREATE TABLE IF NOT EXISTS match_odds_summary (
+        matchId VARCHAR(50) PRIMARY KEY,
+        oddsapiMatchId VARCHAR(50) DEFAULT NULL,
+        homeTeamOdds FLOAT,
+        awayTeamOdds FLOAT,
+        drawOdds FLOAT,
+        lastUpdated DATETIME DEFAULT NULL,
+        closingCreatedAt DATETIME DEFAULT NULL,
+        odds_count INTEGER NOT NULL DEFAULT 0,
+        t_24h TINYINT(1) NOT NULL DEFAULT 0,
+        t_12h TINYINT(1) NOT NULL DEFAULT 0,
+        t_4h TINYINT(1) NOT NULL DEFAULT 0,
+        t_10m TINYINT(1) NOT NULL DEFAULT 0,
+        INDEX idx_match_odds_summary_oddsapiMatchId (oddsapiMatchId)
+    )
+"""
+
+# Recomputes the summary of the matches selected by the WHERE clause it is formatted with. The closing odds are the
+# last odds stored before 5 minutes after the match start, the windows flag odds stored 24h+, 12-24h, 4-12h and
+# 4h-10m before the match start
+REFRESH_MATCH_ODDS_SUMMARY_QUERY = """
+    INSERT INTO match_odds_summary (
+        matchId, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated, closingCreatedAt,
+        odds_count, t_24h, t_12h, t_4h, t_10m
+    )
+    SELECT
+        m.matchId,
+        ml.oddsapiMatchId,
+        closing.homeTeamOdds,
+        closing.awayTeamOdds,
+        closing.drawOdds,
+        closing.lastUpdated,
+        closing.createdAt,
+        COUNT(mo.lastUpdated),
+        COALESCE(MAX(mo.lastUpdated < DATE_SUB(m.matchDate, INTERVAL 24 HOUR)), FALSE),
+        COALESCE(MAX(
+            mo.lastUpdated >= DATE_SUB(m.matchDate, INTERVAL 24 HOUR)
+            AND mo.lastUpdated < DATE_SUB(m.matchDate, INTERVAL 12 HOUR)
+        ), FALSE),
+        COALESCE(MAX(
+            mo.lastUpdated >= DATE_SUB(m.matchDate, INTERVAL 12 HOUR)
+            AND mo.lastUpdated < DATE_SUB(m.matchDate, INTERVAL 4 HOUR)
+        ), FALSE),
+        COALESCE(MAX(
+            mo.lastUpdated >= DATE_SUB(m.matchDate, INTERVAL 4 HOUR)
+            AND mo.lastUpdated < DATE_SUB(m.matchDate, INTERVAL 10 MINUTE)
+        ), FALSE)
+    FROM matches m
+    JOIN matches_lookup ml ON m.matchId = ml.matchId
+    LEFT JOIN match_odds closing ON closing.id = (
         SELECT id
         FROM match_odds AS mo_inner
-        WHERE mo_inner.oddsapiMatchId = mlo.oddsapiMatchId AND mo_inner.lastUpdated < (mlo.matchDate + INTERVAL 5 MINUTE)
+        WHERE mo_inner.oddsapiMatchId = ml.oddsapiMatchId AND mo_inner.lastUpdated < (m.matchDate + INTERVAL 5 MINUTE)
         ORDER BY lastUpdated DESC
         LIMIT 1
     )
+    LEFT JOIN match_odds mo ON ml.oddsapiMatchId = mo.oddsapiMatchId
+    {where}
+    GROUP BY m.matchId, ml.oddsapiMatchId, closing.id
+    ON DUPLICATE KEY UPDATE
+        oddsapiMatchId=VALUES(oddsapiMatchId),
+        homeTeamOdds=VALUES(homeTeamOdds),
+        awayTeamOdds=VALUES(awayTeamOdds),
+        drawOdds=VALUES(drawOdds),
+        lastUpdated=VALUES(lastUpdated),
+        closingCreatedAt=VALUES(closingCreatedAt),
+        odds_count=VALUES(odds_count),
+        t_24h=VALUES(t_24h),
+        t_12h=VALUES(t_12h),
+        t_4h=VALUES(t_4h),
+        t_10m=VALUES(t_10m)
 """
+REFRESH_MATCH_ODDS_SUMMARY_BATCH_SIZE = 500
+
+def refresh_match_odds_summary(c, match_ids=None, oddsapi_match_ids=None):
+    """
+    Recomputes the match_odds_summary rows of the given matches, or of the matches linked to the given odds api ids,
+    in the caller's transaction. Without ids every match is recomputed.
+    """
+    if match_ids is None and oddsapi_match_ids is None:
+        c.execute(REFRESH_MATCH_ODDS_SUMMARY_QUERY.format(where=""))
+        return
+    column, ids = ("m.matchId", match_ids) if match_ids is not None else ("ml.oddsapiMatchId", oddsapi_match_ids)
+    ids = sorted({value for value in ids if value is not None})
+    for i in range(0, len(ids), REFRESH_MATCH_ODDS_SUMMARY_BATCH_SIZE):
+        batch = ids[i:i + REFRESH_MATCH_ODDS_SUMMARY_BATCH_SIZE]
+        where = f"WHERE {column} IN ({', '.join(['%s'] * len(batch))})"
+        c.execute(REFRESH_MATCH_ODDS_SUMMARY_QUERY.format(where=where), batch)
+
+# Stored on existing rows when the delta sync timestamp columns are added, before any validator's sync watermark
+DELTA_SYNC_BACKFILL_TIMESTAMP = "1970-01-01 00:00:00"
+
+# Version of the match, lookup and odds data behind the cached read endpoints, bumped by the writers in the same
+# transaction as their changes, so the API process notices writes made by the fetch processes
+MATCH_DATA_CACHE_VERSION = "match_data"
+
+def bump_cache_version(c, name=MATCH_DATA_CACHE_VERSION):
+    """Invalidates the API responses cached for the named data, in the caller's transaction."""
+    c.execute(
+        """
+        INSERT INTO cache_versions (name, version, lastUpdated) VALUES (%s, 1, UTC_TIMESTAMP())
+        ON DUPLICATE KEY UPDATE version = version + 1, lastUpdated = VALUES(lastUpdated)
+        """,
+        (name,),
+    )
 
-def match_id_exists(match_id):
+def get_cache_version(name=MATCH_DATA_CACHE_VERSION):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor()
+        with db_cursor() as (conn, cursor):
+            cursor.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+
+    except Exception as e:
+        logging.error("Failed to get cache version from the MySQL database", exc_info=True)
+        return None
 
-        cursor.execute("SELECT COUNT(*) FROM matches WHERE matchId = %s", (match_id,))
-        count = cursor.fetchone()[0]
+def match_id_exists(match_id):
+    try:
+        with db_cursor() as (conn, cursor):
+            cursor.execute("SELECT COUNT(*) FROM matches WHERE matchId = %s", (match_id,))
+            count = cursor.fetchone()[0]
 
-        return count > 0
+            return count > 0
 
     except Exception as e:
         logging.error("Failed to check if match exists in MySQL database", exc_info=True)
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
 def match_odds_id_exists(match_odds_id):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT COUNT(*) FROM match_odds WHERE id = %s", (match_odds_id,))
-        count = cursor.fetchone()[0]
+        with db_cursor() as (conn, cursor):
+            cursor.execute("SELECT COUNT(*) FROM match_odds WHERE id = %s", (match_odds_id,))
+            count = cursor.fetchone()[0]
 
-        return count > 0
+            return count > 0
 
     except Exception as e:
         logging.error("Failed to check if match_odds exists in MySQL database", exc_info=True)
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
-def get_matches(all=False):
+def get_current_utc_time():
+    """Gets the current UTC time of the database server, used as the watermark of delta syncs."""
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SET @current_time_utc = CONVERT_TZ(NOW(), @@session.time_zone, '+00:00')")
-        query = GET_MATCH_QUERY
+        with db_cursor() as (conn, cursor):
+            cursor.execute("SELECT UTC_TIMESTAMP()")
+            return cursor.fetchone()[0]
 
-        if not all:
-            query += """
-                WHERE mlo.matchDate BETWEEN @current_time_utc - INTERVAL 10 DAY AND @current_time_utc + INTERVAL 48 HOUR
-            """
+    except Exception as e:
+        logging.error("Failed to get the current time from the MySQL database", exc_info=True)
+        return None
+
+def get_matches(all=False, since=None):
+    try:
+        with db_cursor(dictionary=True) as (conn, cursor):
+            cursor.execute("SET @current_time_utc = CONVERT_TZ(NOW(), @@session.time_zone, '+00:00')")
+            query = GET_MATCH_QUERY
+            conditions = []
+            params = []
+
+            if not all:
+                conditions.append("mlo.matchDate BETWEEN @current_time_utc - INTERVAL 10 DAY AND @current_time_utc + INTERVAL 48 HOUR")
+            if since:
+                # Only matches whose data, odds lookup or closing odds changed after the since watermark
+                conditions.append("(mlo.matchLastUpdated > %s OR mlo.lookupLastUpdated > %s OR mo.closingCreatedAt > %s)")
+                params.extend([since, since, since])
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
         
-        cursor.execute(query)
-        match_list = cursor.fetchall()
+            cursor.execute(query, params)
+            match_list = cursor.fetchall()
 
-        return match_list
+            return match_list
 
     except Exception as e:
         logging.error(
             "Failed to retrieve matches from the MySQL database", exc_info=True
         )
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
 
 def get_upcoming_matches():
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-        # Set the current time in UTC
-        cursor.execute("SET @current_time_utc = CONVERT_TZ(NOW(), @@session.time_zone, '+00:00')")
+        with db_cursor(dictionary=True) as (conn, cursor):
+            # Set the current time in UTC
+            cursor.execute("SET @current_time_utc = CONVERT_TZ(NOW(), @@session.time_zone, '+00:00')")
 
-        query = GET_MATCH_QUERY + """
-           WHERE mlo.matchDate BETWEEN @current_time_utc AND @current_time_utc + INTERVAL 48 HOUR
-        """
+            query = GET_MATCH_QUERY + """
+               WHERE mlo.matchDate BETWEEN @current_time_utc AND @current_time_utc + INTERVAL 48 HOUR
+            """
 
-        cursor.execute(query)
-        match_list = cursor.fetchall()
+            cursor.execute(query)
+            match_list = cursor.fetchall()
 
-        return match_list
+            return match_list
 
     except Exception as e:
         logging.error(
             "Failed to retrieve matches from the MySQL database", exc_info=True
         )
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
 
 def get_matches_with_no_odds():
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-
-        query = """
-            SELECT ml.*, m.*
-            FROM matches_lookup ml
-            LEFT JOIN matches m
-            ON ml.matchId = m.matchId
-        """
+        with db_cursor(dictionary=True) as (conn, cursor):
+            query = """
+                SELECT ml.*, m.*
+                FROM matches_lookup ml
+                LEFT JOIN matches m
+                ON ml.matchId = m.matchId
+            """
 
-        cursor.execute(query)
-        matches = cursor.fetchall()
+            cursor.execute(query)
+            matches = cursor.fetchall()
 
-        return matches
+            return matches
 
     except Exception as e:
         logging.error(
             "Failed to retrieve matches from the MySQL database", exc_info=True
         )
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
 
 def get_stored_odds(lastUpdated = None):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-        if lastUpdated:
-            query = """
-                SELECT mo.*, o.homeTeamName, o.awayTeamName, o.commence_time, o.league
-                FROM (
-                    SELECT id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
-                    FROM match_odds
-                    WHERE (oddsapiMatchId, lastUpdated) IN (
-                        SELECT oddsapiMatchId, MAX(lastUpdated)
+        with db_cursor(dictionary=True) as (conn, cursor):
+            if lastUpdated:
+                query = """
+                    SELECT mo.*, o.homeTeamName, o.awayTeamName, o.commence_time, o.league
+                    FROM (
+                        SELECT id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
                         FROM match_odds
-                        WHERE lastUpdated <= %s
-                        GROUP BY oddsapiMatchId 
-                    )
-                ) mo
-                INNER JOIN odds o
-                ON mo.oddsapiMatchId = o.oddsapiMatchId
-            """
-            cursor.execute(query, (lastUpdated,))
-            stored_odds = cursor.fetchall()
-        else:
-            query = """
-                SELECT mo.*, o.homeTeamName, o.awayTeamName, o.commence_time, o.league
-                FROM (
-                    SELECT id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
-                    FROM match_odds
-                    WHERE (oddsapiMatchId, lastUpdated) IN (
-                        SELECT oddsapiMatchId, MAX(lastUpdated)
+                        WHERE (oddsapiMatchId, lastUpdated) IN (
+                            SELECT oddsapiMatchId, MAX(lastUpdated)
+                            FROM match_odds
+                            WHERE lastUpdated <= %s
+                            GROUP BY oddsapiMatchId 
+                        )
+                    ) mo
+                    INNER JOIN odds o
+                    ON mo.oddsapiMatchId = o.oddsapiMatchId
+                """
+                cursor.execute(query, (lastUpdated,))
+                stored_odds = cursor.fetchall()
+            else:
+                query = """
+                    SELECT mo.*, o.homeTeamName, o.awayTeamName, o.commence_time, o.league
+                    FROM (
+                        SELECT id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
                         FROM match_odds
-                        GROUP BY oddsapiMatchId 
-                    )
-                ) mo
-                INNER JOIN odds o
-                ON mo.oddsapiMatchId = o.oddsapiMatchId
-            """
-            cursor.execute(query)
-            stored_odds = cursor.fetchall()
+                        WHERE (oddsapiMatchId, lastUpdated) IN (
+                            SELECT oddsapiMatchId, MAX(lastUpdated)
+                            FROM match_odds
+                            GROUP BY oddsapiMatchId 
+                        )
+                    ) mo
+                    INNER JOIN odds o
+                    ON mo.oddsapiMatchId = o.oddsapiMatchId
+                """
+                cursor.execute(query)
+                stored_odds = cursor.fetchall()
 
-        return stored_odds
+            return stored_odds
 
     except Exception as e:
         logging.error(
             "Failed to retrieve matches from the MySQL database", exc_info=True
         )
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
 
-def get_match_odds_by_id(match_id):
+def get_match_odds_by_id(match_id, since=None):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-        if match_id:
-            query = """
-                SELECT mo.*, ml.matchId
-                FROM match_odds mo
-                LEFT JOIN matches_lookup ml ON mo.oddsapiMatchId = ml.oddsapiMatchId
-                WHERE ml.matchId = %s AND mo.lastUpdated IS NOT NULL
-                ORDER BY mo.lastUpdated ASC
-            """
-            cursor.execute(query, (match_id,))
-            match_odds = cursor.fetchall()
-        else:
-            query = """
-                SELECT
-                    mlo.*,
-                    (
-                        SELECT
-                            JSON_ARRAYAGG(
-                                JSON_OBJECT(
-                                    "oddsapiMatchId", mo.oddsapiMatchId,
-                                    "homeTeamOdds", mo.homeTeamOdds,
-                                    "awayTeamOdds", mo.awayTeamOdds,
-                                    "drawOdds", mo.drawOdds,
-                                    "lastUpdated", mo.lastUpdated
-                                )
-                            )
-                        FROM match_odds mo
-                        WHERE mlo.oddsapiMatchId = mo.oddsapiMatchId
-                    ) AS oddsData
-                FROM (
-                    SELECT
-                        m.matchId,
-                        m.matchDate,
-                        m.homeTeamName,
-                        m.awayTeamName,
-                        m.sport,
-                        CASE 
-                            WHEN m.isComplete = 1 THEN COALESCE(m.homeTeamScore, 0)
-                            ELSE m.homeTeamScore 
-                        END AS homeTeamScore,
-                        CASE 
-                            WHEN m.isComplete = 1 THEN COALESCE(m.awayTeamScore, 0)
-                            ELSE m.awayTeamScore 
-                        END AS awayTeamScore,
-                        m.matchLeague,
-                        m.isComplete,
-                        ml.oddsapiMatchId
-                    FROM matches m
-                    LEFT JOIN matches_lookup ml ON m.matchId = ml.matchId
-                ) mlo
-            """
-            cursor.execute(query)
-            match_odds = cursor.fetchall()
+        with db_cursor(dictionary=True) as (conn, cursor):
+            if match_id:
+                query = """
+                    SELECT mo.*, ml.matchId
+                    FROM match_odds mo
+                    LEFT JOIN matches_lookup ml ON mo.oddsapiMatchId = ml.oddsapiMatchId
+                    WHERE ml.matchId = %s AND mo.lastUpdated IS NOT NULL
+                """
+                params = [match_id]
+                if since:
+                    query += " AND (mo.createdAt > %s OR ml.lastUpdated > %s)"
+                    params.extend([since, since])
+                query += " ORDER BY mo.lastUpdated ASC"
+                cursor.execute(query, params)
+                match_odds = cursor.fetchall()
+            elif since:
+                # Odds rows stored, or linked to a match, after the since watermark
+                query = """
+                    SELECT ml.matchId, mo.homeTeamOdds, mo.awayTeamOdds, mo.drawOdds, mo.lastUpdated
+                    FROM match_odds mo
+                    JOIN matches_lookup ml ON mo.oddsapiMatchId = ml.oddsapiMatchId
+                    WHERE mo.lastUpdated IS NOT NULL AND (mo.createdAt > %s OR ml.lastUpdated > %s)
+                    ORDER BY ml.matchId, mo.lastUpdated ASC
+                """
+                cursor.execute(query, (since, since))
+                match_odds = cursor.fetchall()
+            else:
+                query, params = match_odds_page_query()
+                cursor.execute(query, params)
+                match_odds = cursor.fetchall()
         
-        return match_odds
+            return match_odds
 
     except Exception as e:
         logging.error(
             "Failed to retrieve matches from the MySQL database", exc_info=True
         )
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
-
-def get_matches_with_missing_odds():
-    try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-        # Set the current time in UTC
-        cursor.execute("SET @current_time_utc = CONVERT_TZ(NOW(), @@session.time_zone, '+00:00')")
 
-        query = """
+MATCH_ODDS_PAGE_QUERY = """
+    SELECT
+        mlo.*,
+        (
             SELECT
-                mlo.*,
-                (
-                    SELECT
-                        JSON_ARRAYAGG(
-                            JSON_OBJECT(
-                                "oddsapiMatchId", mo.oddsapiMatchId,
-                                "homeTeamOdds", mo.homeTeamOdds,
-                                "awayTeamOdds", mo.awayTeamOdds,
-                                "drawOdds", mo.drawOdds,
-                                "lastUpdated", mo.lastUpdated
-                            )
-                        )
-                    FROM match_odds mo
-                    WHERE mlo.oddsapiMatchId = mo.oddsapiMatchId
-                    ORDER BY mo.lastUpdated ASC
-                ) AS oddsData
-            FROM (
-                SELECT
-                    m.matchId,
-                    m.matchDate,
-                    m.homeTeamName,
-                    m.awayTeamName,
-                    m.sport,
-                    CASE 
-                        WHEN m.isComplete = 1 THEN COALESCE(m.homeTeamScore, 0)
-                        ELSE m.homeTeamScore 
-                    END AS homeTeamScore,
-                    CASE 
-                        WHEN m.isComplete = 1 THEN COALESCE(m.awayTeamScore, 0)
-                        ELSE m.awayTeamScore 
-                    END AS awayTeamScore,
-                    m.matchLeague,
-                    m.isComplete,
-                    ml.oddsapiMatchId
-                FROM matches m
-                LEFT JOIN matches_lookup ml ON m.matchId = ml.matchId
-                WHERE m.matchDate BETWEEN @current_time_utc - INTERVAL 10 DAY AND @current_time_utc AND m.isComplete = 1 
-            ) mlo
-        """
+                JSON_ARRAYAGG(
+                    JSON_OBJECT(
+                        "oddsapiMatchId", mo.oddsapiMatchId,
+                        "homeTeamOdds", mo.homeTeamOdds,
+                        "awayTeamOdds", mo.awayTeamOdds,
+                        "drawOdds", mo.drawOdds,
+                        "lastUpdated", mo.lastUpdated
+                    )
+                )
+            FROM match_odds mo
+            WHERE mlo.oddsapiMatchId = mo.oddsapiMatchId
+        ) AS oddsData
+    FROM (
+        SELECT
+            m.matchId,
+            m.matchDate,
+            m.homeTeamName,
+            m.awayTeamName,
+            m.sport,
+            CASE 
+                WHEN m.isComplete = 1 THEN COALESCE(m.homeTeamScore, 0)
+                ELSE m.homeTeamScore 
+            END AS homeTeamScore,
+            CASE 
+                WHEN m.isComplete = 1 THEN COALESCE(m.awayTeamScore, 0)
+                ELSE m.awayTeamScore 
+            END AS awayTeamScore,
+            m.matchLeague,
+            m.isComplete,
+            ml.oddsapiMatchId
+        FROM matches m
+        LEFT JOIN matches_lookup ml ON m.matchId = ml.matchId
+        {where}
+        ORDER BY m.matchId
+        {limit}
+    ) mlo
+    ORDER BY mlo.matchId
+"""
+MATCH_ODDS_PAGE_SIZE = 500
+
+def match_odds_page_query(after_match_id=None, limit=None, completed_within_days=None):
+    """
+    Builds the query for matches ordered by matchId, each with all of its odds as a JSON array in oddsData. Pages start
+    after after_match_id and hold at most limit matches. With completed_within_days, only matches completed within
+    that many days.
+    """
+    conditions = []
+    params = []
+    if after_match_id is not None:
+        conditions.append("m.matchId > %s")
+        params.append(after_match_id)
+    if completed_within_days is not None:
+        conditions.append("m.isComplete = 1 AND m.matchDate BETWEEN UTC_TIMESTAMP() - INTERVAL %s DAY AND UTC_TIMESTAMP()")
+        params.append(completed_within_days)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    if limit is not None:
+        params.append(limit)
+    return MATCH_ODDS_PAGE_QUERY.format(where=where, limit="LIMIT %s" if limit is not None else ""), params
+
+def get_match_odds_page(after_match_id=None, limit=MATCH_ODDS_PAGE_SIZE, completed_within_days=None):
+    """A page of matches with their odds, see match_odds_page_query. Pass the last matchId as after_match_id for the next page."""
+    try:
+        with db_cursor(dictionary=True) as (conn, cursor):
+            query, params = match_odds_page_query(after_match_id, limit, completed_within_days)
+            cursor.execute(query, params)
+            return cursor.fetchall()
 
-        cursor.execute(query)
-        matches = cursor.fetchall()
+    except Exception as e:
+        logging.error("Failed to retrieve match odds page from the MySQL database", exc_info=True)
+        return False
 
-        return matches
+def iter_match_odds(after_match_id=None, page_size=MATCH_ODDS_PAGE_SIZE, completed_within_days=None):
+    """
+    Yields matches with their odds page by page, so memory stays bounded by the page size however much odds history
+    there is. A pooled connection is only held while a page is read, not while the caller consumes it. Raises
+    RuntimeError when a page can not be read.
+    """
+    while True:
+        page = get_match_odds_page(after_match_id, page_size, completed_within_days)
+        if page is False:
+            raise RuntimeError(f"Failed to read the match odds page after {after_match_id}")
+        yield from page
+        if len(page) < page_size:
+            return
+        after_match_id = page[-1]["matchId"]
 
-    except Exception as e:
-        logging.error(
-            "Failed to retrieve matches from the MySQL database", exc_info=True
-        )
+def get_matches_with_missing_odds():
+    """Completed matches of the last 10 days with their odds, for finding odds gaps. fetch_missing_odds streams them with iter_match_odds."""
+    try:
+        return list(iter_match_odds(completed_within_days=10))
+    except RuntimeError:
         return False
-    finally:
-        if cursor is not None:
-            cursor.close()
-        if conn is not None:
-            conn.close()
 
 def get_match_by_id(match_id):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor(dictionary=True)
-
-        query = GET_MATCH_QUERY + """
-            WHERE mlo.matchId = %s
-        """
-        cursor.execute(query, (match_id,))
-        match = cursor.fetchone()
+        with db_cursor(dictionary=True) as (conn, cursor):
+            query = GET_MATCH_QUERY + """
+                WHERE mlo.matchId = %s
+            """
+            cursor.execute(query, (match_id,))
+            match = cursor.fetchone()
 
-        return match
+            return match
 
     except Exception as e:
         logging.error("Failed to retrieve match from the MySQL database", exc_info=True)
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
 
 def insert_match(match_id, event, sport_type, is_complete, current_utc_time):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            INSERT INTO matches (matchId, matchDate, sport, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, matchLeague, isComplete, lastUpdated) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE 
-                matchDate=VALUES(matchDate),
-                sport=VALUES(sport),
-                homeTeamName=VALUES(homeTeamName),
-                awayTeamName=VALUES(awayTeamName),
-                homeTeamScore=CASE 
-                    WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(homeTeamScore), 0)
-                    ELSE VALUES(homeTeamScore)
-                END,
-                awayTeamScore=CASE 
-                    WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(awayTeamScore), 0)
-                    ELSE VALUES(awayTeamScore)
-                END,
-                matchLeague=VALUES(matchLeague),
-                isComplete=VALUES(isComplete),
-                lastUpdated=VALUES(lastUpdated)
-            """,
-            (
-                match_id,
-                event.get("strTimestamp"),
-                sport_type,
-                event.get("strHomeTeam"),
-                event.get("strAwayTeam"),
-                event.get("intHomeScore"),
-                event.get("intAwayScore"),
-                event.get("strLeague"),
-                is_complete,
-                current_utc_time,
-            ),
-        )
+        with db_cursor() as (conn, c):
+            c.execute(
+                """
+                INSERT INTO matches (matchId, matchDate, sport, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, matchLeague, isComplete, lastUpdated) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE 
+                    lastUpdated=IF(
+                        matchDate <=> VALUES(matchDate)
+                        AND sport <=> VALUES(sport)
+                        AND homeTeamName <=> VALUES(homeTeamName)
+                        AND awayTeamName <=> VALUES(awayTeamName)
+                        AND homeTeamScore <=> CASE 
+                            WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(homeTeamScore), 0)
+                            ELSE VALUES(homeTeamScore)
+                        END
+                        AND awayTeamScore <=> CASE 
+                            WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(awayTeamScore), 0)
+                            ELSE VALUES(awayTeamScore)
+                        END
+                        AND matchLeague <=> VALUES(matchLeague)
+                        AND isComplete <=> VALUES(isComplete),
+                        lastUpdated,
+                        VALUES(lastUpdated)
+                    ),
+                    matchDate=VALUES(matchDate),
+                    sport=VALUES(sport),
+                    homeTeamName=VALUES(homeTeamName),
+                    awayTeamName=VALUES(awayTeamName),
+                    homeTeamScore=CASE 
+                        WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(homeTeamScore), 0)
+                        ELSE VALUES(homeTeamScore)
+                    END,
+                    awayTeamScore=CASE 
+                        WHEN VALUES(isComplete) = 1 THEN COALESCE(VALUES(awayTeamScore), 0)
+                        ELSE VALUES(awayTeamScore)
+                    END,
+                    matchLeague=VALUES(matchLeague),
+                    isComplete=VALUES(isComplete)
+                """,
+                (
+                    match_id,
+                    event.get("strTimestamp"),
+                    sport_type,
+                    event.get("strHomeTeam"),
+                    event.get("strAwayTeam"),
+                    event.get("intHomeScore"),
+                    event.get("intAwayScore"),
+                    event.get("strLeague"),
+                    is_complete,
+                    current_utc_time,
+                ),
+            )
+            # Unchanged matches are not counted as affected rows
+            if c.rowcount:
+                # The odds windows are relative to the match date, which may have moved
+                refresh_match_odds_summary(c, match_ids=[match_id])
+                bump_cache_version(c)
 
-        conn.commit()
-        logging.info("Data inserted or updated in database")
-        return True
+            conn.commit()
+            logging.info("Data inserted or updated in database")
+            return True
 
     except Exception as e:
         logging.error("Failed to insert match in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def insert_sportsdb_match_lookup(match_id, sportsdb_match_id):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-            INSERT IGNORE INTO matches_lookup (matchId, sportsdbMatchId) 
-            VALUES (%s, %s)
-            """,
-            (
-                match_id,
-                sportsdb_match_id
-            ),
-        )
+        with db_cursor() as (conn, c):
+            c.execute(
+                """
+                INSERT IGNORE INTO matches_lookup (matchId, sportsdbMatchId, lastUpdated) 
+                VALUES (%s, %s, UTC_TIMESTAMP())
+                """,
+                (
+                    match_id,
+                    sportsdb_match_id
+                ),
+            )
+            if c.rowcount:
+                bump_cache_version(c)
 
-        conn.commit()
-        logging.info("Match lookup inserted in database")
-        return True
+            conn.commit()
+            logging.info("Match lookup inserted in database")
+            return True
 
     except Exception as e:
         logging.error("Failed to insert match lookup in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def query_sportsdb_match_lookup(sportsdb_match_id):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT matchId FROM matches_lookup WHERE sportsdbMatchId = %s",
-            (sportsdb_match_id,),
-        )
-        match_id = cursor.fetchone()
+        with db_cursor() as (conn, cursor):
+            cursor.execute(
+                "SELECT matchId FROM matches_lookup WHERE sportsdbMatchId = %s",
+                (sportsdb_match_id,),
+            )
+            match_id = cursor.fetchone()
 
-        return match_id[0] if match_id else None
+            return match_id[0] if match_id else None
 
     except Exception as e:
         logging.error("Failed to query sportsdb match lookup in MySQL database", exc_info=True)
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 def setup_match_odds_table():
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        
-        # Check if the pinnacle_bookmaker column exists
-        c.execute("SHOW COLUMNS FROM match_odds LIKE 'pinnacle_bookmaker';")
-        result = c.fetchone()
+        with db_cursor() as (conn, c):
+            # Check if the pinnacle_bookmaker column exists
+            c.execute("SHOW COLUMNS FROM match_odds LIKE 'pinnacle_bookmaker';")
+            result = c.fetchone()
+
+            # If the column does not exist, add it
+            if not result:
+                c.execute(
+                    """
+                    ALTER TABLE match_odds
+                    ADD COLUMN pinnacle_bookmaker TINYINT(1) DEFAULT 1;
+                    """
+                )
+                conn.commit()
+                logging.info("Added pinnacle_bookmaker column to match_odds table.")
+
+            # createdAt is when the odds were stored (UTC), the cursor of delta odds syncs. lastUpdated is the bookmaker's timestamp.
+            c.execute("SHOW COLUMNS FROM match_odds LIKE 'createdAt';")
+            column = c.fetchone()
+            if not column:
+                # Added without a default, so existing rows are not stamped with the (session time zone) time of the ALTER
+                c.execute(
+                    """
+                    ALTER TABLE match_odds
+                    ADD COLUMN createdAt DATETIME DEFAULT NULL,
+                    ADD INDEX idx_match_odds_createdAt (createdAt);
+                    """
+                )
+                conn.commit()
+                logging.info("Added createdAt column to match_odds table.")
+            # Backfill existing rows with their UTC bookmaker timestamp before the default is switched on
+            if not column or column[4] is None:
+                c.execute(
+                    """
+                    UPDATE match_odds
+                    SET createdAt = COALESCE(lastUpdated, %s)
+                    WHERE createdAt IS NULL;
+                    """,
+                    (DELTA_SYNC_BACKFILL_TIMESTAMP,)
+                )
+                c.execute("ALTER TABLE match_odds MODIFY COLUMN createdAt DATETIME DEFAULT CURRENT_TIMESTAMP;")
+                conn.commit()
+                logging.info("Backfilled createdAt column of match_odds table.")
+
+            # The closing odds and odds window lookups of the summary refresh read a match's odds by time
+            c.execute("SHOW INDEX FROM match_odds WHERE Key_name = 'idx_match_odds_oddsapiMatchId_lastUpdated';")
+            if not c.fetchall():
+                c.execute(
+                    """
+                    ALTER TABLE match_odds
+                    ADD INDEX idx_match_odds_oddsapiMatchId_lastUpdated (oddsapiMatchId, lastUpdated);
+                    """
+                )
+                conn.commit()
+                logging.info("Added oddsapiMatchId, lastUpdated index to match_odds table.")
+
+            # Build the summary of every match the first time, later writes keep it up to date
+            c.execute(MATCH_ODDS_SUMMARY_CREATE)
+
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                name VARCHAR(50) PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP
+            )"""
+            )
+            c.execute("SELECT 1 FROM match_odds_summary LIMIT 1;")
+            if not c.fetchall():
+                refresh_match_odds_summary(c)
+                conn.commit()
+                logging.info("Built match_odds_summary table.")
 
-        # If the column does not exist, add it
-        if not result:
+            # Update existing records to set a default value for pinnacle_bookmaker
             c.execute(
                 """
-                ALTER TABLE match_odds
-                ADD COLUMN pinnacle_bookmaker TINYINT(1) DEFAULT 1;
+                UPDATE match_odds
+                SET pinnacle_bookmaker = 1
+                WHERE pinnacle_bookmaker IS NULL;
                 """
             )
             conn.commit()
-            logging.info("Added pinnacle_bookmaker column to match_odds table.")
-
-        # Update existing records to set a default value for pinnacle_bookmaker
-        c.execute(
-            """
-            UPDATE match_odds
-            SET pinnacle_bookmaker = 1
-            WHERE pinnacle_bookmaker IS NULL;
-            """
-        )
-        conn.commit()
-        logging.info("Updated existing records in match_odds table.")
+            logging.info("Updated existing records in match_odds table.")
 
     except Exception as e:
         logging.error("Failed to setup match_odds table", exc_info=True)
-    finally:
-        c.close()
-        conn.close()
+
+def setup_matches_lookup_table():
+    try:
+        with db_cursor() as (conn, c):
+            # lastUpdated is when the lookup last changed (UTC), so delta syncs pick up odds that were linked to a match later
+            c.execute("SHOW COLUMNS FROM matches_lookup LIKE 'lastUpdated';")
+            column = c.fetchone()
+            if not column:
+                c.execute(
+                    """
+                    ALTER TABLE matches_lookup
+                    ADD COLUMN lastUpdated DATETIME DEFAULT NULL,
+                    ADD INDEX idx_matches_lookup_lastUpdated (lastUpdated);
+                    """
+                )
+                conn.commit()
+                logging.info("Added lastUpdated column to matches_lookup table.")
+            # Existing lookups were served by full syncs already, backfill them before any watermark
+            if not column or column[4] is None:
+                c.execute(
+                    "UPDATE matches_lookup SET lastUpdated = %s WHERE lastUpdated IS NULL;",
+                    (DELTA_SYNC_BACKFILL_TIMESTAMP,)
+                )
+                c.execute("ALTER TABLE matches_lookup MODIFY COLUMN lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP;")
+                conn.commit()
+                logging.info("Backfilled lastUpdated column of matches_lookup table.")
+
+    except Exception as e:
+        logging.error("Failed to setup matches_lookup table", exc_info=True)
 
 def insert_match_odds_bulk(match_data):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.executemany(
-            """
-            INSERT IGNORE INTO match_odds (id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, pinnacle_bookmaker, lastUpdated) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """,
-            match_data,
-        )
+        with db_cursor() as (conn, c):
+            c.executemany(
+                """
+                INSERT IGNORE INTO match_odds (id, oddsapiMatchId, homeTeamOdds, awayTeamOdds, drawOdds, pinnacle_bookmaker, lastUpdated, createdAt) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s, UTC_TIMESTAMP())
+                """,
+                match_data,
+            )
+            if c.rowcount:
+                refresh_match_odds_summary(c, oddsapi_match_ids=[row[1] for row in match_data])
+                bump_cache_version(c)
 
-        conn.commit()
-        return True
+            conn.commit()
+            return True
 
     except Exception as e:
         logging.error("Failed to insert match odds in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def get_average_pinnacle():
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-                SELECT AVG(vig) AS average_vig
-                FROM (
-                    SELECT 
-                        (1 / homeTeamOdds + 1 / awayTeamOdds + 
-                        (CASE WHEN drawOdds IS NOT NULL THEN 1 / drawOdds ELSE 0 END) - 1) AS vig
-                    FROM match_odds
-                    WHERE pinnacle_bookmaker = 1
-                ) AS vig_table
-            """
-        )
+        with db_cursor() as (conn, c):
+            c.execute(
+                """
+                    SELECT AVG(vig) AS average_vig
+                    FROM (
+                        SELECT 
+                            (1 / homeTeamOdds + 1 / awayTeamOdds + 
+                            (CASE WHEN drawOdds IS NOT NULL THEN 1 / drawOdds ELSE 0 END) - 1) AS vig
+                        FROM match_odds
+                        WHERE pinnacle_bookmaker = 1
+                    ) AS vig_table
+                """
+            )
 
-        average_vig = c.fetchone()[0]  # Fetch the result
-        conn.commit()
-        return average_vig  # Return the average vig
+            average_vig = c.fetchone()[0]  # Fetch the result
+            conn.commit()
+            return average_vig  # Return the average vig
 
     except Exception as e:
         logging.error("Failed to get average pinnacle vig in match odds table", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def insert_match_lookups_bulk(match_lookup_data):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.executemany(
-            """
-            INSERT IGNORE INTO matches_lookup (matchId, oddsapiMatchId) 
-            VALUES (%s, %s)
-            ON DUPLICATE KEY UPDATE
-                oddsapiMatchId=VALUES(oddsapiMatchId)
-            """,
-            match_lookup_data,
-        )
+        with db_cursor() as (conn, c):
+            c.executemany(
+                """
+                INSERT IGNORE INTO matches_lookup (matchId, oddsapiMatchId, lastUpdated) 
+                VALUES (%s, %s, UTC_TIMESTAMP())
+                ON DUPLICATE KEY UPDATE
+                    lastUpdated=IF(oddsapiMatchId <=> VALUES(oddsapiMatchId), lastUpdated, VALUES(lastUpdated)),
+                    oddsapiMatchId=VALUES(oddsapiMatchId)
+                """,
+                match_lookup_data,
+            )
+            if c.rowcount:
+                refresh_match_odds_summary(c, match_ids=[row[0] for row in match_lookup_data])
+                bump_cache_version(c)
 
-        conn.commit()
-        return True
+            conn.commit()
+            return True
 
     except Exception as e:
         logging.error("Failed to insert match lookup in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def insert_odds_bulk(odds_to_store):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.executemany(
-            """
-            INSERT IGNORE INTO odds (oddsapiMatchId, league, homeTeamName, awayTeamName, commence_time, lastUpdated)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                commence_time=VALUES(commence_time),
-                lastUpdated=VALUES(lastUpdated);
-            """,
-            odds_to_store,
-        )
+        with db_cursor() as (conn, c):
+            c.executemany(
+                """
+                INSERT IGNORE INTO odds (oddsapiMatchId, league, homeTeamName, awayTeamName, commence_time, lastUpdated)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    commence_time=VALUES(commence_time),
+                    lastUpdated=VALUES(lastUpdated);
+                """,
+                odds_to_store,
+            )
 
-        conn.commit()
-        return True
+            conn.commit()
+            return True
 
     except Exception as e:
         logging.error("Failed to insert odds in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 def upload_prediction_edge_results(prediction_results):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-
-        """
-        {
-            'miner_scores': [
-                {
-                    "uid": 123,
-                    "hotkey": 'abcdefg',
-                    "vali_hotkey": 'hijklmnop',
-                    "total_score": 5.5,
-                    "total_pred_count": 100,
-                    "mlb_score": 1.1,
-                    "mlb_edge_score": 0.5,
-                    "mlb_roi_score": 0.2,
-                    "mlb_roi": 0.1,
-                    "mlb_market_roi": 0.05,
-                    "mlb_pred_count": 35,
-                    "mlb_pred_win_count": 20,
-                    "nfl_score": 3.12,
-                    "nfl_edge_score": 0.7,
-                    "nfl_roi_score": 0.3,
-                    "nfl_roi": 0.15,
-                    "nfl_market_roi": 0.1,
-                    "nfl_pred_count": 20,
-                    "nfl_pred_win_count": 15,
-                    "nba_score": 0.5,
-                    "nba_edge_score": 0.2,
-                    "nba_roi_score": 0.1,
-                    "nba_roi": 0.05,
-                    "nba_market_roi": 0.02,
-                    "nba_pred_count": 45,
-                    "nba_pred_win_count": 25,
-                    "mls_score": 0,
-                    "mls_edge_score": 0.1,
-                    "mls_roi_score": 0.05,
-                    "mls_roi": 0.02,
-                    "mls_market_roi": 0.01,
-                    "mls_pred_count": 0,
-                    "mls_pred_win_count": 0,
-                    "epl_score": 0,
-                    "epl_edge_score": 0.1,
-                    "epl_roi_score": 0.05,
-                    "epl_roi": 0.02,
-                    "epl_market_roi": 0.01,
-                    "epl_pred_count": 0,
-                    "epl_pred_win_count": 0,
-                    "lastUpdated": '2024-10-28 00:00:00'
-                }
-            ],
-        }
-        """
+        with db_cursor() as (conn, c):
+            """
+            {
+                'miner_scores': [
+                    {
+                        "uid": 123,
+                        "hotkey": 'abcdefg',
+                        "vali_hotkey": 'hijklmnop',
+                        "total_score": 5.5,
+                        "total_pred_count": 100,
+                        "mlb_score": 1.1,
+                        "mlb_edge_score": 0.5,
+                        "mlb_roi_score": 0.2,
+                        "mlb_roi": 0.1,
+                        "mlb_market_roi": 0.05,
+                        "mlb_pred_count": 35,
+                        "mlb_pred_win_count": 20,
+                        "nfl_score": 3.12,
+                        "nfl_edge_score": 0.7,
+                        "nfl_roi_score": 0.3,
+                        "nfl_roi": 0.15,
+                        "nfl_market_roi": 0.1,
+                        "nfl_pred_count": 20,
+                        "nfl_pred_win_count": 15,
+                        "nba_score": 0.5,
+                        "nba_edge_score": 0.2,
+                        "nba_roi_score": 0.1,
+                        "nba_roi": 0.05,
+                        "nba_market_roi": 0.02,
+                        "nba_pred_count": 45,
+                        "nba_pred_win_count": 25,
+                        "mls_score": 0,
+                        "mls_edge_score": 0.1,
+                        "mls_roi_score": 0.05,
+                        "mls_roi": 0.02,
+                        "mls_market_roi": 0.01,
+                        "mls_pred_count": 0,
+                        "mls_pred_win_count": 0,
+                        "epl_score": 0,
+                        "epl_edge_score": 0.1,
+                        "epl_roi_score": 0.05,
+                        "epl_roi": 0.02,
+                        "epl_market_roi": 0.01,
+                        "epl_pred_count": 0,
+                        "epl_pred_win_count": 0,
+                        "lastUpdated": '2024-10-28 00:00:00'
+                    }
+                ],
+            }
+            """
 
-        # Convert the miner_scores dictionary into a list of tuples
-        values_list = []
-        for uid, score_data in prediction_results["miner_scores"].items():
-            values_tuple = (
-                score_data.get("uid"),
-                score_data.get("hotkey"),
-                score_data.get("vali_hotkey"),
-                score_data.get("total_score", 0.0),
-                score_data.get("total_pred_count", 0),
-                score_data.get("mlb_score", 0.0),
-                score_data.get("mlb_edge_score", 0.0),
-                score_data.get("mlb_roi_score", 0.0),
-                score_data.get("mlb_roi", 0.0),
-                score_data.get("mlb_market_roi", 0.0),
-                score_data.get("mlb_pred_count", 0),
-                score_data.get("mlb_pred_win_count", 0),
-                score_data.get("nfl_score", 0.0),
-                score_data.get("nfl_edge_score", 0.0),
-                score_data.get("nfl_roi_score", 0.0),
-                score_data.get("nfl_roi", 0.0),
-                score_data.get("nfl_market_roi", 0.0),
-                score_data.get("nfl_pred_count", 0),
-                score_data.get("nfl_pred_win_count", 0),
-                score_data.get("nba_score", 0.0),
-                score_data.get("nba_edge_score", 0.0),
-                score_data.get("nba_roi_score", 0.0),
-                score_data.get("nba_roi", 0.0),
-                score_data.get("nba_market_roi", 0.0),
-                score_data.get("nba_pred_count", 0),
-                score_data.get("nba_pred_win_count", 0),
-                score_data.get("mls_score", 0.0),
-                score_data.get("mls_edge_score", 0.0),
-                score_data.get("mls_roi_score", 0.0),
-                score_data.get("mls_roi", 0.0),
-                score_data.get("mls_market_roi", 0.0),
-                score_data.get("mls_pred_count", 0),
-                score_data.get("mls_pred_win_count", 0),
-                score_data.get("epl_score", 0.0),
-                score_data.get("epl_edge_score", 0.0),
-                score_data.get("epl_roi_score", 0.0),
-                score_data.get("epl_roi", 0.0),
-                score_data.get("epl_market_roi", 0.0),
-                score_data.get("epl_pred_count", 0),
-                score_data.get("epl_pred_win_count", 0),
-            )
-            values_list.append(values_tuple)
-
-        prediction_edge_scores_table_name = "MatchPredictionEdgeResults"
-        if not IS_PROD:
-            prediction_edge_scores_table_name += "_test"
-        c.executemany(
-            f"""
-            INSERT INTO {prediction_edge_scores_table_name} (
-                miner_uid,
-                miner_hotkey,
-                vali_hotkey,
-                total_score,
-                total_pred_count,
-                mlb_score,
-                mlb_edge_score,
-                mlb_roi_score,
-                mlb_roi,
-                mlb_market_roi,
-                mlb_pred_count,
-                mlb_pred_win_count,
-                nfl_score,
-                nfl_edge_score,
-                nfl_roi_score,
-                nfl_roi,
-                nfl_market_roi,
-                nfl_pred_count,
-                nfl_pred_win_count,
-                nba_score,
-                nba_edge_score,
-                nba_roi_score,
-                nba_roi,
-                nba_market_roi,
-                nba_pred_count,
-                nba_pred_win_count,
-                mls_score,
-                mls_edge_score,
-                mls_roi_score,
-                mls_roi,
-                mls_market_roi,
-                mls_pred_count,
-                mls_pred_win_count,
-                epl_score,
-                epl_edge_score,
-                epl_roi_score,
-                epl_roi,
-                epl_market_roi,
-                epl_pred_count,
-                epl_pred_win_count,
-                lastUpdated
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW()
+            # Convert the miner_scores dictionary into a list of tuples
+            values_list = []
+            for uid, score_data in prediction_results["miner_scores"].items():
+                values_tuple = (
+                    score_data.get("uid"),
+                    score_data.get("hotkey"),
+                    score_data.get("vali_hotkey"),
+                    score_data.get("total_score", 0.0),
+                    score_data.get("total_pred_count", 0),
+                    score_data.get("mlb_score", 0.0),
+                    score_data.get("mlb_edge_score", 0.0),
+                    score_data.get("mlb_roi_score", 0.0),
+                    score_data.get("mlb_roi", 0.0),
+                    score_data.get("mlb_market_roi", 0.0),
+                    score_data.get("mlb_pred_count", 0),
+                    score_data.get("mlb_pred_win_count", 0),
+                    score_data.get("nfl_score", 0.0),
+                    score_data.get("nfl_edge_score", 0.0),
+                    score_data.get("nfl_roi_score", 0.0),
+                    score_data.get("nfl_roi", 0.0),
+                    score_data.get("nfl_market_roi", 0.0),
+                    score_data.get("nfl_pred_count", 0),
+                    score_data.get("nfl_pred_win_count", 0),
+                    score_data.get("nba_score", 0.0),
+                    score_data.get("nba_edge_score", 0.0),
+                    score_data.get("nba_roi_score", 0.0),
+                    score_data.get("nba_roi", 0.0),
+                    score_data.get("nba_market_roi", 0.0),
+                    score_data.get("nba_pred_count", 0),
+                    score_data.get("nba_pred_win_count", 0),
+                    score_data.get("mls_score", 0.0),
+                    score_data.get("mls_edge_score", 0.0),
+                    score_data.get("mls_roi_score", 0.0),
+                    score_data.get("mls_roi", 0.0),
+                    score_data.get("mls_market_roi", 0.0),
+                    score_data.get("mls_pred_count", 0),
+                    score_data.get("mls_pred_win_count", 0),
+                    score_data.get("epl_score", 0.0),
+                    score_data.get("epl_edge_score", 0.0),
+                    score_data.get("epl_roi_score", 0.0),
+                    score_data.get("epl_roi", 0.0),
+                    score_data.get("epl_market_roi", 0.0),
+                    score_data.get("epl_pred_count", 0),
+                    score_data.get("epl_pred_win_count", 0),
+                )
+                values_list.append(values_tuple)
+
+            prediction_edge_scores_table_name = "MatchPredictionEdgeResults"
+            if not IS_PROD:
+                prediction_edge_scores_table_name += "_test"
+            c.executemany(
+                f"""
+                INSERT INTO {prediction_edge_scores_table_name} (
+                    miner_uid,
+                    miner_hotkey,
+                    vali_hotkey,
+                    total_score,
+                    total_pred_count,
+                    mlb_score,
+                    mlb_edge_score,
+                    mlb_roi_score,
+                    mlb_roi,
+                    mlb_market_roi,
+                    mlb_pred_count,
+                    mlb_pred_win_count,
+                    nfl_score,
+                    nfl_edge_score,
+                    nfl_roi_score,
+                    nfl_roi,
+                    nfl_market_roi,
+                    nfl_pred_count,
+                    nfl_pred_win_count,
+                    nba_score,
+                    nba_edge_score,
+                    nba_roi_score,
+                    nba_roi,
+                    nba_market_roi,
+                    nba_pred_count,
+                    nba_pred_win_count,
+                    mls_score,
+                    mls_edge_score,
+                    mls_roi_score,
+                    mls_roi,
+                    mls_market_roi,
+                    mls_pred_count,
+                    mls_pred_win_count,
+                    epl_score,
+                    epl_edge_score,
+                    epl_roi_score,
+                    epl_roi,
+                    epl_market_roi,
+                    epl_pred_count,
+                    epl_pred_win_count,
+                    lastUpdated
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW()
+                )
+                """,
+                values_list,
             )
-            """,
-            values_list,
-        )
 
-        conn.commit()
-        logging.info("Prediction edge results data inserted or updated in database")
-        return True
+            conn.commit()
+            logging.info("Prediction edge results data inserted or updated in database")
+            return True
 
     except Exception as e:
         logging.error("Failed to insert prediction edge results data in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 
 def get_prediction_edge_results(vali_hotkey, miner_hotkey=None, miner_id=None, league=None, date=None, count=10):
     try:
-        conn = get_db_conn()
-        c = conn.cursor(dictionary=True)
-
-        prediction_edge_results_table_name = "MatchPredictionEdgeResults"
-        params = [vali_hotkey]
-        if not IS_PROD:
-            prediction_edge_results_table_name += "_test"
-
-        query = f"""
-            SELECT *
-            FROM {prediction_edge_results_table_name}
-            WHERE vali_hotkey = %s
-        """
+        with db_cursor(dictionary=True) as (conn, c):
+            prediction_edge_results_table_name = "MatchPredictionEdgeResults"
+            params = [vali_hotkey]
+            if not IS_PROD:
+                prediction_edge_results_table_name += "_test"
+
+            query = f"""
+                SELECT *
+                FROM {prediction_edge_results_table_name}
+                WHERE vali_hotkey = %s
+            """
 
-        if miner_hotkey:
-            query += " AND miner_hotkey = %s"
-            params.append(miner_hotkey)
+            if miner_hotkey:
+                query += " AND miner_hotkey = %s"
+                params.append(miner_hotkey)
         
-        if miner_id:
-            query += " AND miner_uid = %s"
-            params.append(miner_id)
+            if miner_id:
+                query += " AND miner_uid = %s"
+                params.append(miner_id)
 
-        if league:
-            query += f" AND {league.lower()}_pred_count > 0 AND {league.lower()}_score > 0"
+            if league:
+                query += f" AND {league.lower()}_pred_count > 0 AND {league.lower()}_score > 0"
         
-        if date:
-            query += " AND DATE(lastUpdated) >= %s"
-            date = dt.datetime.strptime(date, "%Y-%m-%d")
-            params.append(date)
-            if not count:
-                count = 1
-
-        query += """
-            ORDER BY lastUpdated DESC
-        """
+            if date:
+                query += " AND DATE(lastUpdated) >= %s"
+                date = dt.datetime.strptime(date, "%Y-%m-%d")
+                params.append(date)
+                if not count:
+                    count = 1
 
-        if league:
-            query += f"""
-                , {league.lower()}_score DESC
+            query += """
+                ORDER BY lastUpdated DESC
             """
 
-        if count:
-            query += " LIMIT %s"
-            params.append(count)
+            if league:
+                query += f"""
+                    , {league.lower()}_score DESC
+                """
+
+            if count:
+                query += " LIMIT %s"
+                params.append(count)
 
-        if params:
-            c.execute(query, params)
-        else:
-            c.execute(query)
-        return c.fetchall()
+            if params:
+                c.execute(query, params)
+            else:
+                c.execute(query)
+            return c.fetchall()
 
     except Exception as e:
         logging.error(
             "Failed to query league prediction stats from MySQL database", exc_info=True
         )
         return False
-    finally:
-        c.close()
-        conn.close()
 
 
 def upload_scored_predictions(predictions, vali_hotkey):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-
-        current_utc_time = dt.datetime.now(timezone.utc)
-        current_utc_time = current_utc_time.strftime("%Y-%m-%d %H:%M:%S")
+        with db_cursor() as (conn, c):
+            current_utc_time = dt.datetime.now(timezone.utc)
+            current_utc_time = current_utc_time.strftime("%Y-%m-%d %H:%M:%S")
         
-        print(f"Content of predictions: {predictions}")
-
-        predictions = predictions.get('predictions', [])
-
-        # Ensure predictions is a list
-        if not isinstance(predictions, list):
-            raise ValueError("predictions must be a list of dictionaries")
-
-        # Prepare the data for executemany
-        data_to_insert = [
-            (
-                int(prediction.get("minerId")),
-                prediction.get("hotkey"),
-                vali_hotkey,
-                prediction.get("predictionDate"),
-                prediction.get("matchId"),
-                prediction.get("matchDate"),
-                int(prediction.get("sport")),
-                prediction.get("league"),
-                1,
-                current_utc_time,
-                prediction.get("homeTeamName"),
-                prediction.get("awayTeamName"),
-                prediction.get("homeTeamScore"),
-                prediction.get("awayTeamScore"),
-                prediction.get("probabilityChoice"),
-                float(prediction.get("probability")),
-                float(prediction.get("closingEdge")) if prediction.get("closingEdge") is not None else None,
+            print(f"Content of predictions: {predictions}")
+
+            predictions = predictions.get('predictions', [])
+
+            # Ensure predictions is a list
+            if not isinstance(predictions, list):
+                raise ValueError("predictions must be a list of dictionaries")
+
+            # Prepare the data for executemany
+            data_to_insert = [
+                (
+                    int(prediction.get("minerId")),
+                    prediction.get("hotkey"),
+                    vali_hotkey,
+                    prediction.get("predictionDate"),
+                    prediction.get("matchId"),
+                    prediction.get("matchDate"),
+                    int(prediction.get("sport")),
+                    prediction.get("league"),
+                    1,
+                    current_utc_time,
+                    prediction.get("homeTeamName"),
+                    prediction.get("awayTeamName"),
+                    prediction.get("homeTeamScore"),
+                    prediction.get("awayTeamScore"),
+                    prediction.get("probabilityChoice"),
+                    float(prediction.get("probability")),
+                    float(prediction.get("closingEdge")) if prediction.get("closingEdge") is not None else None,
+                )
+                for prediction in predictions
+            ]
+
+            prediction_scores_table_name = "MatchPredictionsScored"
+            if not IS_PROD:
+                prediction_scores_table_name += "_test"
+            c.executemany(
+                f"""
+                INSERT IGNORE INTO {prediction_scores_table_name} (
+                    miner_id,
+                    miner_hotkey,
+                    vali_hotkey,
+                    predictionDate,
+                    matchId,
+                    matchDate,
+                    sport,
+                    league,
+                    isScored,
+                    scoredDate,
+                    homeTeamName,
+                    awayTeamName,
+                    homeTeamScore,
+                    awayTeamScore,
+                    probabilityChoice,
+                    probability,
+                    closingEdge
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                );
+                """,
+                data_to_insert,
             )
-            for prediction in predictions
-        ]
-
-        prediction_scores_table_name = "MatchPredictionsScored"
-        if not IS_PROD:
-            prediction_scores_table_name += "_test"
-        c.executemany(
-            f"""
-            INSERT IGNORE INTO {prediction_scores_table_name} (
-                miner_id,
-                miner_hotkey,
-                vali_hotkey,
-                predictionDate,
-                matchId,
-                matchDate,
-                sport,
-                league,
-                isScored,
-                scoredDate,
-                homeTeamName,
-                awayTeamName,
-                homeTeamScore,
-                awayTeamScore,
-                probabilityChoice,
-                probability,
-                closingEdge
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-            );
-            """,
-            data_to_insert,
-        )
 
-        conn.commit()
-        logging.info("Scored predictions inserted in database")
-        return True
+            conn.commit()
+            logging.info("Scored predictions inserted in database")
+            return True
 
     except Exception as e:
         logging.error("Failed to insert scored predictions in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 
 def update_miner_reg_statuses(active_uids, active_hotkeys):
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-
-        miners_table_name = "Miners"
-        if not IS_PROD:
-            miners_table_name += "_test"
-
-        # mark all as unregistered first as we'll update only the active ones next
-        c.execute(
-            f"""
-            UPDATE {miners_table_name}
-            SET miner_is_registered = 0
-            """,
-        )
-        conn.commit()
+        with db_cursor() as (conn, c):
+            miners_table_name = "Miners"
+            if not IS_PROD:
+                miners_table_name += "_test"
 
-        # loop through zipped uids and hotkeys and update the miner_is_registered status
-        for uid, hotkey in zip(active_uids, active_hotkeys):
+            # mark all as unregistered first as we'll update only the active ones next
             c.execute(
                 f"""
                 UPDATE {miners_table_name}
-                SET miner_is_registered = 1, miner_uid = %s
-                WHERE miner_hotkey = %s
+                SET miner_is_registered = 0
                 """,
-                (uid, hotkey),
             )
             conn.commit()
+
+            # loop through zipped uids and hotkeys and update the miner_is_registered status
+            for uid, hotkey in zip(active_uids, active_hotkeys):
+                c.execute(
+                    f"""
+                    UPDATE {miners_table_name}
+                    SET miner_is_registered = 1, miner_uid = %s
+                    WHERE miner_hotkey = %s
+                    """,
+                    (uid, hotkey),
+                )
+                conn.commit()
         
-        logging.info("Miner registration statuses updated in database")
-        return True
+            logging.info("Miner registration statuses updated in database")
+            return True
 
     except Exception as e:
         logging.error("Failed to update miner registration statuses in MySQL database", exc_info=True)
         return False
-    finally:
-        c.close()
-        conn.close()
 
 
 def insert_or_update_miner_coldkeys_and_ages(data_to_update):
     try:
-        conn = get_db_conn()
-        cursor = conn.cursor()
-
-        miners_table_name = "Miners"
-        if not IS_PROD:
-            miners_table_name += "_test"
-
-        # mark all as unregistered first as we'll update only the active ones next
-        cursor.execute(
-            f"""
-            UPDATE {miners_table_name}
-            SET miner_is_registered = 0
-            """,
-        )
-        conn.commit()
+        with db_cursor() as (conn, cursor):
+            miners_table_name = "Miners"
+            if not IS_PROD:
+                miners_table_name += "_test"
+
+            # mark all as unregistered first as we'll update only the active ones next
+            cursor.execute(
+                f"""
+                UPDATE {miners_table_name}
+                SET miner_is_registered = 0
+                """,
+            )
+            conn.commit()
 
-        cursor.executemany(f"""
-            INSERT INTO {miners_table_name} (miner_hotkey, miner_coldkey, miner_uid, miner_age, miner_is_registered, last_updated) 
-            VALUES (%s, %s, %s, %s, 1, NOW())
-            ON DUPLICATE KEY UPDATE
-                miner_coldkey=VALUES(miner_coldkey), 
-                miner_age=VALUES(miner_age), 
-                miner_is_registered=VALUES(miner_is_registered)
-        """, data_to_update)
+            cursor.executemany(f"""
+                INSERT INTO {miners_table_name} (miner_hotkey, miner_coldkey, miner_uid, miner_age, miner_is_registered, last_updated) 
+                VALUES (%s, %s, %s, %s, 1, NOW())
+                ON DUPLICATE KEY UPDATE
+                    miner_coldkey=VALUES(miner_coldkey), 
+                    miner_age=VALUES(miner_age), 
+                    miner_is_registered=VALUES(miner_is_registered)
+            """, data_to_update)
 
-        # Commit the changes
-        conn.commit()
+            # Commit the changes
+            conn.commit()
 
     except Exception as e:
         logging.error("Failed to update miner coldkeys and ages in MySQL database", exc_info=True)
-    finally:
-        cursor.close()
-        conn.close()
 
 
 def get_prediction_results_by_league(vali_hotkey, league=None, miner_hotkey=None):
     try:
-        conn = get_db_conn()
-        c = conn.cursor(dictionary=True)
-
-        prediction_scores_table_name = "MatchPredictionsScored"
-        params = [vali_hotkey]
-        miners_table_name = "Miners"
-        if not IS_PROD:
-            prediction_scores_table_name += "_test"
-            miners_table_name += "_test"
+        with db_cursor(dictionary=True) as (conn, c):
+            prediction_scores_table_name = "MatchPredictionsScored"
+            params = [vali_hotkey]
+            miners_table_name = "Miners"
+            if not IS_PROD:
+                prediction_scores_table_name += "_test"
+                miners_table_name += "_test"
+
+            query = f"""
+                SELECT
+                    DATE(mps.scoredDate) AS scoreDate,
+                    COUNT(*) AS total_predictions
+                FROM {prediction_scores_table_name} mps
+                LEFT JOIN {miners_table_name} m ON mps.miner_hotkey = m.miner_hotkey
+                WHERE m.miner_is_registered = 1 AND mps.vali_hotkey = %s
+            """
+            if league:
+                query += " AND league = %s"
+                params.append(league)
 
-        query = f"""
-            SELECT
-                DATE(mps.scoredDate) AS scoreDate,
-                COUNT(*) AS total_predictions
-            FROM {prediction_scores_table_name} mps
-            LEFT JOIN {miners_table_name} m ON mps.miner_hotkey = m.miner_hotkey
-            WHERE m.miner_is_registered = 1 AND mps.vali_hotkey = %s
-        """
-        if league:
-            query += " AND league = %s"
-            params.append(league)
-
-        if miner_hotkey:
-            query += " AND mps.miner_hotkey = %s"
-            params.append(miner_hotkey)
-        query += """
-            GROUP BY DATE(mps.scoredDate)
-            ORDER BY scoreDate ASC;
-        """
-        if params:
-            c.execute(query, params)
-        else:
-            c.execute(query)
-        return c.fetchall()
+            if miner_hotkey:
+                query += " AND mps.miner_hotkey = %s"
+                params.append(miner_hotkey)
+            query += """
+                GROUP BY DATE(mps.scoredDate)
+                ORDER BY scoreDate ASC;
+            """
+            if params:
+                c.execute(query, params)
+            else:
+                c.execute(query)
+            return c.fetchall()
 
     except Exception as e:
         logging.error(
             "Failed to query league prediction stats from MySQL database", exc_info=True
         )
         return False
-    finally:
-        c.close()
-        conn.close()
 
 
 def create_tables():
-    c = None
-    conn = None
     try:
-        conn = get_db_conn()
-        c = conn.cursor()
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS matches (
-            matchId VARCHAR(50) PRIMARY KEY,
-            matchDate TIMESTAMP NOT NULL,
-            sport INTEGER NOT NULL,
-            homeTeamName VARCHAR(30) NOT NULL,
-            awayTeamName VARCHAR(30) NOT NULL,
-            homeTeamScore INTEGER,
-            awayTeamScore INTEGER,
-            matchLeague VARCHAR(50),
-            isComplete BOOLEAN DEFAULT FALSE,
-            lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )"""
-        )
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS matches_lookup (
-            matchId VARCHAR(50) PRIMARY KEY,
-            sportsdbMatchId VARCHAR(50) DEFAULT NULL,
-            oddsapiMatchId VARCHAR(50) DEFAULT NULL
-        )"""
-        )
+        with db_cursor() as (conn, c):
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS matches (
+                matchId VARCHAR(50) PRIMARY KEY,
+                matchDate TIMESTAMP NOT NULL,
+                sport INTEGER NOT NULL,
+                homeTeamName VARCHAR(30) NOT NULL,
+                awayTeamName VARCHAR(30) NOT NULL,
+                homeTeamScore INTEGER,
+                awayTeamScore INTEGER,
+                matchLeague VARCHAR(50),
+                isComplete BOOLEAN DEFAULT FALSE,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )"""
+            )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS matches_lookup (
+                matchId VARCHAR(50) PRIMARY KEY,
+                sportsdbMatchId VARCHAR(50) DEFAULT NULL,
+                oddsapiMatchId VARCHAR(50) DEFAULT NULL,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_matches_lookup_lastUpdated (lastUpdated)
+            )"""
+            )
 
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS match_odds (
-            id VARCHAR(50) PRIMARY KEY,
-            oddsapiMatchId VARCHAR(50) DEFAULT NULL,
-            homeTeamOdds FLOAT,
-            awayTeamOdds FLOAT,
-            drawOdds FLOAT,
-            pinnacle_bookmaker TINYINT(1) DEFAULT 1,
-            lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-        )"""
-        )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS match_odds (
+                id VARCHAR(50) PRIMARY KEY,
+                oddsapiMatchId VARCHAR(50) DEFAULT NULL,
+                homeTeamOdds FLOAT,
+                awayTeamOdds FLOAT,
+                drawOdds FLOAT,
+                pinnacle_bookmaker TINYINT(1) DEFAULT 1,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                createdAt DATETIME DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_match_odds_createdAt (createdAt),
+                INDEX idx_match_odds_oddsapiMatchId_lastUpdated (oddsapiMatchId, lastUpdated)
+            )"""
+            )
 
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS odds (
-            oddsapiMatchId VARCHAR(50) PRIMARY KEY,
-            league VARCHAR(30) NOT NULL,
-            homeTeamName VARCHAR(30) NOT NULL,
-            awayTeamName VARCHAR(30) NOT NULL,
-            commence_time TIMESTAMP NOT NULL,
-            lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-       )"""
-       )
-
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS MatchPredictionsScored (
-            miner_id INTEGER NOT NULL,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            vali_hotkey VARCHAR(64) NOT NULL,
-            predictionDate TIMESTAMP NOT NULL,
-            matchId VARCHAR(50) NOT NULL,
-            matchDate TIMESTAMP NOT NULL,
-            sport INTEGER NOT NULL,
-            league VARCHAR(50) NOT NULL,
-            homeTeamName VARCHAR(30) NOT NULL,
-            awayTeamName VARCHAR(30) NOT NULL,
-            homeTeamScore INTEGER,
-            awayTeamScore INTEGER,
-            probabilityChoice VARCHAR(10) NOT NULL,
-            probability FLOAT NOT NULL,
-            closingEdge FLOAT NOT NULL,
-            isScored BOOLEAN DEFAULT FALSE,
-            scoredDate TIMESTAMP DEFAULT NULL,
-            lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            PRIMARY KEY (miner_hotkey, vali_hotkey, matchId)
-        )"""
-        )
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS MatchPredictionsScored_test (
-            miner_id INTEGER NOT NULL,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            vali_hotkey VARCHAR(64) NOT NULL,
-            predictionDate TIMESTAMP NOT NULL,
-            matchId VARCHAR(50) NOT NULL,
-            matchDate TIMESTAMP NOT NULL,
-            sport INTEGER NOT NULL,
-            league VARCHAR(50) NOT NULL,
-            homeTeamName VARCHAR(30) NOT NULL,
-            awayTeamName VARCHAR(30) NOT NULL,
-            homeTeamScore INTEGER,
-            awayTeamScore INTEGER,
-            probabilityChoice VARCHAR(10) NOT NULL,
-            probability FLOAT NOT NULL,
-            closingEdge FLOAT NOT NULL,
-            isScored BOOLEAN DEFAULT FALSE,
-            scoredDate TIMESTAMP DEFAULT NULL,
-            lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-            PRIMARY KEY (miner_hotkey, vali_hotkey, matchId)
-        )"""
-        )
+            c.execute(MATCH_ODDS_SUMMARY_CREATE)
 
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS MatchPredictionEdgeResults (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            miner_uid INTEGER NOT NULL,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            vali_hotkey VARCHAR(64) NOT NULL,
-            total_score FLOAT NOT NULL,
-            total_pred_count INTEGER NOT NULL,
-            mlb_score FLOAT NOT NULL,
-            mlb_edge_score FLOAT NOT NULL,
-            mlb_roi_score FLOAT NOT NULL,
-            mlb_roi FLOAT NOT NULL,
-            mlb_market_roi FLOAT NOT NULL,
-            mlb_pred_count INTEGER NOT NULL,
-            nfl_score FLOAT NOT NULL,
-            nfl_edge_score FLOAT NOT NULL,
-            nfl_roi_score FLOAT NOT NULL,
-            nfl_roi FLOAT NOT NULL,
-            nfl_market_roi FLOAT NOT NULL,
-            nfl_pred_count INTEGER NOT NULL,
-            nba_score FLOAT NOT NULL,
-            nba_edge_score FLOAT NOT NULL,
-            nba_roi_score FLOAT NOT NULL,
-            nba_roi FLOAT NOT NULL,
-            nba_market_roi FLOAT NOT NULL,
-            nba_pred_count INTEGER NOT NULL,
-            mls_score FLOAT NOT NULL,
-            mls_edge_score FLOAT NOT NULL,
-            mls_roi_score FLOAT NOT NULL,
-            mls_roi FLOAT NOT NULL,
-            mls_market_roi FLOAT NOT NULL,
-            mls_pred_count INTEGER NOT NULL,
-            epl_score FLOAT NOT NULL,
-            epl_edge_score FLOAT NOT NULL,
-            epl_roi_score FLOAT NOT NULL,
-            epl_roi FLOAT NOT NULL,
-            epl_market_roi FLOAT NOT NULL,
-            epl_pred_count INTEGER NOT NULL,
-            lastUpdated TIMESTAMP NOT NULL
-        )"""
-        )
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS MatchPredictionEdgeResults_test (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            miner_uid INTEGER NOT NULL,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            vali_hotkey VARCHAR(64) NOT NULL,
-            total_score FLOAT NOT NULL,
-            total_pred_count INTEGER NOT NULL,
-            mlb_score FLOAT NOT NULL,
-            mlb_edge_score FLOAT NOT NULL,
-            mlb_roi_score FLOAT NOT NULL,
-            mlb_roi FLOAT NOT NULL,
-            mlb_market_roi FLOAT NOT NULL,
-            mlb_pred_count INTEGER NOT NULL,
-            mlb_pred_win_count INTEGER NOT NULL,
-            nfl_score FLOAT NOT NULL,
-            nfl_edge_score FLOAT NOT NULL,
-            nfl_roi_score FLOAT NOT NULL,
-            nfl_roi FLOAT NOT NULL,
-            nfl_market_roi FLOAT NOT NULL,
-            nfl_pred_count INTEGER NOT NULL,
-            nfl_pred_win_count INTEGER NOT NULL,
-            nba_score FLOAT NOT NULL,
-            nba_edge_score FLOAT NOT NULL,
-            nba_roi_score FLOAT NOT NULL,
-            nba_roi FLOAT NOT NULL,
-            nba_market_roi FLOAT NOT NULL,
-            nba_pred_count INTEGER NOT NULL,
-            nba_pred_win_count INTEGER NOT NULL,
-            mls_score FLOAT NOT NULL,
-            mls_edge_score FLOAT NOT NULL,
-            mls_roi_score FLOAT NOT NULL,
-            mls_roi FLOAT NOT NULL,
-            mls_market_roi FLOAT NOT NULL,
-            mls_pred_count INTEGER NOT NULL,
-            mls_pred_win_count INTEGER NOT NULL,
-            epl_score FLOAT NOT NULL,
-            epl_edge_score FLOAT NOT NULL,
-            epl_roi_score FLOAT NOT NULL,
-            epl_roi FLOAT NOT NULL,
-            epl_market_roi FLOAT NOT NULL,
-            epl_pred_count INTEGER NOT NULL,
-            epl_pred_win_count INTEGER NOT NULL,
-            lastUpdated TIMESTAMP NOT NULL
-        )"""
-        )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS odds (
+                oddsapiMatchId VARCHAR(50) PRIMARY KEY,
+                league VARCHAR(30) NOT NULL,
+                homeTeamName VARCHAR(30) NOT NULL,
+                awayTeamName VARCHAR(30) NOT NULL,
+                commence_time TIMESTAMP NOT NULL,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+           )"""
+           )
+
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS MatchPredictionsScored (
+                miner_id INTEGER NOT NULL,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                vali_hotkey VARCHAR(64) NOT NULL,
+                predictionDate TIMESTAMP NOT NULL,
+                matchId VARCHAR(50) NOT NULL,
+                matchDate TIMESTAMP NOT NULL,
+                sport INTEGER NOT NULL,
+                league VARCHAR(50) NOT NULL,
+                homeTeamName VARCHAR(30) NOT NULL,
+                awayTeamName VARCHAR(30) NOT NULL,
+                homeTeamScore INTEGER,
+                awayTeamScore INTEGER,
+                probabilityChoice VARCHAR(10) NOT NULL,
+                probability FLOAT NOT NULL,
+                closingEdge FLOAT NOT NULL,
+                isScored BOOLEAN DEFAULT FALSE,
+                scoredDate TIMESTAMP DEFAULT NULL,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (miner_hotkey, vali_hotkey, matchId)
+            )"""
+            )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS MatchPredictionsScored_test (
+                miner_id INTEGER NOT NULL,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                vali_hotkey VARCHAR(64) NOT NULL,
+                predictionDate TIMESTAMP NOT NULL,
+                matchId VARCHAR(50) NOT NULL,
+                matchDate TIMESTAMP NOT NULL,
+                sport INTEGER NOT NULL,
+                league VARCHAR(50) NOT NULL,
+                homeTeamName VARCHAR(30) NOT NULL,
+                awayTeamName VARCHAR(30) NOT NULL,
+                homeTeamScore INTEGER,
+                awayTeamScore INTEGER,
+                probabilityChoice VARCHAR(10) NOT NULL,
+                probability FLOAT NOT NULL,
+                closingEdge FLOAT NOT NULL,
+                isScored BOOLEAN DEFAULT FALSE,
+                scoredDate TIMESTAMP DEFAULT NULL,
+                lastUpdated DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                PRIMARY KEY (miner_hotkey, vali_hotkey, matchId)
+            )"""
+            )
+
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS MatchPredictionEdgeResults (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                miner_uid INTEGER NOT NULL,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                vali_hotkey VARCHAR(64) NOT NULL,
+                total_score FLOAT NOT NULL,
+                total_pred_count INTEGER NOT NULL,
+                mlb_score FLOAT NOT NULL,
+                mlb_edge_score FLOAT NOT NULL,
+                mlb_roi_score FLOAT NOT NULL,
+                mlb_roi FLOAT NOT NULL,
+                mlb_market_roi FLOAT NOT NULL,
+                mlb_pred_count INTEGER NOT NULL,
+                nfl_score FLOAT NOT NULL,
+                nfl_edge_score FLOAT NOT NULL,
+                nfl_roi_score FLOAT NOT NULL,
+                nfl_roi FLOAT NOT NULL,
+                nfl_market_roi FLOAT NOT NULL,
+                nfl_pred_count INTEGER NOT NULL,
+                nba_score FLOAT NOT NULL,
+                nba_edge_score FLOAT NOT NULL,
+                nba_roi_score FLOAT NOT NULL,
+                nba_roi FLOAT NOT NULL,
+                nba_market_roi FLOAT NOT NULL,
+                nba_pred_count INTEGER NOT NULL,
+                mls_score FLOAT NOT NULL,
+                mls_edge_score FLOAT NOT NULL,
+                mls_roi_score FLOAT NOT NULL,
+                mls_roi FLOAT NOT NULL,
+                mls_market_roi FLOAT NOT NULL,
+                mls_pred_count INTEGER NOT NULL,
+                epl_score FLOAT NOT NULL,
+                epl_edge_score FLOAT NOT NULL,
+                epl_roi_score FLOAT NOT NULL,
+                epl_roi FLOAT NOT NULL,
+                epl_market_roi FLOAT NOT NULL,
+                epl_pred_count INTEGER NOT NULL,
+                lastUpdated TIMESTAMP NOT NULL
+            )"""
+            )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS MatchPredictionEdgeResults_test (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                miner_uid INTEGER NOT NULL,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                vali_hotkey VARCHAR(64) NOT NULL,
+                total_score FLOAT NOT NULL,
+                total_pred_count INTEGER NOT NULL,
+                mlb_score FLOAT NOT NULL,
+                mlb_edge_score FLOAT NOT NULL,
+                mlb_roi_score FLOAT NOT NULL,
+                mlb_roi FLOAT NOT NULL,
+                mlb_market_roi FLOAT NOT NULL,
+                mlb_pred_count INTEGER NOT NULL,
+                mlb_pred_win_count INTEGER NOT NULL,
+                nfl_score FLOAT NOT NULL,
+                nfl_edge_score FLOAT NOT NULL,
+                nfl_roi_score FLOAT NOT NULL,
+                nfl_roi FLOAT NOT NULL,
+                nfl_market_roi FLOAT NOT NULL,
+                nfl_pred_count INTEGER NOT NULL,
+                nfl_pred_win_count INTEGER NOT NULL,
+                nba_score FLOAT NOT NULL,
+                nba_edge_score FLOAT NOT NULL,
+                nba_roi_score FLOAT NOT NULL,
+                nba_roi FLOAT NOT NULL,
+                nba_market_roi FLOAT NOT NULL,
+                nba_pred_count INTEGER NOT NULL,
+                nba_pred_win_count INTEGER NOT NULL,
+                mls_score FLOAT NOT NULL,
+                mls_edge_score FLOAT NOT NULL,
+                mls_roi_score FLOAT NOT NULL,
+                mls_roi FLOAT NOT NULL,
+                mls_market_roi FLOAT NOT NULL,
+                mls_pred_count INTEGER NOT NULL,
+                mls_pred_win_count INTEGER NOT NULL,
+                epl_score FLOAT NOT NULL,
+                epl_edge_score FLOAT NOT NULL,
+                epl_roi_score FLOAT NOT NULL,
+                epl_roi FLOAT NOT NULL,
+                epl_market_roi FLOAT NOT NULL,
+                epl_pred_count INTEGER NOT NULL,
+                epl_pred_win_count INTEGER NOT NULL,
+                lastUpdated TIMESTAMP NOT NULL
+            )"""
+            )
         
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS Miners (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            miner_coldkey VARCHAR(64) NOT NULL,
-            miner_uid INTEGER NOT NULL,
-            miner_is_registered TINYINT(1) DEFAULT 1,
-            miner_age INTEGER NOT NULL DEFAULT 0,
-            last_updated TIMESTAMP NOT NULL,
-            UNIQUE (miner_hotkey, miner_uid)
-        )"""
-        )
-        c.execute(
-            """
-        CREATE TABLE IF NOT EXISTS Miners_test (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            miner_hotkey VARCHAR(64) NOT NULL,
-            miner_coldkey VARCHAR(64) NOT NULL,
-            miner_uid INTEGER NOT NULL,
-            miner_is_registered TINYINT(1) DEFAULT 1,
-            miner_age INTEGER NOT NULL DEFAULT 0,
-            last_updated TIMESTAMP NOT NULL,
-            UNIQUE (miner_hotkey, miner_uid)
-        )"""
-        )
-        conn.commit()
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS Miners (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                miner_coldkey VARCHAR(64) NOT NULL,
+                miner_uid INTEGER NOT NULL,
+                miner_is_registered TINYINT(1) DEFAULT 1,
+                miner_age INTEGER NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP NOT NULL,
+                UNIQUE (miner_hotkey, miner_uid)
+            )"""
+            )
+            c.execute(
+                """
+            CREATE TABLE IF NOT EXISTS Miners_test (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                miner_hotkey VARCHAR(64) NOT NULL,
+                miner_coldkey VARCHAR(64) NOT NULL,
+                miner_uid INTEGER NOT NULL,
+                miner_is_registered TINYINT(1) DEFAULT 1,
+                miner_age INTEGER NOT NULL DEFAULT 0,
+                last_updated TIMESTAMP NOT NULL,
+                UNIQUE (miner_hotkey, miner_uid)
+            )"""
+            )
+            conn.commit()
     except Exception as e:
         logging.error("Failed to create matches table in MySQL database", exc_info=True)
-    finally:
-        if c is not None:
-            c.close()
-        if conn is not None:
-            conn.close()
 
 
-def get_db_conn():
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-        )
-        return conn
-    except mysql.connector.Error as e:
-        logging.error(f"Failed to connect to MySQL database: {e}")
-        return None  # Explicitly return None if there is an error
+def connect():
+    """Opens a new MySQL connection. The db functions borrow pooled connections through db_cursor instead."""
+    return mysql.connector.connect(
+        host=DB_HOST,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD,
+    )
 
 
+pool = ConnectionPool(
+    connect,
+    size=DB_POOL_SIZE,
+    timeout=DB_POOL_TIMEOUT_IN_SECONDS,
+    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL_IN_SECONDS,
+)
+
+
+@contextmanager
+def db_cursor(**cursor_args):
+    """
+    Borrows a connection from the pool and yields it with a new cursor. On exit the cursor is closed and the
+    connection returned to the pool, with any uncommitted work rolled back.
+    """
+    with pool.connection() as conn:
+        cursor = conn.cursor(**cursor_args)
+        try:
+            yield conn, cursor
+        finally:
+            cursor.close()
+
 create_tables()
@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class DatabaseThreads:
+    """
+    Runs the blocking api.db functions for the API's async handlers on a bounded thread pool, so MySQL queries do not
+    stall the event loop. The functions themselves stay synchronous for the fetch scripts.
+
+    Size it to the connection pool. Calls beyond max_workers then queue here, without holding a thread while they
+    wait for a connection.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api-db")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.peak_pending = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Awaits func(*args, **kwargs) run on a database thread. Its exceptions propagate to the caller."""
+        with self._lock:
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Calls running or queued, for the health check and benchmarks."""
+        with self._lock:
+            return {"max_workers": self.max_workers, "pending": self._pending, "peak_pending": self.peak_pending}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+
+class PoolExhaustedError(Exception):
+    """Raised when no pooled connection frees up within the checkout timeout."""
+
+
+class _Waiter:
+    """A caller waiting for a connection. Granted with a returned connection, or with None to open a new one."""
+
+    __slots__ = ("event", "granted", "conn", "returned_at")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.conn = None
+        self.returned_at = None
+
+
+def ping_connection(conn):
+    """Health check for mysql-connector connections, reconnecting a connection the server dropped."""
+    conn.ping(reconnect=True, attempts=1, delay=0)
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of database connections, shared by the API's db functions.
+
+    Up to `size` connections are opened on demand by `connect` and kept open between calls. Callers borrow one with the
+    `connection()` context manager, waiting in line up to `timeout` seconds when all of them are in use before
+    PoolExhaustedError is raised. Connections that sat idle for longer than `health_check_interval` seconds are health
+    checked before they are handed out, and replaced when the check fails. Returned connections are rolled back, so
+    uncommitted work and read snapshots do not leak into the next caller.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        size: int,
+        timeout: float,
+        health_check_interval: float,
+        health_check: Callable[[Any], None] = ping_connection,
+    ):
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._connect = connect
+        self._health_check = health_check
+        self._lock = threading.Lock()
+        # Idle connections with the time they were returned, the most recently used last
+        self._idle: List[Tuple[Any, float]] = []
+        self._waiters: Deque[_Waiter] = deque()
+        self._open = 0
+        self._in_use = 0
+        self._closed = False
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.exhausted = 0
+        self.peak_in_use = 0
+        self.connects = 0
+        self.health_check_failures = 0
+        self.discarded = 0
+
+    def acquire(self, timeout: float = None):
+        """Borrows a connection, waiting up to timeout seconds for one to be returned. Pair with release()."""
+        timeout = self.timeout if timeout is None else timeout
+        conn, returned_at, waiter = None, None, None
+        with self._lock:
+            if self._closed:
+                raise PoolExhaustedError("Connection pool is closed")
+            if self._idle and not self._waiters:
+                # Reusing the most recently returned connection lets the others go idle long enough to be checked
+                conn, returned_at = self._idle.pop()
+            elif self._open < self.size:
+                self._open += 1
+            else:
+                waiter = _Waiter()
+                self._waiters.append(waiter)
+                self.waits += 1
+
+        if waiter is not None:
+            waited_since = time.monotonic()
+            waiter.event.wait(timeout)
+            with self._lock:
+                self.wait_seconds += time.monotonic() - waited_since
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    if self._closed:
+                        raise PoolExhaustedError("Connection pool is closed")
+                    self.exhausted += 1
+                    logging.warning(f"Database connection pool exhausted, all {self.size} connections in use for {timeout}s")
+                    raise PoolExhaustedError(f"No database connection was returned to the pool within {timeout}s")
+                conn, returned_at = waiter.conn, waiter.returned_at
+
+        with self._lock:
+            self.checkouts += 1
+            self._in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self._in_use)
+
+        # Connecting and health checks are network round trips, keep them outside the lock
+        try:
+            if conn is None:
+                conn = self._new_connection()
+            elif time.monotonic() - returned_at > self.health_check_interval:
+                conn = self._checked(conn)
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            self._hand_off(None)
+            raise
+        return conn
+
+    def release(self, conn, discard: bool = False):
+        """Returns a borrowed connection to the pool, or closes it when discard is set or it can not be rolled back."""
+        if not discard:
+            try:
+                # mysql-connector tracks the server's transaction status, so clean connections skip the round trip
+                if getattr(conn, "in_transaction", True):
+                    conn.rollback()
+            except Exception:
+                logging.warning("Discarding pooled database connection that failed to roll back", exc_info=True)
+                discard = True
+
+        with self._lock:
+            self._in_use -= 1
+            if discard:
+                self.discarded += 1
+        if discard or self._closed:
+            self._close_quietly(conn)
+            conn = None
+        self._hand_off(conn)
+
+    def _hand_off(self, conn):
+        """
+        Gives a returned connection to the longest waiting caller, or back to the idle list. Without a connection, the
+        waiter is allowed to open a new one in place of the closed one. Handing off in order keeps callers that release
+        and acquire in a loop from starving the waiters.
+        """
+        with self._lock:
+            if self._waiters and not self._closed:
+                waiter = self._waiters.popleft()
+                waiter.conn, waiter.returned_at, waiter.granted = conn, time.monotonic(), True
+                waiter.event.set()
+            elif conn is not None:
+                self._idle.append((conn, time.monotonic()))
+            else:
+                self._open -= 1
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """Borrows a connection for the duration of the with block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage counters, for logging and load tests."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "exhausted": self.exhausted,
+                "connects": self.connects,
+                "health_check_failures": self.health_check_failures,
+                "discarded": self.discarded,
+            }
+
+    def close(self):
+        """Closes the idle connections and fails waiting callers. Borrowed connections are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            for waiter in self._waiters:
+                waiter.event.set()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def _new_connection(self):
+        conn = self._connect()
+        with self._lock:
+            self.connects += 1
+        return conn
+
+    def _checked(self, conn):
+        """Health checks an idle connection, replacing it with a new one when the check fails."""
+        try:
+            self._health_check(conn)
+            return conn
+        except Exception:
+            logging.warning("Replacing pooled database connection that failed its health check", exc_info=True)
+            with self._lock:
+                self.health_check_failures += 1
+            self._close_quietly(conn)
+            return self._new_connection()
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -94,7 +94,8 @@ def fetch_odds(api_url, start, intervals):
     logging.info("All intervals processed.")
 
 def fetch_missing_odds():
-    completed_matches = db.get_matches_with_missing_odds()
+    # Streamed page by page, so memory does not grow with the odds history of the matches
+    completed_matches = db.iter_match_odds(completed_within_days=10)
     history_intervals = []
     for completed_match in completed_matches:
         matchDate = completed_match['matchDate']
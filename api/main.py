@@ -1,17 +1,21 @@
-from typing import Annotated, List, Optional
+from typing import Annotated, Callable, Iterable, Iterator, List, Optional
 from pydantic import conint
 from traceback import print_exception
 
 import bittensor
 import uvicorn
 import asyncio
+import gzip
+import json
 import logging
 import random
-from fastapi import FastAPI, HTTPException, Depends, Body, Path, Security
+from fastapi import FastAPI, HTTPException, Depends, Body, Path, Request, Response, Security
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBasicCredentials, HTTPBasic
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from starlette import status
 from substrateinterface import Keypair
 
@@ -22,9 +26,21 @@ import sentry_sdk
 import mysql.connector
 from mysql.connector import Error
 
-from datetime import datetime
+from datetime import datetime, timezone
 import api.db as db
-from api.config import NETWORK, NETUID, IS_PROD, API_KEYS, TESTNET_VALI_HOTKEYS
+from api.config import (
+    NETWORK,
+    NETUID,
+    IS_PROD,
+    API_KEYS,
+    TESTNET_VALI_HOTKEYS,
+    RESPONSE_CACHE_TTL_IN_SECONDS,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_VERSION_CHECK_INTERVAL_IN_SECONDS,
+    DB_POOL_SIZE,
+)
+from api.db_async import DatabaseThreads
+from api.response_cache import ResponseCache, etag_matches
 from common.constants import ENABLE_APP, APP_PREDICTIONS_UNFULFILLED_THRESHOLD
 
 sentry_sdk.init(
@@ -86,8 +102,94 @@ def authenticate_with_bittensor(hotkey, metagraph):
     return True
 
 
+class GZipRequestMiddleware:
+    """Decompresses gzipped request bodies. Validators gzip their large JSON posts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or dict(scope["headers"]).get(b"content-encoding") != b"gzip":
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        try:
+            body = gzip.decompress(b"".join(chunks))
+        except (OSError, EOFError):
+            response = JSONResponse({"detail": "Invalid gzip request body"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        headers = [(key, value) for key, value in scope["headers"] if key not in (b"content-encoding", b"content-length")]
+        headers.append((b"content-length", str(len(body)).encode()))
+        body_sent = False
+
+        async def receive_decompressed():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(dict(scope, headers=headers), receive_decompressed, send)
+
+
+# The async handlers run their queries here, one thread per pooled connection. The plain def handlers already run in
+# the framework's threadpool
+db_threads = DatabaseThreads(max_workers=DB_POOL_SIZE)
+
+# Most matches a /matchOdds page can hold
+MATCH_ODDS_MAX_PAGE_SIZE = 5000
+
+# Bodies of the match and odds read endpoints, invalidated when the fetch processes write new match data
+response_cache = ResponseCache(
+    db.get_cache_version,
+    ttl=RESPONSE_CACHE_TTL_IN_SECONDS,
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    version_check_interval=RESPONSE_CACHE_VERSION_CHECK_INTERVAL_IN_SECONDS,
+)
+
+
+def cached_json_response(request: Request, key: tuple, build: Callable[[], dict]) -> Response:
+    """
+    Serves the JSON of build() from the response cache, serialized like FastAPI would. Clients that send the ETag of
+    the current body in If-None-Match get a 304 Not Modified without the body.
+    """
+    cached = response_cache.get_or_build(key, lambda: JSONResponse(jsonable_encoder(build())).body)
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[bytes]:
+    """Serializes rows as newline delimited JSON, one row per line, encoded like FastAPI's JSON responses."""
+    for row in rows:
+        yield json.dumps(jsonable_encoder(row), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode() + b"\n"
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Converts a since watermark to a naive UTC datetime, matching the DATETIME columns it is compared with."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 async def main():
     app = FastAPI()
+    # Gzip large responses, e.g. match odds syncs, and accept gzipped request bodies
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    app.add_middleware(GZipRequestMiddleware)
+
+    # Add the change tracking columns used by delta syncs, if they do not exist yet
+    db.setup_match_odds_table()
+    db.setup_matches_lookup_table()
 
     subtensor = bittensor.subtensor(network=NETWORK)
     metagraph: bittensor.metagraph = subtensor.metagraph(NETUID)
@@ -136,7 +238,7 @@ async def main():
 
                 # Combine the data into a list of tuples
                 data_to_update = list(zip(active_hotkeys, active_coldkeys, active_uids, ages))
-                db.insert_or_update_miner_coldkeys_and_ages(data_to_update)
+                await db_threads.run(db.insert_or_update_miner_coldkeys_and_ages, data_to_update)
 
             # In case of unforeseen errors, the api will log the error and continue operations.
             except Exception as err:
@@ -147,16 +249,35 @@ async def main():
 
     @app.get("/")
     def healthcheck():
-        return {"status": "ok", "message": datetime.utcnow()}
+        return {
+            "status": "ok",
+            "message": datetime.utcnow(),
+            "db_pool": db.pool.stats(),
+            "db_threads": db_threads.stats(),
+            "response_cache": response_cache.stats(),
+        }
 
     @app.get("/matches")
-    def get_matches():
+    def get_matches(request: Request, since: Optional[datetime] = None):
+        """With since, only matches that changed after it. Pass the returned watermark as since on the next request."""
+        since = to_naive_utc(since)
+
+        def build():
+            # Taken before querying so that changes made during the query are picked up by the next delta
+            watermark = db.get_current_utc_time()
+            match_list = db.get_matches(since=since)
+            if match_list is False or watermark is None:
+                raise HTTPException(status_code=500, detail="Internal server error.")
+            return {"matches": match_list, "watermark": watermark}
+
         try:
-            match_list = db.get_matches()
-            if match_list:
-                return {"matches": match_list}
-            else:
-                return {"matches": []}
+            # Delta responses are keyed by each client's own watermark and never requested twice, caching them would
+            # only evict the full responses
+            if since is not None:
+                return build()
+            return cached_json_response(request, ("matches",), build)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error retrieving matches: {e}")
             raise HTTPException(status_code=500, detail="Internal server error.")
@@ -174,13 +295,18 @@ async def main():
             raise HTTPException(status_code=500, detail="Internal server error.")
 
     @app.get("/matches/upcoming")
-    def get_upcoming_matches():
-        try:
+    def get_upcoming_matches(request: Request):
+        def build():
             match_list = db.get_upcoming_matches()
-            if match_list:
-                return {"matches": match_list}
-            else:
-                return {"matches": []}
+            # Not cached, a failed query would otherwise be served as no upcoming matches until the TTL passes
+            if match_list is False:
+                raise HTTPException(status_code=500, detail="Internal server error.")
+            return {"matches": match_list or []}
+
+        try:
+            return cached_json_response(request, ("matches/upcoming",), build)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error retrieving matches: {e}")
             raise HTTPException(status_code=500, detail="Internal server error.")
@@ -188,7 +314,7 @@ async def main():
     @app.get("/get-match")
     async def get_match(id: str):
         try:
-            match = db.get_match_by_id(id)
+            match = await db_threads.run(db.get_match_by_id, id)
             if match:
                 # Apply datetime serialization to all fields in the dictionary that need it
                 match = {key: serialize_datetime(value) for key, value in match.items()}
@@ -200,13 +326,60 @@ async def main():
             raise HTTPException(status_code=500, detail="Internal server error.")
 
     @app.get("/matchOdds")
-    async def get_match_odds(matchId: Optional[str] = None):
-        try:
-            match_odds = db.get_match_odds_by_id(matchId)
-            if match_odds:
-                return {"match_odds": match_odds}
+    def get_match_odds(
+        request: Request,
+        matchId: Optional[str] = None,
+        since: Optional[datetime] = None,
+        after_match_id: Optional[str] = None,
+        limit: Optional[conint(ge=1, le=MATCH_ODDS_MAX_PAGE_SIZE)] = None,
+        stream: bool = False,
+    ):
+        """
+        With since, only odds stored or linked to a match after it. Pass the returned watermark as since on the next request.
+        Without matchId and since, every match with all of its odds. With limit, a page of matches after after_match_id,
+        and next_after_match_id to request the next page with. With stream, every match after after_match_id as
+        newline delimited JSON, read from the database page by page.
+        """
+        since = to_naive_utc(since)
+        paginated = after_match_id is not None or limit is not None or stream
+        if paginated and (matchId or since):
+            raise HTTPException(
+                status_code=400, detail="after_match_id, limit and stream can not be combined with matchId or since."
+            )
+
+        if stream:
+            watermark = db.get_current_utc_time()
+            if watermark is None:
+                raise HTTPException(status_code=500, detail="Internal server error.")
+            # Starlette iterates the rows in its threadpool, the watermark header replaces the watermark field
+            return StreamingResponse(
+                ndjson_lines(db.iter_match_odds(after_match_id, page_size=limit or db.MATCH_ODDS_PAGE_SIZE)),
+                media_type="application/x-ndjson",
+                headers={"X-Watermark": watermark.isoformat()},
+            )
+
+        def build():
+            watermark = db.get_current_utc_time()
+            if paginated:
+                match_odds = db.get_match_odds_page(after_match_id, limit or db.MATCH_ODDS_PAGE_SIZE)
             else:
-                return {"match_odds": []}
+                match_odds = db.get_match_odds_by_id(matchId, since=since)
+            if match_odds is False or watermark is None:
+                raise HTTPException(status_code=500, detail="Internal server error.")
+            response = {"match_odds": match_odds, "watermark": watermark}
+            if paginated:
+                full_page = len(match_odds) == (limit or db.MATCH_ODDS_PAGE_SIZE)
+                response["next_after_match_id"] = match_odds[-1]["matchId"] if full_page else None
+            return response
+
+        try:
+            # A plain def, so the queries of a cache miss run in the threadpool instead of blocking the event loop.
+            # Delta responses are not cached, as for /matches.
+            if since is not None:
+                return build()
+            return cached_json_response(request, ("matchOdds", matchId, after_match_id, limit), build)
+        except HTTPException:
+            raise
         except Exception as e:
             logging.error(f"Error retrieving match odds by match id: {e}")
             raise HTTPException(status_code=500, detail="Internal server error.")
@@ -226,7 +399,7 @@ async def main():
         uid = metagraph.hotkeys.index(hotkey)
 
         try:
-            result = db.upload_prediction_edge_results(prediction_edge_results)
+            result = await db_threads.run(db.upload_prediction_edge_results, prediction_edge_results)
             if result:
                 return {
                     "message": "Prediction edge results uploaded successfully from validator "
@@ -251,7 +424,9 @@ async def main():
         count: Optional[int] = None,
     ):
         try:
-            results = db.get_prediction_edge_results(vali_hotkey, miner_hotkey, miner_id, league, date, count)
+            results = await db_threads.run(
+                db.get_prediction_edge_results, vali_hotkey, miner_hotkey, miner_id, league, date, count
+            )
 
             if results:
                 return {"results": results}
@@ -276,7 +451,7 @@ async def main():
         uid = metagraph.hotkeys.index(hotkey)
 
         try:
-            result = db.upload_scored_predictions(predictions, hotkey)
+            result = await db_threads.run(db.upload_scored_predictions, predictions, hotkey)
             if result:
                 return {
                     "message": "Scored predictions uploaded successfully from validator "
@@ -298,7 +473,7 @@ async def main():
         league: Optional[str] = None,
     ):
         try:
-            results = db.get_prediction_results_by_league(vali_hotkey, league, miner_hotkey)
+            results = await db_threads.run(db.get_prediction_results_by_league, vali_hotkey, league, miner_hotkey)
 
             if results:
                 return {"results": results}
@@ -0,0 +1,139 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """Weak ETag of a response body. Weak, since the gzip middleware may re-encode the body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists the ETag, compared weakly as RFC 9110 requires for If-None-Match."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque_tag(tag) == _opaque_tag(etag) for tag in if_none_match.split(","))
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+class ResponseCache:
+    """
+    Serialized response bodies of the read endpoints, keyed by endpoint and parameters.
+
+    Entries are tagged with the data version returned by `load_version` before they were built, and are only served
+    while that version is current and their TTL has not passed. The writers bump the version in the database when they
+    commit, so writes from the fetch processes invalidate the entries too. The version is read at most once per
+    `version_check_interval` seconds. Concurrent misses for the same key wait for a single build.
+    """
+
+    def __init__(
+        self,
+        load_version: Callable[[], Optional[int]],
+        ttl: float,
+        max_entries: int,
+        version_check_interval: float,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self._load_version = load_version
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._build_locks: Dict[Hashable, threading.Lock] = {}
+        self._version: Optional[int] = None
+        self._version_checked_at = float("-inf")
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def version(self) -> Optional[int]:
+        """The current data version, reloaded when the last check is older than version_check_interval."""
+        with self._lock:
+            if time.monotonic() - self._version_checked_at < self.version_check_interval:
+                return self._version
+        version = self._load_version()
+        with self._lock:
+            if version != self._version:
+                # Entries of older versions can not be served again, free them
+                self._entries.clear()
+                self.invalidations += 1
+            self._version = version
+            self._version_checked_at = time.monotonic()
+        return version
+
+    def invalidate(self):
+        """Drops every entry and reloads the version on the next request, for writes made by this process."""
+        with self._lock:
+            self._entries.clear()
+            self._version_checked_at = float("-inf")
+            self.invalidations += 1
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes], ttl: float = None) -> CachedResponse:
+        """Returns the cached response for key, or builds, caches and returns it. Exceptions of build propagate."""
+        ttl = self.ttl if ttl is None else ttl
+        version = self.version()
+        cached = self._get(key, version)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        try:
+            with build_lock:
+                # Another request may have built it while this one waited
+                cached = self._get(key, version)
+                if cached is not None:
+                    return cached
+                with self._lock:
+                    self.misses += 1
+                body = build()
+                response = CachedResponse(body, make_etag(body))
+                # Versions can not be loaded while the database is down, nothing built then is cached
+                if version is not None:
+                    with self._lock:
+                        self._entries[key] = (version, time.monotonic() + ttl, response)
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                return response
+        finally:
+            with self._lock:
+                if self._build_locks.get(key) is build_lock and not build_lock.locked():
+                    del self._build_locks[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+    def _get(self, key: Hashable, version: Optional[int]) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, expires_at, response = entry
+            if entry_version != version or time.monotonic() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
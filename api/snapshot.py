@@ -56,60 +56,55 @@ def take_snapshot():
         hotkey_incentives[hotkey] = incentive
 
     try:
-        conn = db.get_db_conn()
-        c = conn.cursor()
-
-        current_date = dt.datetime.now(timezone.utc)
-
-        prediction_scores_table_name = "MatchPredictionResults"
-        if not IS_PROD:
-            prediction_scores_table_name += "_test"
-
-        # Fetch data from the prediction scores table
-        fetch_query = f"""
-        SELECT 
-            id, 
-            miner_hotkey,
-            miner_coldkey,
-            miner_uid, 
-            miner_is_registered,
-            miner_age,
-            league, 
-            sport, 
-            total_predictions, 
-            winner_predictions, 
-            avg_score, 
-            last_updated
-        FROM {prediction_scores_table_name}
-        """
-        c.execute(fetch_query)
-        results = c.fetchall()
-
-        # Add incentive to the results
-        modified_results = []
-        for row in results:
-            miner_hotkey = row[1]
-            incentive = hotkey_incentives.get(miner_hotkey, None)
-            modified_row = row + (incentive,)
-            modified_results.append((current_date,) + modified_row)
+        with db.db_cursor() as (conn, c):
+            current_date = dt.datetime.now(timezone.utc)
+
+            prediction_scores_table_name = "MatchPredictionResults"
+            if not IS_PROD:
+                prediction_scores_table_name += "_test"
+
+            # Fetch data from the prediction scores table
+            fetch_query = f"""
+            SELECT 
+                id, 
+                miner_hotkey,
+                miner_coldkey,
+                miner_uid, 
+                miner_is_registered,
+                miner_age,
+                league, 
+                sport, 
+                total_predictions, 
+                winner_predictions, 
+                avg_score, 
+                last_updated
+            FROM {prediction_scores_table_name}
+            """
+            c.execute(fetch_query)
+            results = c.fetchall()
+
+            # Add incentive to the results
+            modified_results = []
+            for row in results:
+                miner_hotkey = row[1]
+                incentive = hotkey_incentives.get(miner_hotkey, None)
+                modified_row = row + (incentive,)
+                modified_results.append((current_date,) + modified_row)
         
-        # Insert modified data into the snapshot table
-        insert_snapshot_query = """
-        INSERT INTO MPRSnapshots (
-            snapshot_date, id, miner_hotkey, miner_coldkey, miner_uid, miner_is_registered, miner_age, league, sport, total_predictions, winner_predictions, avg_score, last_updated, incentive
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        c.executemany(insert_snapshot_query, modified_results)
-        conn.commit()
-        return True
+            # Insert modified data into the snapshot table
+            insert_snapshot_query = """
+            INSERT INTO MPRSnapshots (
+                snapshot_date, id, miner_hotkey, miner_coldkey, miner_uid, miner_is_registered, miner_age, league, sport, total_predictions, winner_predictions, avg_score, last_updated, incentive
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """
+            c.executemany(insert_snapshot_query, modified_results)
+            conn.commit()
+            return True
 
     except Exception as e:
         logging.error("Failed to insert match prediction results snapshot in MySQL database", exc_info=True)
         return False
 
-    finally:
-        c.close()
-        conn.close()
 
 def main():
     try:
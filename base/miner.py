@@ -61,6 +61,10 @@ class BaseMinerNeuron(BaseNeuron):
             forward_fn=self.get_match_prediction,
             blacklist_fn=self.get_match_prediction_blacklist,
             priority_fn=self.get_match_prediction_priority,
+        ).attach(
+            forward_fn=self.get_match_predictions,
+            blacklist_fn=self.get_match_predictions_blacklist,
+            priority_fn=self.get_match_predictions_priority,
         ).attach(
             forward_fn=self.get_league_commitments,
             blacklist_fn=self.get_league_commitments_blacklist,
@@ -193,6 +193,27 @@ def add_validator_args(cls, parser):
         default=50,
     )
 
+    parser.add_argument(
+        "--neuron.max_concurrent_batches",
+        type=int,
+        help="The max number of miner prediction request batches in flight at once, across all matches being requested.",
+        default=4,
+    )
+
+    parser.add_argument(
+        "--neuron.scoring_workers",
+        type=int,
+        help="The number of worker processes used to score leagues in parallel. 0 scores leagues sequentially in the weight setting thread.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.copycat_full_rebuild",
+        action="store_true",
+        help="Compares every match again during copycat analysis instead of reusing the similar prediction pairs persisted by earlier passes. Used to verify the persisted pairs.",
+        default=False,
+    )
+
     parser.add_argument(
         "--neuron.disable_set_weights",
         action="store_true",
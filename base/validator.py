@@ -25,7 +25,7 @@ import argparse
 import threading
 import bittensor as bt
 
-from typing import List
+from typing import List, Optional
 from traceback import print_exception
 import time
 import datetime as dt
@@ -112,6 +112,10 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.error(f"Failed to create Axon initialize with exception: {e}")
             pass
 
+    def seconds_until_next_forward(self) -> Optional[float]:
+        """Seconds until the next forward has work to do, or None to step every neuron.timeout seconds."""
+        return None
+
     async def concurrent_forward(self):
         coroutines = [
             self.forward() for _ in range(self.config.neuron.num_concurrent_forwards)
@@ -221,10 +225,13 @@ class BaseValidatorNeuron(BaseNeuron):
                     self.load_scoring_controls()
                     self.load_scoring_controls_start = dt.datetime.now()
 
-                # Sleep for the remaining time in the step.
+                # Sleep for the remaining time in the step, waking up early when scheduled work is due.
                 elapsed = time.time() - start_time
-                if elapsed < self.config.neuron.timeout:
-                    sleep_time = self.config.neuron.timeout - elapsed
+                sleep_time = self.config.neuron.timeout - elapsed
+                seconds_until_next_forward = self.seconds_until_next_forward()
+                if seconds_until_next_forward is not None:
+                    sleep_time = min(sleep_time, seconds_until_next_forward)
+                if sleep_time > 0:
                     bt.logging.info(f"Sleeping for {sleep_time} ...")
                     time.sleep(sleep_time)
 
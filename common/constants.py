@@ -6,7 +6,10 @@ IS_DEV = False
 ENABLE_APP = False
 
 # The current protocol version (int)
-PROTOCOL_VERSION = 1
+PROTOCOL_VERSION = 2
+
+# First protocol version whose miners answer GetMatchPredictions requests for several matches at once
+BATCHED_PREDICTIONS_PROTOCOL_VERSION = 2
 
 # Interval in minutes that we sync match data
 DATA_SYNC_INTERVAL_IN_MINUTES = 30
@@ -41,6 +44,39 @@ MAX_BATCHSIZE_FOR_SCORING = 500
 # Cut off days to attempt to score predictions. i.e. Any predictions not scored with X days will be left behind
 SCORING_CUTOFF_IN_DAYS = 30
 
+# Timeout in seconds waiting for data on a match odds sync request
+MATCH_ODDS_REQUEST_TIMEOUT = 10
+
+# Total timeout in seconds of a Sportstensor API request, unless the call sets its own
+API_REQUEST_TIMEOUT = 60
+
+# Retries of a failed Sportstensor API request, with exponential backoff between attempts
+API_MAX_RETRIES = 3
+API_RETRY_BACKOFF_BASE_IN_SECONDS = 2
+API_RETRY_BACKOFF_MAX_IN_SECONDS = 30
+
+# Keep-alive connection pool of the shared Sportstensor API client
+API_CONNECTION_LIMIT = 20
+API_KEEPALIVE_TIMEOUT = 60
+
+# Gzip JSON request bodies to the Sportstensor API from this size in bytes
+API_COMPRESS_REQUESTS_MIN_BYTES = 1024
+
+# Minutes that delta syncs re-request before the stored watermark, to pick up API rows committed late
+SYNC_WATERMARK_OVERLAP_IN_MINUTES = 60
+
+# Interval in seconds that we check the match prediction windows for requests to send
+PREDICTION_REQUESTS_INTERVAL_IN_SECONDS = 60
+
+# Interval in minutes that we calculate incentives and set weights, on the marks of the hour
+WEIGHT_SETTING_INTERVAL_IN_MINUTES = 30
+
+# Max random delay in seconds added to each match data sync, to spread validator requests to the API
+MATCH_SYNC_JITTER_IN_SECONDS = 60
+
+# Interval in minutes that we log the timing stats of the scheduled jobs
+SCHEDULER_STATS_INTERVAL_IN_MINUTES = 30
+
 # Interval in minutes that we attempt to score predictions
 SCORING_INTERVAL_IN_MINUTES = 1
 
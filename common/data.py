@@ -10,6 +10,8 @@ from pydantic import (
     model_serializer,
 )
 
+from common.timestamps import parse_timestamp, to_epoch_us
+
 
 class StrictBaseModel(BaseModel):
     """A BaseModel that enforces stricter validation constraints"""
@@ -196,18 +198,10 @@ def get_probablity_choice_from_string(choice_str: str) -> Optional[ProbabilityCh
     return None
 
 
-class MatchPrediction(Prediction):
-    """Represents a prediction of a sports match."""
-
-    homeTeamName: str
-    awayTeamName: str
-    homeTeamScore: Optional[int] = Field(default=None)
-    awayTeamScore: Optional[int] = Field(default=None)
+class PredictedTeamMixin:
+    """Accessors shared by MatchPrediction and ScoringPrediction."""
 
-    probabilityChoice: Optional[ProbabilityChoice] = Field(default=None)
-    probability: Optional[float] = Field(default=None)
-    
-    closingEdge: Optional[float] = Field(default=None)
+    __slots__ = ()
 
     def get_predicted_team(self) -> str:
         """Get the predicted team or Draw based on the probability choice."""
@@ -219,7 +213,31 @@ class MatchPrediction(Prediction):
             return "Draw"
         else:
             return "Unknown"
-        
+
+
+class MatchPrediction(PredictedTeamMixin, Prediction):
+    """Represents a prediction of a sports match."""
+
+    homeTeamName: str
+    awayTeamName: str
+    homeTeamScore: Optional[int] = Field(default=None)
+    awayTeamScore: Optional[int] = Field(default=None)
+
+    probabilityChoice: Optional[ProbabilityChoice] = Field(default=None)
+    probability: Optional[float] = Field(default=None)
+    
+    closingEdge: Optional[float] = Field(default=None)
+
+    @property
+    def matchDateUs(self) -> Optional[int]:
+        """matchDate as UTC epoch microseconds."""
+        return to_epoch_us(self.matchDate)
+
+    @property
+    def predictionDateUs(self) -> Optional[int]:
+        """predictionDate as UTC epoch microseconds."""
+        return to_epoch_us(self.predictionDate)
+
     @model_serializer(mode="wrap")
     def serialize_dates(self, handler):
         data = handler(self)
@@ -263,13 +281,10 @@ class MatchPrediction(Prediction):
         )
 
 
-class MatchPredictionWithMatchData(BaseModel):
-    prediction: MatchPrediction
-    actualHomeTeamScore: int
-    actualAwayTeamScore: int
-    homeTeamOdds: float
-    awayTeamOdds: float
-    drawOdds: float
+class MatchOutcomeMixin:
+    """Accessors shared by MatchPredictionWithMatchData and ScoringRow, over a prediction and its match result and closing odds."""
+
+    __slots__ = ()
 
     def get_closing_odds_for_predicted_outcome(self) -> Optional[float]:
         """
@@ -328,4 +343,124 @@ class MatchPredictionWithMatchData(BaseModel):
         if self.prediction.league in LEAGUES_ALLOWING_DRAWS and self.drawOdds > 0:
             favorite_odds = min([self.homeTeamOdds, self.awayTeamOdds, self.drawOdds])
         return predicted_odds > favorite_odds
-    
\ No newline at end of file
+
+
+class MatchPredictionWithMatchData(MatchOutcomeMixin, BaseModel):
+    prediction: MatchPrediction
+    actualHomeTeamScore: int
+    actualAwayTeamScore: int
+    homeTeamOdds: float
+    awayTeamOdds: float
+    drawOdds: float
+
+
+# Columns of a MatchPredictions row for scoring, in the order ScoringPrediction takes them
+MATCH_PREDICTION_COLUMNS = (
+    "predictionId", "minerId", "hotkey", "matchId", "matchDate", "sport", "league", "homeTeamName", "awayTeamName",
+    "homeTeamScore", "awayTeamScore", "isScored", "scoredDate", "lastUpdated", "predictionDate", "probabilityChoice",
+    "probability", "closingEdge", "isArchived", "matchDateUs", "predictionDateUs",
+)
+
+# Timestamp columns ScoringPrediction keeps as stored text until they are read
+SCORING_PREDICTION_TIMESTAMPS = ("matchDate", "scoredDate", "lastUpdated", "predictionDate")
+
+
+def _lazy_timestamp(name: str) -> property:
+    """A ScoringPrediction timestamp that is parsed from its stored text on first read."""
+    slot = f"_{name}"
+
+    def getter(self):
+        value = getattr(self, slot)
+        if value is not None and not isinstance(value, dt.datetime):
+            value = parse_timestamp(value)
+            setattr(self, slot, value)
+        return value
+
+    def setter(self, value):
+        setattr(self, slot, value)
+
+    return property(getter, setter, doc=f"{name}, parsed from the stored timestamp on first read.")
+
+
+class ScoringPrediction(PredictedTeamMixin):
+    """
+    A stored MatchPrediction for scoring, built straight from its MatchPredictions row without validation.
+
+    Scoring loads tens of thousands of these per pass and only reads them, apart from setting closingEdge. Pydantic
+    models are kept for the protocol and API, see to_dict.
+
+    Scoring compares times with the integer matchDateUs and predictionDateUs epoch columns. The datetime fields accept
+    the stored timestamp text and are only parsed if they are read.
+    """
+
+    __slots__ = tuple(
+        f"_{column}" if column in SCORING_PREDICTION_TIMESTAMPS else column for column in MATCH_PREDICTION_COLUMNS
+    )
+
+    matchDate = _lazy_timestamp("matchDate")
+    scoredDate = _lazy_timestamp("scoredDate")
+    lastUpdated = _lazy_timestamp("lastUpdated")
+    predictionDate = _lazy_timestamp("predictionDate")
+
+    def __init__(
+        self, predictionId, minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName,
+        homeTeamScore, awayTeamScore, isScored, scoredDate, lastUpdated, predictionDate, probabilityChoice,
+        probability, closingEdge, isArchived, matchDateUs=None, predictionDateUs=None,
+    ):
+        self.predictionId = predictionId
+        self.minerId = minerId
+        self.hotkey = hotkey
+        self.matchId = matchId
+        self._matchDate = matchDate
+        self.sport = sport
+        self.league = league
+        self.homeTeamName = homeTeamName
+        self.awayTeamName = awayTeamName
+        self.homeTeamScore = homeTeamScore
+        self.awayTeamScore = awayTeamScore
+        self.isScored = bool(isScored)
+        self._scoredDate = scoredDate
+        self._lastUpdated = lastUpdated
+        self._predictionDate = predictionDate
+        self.probabilityChoice = probabilityChoice
+        self.probability = probability
+        self.closingEdge = closingEdge
+        self.isArchived = bool(isArchived)
+        # Predictions built from datetimes rather than stored rows derive the epoch columns
+        self.matchDateUs = matchDateUs if matchDateUs is not None else to_epoch_us(matchDate)
+        self.predictionDateUs = predictionDateUs if predictionDateUs is not None else to_epoch_us(predictionDate)
+
+    def to_dict(self) -> dict:
+        """The fields of the equivalent MatchPrediction, for serialization."""
+        return {field: getattr(self, field) for field in MatchPrediction.model_fields}
+
+    def __repr__(self):
+        return f"ScoringPrediction(predictionId={self.predictionId}, minerId={self.minerId}, matchId={self.matchId})"
+
+
+class ScoringRow(MatchOutcomeMixin):
+    """A scoring prediction with its match result and closing odds. The lightweight MatchPredictionWithMatchData."""
+
+    __slots__ = ("prediction", "actualHomeTeamScore", "actualAwayTeamScore", "homeTeamOdds", "awayTeamOdds", "drawOdds")
+
+    def __init__(
+        self, prediction: ScoringPrediction, actualHomeTeamScore: int, actualAwayTeamScore: int,
+        homeTeamOdds: float, awayTeamOdds: float, drawOdds: float,
+    ):
+        self.prediction = prediction
+        self.actualHomeTeamScore = actualHomeTeamScore
+        self.actualAwayTeamScore = actualAwayTeamScore
+        self.homeTeamOdds = homeTeamOdds
+        self.awayTeamOdds = awayTeamOdds
+        self.drawOdds = drawOdds
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "ScoringRow":
+        """
+        Builds a row from the MATCH_PREDICTION_COLUMNS of a MatchPredictions row followed by actualHomeTeamScore,
+        actualAwayTeamScore, homeTeamOdds, awayTeamOdds and drawOdds.
+        """
+        return cls(ScoringPrediction(*row[:21]), *row[21:26])
+
+    def __repr__(self):
+        return f"ScoringRow(prediction={self.prediction!r})"
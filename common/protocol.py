@@ -75,3 +75,25 @@ class GetMatchPrediction(BaseProtocol):
         return f"GetMatchPrediction(match_prediction={self.match_prediction}, axon={self.axon})"
 
     __repr__ = __str__
+
+
+class GetMatchPredictions(BaseProtocol):
+    """
+    Protocol by which Validators can retrieve Match Predictions for several matches from a Miner in one request.
+    Only sent to Miners that report a version of at least BATCHED_PREDICTIONS_PROTOCOL_VERSION.
+
+    Attributes:
+    - match_predictions: A list of MatchPrediction objects being requested. The Miner returns them with its predictions filled in.
+    """
+
+    match_predictions: List[MatchPrediction] = pydantic.Field(
+        description="The MatchPrediction objects being requested",
+        frozen=False,
+        repr=False,
+        default_factory=list,
+    )
+
+    def __str__(self):
+        return f"GetMatchPredictions(match_predictions={self.match_predictions}, axon={self.axon})"
+
+    __repr__ = __str__
@@ -0,0 +1,83 @@
+"""UTC epoch timestamp helpers. Naive datetimes are treated as UTC throughout."""
+
+import datetime as dt
+from typing import Optional, Union
+
+EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+NAIVE_EPOCH = dt.datetime(1970, 1, 1)
+MICROSECOND = dt.timedelta(microseconds=1)
+
+TimestampValue = Union[dt.datetime, str, bytes, int]
+
+
+def parse_timestamp(value: Union[str, bytes, dt.datetime, None]) -> Optional[dt.datetime]:
+    """
+    Parses a stored timestamp such as 2024-10-01 12:00:00, 2024-10-01 12:00:00.123+00:00 or 2024-10-01T12:00:00Z.
+    Timestamps with an offset are returned timezone aware, others naive.
+    """
+    if value is None or isinstance(value, dt.datetime):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode()
+    try:
+        return dt.datetime.fromisoformat(value)
+    except ValueError:
+        return _parse_timestamp_fallback(value)
+
+
+def _parse_timestamp_fallback(value: str) -> dt.datetime:
+    """
+    Splits the timestamp by hand, for formats fromisoformat rejects. Before Python 3.11 these include a T separator
+    with a trailing Z, and fractions of other than 3 or 6 digits.
+    """
+    datepart, timepart = value.replace("T", " ", 1).split(" ")
+    year, month, day = map(int, datepart.split("-"))
+
+    if timepart.endswith("Z"):
+        timepart = timepart[:-1]
+        tzinfo = dt.timezone.utc
+    elif "+" in timepart:
+        timepart, tz_offset = timepart.rsplit("+", 1)
+        hours, minutes = map(int, tz_offset.split(":", 1))
+        tzinfo = dt.timezone(dt.timedelta(hours=hours, minutes=minutes))
+    elif "-" in timepart:
+        timepart, tz_offset = timepart.rsplit("-", 1)
+        hours, minutes = map(int, tz_offset.split(":", 1))
+        tzinfo = dt.timezone(dt.timedelta(hours=-hours, minutes=-minutes))
+    else:
+        tzinfo = None
+    if tzinfo is not None and tzinfo.utcoffset(None) == dt.timedelta(0):
+        tzinfo = dt.timezone.utc
+
+    timepart_full = timepart.split(".")
+    hours, minutes, seconds = map(int, timepart_full[0].split(":"))
+    microseconds = int("{:0<6.6}".format(timepart_full[1])) if len(timepart_full) == 2 else 0
+
+    return dt.datetime(year, month, day, hours, minutes, seconds, microseconds, tzinfo)
+
+
+def to_epoch(value: dt.datetime) -> float:
+    """Converts a datetime to UTC epoch seconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return value.timestamp()
+
+
+def to_epoch_us(value: Optional[TimestampValue]) -> Optional[int]:
+    """
+    Converts a datetime or stored timestamp to integer UTC epoch microseconds. Integers are returned as they are, so
+    callers can pass either a stored epoch column or a datetime.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if not isinstance(value, dt.datetime):
+        value = parse_timestamp(value)
+    # Integer division keeps microseconds exact, unlike datetime.timestamp()
+    if value.tzinfo is None:
+        return (value - NAIVE_EPOCH) // MICROSECOND
+    return (value - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(value: int) -> dt.datetime:
+    """Converts integer UTC epoch microseconds to a timezone aware UTC datetime."""
+    return EPOCH + dt.timedelta(microseconds=value)
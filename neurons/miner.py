@@ -27,7 +27,7 @@ from base.miner import BaseMinerNeuron
 
 from common import constants
 from common.data import League, get_league_from_string
-from common.protocol import GetLeagueCommitments, GetMatchPrediction
+from common.protocol import GetLeagueCommitments, GetMatchPrediction, GetMatchPredictions
 from st.sport_prediction_model import make_match_prediction
 
 # Define the path to the miner.env file
@@ -90,6 +90,24 @@ class Miner(BaseMinerNeuron):
         )
 
         return synapse
+
+    async def get_match_predictions(self, synapse: GetMatchPredictions) -> GetMatchPredictions:
+        bt.logging.info(
+            f"Received GetMatchPredictions request for {len(synapse.match_predictions)} matches in forward() from {synapse.dendrite.hotkey}."
+        )
+
+        # Make a match prediction for every requested MatchPrediction object
+        synapse.match_predictions = [
+            make_match_prediction(match_prediction) for match_prediction in synapse.match_predictions
+        ]
+        synapse.version = constants.PROTOCOL_VERSION
+
+        for match_prediction in synapse.match_predictions:
+            bt.logging.success(
+                f"Returning MatchPrediction to {synapse.dendrite.hotkey}: \n{match_prediction.pretty_print()}."
+            )
+
+        return synapse
     
     async def get_league_commitments_blacklist(
         self, synapse: GetLeagueCommitments
@@ -101,6 +119,11 @@ class Miner(BaseMinerNeuron):
     ) -> typing.Tuple[bool, str]:
         return await self.blacklist(synapse)
 
+    async def get_match_predictions_blacklist(
+        self, synapse: GetMatchPredictions
+    ) -> typing.Tuple[bool, str]:
+        return await self.blacklist(synapse)
+
     async def blacklist(self, synapse: bt.Synapse) -> typing.Tuple[bool, str]:
         """
         Determines whether an incoming request should be blacklisted and thus ignored. Your implementation should
@@ -173,6 +196,9 @@ class Miner(BaseMinerNeuron):
     async def get_match_prediction_priority(self, synapse: GetMatchPrediction) -> float:
         return await self.priority(synapse)
 
+    async def get_match_predictions_priority(self, synapse: GetMatchPredictions) -> float:
+        return await self.priority(synapse)
+
     async def priority(self, synapse: bt.Synapse) -> float:
         """
         The priority function determines the order in which requests are handled. More valuable or higher-priority
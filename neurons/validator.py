@@ -18,11 +18,13 @@
 
 
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 import datetime as dt
 import time
 import asyncio
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import traceback
 import requests
 
@@ -31,7 +33,7 @@ import bittensor as bt
 import wandb
 
 # Bittensor Validator Template:
-from common.protocol import GetLeagueCommitments, GetMatchPrediction
+from common.protocol import GetLeagueCommitments
 from common.data import League, get_league_from_string
 from common.constants import (
     ENABLE_APP,
@@ -40,9 +42,12 @@ from common.constants import (
     PURGE_DEREGGED_MINERS_INTERVAL_IN_MINUTES,
     MAX_BATCHSIZE_FOR_SCORING,
     SCORING_INTERVAL_IN_MINUTES,
-    NO_PREDICTION_RESPONSE_PENALTY,
     ACTIVE_LEAGUES,
     LEAGUE_COMMITMENT_INTERVAL_IN_MINUTES,
+    PREDICTION_REQUESTS_INTERVAL_IN_SECONDS,
+    WEIGHT_SETTING_INTERVAL_IN_MINUTES,
+    MATCH_SYNC_JITTER_IN_SECONDS,
+    SCHEDULER_STATS_INTERVAL_IN_MINUTES,
     LEAGUE_SCORING_PERCENTAGES,
     ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE,
     LEAGUE_SENSITIVITY_ALPHAS,
@@ -55,6 +60,9 @@ from common.constants import (
 )
 import vali_utils.utils as utils
 import vali_utils.scoring_utils as scoring_utils
+from vali_utils.scheduler import Scheduler, OverrunPolicy
+from vali_utils.api_client import ApiClient
+from storage.sqlite_validator_storage import get_storage
 
 # import base validator class which takes care of most of the boilerplate
 from base.validator import BaseValidatorNeuron
@@ -72,6 +80,11 @@ class Validator(BaseValidatorNeuron):
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)
 
+        # Initialize the validator storage here rather than on import, scoring worker processes import this module
+        # but never touch storage, so they must not run its initialization and startup cleanup.
+        bt.logging.info("Initializing validator storage.")
+        get_storage().initialize()
+
         bt.logging.info("load_state()")
         self.load_state()
 
@@ -109,6 +122,12 @@ class Validator(BaseValidatorNeuron):
         bt.logging.info(f"Loading scoring controls from URL: {self.scoring_controls_url}")
         self.load_scoring_controls()
 
+        # Persisted copycat pairs depend on the copycat similarity criteria. Drop them if those changed.
+        try:
+            scoring_utils.invalidate_stale_copycat_prediction_pairs()
+        except Exception as e:
+            bt.logging.error(f"Error invalidating persisted copycat prediction pairs: {e}")
+
         api_root = (
             "https://dev-api.sportstensor.com"
             if self.config.subtensor.network == "test"
@@ -122,14 +141,44 @@ class Validator(BaseValidatorNeuron):
         self.scored_predictions_endpoint = f"{api_root}/scoredPredictions"
         self.app_prediction_requests_endpoint = f"{api_root}/AppMatchPredictionsForValidators"
         self.app_prediction_responses_endpoint = f"{api_root}/AppMatchPredictionsForValidators"
+        # One keep-alive HTTP client for every API call, shared by the forward loop and the weight setting thread
+        self.api_client = ApiClient()
+        self.api_client.start()
         
-        self.next_match_syncing_datetime = dt.datetime.now(dt.timezone.utc)
-        self.next_predictions_cleanup_datetime = dt.datetime.now(dt.timezone.utc)
-        self.next_league_commitments_datetime = dt.datetime.now(dt.timezone.utc)
-        self.next_scoring_datetime = dt.datetime.now(dt.timezone.utc)
-        self.next_app_predictions_syncing_datetime = dt.datetime.now(dt.timezone.utc)
+        # Periodic work of the forward loop, in the order it runs when several jobs are due at once.
+        # Jobs are taken off the scheduler while they run, so concurrent forwards never run the same job twice.
+        self.scheduler = Scheduler("forward")
+        self.scheduler.add_job(
+            "match_sync", self.sync_match_data, DATA_SYNC_INTERVAL_IN_MINUTES * 60, jitter=MATCH_SYNC_JITTER_IN_SECONDS
+        )
+        self.scheduler.add_job("league_commitments", self.send_league_commitments, LEAGUE_COMMITMENT_INTERVAL_IN_MINUTES * 60)
+        self.scheduler.add_job("prediction_requests", self.send_match_prediction_requests, PREDICTION_REQUESTS_INTERVAL_IN_SECONDS)
+        self.scheduler.add_job("predictions_cleanup", self.clean_up_predictions, PURGE_DEREGGED_MINERS_INTERVAL_IN_MINUTES * 60)
+        self.scheduler.add_job("scoring", self.score_predictions, SCORING_INTERVAL_IN_MINUTES * 60)
+        if ENABLE_APP:
+            self.scheduler.add_job(
+                "app_predictions", self.process_app_prediction_requests, APP_DATA_SYNC_INTERVAL_IN_MINUTES * 60
+            )
+        self.scheduler.add_job(
+            "scheduler_stats", self.log_scheduler_stats, SCHEDULER_STATS_INTERVAL_IN_MINUTES * 60,
+            start=time.time() + SCHEDULER_STATS_INTERVAL_IN_MINUTES * 60,
+        )
+
+        # Incentive scoring and weight setting run on their own thread at the 30-minute marks. A pass that overruns
+        # a mark skips it rather than running again straight away, and a pass that cannot start within half an
+        # interval of its mark is skipped in favor of the next one.
+        weight_setting_interval = WEIGHT_SETTING_INTERVAL_IN_MINUTES * 60
+        self.weights_scheduler = Scheduler("weights")
+        self.weights_scheduler.add_job(
+            "set_weights",
+            lambda: self.score_and_set_weights(300),
+            weight_setting_interval,
+            overrun=OverrunPolicy.SKIP,
+            deadline=weight_setting_interval / 2,
+            align=True,
+            start=time.time() if self.config.immediate else None,
+        )
 
-        
         self.accumulated_league_commitment_penalties = {}
         self.accumulated_league_commitment_penalties_lock = threading.RLock()
         self.accumulated_no_response_penalties = {}
@@ -142,47 +191,88 @@ class Validator(BaseValidatorNeuron):
         self.uids_to_last_leagues_lock = threading.RLock()
         self.uids_to_leagues_last_updated: Dict[int, dt.datetime] = {}
         self.uids_to_leagues_last_updated_lock = threading.RLock()
+        # Protocol version each miner last reported with its league commitments. Guarded by uids_to_leagues_lock.
+        self.uids_to_protocol_versions: Dict[int, Optional[int]] = {}
+
+        # Optionally score leagues in parallel worker processes. Spawned rather than forked, as the validator is multi-threaded.
+        self.scoring_executor = None
+        if self.config.neuron.scoring_workers > 0:
+            self.scoring_executor = ProcessPoolExecutor(
+                max_workers=self.config.neuron.scoring_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
 
         # Initialize the incentive scoring and weight setting thread
         self.stop_event = threading.Event()
         self.weight_thread = threading.Thread(
-            target=self.incentive_scoring_and_set_weights,
-            args=(300,),
+            target=self.weights_scheduler.run_forever,
+            args=(self.stop_event,),
             daemon=True,
         )
         self.weight_thread.start()
 
     
-    def incentive_scoring_and_set_weights(self, ttl: int):
-        # Continually loop and execute at the 30-minute mark
-        while not self.stop_event.is_set():
-            current_time = dt.datetime.utcnow()
-            minutes = current_time.minute
-            hour = current_time.hour
-            
-            # Check if we're at a 30-minute mark
-            if minutes % 30 == 0 or self.config.immediate:
-                # Skip processing if we haven't loaded our league commitments yet
-                if len(self.uids_to_leagues) == 0:
-                    bt.logging.info("Skipping calculating incentives, updating scores, and setting weights. League commitments not loaded yet.")
-                    time.sleep(60)
-                    continue
-
-                try:
-                    bt.logging.info(
-                        "*** Syncing the latest match odds data to local validator storage. ***"
-                    )
-                    sync_result = utils.sync_match_odds_data(self.match_odds_endpoint)
-                    if sync_result:
-                        bt.logging.info("Successfully synced match odds data.")
-                    else:
-                        bt.logging.warning("Issue syncing match odds data")
-                except Exception as e:
-                    bt.logging.error(f"Error syncing match odds: {str(e)}")
-
-                try:
-                    bt.logging.debug("Calculating incentives.")
-                    (
+    def score_and_set_weights(self, ttl: int) -> Optional[float]:
+        """Syncs match odds, calculates incentives and sets weights. Posts the league scores to the API on the midnight UTC pass."""
+        current_time = dt.datetime.utcnow()
+
+        # Skip processing if we haven't loaded our league commitments yet, and try again in a minute
+        if len(self.uids_to_leagues) == 0:
+            bt.logging.info("Skipping calculating incentives, updating scores, and setting weights. League commitments not loaded yet.")
+            return time.time() + 60
+
+        try:
+            bt.logging.info(
+                "*** Syncing the latest match odds data to local validator storage. ***"
+            )
+            # The weight thread has no event loop of its own, so run the async odds sync to completion here
+            sync_result = asyncio.run(utils.sync_match_odds_data(self.api_client, self.match_odds_endpoint))
+            if sync_result:
+                bt.logging.info("Successfully synced match odds data.")
+            else:
+                bt.logging.warning("Issue syncing match odds data")
+        except Exception as e:
+            bt.logging.error(f"Error syncing match odds: {str(e)}")
+
+        league_scores = None
+        try:
+            bt.logging.debug("Calculating incentives.")
+            (
+                league_scores,
+                league_edge_scores,
+                league_roi_scores,
+                league_roi_counts,
+                league_roi_payouts,
+                league_roi_market_payouts,
+                league_pred_counts,
+                league_pred_win_counts,
+                all_scores,
+            ) = scoring_utils.calculate_incentives_and_update_scores(self)
+            bt.logging.debug("Finished calculating incentives.")
+        except Exception as e:
+            bt.logging.error(f"Error calculating incentives: {str(e)}")
+            bt.logging.error(f"Error details: {traceback.format_exc()}")
+
+        try:
+            if not self.config.neuron.disable_set_weights and not self.config.offline:
+                bt.logging.debug("Setting weights.")
+                self.set_weights()
+                bt.logging.debug("Finished setting weights.")
+        except asyncio.TimeoutError:
+            bt.logging.error(f"Failed to set weights after {ttl} seconds")
+
+        try:
+            # Only post on the pass for the midnight UTC mark.
+            if current_time.hour == 0 and current_time.minute < WEIGHT_SETTING_INTERVAL_IN_MINUTES:
+                if (
+                    league_scores and len(league_scores) > 0 and
+                    ((self.config.subtensor.network == "test") or 
+                    (self.config.subtensor.network != "test" and self.metagraph.validator_permit[self.uid] and self.metagraph.S[self.uid] >= 200_000))
+                ):
+                    bt.logging.info("Posting league scores to API.")
+                    post_result = asyncio.run(utils.post_prediction_edge_results(
+                        self,
+                        self.prediction_edge_results_endpoint,
                         league_scores,
                         league_edge_scores,
                         league_roi_scores,
@@ -191,56 +281,20 @@ class Validator(BaseValidatorNeuron):
                         league_roi_market_payouts,
                         league_pred_counts,
                         league_pred_win_counts,
-                        all_scores,
-                    ) = scoring_utils.calculate_incentives_and_update_scores(self)
-                    bt.logging.debug("Finished calculating incentives.")
-                except Exception as e:
-                    bt.logging.error(f"Error calculating incentives: {str(e)}")
-                    bt.logging.error(f"Error details: {traceback.format_exc()}")
-
-                try:
-                    if not self.config.neuron.disable_set_weights and not self.config.offline:
-                        bt.logging.debug("Setting weights.")
-                        self.set_weights()
-                        bt.logging.debug("Finished setting weights.")
-                        if self.config.immediate:
-                            time.sleep(3600)
-                except asyncio.TimeoutError:
-                    bt.logging.error(f"Failed to set weights after {ttl} seconds")
-
-                try:
-                    # Check if we're at a 0-hour 0-minute mark. Only run this at midnight UTC.
-                    if hour == 0 and minutes == 0:
-                        if (
-                            league_scores and len(league_scores) > 0 and
-                            ((self.config.subtensor.network == "test") or 
-                            (self.config.subtensor.network != "test" and self.metagraph.validator_permit[self.uid] and self.metagraph.S[self.uid] >= 200_000))
-                        ):
-                            bt.logging.info("Posting league scores to API.")
-                            post_result = utils.post_prediction_edge_results(
-                                self,
-                                self.prediction_edge_results_endpoint,
-                                league_scores,
-                                league_edge_scores,
-                                league_roi_scores,
-                                league_roi_counts,
-                                league_roi_payouts,
-                                league_roi_market_payouts,
-                                league_pred_counts,
-                                league_pred_win_counts,
-                                all_scores
-                            )
-
-                except Exception as e:
-                    bt.logging.error(f"Error posting league scores to API: {str(e)}")
+                        all_scores
+                    ))
 
-            else:
-                # only log every 5 minutes
-                if minutes % 5 == 0:
-                    bt.logging.debug(f"Skipping setting weights. Only set weights at 30-minute marks.")
+        except Exception as e:
+            bt.logging.error(f"Error posting league scores to API: {str(e)}")
+
+        return None
 
-            # sleep for 1 minute before checking again
-            time.sleep(60)
+    def log_scheduler_stats(self):
+        bt.logging.info(self.scheduler.format_stats())
+        bt.logging.info(self.weights_scheduler.format_stats())
+
+    def seconds_until_next_forward(self) -> Optional[float]:
+        return self.scheduler.seconds_until_next()
 
 
     def validate_league_percentages(self, percentages: Dict[League, float]):
@@ -371,6 +425,12 @@ class Validator(BaseValidatorNeuron):
             self.TRANSITION_KAPPA = TRANSITION_KAPPA
             self.EXTREMIS_BETA = EXTREMIS_BETA
 
+        # Persisted score contributions depend on GAMMA, TRANSITION_KAPPA and EXTREMIS_BETA. Drop them if those changed.
+        try:
+            scoring_utils.invalidate_stale_score_contributions(self)
+        except Exception as e:
+            bt.logging.error(f"Error invalidating persisted score contributions: {e}")
+
 
     def new_wandb_run(self):
         # Shoutout SN13 for the wandb snippet!
@@ -413,7 +473,7 @@ class Validator(BaseValidatorNeuron):
 
     async def forward(self):
         """
-        Validator forward pass. Consists of:
+        Validator forward pass. Runs the scheduled jobs that are due:
         - Periodically updating match data.
         - Querying the miners for league commitments
         - Generating the prediction queries
@@ -422,48 +482,37 @@ class Validator(BaseValidatorNeuron):
         - Storing prediction responses
         - Scoring (calculating closing edge) on eligible past prediction responses
 
-        The forward function is called by the validator every run step.
-
-        It is responsible for querying the network and scoring the responses.
+        The forward function is called by the validator every run step. Steps wake up when the next job is due.
 
         Args:
             self (:obj:`bittensor.neuron.Neuron`): The neuron object which contains all the necessary state for the validator.
         """
+        await self.scheduler.run_due()
 
-        """ START MATCH SYNCING """
-        if self.next_match_syncing_datetime <= dt.datetime.now(dt.timezone.utc):
-            bt.logging.info(
-                "*** Syncing the latest match data to local validator storage. ***"
-            )
-            sync_result = await utils.sync_match_data(self.match_data_endpoint)
-            if sync_result:
-                bt.logging.info("Successfully synced match data.")
-            else:
-                bt.logging.warning("Issue syncing match data")
-            self.next_match_syncing_datetime = dt.datetime.now(
-                dt.timezone.utc
-            ) + dt.timedelta(minutes=DATA_SYNC_INTERVAL_IN_MINUTES)
-        """ END MATCH SYNCING """
-
-        """ START LEAGUE COMMITMENTS REQUESTS """
-        if self.next_league_commitments_datetime <= dt.datetime.now(dt.timezone.utc):
-            # Get all miner uids by passing in high number (300)
-            miner_uids = utils.get_random_uids(self, k=300)
-            
-            # Send league commitments request to miners
-            bt.logging.info(
-                f"*** Sending league commitments requests to all miners. ***"
-            )
-            input_synapse = GetLeagueCommitments()
-            await utils.send_league_commitments_to_miners(
-                self, input_synapse, miner_uids
-            )
-            self.next_league_commitments_datetime = dt.datetime.now(
-                dt.timezone.utc
-            ) + dt.timedelta(minutes=LEAGUE_COMMITMENT_INTERVAL_IN_MINUTES)
-        """ END LEAGUE COMMITMENTS REQUESTS """
+    async def sync_match_data(self):
+        bt.logging.info(
+            "*** Syncing the latest match data to local validator storage. ***"
+        )
+        sync_result = await utils.sync_match_data(self.api_client, self.match_data_endpoint)
+        if sync_result:
+            bt.logging.info("Successfully synced match data.")
+        else:
+            bt.logging.warning("Issue syncing match data")
 
-        """ START MATCH PREDICTION REQUESTS """
+    async def send_league_commitments(self):
+        # Get all miner uids by passing in high number (300)
+        miner_uids = utils.get_random_uids(self, k=300)
+        
+        # Send league commitments request to miners
+        bt.logging.info(
+            f"*** Sending league commitments requests to all miners. ***"
+        )
+        input_synapse = GetLeagueCommitments()
+        await utils.send_league_commitments_to_miners(
+            self, input_synapse, miner_uids
+        )
+
+    async def send_match_prediction_requests(self) -> Optional[float]:
         # Get prediction requests to send to miners
         match_prediction_requests, next_match_request_info = utils.get_match_prediction_requests(self)
 
@@ -472,132 +521,91 @@ class Validator(BaseValidatorNeuron):
             bt.logging.info(
                 f"*** Sending {len(match_prediction_requests)} matches to miners for predictions. ***"
             )
-            # Loop through predictions and send to miners
-            for mpr in match_prediction_requests:
-                input_synapse = GetMatchPrediction(match_prediction=mpr)
-
-                # Gather all miner uids that have committed to the league in the match prediction
-                miner_uids = self.get_miner_uids_committed_to_league(mpr.league)
-                if len(miner_uids) == 0:
-                    bt.logging.info(f"No miners committed to send requests to for league: {mpr.league}")
-                    continue
-
-                bt.logging.info(f"Sending miners {miner_uids} prediction request for match: {mpr}")
-
-                # Send prediction requests to miners and store their responses
-                finished_responses, working_miner_uids = (
-                    await utils.send_predictions_to_miners(
-                        self, input_synapse, miner_uids
-                    )
-                )
-
-                # Update the scores of miner uids NOT working. Default to 0. Miners who commit to a league but don't respond to a prediction request will be penalized.
-                not_working_miner_uids = []
-                for uid in miner_uids:
-                    if uid not in working_miner_uids:
-                        not_working_miner_uids.append(uid)
-                        with self.accumulated_no_response_penalties_lock:
-                            if uid not in self.accumulated_no_response_penalties:
-                                self.accumulated_no_response_penalties[uid] = 0.0
-                            self.accumulated_no_response_penalties[uid] += NO_PREDICTION_RESPONSE_PENALTY
-                        
-                if len(not_working_miner_uids) > 0:
-                    bt.logging.info(
-                        f"Penalizing miners {not_working_miner_uids} that did not respond."
-                    )
+            # Send the matches to their committed miners concurrently, with a bounded number of dendrite batches in flight
+            await utils.send_match_prediction_requests_to_miners(self, match_prediction_requests)
         else:
             bt.logging.info("No matches available to send for predictions.")
             bt.logging.info(f"{next_match_request_info}")
-        """ END MATCH PREDICTION REQUESTS """
 
-        """ START MATCH PREDICTIONS CLEANUP """
+        # Run again as the next prediction window opens if that is sooner than the polling interval. Polling still
+        # picks up windows of matches queued by a later match sync.
+        next_request_time = utils.get_next_match_prediction_request_time()
+        if next_request_time is not None and next_request_time < time.time() + PREDICTION_REQUESTS_INTERVAL_IN_SECONDS:
+            return next_request_time
+        return None
+
+    def clean_up_predictions(self):
         # Clean up any unscored predictions from miners that are no longer registered. Archive predictions from miners that are no longer registered.
-        if self.next_predictions_cleanup_datetime <= dt.datetime.now(dt.timezone.utc):
+        bt.logging.info(
+            "*** Cleaning up unscored predictions from miners that are no longer registered. ***"
+        )
+        # Sync the metagraph to get the latest miner hotkeys
+        self.resync_metagraph()
+
+        # Get active hotkeys and uids
+        active_hotkeys = []
+        active_uids = []
+        for uid in range(self.metagraph.n.item()):
+            active_uids.append(uid)
+            active_hotkeys.append(self.metagraph.axons[uid].hotkey)
+
+        # Delete unscored predictions from miners that are no longer registered
+        utils.clean_up_unscored_deregistered_match_predictions(active_hotkeys, active_uids)
+
+        # Archive predictions from miners that are no longer registered
+        utils.archive_deregistered_match_predictions(active_hotkeys, active_uids)
+
+    async def score_predictions(self):
+        # Score a batch of predictions for completed matches
+        bt.logging.info(f"*** Checking if there are predictions to score. ***")
+
+        (
+            predictions,
+            edge_scores,
+            correct_winner_results,
+            prediction_miner_uids,
+            prediction_sports,
+            prediction_leagues,
+        ) = utils.find_and_score_edge_match_predictions(self, MAX_BATCHSIZE_FOR_SCORING)
+
+        if len(edge_scores) > 0:
             bt.logging.info(
-                "*** Cleaning up unscored predictions from miners that are no longer registered. ***"
+                f"Scoring (calculating Closing Edge) {len(prediction_miner_uids)} predictions for miners {prediction_miner_uids}."
+            )
+            bt.logging.info(
+                f"Closing Edge scores: {edge_scores}"
             )
-            # Sync the metagraph to get the latest miner hotkeys
-            self.resync_metagraph()
-
-            # Get active hotkeys and uids
-            active_hotkeys = []
-            active_uids = []
-            for uid in range(self.metagraph.n.item()):
-                active_uids.append(uid)
-                active_hotkeys.append(self.metagraph.axons[uid].hotkey)
-
-            # Delete unscored predictions from miners that are no longer registered
-            utils.clean_up_unscored_deregistered_match_predictions(active_hotkeys, active_uids)
-
-            # Archive predictions from miners that are no longer registered
-            utils.archive_deregistered_match_predictions(active_hotkeys, active_uids)
-            
-            self.next_predictions_cleanup_datetime = dt.datetime.now(
-                dt.timezone.utc
-            ) + dt.timedelta(minutes=PURGE_DEREGGED_MINERS_INTERVAL_IN_MINUTES)
-        """ END MATCH PREDICTIONS CLEANUP """
-
-        """ START MATCH PREDICTION SCORING """
-        # Check if we're ready to score another batch of predictions
-        if self.next_scoring_datetime <= dt.datetime.now(dt.timezone.utc):
-            bt.logging.info(f"*** Checking if there are predictions to score. ***")
 
-            (
+            # Post scored predictions to API for storage/analysis
+            post_result = await utils.post_scored_predictions(
+                self,
+                self.scored_predictions_endpoint,
                 predictions,
-                edge_scores,
-                correct_winner_results,
-                prediction_miner_uids,
-                prediction_sports,
-                prediction_leagues,
-            ) = utils.find_and_score_edge_match_predictions(MAX_BATCHSIZE_FOR_SCORING)
-
-            if len(edge_scores) > 0:
-                bt.logging.info(
-                    f"Scoring (calculating Closing Edge) {len(prediction_miner_uids)} predictions for miners {prediction_miner_uids}."
-                )
-                bt.logging.info(
-                    f"Closing Edge scores: {edge_scores}"
-                )
+            )
 
-                # Post scored predictions to API for storage/analysis
-                post_result = await utils.post_scored_predictions(
-                    self,
-                    self.scored_predictions_endpoint,
-                    predictions,
-                )
+        else:
+            bt.logging.info("No predictions to score.")
 
-            else:
-                bt.logging.info("No predictions to score.")
-            # Update next sync time
-            self.next_scoring_datetime = dt.datetime.now(
-                dt.timezone.utc
-            ) + dt.timedelta(minutes=SCORING_INTERVAL_IN_MINUTES)
-        """ END MATCH PREDICTION SCORING """
-
-        """ START APP PREDICTION FLOW """
-        if ENABLE_APP:
-            # Check if we're ready to poll the API for prediction requests from the app
-            if self.next_app_predictions_syncing_datetime <= dt.datetime.now(
-                dt.timezone.utc
-            ):
-                bt.logging.info(
-                    "*** Checking the latest app prediction request data for requests for this validator. ***"
-                )
-                process_result = await utils.process_app_prediction_requests(
-                    self,
-                    self.app_prediction_requests_endpoint,
-                    self.app_prediction_responses_endpoint,
-                )
-                if process_result:
-                    bt.logging.info(
-                        "Successfully processed app match prediction requests."
-                    )
-                self.next_app_predictions_syncing_datetime = dt.datetime.now(
-                    dt.timezone.utc
-                ) + dt.timedelta(minutes=APP_DATA_SYNC_INTERVAL_IN_MINUTES)
-        """ END APP PREDICTION FLOW """
+    async def process_app_prediction_requests(self):
+        # Poll the API for prediction requests from the app
+        bt.logging.info(
+            "*** Checking the latest app prediction request data for requests for this validator. ***"
+        )
+        process_result = await utils.process_app_prediction_requests(
+            self,
+            self.app_prediction_requests_endpoint,
+            self.app_prediction_responses_endpoint,
+        )
+        if process_result:
+            bt.logging.info(
+                "Successfully processed app match prediction requests."
+            )
 
 
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
-    Validator().run()
+    validator = Validator()
+    try:
+        validator.run()
+    finally:
+        validator.api_client.close()
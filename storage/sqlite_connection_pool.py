@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+import contextlib
+from typing import Iterator, List
+
+
+class SqliteConnectionPool:
+    """
+    Persistent SQLite connections for a single database file in WAL mode.
+
+    Each thread gets its own long lived, read-only connection. All writes go through one shared writer connection
+    guarded by a lock. With WAL journaling readers never wait on the writer, so long scoring queries can run while
+    the forward loop inserts predictions.
+    """
+
+    # Pragmas applied to every connection. Negative cache_size is in KiB.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -65536",
+        "PRAGMA mmap_size = 268435456",
+        "PRAGMA temp_store = MEMORY",
+    )
+
+    def __init__(self, database: str, timeout: float = 120.0):
+        self.database = database
+        self.timeout = timeout
+        self.write_lock = threading.RLock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self._writer = self._connect(check_same_thread=False)
+        # WAL is persistent on the database file, so it only needs to be set from one connection.
+        self._writer.execute("PRAGMA journal_mode = WAL")
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        # Use PARSE_DECLTYPES to convert accessed values into the appropriate type.
+        connection = sqlite3.connect(
+            self.database,
+            uri=True,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=self.timeout,
+            check_same_thread=check_same_thread,
+        )
+        # Manage transactions explicitly.
+        connection.isolation_level = None
+        for pragma in self.CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """Yields this thread's read-only connection. Does not take the write lock."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect()
+            connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+        yield connection
+
+    @contextlib.contextmanager
+    def writer(self, transaction: bool = True) -> Iterator[sqlite3.Connection]:
+        """
+        Yields the shared writer connection while holding the write lock.
+
+        By default the block runs inside a transaction that is committed on exit and rolled back on error.
+        Pass transaction=False for callers that manage their own transactions (i.e. schema migrations).
+        """
+        with self.write_lock:
+            connection = self._writer
+            # Nested writer blocks on the same thread join the outer transaction.
+            if not transaction or connection.in_transaction:
+                yield connection
+                return
+
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            else:
+                if connection.in_transaction:
+                    connection.execute("COMMIT")
+
+    def close(self):
+        """Closes every connection opened by the pool."""
+        with self._connections_lock:
+            for connection in self._connections:
+                try:
+                    connection.close()
+                except sqlite3.ProgrammingError:
+                    # Connections owned by other threads can only be closed from those threads.
+                    pass
+            self._connections = []
+        self._local = threading.local()
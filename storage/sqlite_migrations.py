@@ -0,0 +1,162 @@
+import datetime as dt
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+import bittensor as bt
+
+from common.timestamps import to_epoch_us
+
+
+SCHEMA_VERSION_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS SchemaVersion (
+                            version         INTEGER         PRIMARY KEY,
+                            description     VARCHAR(255)    NOT NULL,
+                            appliedAt       TIMESTAMP(6)    NOT NULL
+                            )"""
+
+
+def column_exists(cursor: sqlite3.Cursor, table: str, column: str) -> bool:
+    """Checks whether a column exists on a table. Used to keep ALTER TABLE steps idempotent."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return any(row[1] == column for row in cursor.fetchall())
+
+
+def add_column_step(table: str, column: str, definition: str) -> Callable[[sqlite3.Cursor], None]:
+    """Builds an idempotent migration step that adds a column if it does not exist yet."""
+    def step(cursor: sqlite3.Cursor):
+        if not column_exists(cursor, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return step
+
+
+def backfill_epoch_us_step(table: str, column: str, epoch_column: str, batch_size: int = 10_000) -> Callable[[sqlite3.Cursor], None]:
+    """
+    Builds a migration step that fills an epoch microsecond column from its timestamp column where it is still NULL.
+    Parsed in Python, since SQLite's date functions only keep milliseconds.
+    """
+    def step(cursor: sqlite3.Cursor):
+        while True:
+            # CAST bypasses the timestamp converter, to_epoch_us parses the stored text
+            cursor.execute(
+                f"SELECT rowid, CAST({column} AS TEXT) FROM {table} WHERE {epoch_column} IS NULL AND {column} IS NOT NULL LIMIT ?",
+                (batch_size,),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(
+                f"UPDATE {table} SET {epoch_column} = ? WHERE rowid = ?",
+                [(to_epoch_us(value), rowid) for rowid, value in rows],
+            )
+    return step
+
+
+# A migration step is either a SQL statement or a callable taking the cursor, for steps that need to inspect the schema first.
+MigrationStep = Union[str, Callable[[sqlite3.Cursor], None]]
+
+# Ordered list of (version, description, steps). Versions must be strictly increasing and never reused.
+# Every step must be idempotent so that a partially applied migration can safely be re-run on the next startup.
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (
+        1,
+        "Add indexes for miner prediction, odds and scoring lookups",
+        [
+            # get_miner_match_predictions: hotkey/minerId/league/isScored filter, ORDER BY predictionDate
+            """CREATE INDEX IF NOT EXISTS idx_MatchPredictions_miner_league_scored
+               ON MatchPredictions (hotkey, minerId, league, isScored, predictionDate)""",
+            # get_match_predictions_to_score and cleanup: unscored predictions by match date
+            """CREATE INDEX IF NOT EXISTS idx_MatchPredictions_scored_matchDate
+               ON MatchPredictions (isScored, matchDate)""",
+            # get_match_odds and check_match_odds: matchId filter, ORDER BY lastUpdated
+            """CREATE INDEX IF NOT EXISTS idx_MatchOdds_matchId_lastUpdated
+               ON MatchOdds (matchId, lastUpdated)""",
+            # get_matches_to_predict and get_recently_completed_matches: isComplete filter with matchDate range
+            """CREATE INDEX IF NOT EXISTS idx_Matches_complete_matchDate
+               ON Matches (isComplete, matchDate)""",
+        ],
+    ),
+    (
+        2,
+        "Add index for league-wide scored prediction window queries",
+        [
+            # get_league_miner_match_predictions: league/isScored filter, PARTITION BY hotkey, minerId ORDER BY predictionDate
+            """CREATE INDEX IF NOT EXISTS idx_MatchPredictions_league_scored_miner
+               ON MatchPredictions (league, isScored, hotkey, minerId, predictionDate)""",
+        ],
+    ),
+    (
+        3,
+        "Add integer UTC epoch microsecond columns alongside the timestamps compared by scoring and match queries",
+        [
+            add_column_step("Matches", "matchDateUs", "INTEGER NULL"),
+            add_column_step("MatchOdds", "lastUpdatedUs", "INTEGER NULL"),
+            add_column_step("MatchPredictions", "matchDateUs", "INTEGER NULL"),
+            add_column_step("MatchPredictions", "predictionDateUs", "INTEGER NULL"),
+            backfill_epoch_us_step("Matches", "matchDate", "matchDateUs"),
+            backfill_epoch_us_step("MatchOdds", "lastUpdated", "lastUpdatedUs"),
+            backfill_epoch_us_step("MatchPredictions", "matchDate", "matchDateUs"),
+            backfill_epoch_us_step("MatchPredictions", "predictionDate", "predictionDateUs"),
+            # get_matches_to_predict, get_upcoming_matches and get_recently_completed_matches
+            """CREATE INDEX IF NOT EXISTS idx_Matches_complete_matchDateUs
+               ON Matches (isComplete, matchDateUs)""",
+            # get_match_odds_for_matches: matchId filter, ORDER BY lastUpdatedUs
+            """CREATE INDEX IF NOT EXISTS idx_MatchOdds_matchId_lastUpdatedUs
+               ON MatchOdds (matchId, lastUpdatedUs)""",
+            # get_match_predictions_to_score: unscored predictions by match date
+            """CREATE INDEX IF NOT EXISTS idx_MatchPredictions_scored_matchDateUs
+               ON MatchPredictions (isScored, matchDateUs)""",
+        ],
+    ),
+    (
+        4,
+        "Add index for invalidating the score contributions of a match's predictions",
+        [
+            # upsert_matches and insert_match_odds: matchId filter with predictionDateUs range
+            """CREATE INDEX IF NOT EXISTS idx_MatchPredictions_matchId_predictionDateUs
+               ON MatchPredictions (matchId, predictionDateUs)""",
+        ],
+    ),
+]
+
+
+def get_schema_version(cursor: sqlite3.Cursor) -> int:
+    """Returns the highest applied schema version, or 0 if no migrations have been applied."""
+    cursor.execute(SCHEMA_VERSION_TABLE_CREATE)
+    cursor.execute("SELECT MAX(version) FROM SchemaVersion")
+    row = cursor.fetchone()
+    return row[0] if row and row[0] is not None else 0
+
+
+def apply_migrations(connection: sqlite3.Connection) -> List[int]:
+    """Applies all pending migrations in order. Each migration runs in its own transaction. Returns the applied versions."""
+    cursor = connection.cursor()
+    current_version = get_schema_version(cursor)
+    applied = []
+
+    for version, description, steps in MIGRATIONS:
+        if version <= current_version:
+            continue
+
+        bt.logging.info(f"Applying SportsTensorEdge.db schema migration {version}: {description}")
+        try:
+            cursor.execute("BEGIN")
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO SchemaVersion (version, description, appliedAt) VALUES (?, ?, ?)",
+                (version, description, dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            cursor.execute("COMMIT")
+        except Exception:
+            if connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            bt.logging.error(f"Schema migration {version} failed. Database left at version {current_version}.")
+            raise
+
+        current_version = version
+        applied.append(version)
+
+    return applied
+
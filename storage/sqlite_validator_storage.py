@@ -1,22 +1,23 @@
 import os
-import contextlib
 import datetime as dt
 import time
 import bittensor as bt
 import sqlite3
 import threading
 import random
-from pydantic import ValidationError
-from typing import Any, Dict, Optional, Set, Tuple, List
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set, Tuple, List, Union
 from common.data import (
     Sport,
     Match,
     Prediction,
     MatchPrediction,
     League,
-    MatchPredictionWithMatchData,
+    ScoringPrediction,
+    ScoringRow,
 )
 from common.protocol import GetMatchPrediction
+from common.timestamps import parse_timestamp, to_epoch_us
 from common.constants import (
     IS_DEV,
     MIN_PREDICTION_TIME_THRESHOLD,
@@ -24,6 +25,8 @@ from common.constants import (
     SCORING_CUTOFF_IN_DAYS,
 )
 from storage.validator_storage import ValidatorStorage
+from storage.sqlite_migrations import apply_migrations
+from storage.sqlite_connection_pool import SqliteConnectionPool
 
 
 class SqliteValidatorStorage(ValidatorStorage):
@@ -60,7 +63,8 @@ class SqliteValidatorStorage(ValidatorStorage):
                             lastUpdated     TIMESTAMP(6)    NOT NULL,
                             homeTeamOdds    FLOAT           NULL,
                             awayTeamOdds    FLOAT           NULL,
-                            drawOdds        FLOAT           NULL
+                            drawOdds        FLOAT           NULL,
+                            matchDateUs     INTEGER         NULL
                             )"""
     
     MATCH_ODDS_CREATE = """CREATE TABLE IF NOT EXISTS MatchOdds (
@@ -68,7 +72,8 @@ class SqliteValidatorStorage(ValidatorStorage):
                             homeTeamOdds    FLOAT           NULL,
                             awayTeamOdds    FLOAT           NULL,
                             drawOdds        FLOAT           NULL,
-                            lastUpdated     TIMESTAMP(6)    NOT NULL
+                            lastUpdated     TIMESTAMP(6)    NOT NULL,
+                            lastUpdatedUs   INTEGER         NULL
                             )"""
     
     MATCHPREDICTIONREQUESTS_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS MatchPredictionRequests (
@@ -99,15 +104,63 @@ class SqliteValidatorStorage(ValidatorStorage):
                             probabilityChoice   VARCHAR(10)     NULL,
                             probability         FLOAT           NULL,
                             closingEdge         FLOAT           NULL,
-                            isArchived          INTEGER         DEFAULT 0
+                            isArchived          INTEGER         DEFAULT 0,
+                            matchDateUs         INTEGER         NULL,
+                            predictionDateUs    INTEGER         NULL
+                            )"""
+
+    # Per-prediction edge score contributions (v * sigma * gfilter) for scored predictions, keyed by the scoring controls they were computed with.
+    # Predictions that were missing odds at the time of prediction have no row, so they are scored again once the odds are synced.
+    MATCHPREDICTIONSCORES_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS MatchPredictionScores (
+                            predictionId        INTEGER         PRIMARY KEY,
+                            scoringKey          VARCHAR(64)     NOT NULL,
+                            contribution        FLOAT           NULL
+                            )"""
+
+    # Similar prediction pairs found by copycat analysis, keyed by the similarity criteria they were computed with.
+    # Pairs are only between predictions for the same match, so matches whose predictions were all compared are not compared again.
+    COPYCATPREDICTIONPAIRS_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS CopycatPredictionPairs (
+                            predictionId1       INTEGER         NOT NULL,
+                            predictionId2       INTEGER         NOT NULL,
+                            analysisKey         VARCHAR(64)     NOT NULL,
+                            PRIMARY KEY (predictionId1, predictionId2)
+                            )"""
+
+    # Predictions that copycat analysis has compared with every other analyzed prediction for their match.
+    COPYCATCOMPAREDPREDICTIONS_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS CopycatComparedPredictions (
+                            predictionId        INTEGER         PRIMARY KEY,
+                            analysisKey         VARCHAR(64)     NOT NULL
+                            )"""
+    
+    # Watermarks of the delta syncs from the API, keyed by the synced data. Values are the API's UTC time of the last successful sync.
+    SYNCWATERMARKS_TABLE_CREATE = """CREATE TABLE IF NOT EXISTS SyncWatermarks (
+                            name                VARCHAR(50)     PRIMARY KEY,
+                            watermark           TIMESTAMP(6)    NOT NULL
                             )"""
     
     HOTFIX_ZERO_PROB_MARKER_FILE = "HOTFIX_ZERO_PROB_MARKER_FILE.txt"
 
+    DATABASE_FILE = "SportsTensorEdge.db"
+
+    MAX_QUERY_PARAMS = 900
+
+    # Window flag columns of MatchPredictionRequests. Column names cannot be bound as query parameters.
+    MATCH_PREDICTION_REQUEST_COLUMNS = ("prediction_24_hour", "prediction_12_hour", "prediction_4_hour", "prediction_10_min")
+
+    # Columns of a MatchPredictions row joined with its match data, in the order ScoringRow.from_row takes them.
+    # Timestamps are cast to text so the timestamp converter does not parse them. Scoring compares the epoch columns.
+    SCORING_ROW_COLUMNS = """mp.predictionId, mp.minerId, mp.hotkey, mp.matchId, CAST(mp.matchDate AS TEXT), mp.sport, mp.league,
+                    mp.homeTeamName, mp.awayTeamName, mp.homeTeamScore, mp.awayTeamScore, mp.isScored, CAST(mp.scoredDate AS TEXT),
+                    CAST(mp.lastUpdated AS TEXT), CAST(mp.predictionDate AS TEXT), mp.probabilityChoice, mp.probability, mp.closingEdge,
+                    mp.isArchived, mp.matchDateUs, mp.predictionDateUs,
+                    m.homeTeamScore as actualHomeTeamScore, m.awayTeamScore as actualAwayTeamScore, m.homeTeamOdds, m.awayTeamOdds, COALESCE(m.drawOdds, 0) as drawOdds"""
+
     def __init__(self):
         self._initialized = False
-        self.continuous_connection_do_not_reuse: Optional[sqlite3.Connection] = None
+        self.pool: Optional[SqliteConnectionPool] = None
         self.lock = threading.RLock()
+        # Bumped when the odds or results of completed matches change, see get_score_inputs_version
+        self.score_inputs_version = 0
 
     def initialize(self):
         if self._initialized:
@@ -120,9 +173,12 @@ class SqliteValidatorStorage(ValidatorStorage):
     
             sqlite3.register_converter("timestamp", tz_aware_timestamp_adapter)
 
-            self.continuous_connection_do_not_reuse = self._create_connection()
+            # Persistent per-thread reader connections and a single writer connection, in WAL mode.
+            self.pool = SqliteConnectionPool(self.DATABASE_FILE)
+            # Writes are serialized by the pool's writer lock. Readers do not take it.
+            self.lock = self.pool.write_lock
 
-            with contextlib.closing(self._create_connection()) as connection:
+            with self._writer() as connection:
                 cursor = connection.cursor()
 
                 # Create the Matches table (if it does not already exist).
@@ -140,36 +196,39 @@ class SqliteValidatorStorage(ValidatorStorage):
                 # Create the MatchPredictions table (if it does not already exist).
                 cursor.execute(SqliteValidatorStorage.MATCHPREDICTIONS_TABLE_CREATE)
 
-                # Execute db hotfix ce_draws
-                self.execute_db_hotfix_zero_prob()
+                # Create the MatchPredictionScores table (if it does not already exist).
+                cursor.execute(SqliteValidatorStorage.MATCHPREDICTIONSCORES_TABLE_CREATE)
+
+                # Create the copycat analysis state tables (if they do not already exist).
+                cursor.execute(SqliteValidatorStorage.COPYCATPREDICTIONPAIRS_TABLE_CREATE)
+                cursor.execute(SqliteValidatorStorage.COPYCATCOMPAREDPREDICTIONS_TABLE_CREATE)
 
-                # Commit the changes and close the connection
-                connection.commit()
+                # Create the SyncWatermarks table (if it does not already exist).
+                cursor.execute(SqliteValidatorStorage.SYNCWATERMARKS_TABLE_CREATE)
 
-                # Lock to avoid concurrency issues on interacting with the database.
-                self.lock = threading.RLock()
+            # Bring the schema up to date (indexes, new columns, etc.). Each migration runs in its own transaction.
+            with self.pool.writer(transaction=False) as connection:
+                applied_migrations = apply_migrations(connection)
+            if applied_migrations:
+                print(f"Applied SportsTensorEdge.db schema migrations: {applied_migrations}")
+
+            # Execute db hotfix ce_draws
+            self.execute_db_hotfix_zero_prob()
 
             # Execute cleanup queries
             self.cleanup()
 
-    def _create_connection(self):
-        # Create the database if it doesn't exist, defaulting to the local directory.
-        # Use PARSE_DECLTYPES to convert accessed values into the appropriate type.
-        connection = sqlite3.connect(
-            "SportsTensorEdge.db",
-            uri=True,
-            detect_types=sqlite3.PARSE_DECLTYPES,
-            timeout=120.0,
-        )
-        # Avoid using a row_factory that would allow parsing results by column name for performance.
-        # connection.row_factory = sqlite3.Row
-        connection.isolation_level = None
-        return connection
-    
-    def get_connection(self):
+    def _reader(self):
+        """Context manager yielding this thread's pooled read-only connection."""
+        if not self._initialized:
+            raise RuntimeError("SqliteValidatorStorage has not been initialized")
+        return self.pool.reader()
+
+    def _writer(self):
+        """Context manager yielding the pooled writer connection inside a transaction."""
         if not self._initialized:
             raise RuntimeError("SqliteValidatorStorage has not been initialized")
-        return self.continuous_connection_do_not_reuse
+        return self.pool.writer()
     
     def execute_db_hotfix_zero_prob(self):
         if os.path.exists(self.HOTFIX_ZERO_PROB_MARKER_FILE):
@@ -177,13 +236,11 @@ class SqliteValidatorStorage(ValidatorStorage):
             return
 
         try:
-            with self.lock:
-                with contextlib.closing(self._create_connection()) as connection:
-                    cursor = connection.cursor()
-                    cursor.execute(
-                        """DELETE FROM MatchPredictions WHERE probability = 0""",
-                    )
-                    connection.commit()
+            with self._writer() as connection:
+                cursor = connection.cursor()
+                cursor.execute(
+                    """DELETE FROM MatchPredictions WHERE probability = 0""",
+                )
             
             # Create the marker file
             with open(self.HOTFIX_ZERO_PROB_MARKER_FILE, "w") as f:
@@ -196,51 +253,64 @@ class SqliteValidatorStorage(ValidatorStorage):
     def cleanup(self):
         """Cleanup the database."""
         print("========================== Database status checks and cleanup ==========================")
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
+        with self._writer() as connection:
+            cursor = connection.cursor()
                 
-                db_size_bytes = os.path.getsize("SportsTensorEdge.db")
-                db_size_gb = db_size_bytes / (1024 ** 3)
-                db_size_mb = db_size_bytes / (1024 ** 2)
-                print(f"SportsTensorEdge.db size: {db_size_gb:.2f} GB ({db_size_mb:.2f} MB)")
+            db_size_bytes = os.path.getsize(self.DATABASE_FILE)
+            db_size_gb = db_size_bytes / (1024 ** 3)
+            db_size_mb = db_size_bytes / (1024 ** 2)
+            print(f"SportsTensorEdge.db size: {db_size_gb:.2f} GB ({db_size_mb:.2f} MB)")
                 
-                # Print the total number of rows in the MatchPredictions table
-                cursor.execute("SELECT COUNT(*) FROM MatchPredictions")
-                total_rows = cursor.fetchone()[0]
-                print(f"Total number of rows in MatchPredictions: {total_rows}")
-
-                # Print the total number of rows in the MatchPredictions table
-                cursor.execute(f"SELECT COUNT(*) FROM MatchPredictions WHERE isScored = 0 AND lastUpdated < DATETIME('now', '-{SCORING_CUTOFF_IN_DAYS} day')")
-                total_unscored_rows = cursor.fetchone()[0]
-                print(f"Total number of MatchPredictions {SCORING_CUTOFF_IN_DAYS}+ days old that haven't been scored: {total_unscored_rows}")
+            # Print the total number of rows in the MatchPredictions table
+            cursor.execute("SELECT COUNT(*) FROM MatchPredictions")
+            total_rows = cursor.fetchone()[0]
+            print(f"Total number of rows in MatchPredictions: {total_rows}")
+
+            # Print the total number of rows in the MatchPredictions table
+            cursor.execute(f"SELECT COUNT(*) FROM MatchPredictions WHERE isScored = 0 AND lastUpdated < DATETIME('now', '-{SCORING_CUTOFF_IN_DAYS} day')")
+            total_unscored_rows = cursor.fetchone()[0]
+            print(f"Total number of MatchPredictions {SCORING_CUTOFF_IN_DAYS}+ days old that haven't been scored: {total_unscored_rows}")
                 
-                try:
-                    # Execute cleanup queries
-                    if total_unscored_rows > 0:
-                        # Clean up old predictions that haven't been scored (for whatever reason) and never will be
-                        print(f"Deleting abandoned predictions older than {SCORING_CUTOFF_IN_DAYS} days...")
-                        cursor.execute(
-                            f"DELETE FROM MatchPredictions WHERE isScored = 0 AND lastUpdated < DATETIME('now', '-{SCORING_CUTOFF_IN_DAYS} day')"
-                        )
-                        connection.commit()
-
-                    # Run VACUUM to reclaim unused space
-                    #print("Running VACUUM to reclaim unused space...")
-                    #cursor.execute("VACUUM")
+            try:
+                # Execute cleanup queries
+                if total_unscored_rows > 0:
+                    # Clean up old predictions that haven't been scored (for whatever reason) and never will be
+                    print(f"Deleting abandoned predictions older than {SCORING_CUTOFF_IN_DAYS} days...")
+                    cursor.execute(
+                        f"DELETE FROM MatchPredictions WHERE isScored = 0 AND lastUpdated < DATETIME('now', '-{SCORING_CUTOFF_IN_DAYS} day')"
+                    )
+
+                # Clean up score contributions for predictions that no longer exist
+                cursor.execute(
+                    "DELETE FROM MatchPredictionScores WHERE predictionId NOT IN (SELECT predictionId FROM MatchPredictions)"
+                )
+
+                # Clean up copycat analysis state for predictions that no longer exist
+                cursor.execute(
+                    "DELETE FROM CopycatComparedPredictions WHERE predictionId NOT IN (SELECT predictionId FROM MatchPredictions)"
+                )
+                cursor.execute(
+                    """DELETE FROM CopycatPredictionPairs
+                       WHERE predictionId1 NOT IN (SELECT predictionId FROM MatchPredictions)
+                       OR predictionId2 NOT IN (SELECT predictionId FROM MatchPredictions)"""
+                )
+
+                # Run VACUUM to reclaim unused space
+                #print("Running VACUUM to reclaim unused space...")
+                #cursor.execute("VACUUM")
                     
-                    # Check database integrity
-                    print("Checking database integrity...")
-                    cursor.execute("PRAGMA integrity_check")
-                    integrity_result = cursor.fetchone()[0]
-                    if integrity_result != "ok":
-                        print("*** ERROR: Database integrity check failed! Contact Sportstensor admin. ***")
-                    else:
-                        print("Database integrity check passed.")
+                # Check database integrity
+                print("Checking database integrity...")
+                cursor.execute("PRAGMA integrity_check")
+                integrity_result = cursor.fetchone()[0]
+                if integrity_result != "ok":
+                    print("*** ERROR: Database integrity check failed! Contact Sportstensor admin. ***")
+                else:
+                    print("Database integrity check passed.")
                 
-                except Exception as e:
-                    print(f"An error occurred during cleanup: {e}")
-                    raise e
+            except Exception as e:
+                print(f"An error occurred during cleanup: {e}")
+                raise e
         print("========================================================================================")
 
     def insert_leagues(self, leagues: List[League]):
@@ -259,14 +329,12 @@ class SqliteValidatorStorage(ValidatorStorage):
                 ]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """INSERT OR IGNORE INTO Leagues (leagueId, leagueName, sport, isActive, lastUpdated) VALUES (?, ?, ?, ?, ?)""",
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """INSERT OR IGNORE INTO Leagues (leagueId, leagueName, sport, isActive, lastUpdated) VALUES (?, ?, ?, ?, ?)""",
+                values,
+            )
 
     def update_leagues(self, leagues: List[League]):
         """Updates leagues. Mainly for activating or deactivating"""
@@ -279,14 +347,12 @@ class SqliteValidatorStorage(ValidatorStorage):
                 [league.leagueName, league.isActive, now_str, league.leagueId]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """UPDATE Leagues SET leagueName = ?, isActive = ?, lastUpdated = ? WHERE leagueId = ?""",
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """UPDATE Leagues SET leagueName = ?, isActive = ?, lastUpdated = ? WHERE leagueId = ?""",
+                values,
+            )
 
     def insert_matches(self, matches: List[Match]):
         """Stores official matches to score predictions from miners on."""
@@ -310,20 +376,19 @@ class SqliteValidatorStorage(ValidatorStorage):
                     match.drawOdds,
                     match.isComplete,
                     now_str,
+                    to_epoch_us(match.matchDate),
                 ]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """
-                        INSERT OR IGNORE INTO Matches (matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, homeTeamOdds, awayTeamOdds, drawOdds, isComplete, lastUpdated) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """
+                    INSERT OR IGNORE INTO Matches (matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, homeTeamOdds, awayTeamOdds, drawOdds, isComplete, lastUpdated, matchDateUs) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                values,
+            )
 
     def update_matches(self, matches: List[Match]):
         """Updates matches. Typically only used when updating final score."""
@@ -342,29 +407,113 @@ class SqliteValidatorStorage(ValidatorStorage):
                     match.drawOdds,
                     match.isComplete,
                     now_str,
+                    to_epoch_us(match.matchDate),
                     match.matchId,
                 ]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """UPDATE Matches SET matchDate = ?, homeTeamScore = ?, awayTeamScore = ?, homeTeamOdds = ?, awayTeamOdds = ?, drawOdds = ?, isComplete = ?, lastUpdated = ? WHERE matchId = ?""",
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """UPDATE Matches SET matchDate = ?, homeTeamScore = ?, awayTeamScore = ?, homeTeamOdds = ?, awayTeamOdds = ?, drawOdds = ?, isComplete = ?, lastUpdated = ?, matchDateUs = ? WHERE matchId = ?""",
+                values,
+            )
+
+    def upsert_matches(self, matches: List[Match]):
+        """Stores new matches and updates existing ones in one transaction. Updates only change the date, scores, odds and completion."""
+        now_str = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        values = [
+            [
+                match.matchId,
+                match.matchDate,
+                match.sport,
+                match.league,
+                match.homeTeamName,
+                match.awayTeamName,
+                match.homeTeamScore,
+                match.awayTeamScore,
+                match.homeTeamOdds,
+                match.awayTeamOdds,
+                match.drawOdds,
+                match.isComplete,
+                now_str,
+                to_epoch_us(match.matchDate),
+            ]
+            for match in matches
+        ]
+
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            # Score contributions depend on the closing odds and result, so they are recomputed when those change
+            changed_match_ids = self._get_changed_completed_matches(cursor, matches)
+            cursor.executemany(
+                """
+                    INSERT INTO Matches (matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, homeTeamOdds, awayTeamOdds, drawOdds, isComplete, lastUpdated, matchDateUs) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(matchId) DO UPDATE SET
+                        matchDate = excluded.matchDate,
+                        matchDateUs = excluded.matchDateUs,
+                        homeTeamScore = excluded.homeTeamScore,
+                        awayTeamScore = excluded.awayTeamScore,
+                        homeTeamOdds = excluded.homeTeamOdds,
+                        awayTeamOdds = excluded.awayTeamOdds,
+                        drawOdds = excluded.drawOdds,
+                        isComplete = excluded.isComplete,
+                        lastUpdated = excluded.lastUpdated
+                """,
+                values,
+            )
+            self._invalidate_prediction_score_contributions(cursor, {matchId: None for matchId in changed_match_ids})
+
+    def _get_changed_completed_matches(self, cursor: sqlite3.Cursor, matches: List[Match]) -> Set[str]:
+        """Completed matches whose stored closing odds or scores differ from the provided ones."""
+        matches_by_id = {match.matchId: match for match in matches}
+        match_ids = list(matches_by_id)
+        changed = set()
+        for i in range(0, len(match_ids), self.MAX_QUERY_PARAMS):
+            chunk = match_ids[i:i + self.MAX_QUERY_PARAMS]
+            cursor.execute(
+                """SELECT matchId, homeTeamScore, awayTeamScore, homeTeamOdds, awayTeamOdds, drawOdds FROM Matches
+                   WHERE isComplete = 1 AND matchId IN ({})""".format(",".join("?" * len(chunk))),
+                chunk,
+            )
+            for matchId, *stored in cursor.fetchall():
+                match = matches_by_id[matchId]
+                if stored != [match.homeTeamScore, match.awayTeamScore, match.homeTeamOdds, match.awayTeamOdds, match.drawOdds]:
+                    changed.add(matchId)
+        return changed
+
+    def _invalidate_prediction_score_contributions(self, cursor: sqlite3.Cursor, sinceUsByMatch: Dict[str, Optional[int]]):
+        """
+        Deletes the score contributions of predictions of the given matches made at or after sinceUs (all when None),
+        in the caller's transaction, and bumps score_inputs_version.
+        """
+        if not sinceUsByMatch:
+            return
+        cursor.executemany(
+            """DELETE FROM MatchPredictionScores WHERE predictionId IN (
+                   SELECT predictionId FROM MatchPredictions WHERE matchId = :matchId AND (:sinceUs IS NULL OR predictionDateUs >= :sinceUs)
+               )""",
+            [{"matchId": matchId, "sinceUs": sinceUs} for matchId, sinceUs in sinceUsByMatch.items()],
+        )
+        self.score_inputs_version += 1
+
+    def get_score_inputs_version(self) -> int:
+        """
+        Version of the odds and results of completed matches. Read it before loading scoring inputs and pass it to
+        upsert_prediction_score_contributions, so contributions computed from inputs changed since are not stored.
+        """
+        return self.score_inputs_version
 
     def check_match(self, matchId: str) -> Match:
         """Check if a match with the given ID exists in the database."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.execute(
-                    """SELECT EXISTS(SELECT 1 FROM matches WHERE matchId = ?)""",
-                    (matchId,),
-                )
-                return cursor.fetchone()[0]
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT EXISTS(SELECT 1 FROM matches WHERE matchId = ?)""",
+                (matchId,),
+            )
+            return cursor.fetchone()[0]
             
     def insert_match_odds(self, match_odds: List[tuple[str, float, float, float, dt.datetime]]):
         """Stores match odds in the database."""
@@ -377,168 +526,279 @@ class SqliteValidatorStorage(ValidatorStorage):
                     odds[2],
                     odds[3],
                     odds[4],
+                    to_epoch_us(odds[4]),
                 ]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """
-                        INSERT OR IGNORE INTO MatchOdds (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated) 
-                        VALUES (?, ?, ?, ?, ?)
-                    """,
-                    values,
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """
+                    INSERT OR IGNORE INTO MatchOdds (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated, lastUpdatedUs) 
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                values,
+            )
+
+            # Odds synced after a match completed can change the odds at prediction time of predictions made since
+            earliest_us_by_match: Dict[str, int] = {}
+            for value in values:
+                earliest_us_by_match[value[0]] = min(value[5], earliest_us_by_match.get(value[0], value[5]))
+            match_ids = list(earliest_us_by_match)
+            completed_match_ids = set()
+            for i in range(0, len(match_ids), self.MAX_QUERY_PARAMS):
+                chunk = match_ids[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    "SELECT matchId FROM Matches WHERE isComplete = 1 AND matchId IN ({})".format(",".join("?" * len(chunk))),
+                    chunk,
                 )
-                connection.commit()
+                completed_match_ids.update(row[0] for row in cursor.fetchall())
+            self._invalidate_prediction_score_contributions(
+                cursor, {matchId: earliest_us_by_match[matchId] for matchId in completed_match_ids}
+            )
     
     def delete_match_odds(self):
         """Deletes all match odds from the database."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """
-                        DELETE FROM MatchOdds
-                    """,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """
+                    DELETE FROM MatchOdds
+                """,
+            )
 
     def check_match_odds(self, matchId: str, lastUpdated: str) -> bool:
         """Check if match odds with the given ID exists in the database."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.execute(
-                    """SELECT EXISTS(SELECT 1 FROM MatchOdds WHERE matchId = ? AND lastUpdated = ?)""",
-                    (matchId, lastUpdated),
-                )
-                return cursor.fetchone()[0]
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """SELECT EXISTS(SELECT 1 FROM MatchOdds WHERE matchId = ? AND lastUpdated = ?)""",
+                (matchId, lastUpdated),
+            )
+            return cursor.fetchone()[0]
 
     def get_match_odds(self, matchId: str = None):
         """Gets all the match odds for the provided matchId."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                if matchId:
-                    cursor.execute(
-                        """
-                        SELECT * 
-                        FROM MatchOdds
-                        WHERE matchId = ?
-                        ORDER BY lastUpdated ASC
-                        """,
-                        (matchId,)
-                    )
-                else:
-                    cursor.execute(
-                        """
-                        SELECT * 
-                        FROM MatchOdds
-                        ORDER BY lastUpdated ASC
-                        """,
-                    )
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            if matchId:
+                cursor.execute(
+                    """
+                    SELECT matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
+                    FROM MatchOdds
+                    WHERE matchId = ?
+                    ORDER BY lastUpdated ASC
+                    """,
+                    (matchId,)
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated
+                    FROM MatchOdds
+                    ORDER BY lastUpdated ASC
+                    """,
+                )
 
-                results = cursor.fetchall()
-                if not results:
-                    return []
+            results = cursor.fetchall()
+            if not results:
+                return []
                 
-                return results
+            return results
+
+    def get_match_odds_timestamps(self, matchIds: List[str]) -> Set[Tuple[str, int]]:
+        """Gets the (matchId, lastUpdatedUs) of every stored match odds row for the provided matchIds."""
+        timestamps = set()
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            for i in range(0, len(matchIds), self.MAX_QUERY_PARAMS):
+                chunk = matchIds[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    "SELECT matchId, lastUpdatedUs FROM MatchOdds WHERE matchId IN ({})".format(",".join("?" * len(chunk))),
+                    chunk,
+                )
+                timestamps.update(cursor.fetchall())
+
+        return timestamps
+
+    def get_match_odds_for_matches(self, matchIds: List[str]) -> List[tuple]:
+        """
+        Gets all the match odds for the provided matchIds, ordered by matchId and lastUpdated.
+        Rows are (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdatedUs).
+        """
+        results = []
+        unique_match_ids = list(set(matchIds))
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            # Stay well under SQLite's bound parameter limit
+            for i in range(0, len(unique_match_ids), self.MAX_QUERY_PARAMS):
+                chunk = unique_match_ids[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    """
+                    SELECT matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdatedUs
+                    FROM MatchOdds
+                    WHERE matchId IN ({})
+                    ORDER BY matchId ASC, lastUpdatedUs ASC
+                    """.format(",".join("?" * len(chunk))),
+                    chunk,
+                )
+                results.extend(cursor.fetchall())
+
+        return results
+
+    def get_sync_watermark(self, name: str) -> Optional[dt.datetime]:
+        """Gets the watermark of the named delta sync, or None if it has never completed."""
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT watermark FROM SyncWatermarks WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+    def set_sync_watermark(self, name: str, watermark: dt.datetime):
+        """Stores the watermark of the named delta sync."""
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                INSERT INTO SyncWatermarks (name, watermark) VALUES (?, ?)
+                ON CONFLICT(name) DO UPDATE SET watermark = excluded.watermark
+                """,
+                (name, watermark),
+            )
 
     def get_matches_to_predict(self, batchsize: Optional[int] = None) -> List[Match]:
         """Gets batchsize number of matches ready to be predicted."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-
-                # Calculate the current timestamp
-                current_timestamp = int(time.time())
-                # Calculate the lower bound timestamp (earliest match date allowed for predictions)
-                lower_bound_timestamp = (
-                    current_timestamp + MIN_PREDICTION_TIME_THRESHOLD
-                )
-                # Calculate the upper bound timestamp (latest match date allowed for predictions)
-                upper_bound_timestamp = (
-                    current_timestamp + MAX_PREDICTION_DAYS_THRESHOLD * 24 * 3600
-                )
-                # Convert timestamps to strings in 'YYYY-MM-DD HH:MM:SS' format
-                lower_bound_str = dt.datetime.utcfromtimestamp(
-                    lower_bound_timestamp
-                ).strftime("%Y-%m-%d %H:%M:%S")
-                upper_bound_str = dt.datetime.utcfromtimestamp(
-                    upper_bound_timestamp
-                ).strftime("%Y-%m-%d %H:%M:%S")
+        with self._reader() as connection:
 
-                cursor = connection.cursor()
-                query = """
-                    SELECT * 
-                    FROM Matches
-                    WHERE isComplete = 0
-                    AND matchDate BETWEEN ? AND ?
-                    ORDER BY RANDOM()
-                    """
-                if batchsize:
-                    query += "LIMIT ?"
-                    cursor.execute(query, (lower_bound_str, upper_bound_str, batchsize))
-                else:
-                    cursor.execute(query, (lower_bound_str, upper_bound_str))
+            # Calculate the current timestamp
+            current_timestamp = int(time.time())
+            # Calculate the lower bound timestamp (earliest match date allowed for predictions)
+            lower_bound_timestamp = (
+                current_timestamp + MIN_PREDICTION_TIME_THRESHOLD
+            )
+            # Calculate the upper bound timestamp (latest match date allowed for predictions)
+            upper_bound_timestamp = (
+                current_timestamp + MAX_PREDICTION_DAYS_THRESHOLD * 24 * 3600
+            )
+            # Compare against the epoch microsecond column
+            lower_bound_us = lower_bound_timestamp * 1_000_000
+            upper_bound_us = upper_bound_timestamp * 1_000_000
+
+            cursor = connection.cursor()
+            query = """
+                SELECT * 
+                FROM Matches
+                WHERE isComplete = 0
+                AND matchDateUs BETWEEN ? AND ?
+                ORDER BY RANDOM()
+                """
+            if batchsize:
+                query += "LIMIT ?"
+                cursor.execute(query, (lower_bound_us, upper_bound_us, batchsize))
+            else:
+                cursor.execute(query, (lower_bound_us, upper_bound_us))
                 
-                results = cursor.fetchall()
-                if not results:
-                    return []
-
-                # Convert the raw database results into Pydantic models
-                matches = [
-                    Match(
-                        **dict(zip([column[0] for column in cursor.description], row))
-                    )
-                    for row in results
-                ]
-                return matches
+            results = cursor.fetchall()
+            if not results:
+                return []
+
+            # Convert the raw database results into Pydantic models
+            matches = [
+                Match(
+                    **dict(zip([column[0] for column in cursor.description], row))
+                )
+                for row in results
+            ]
+            return matches
             
-    def get_recently_completed_matches(self, matchDateSince: dt.datetime, league: Optional[League] = None) -> List[Match]:
-        """Gets completed matches since the passed in date."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                # Convert datetime to string in 'YYYY-MM-DD HH:MM:SS' format
-                dateSince = matchDateSince.strftime("%Y-%m-%d %H:%M:%S")
+    def get_upcoming_matches(self, matchDateAfter: dt.datetime) -> List[Match]:
+        """Gets incomplete matches starting after the passed in date."""
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                SELECT *
+                FROM Matches
+                WHERE isComplete = 0
+                AND matchDateUs > ?
+                """,
+                (to_epoch_us(matchDateAfter),)
+            )
 
-                cursor = connection.cursor()
-                params = [dateSince]
-                query = """
-                    SELECT * 
-                    FROM Matches
-                    WHERE isComplete = 1
-                    AND matchDate > ?
-                    """
+            results = cursor.fetchall()
+            if not results:
+                return []
+
+            # Convert the raw database results into Pydantic models
+            columns = [column[0] for column in cursor.description]
+            return [Match(**dict(zip(columns, row))) for row in results]
+
+    def get_recently_completed_matches(self, matchDateSince: Union[dt.datetime, int], league: Optional[League] = None) -> List[Match]:
+        """Gets completed matches since the passed in date, or UTC epoch microseconds."""
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            params = [to_epoch_us(matchDateSince)]
+            query = """
+                SELECT * 
+                FROM Matches
+                WHERE isComplete = 1
+                AND matchDateUs > ?
+                """
                 
-                if league:
-                    query += "AND (league = ? OR league = ?)"
-                    params.append(league.name)
-                    params.append(league.value)
+            if league:
+                query += "AND (league = ? OR league = ?)"
+                params.append(league.name)
+                params.append(league.value)
                 
-                cursor.execute(query, params)
+            cursor.execute(query, params)
                 
-                results = cursor.fetchall()
-                if not results:
-                    return []
-
-                # Convert the raw database results into Pydantic models
-                matches = [
-                    Match(
-                        **dict(zip([column[0] for column in cursor.description], row))
-                    )
-                    for row in results
-                ]
-                return matches
+            results = cursor.fetchall()
+            if not results:
+                return []
+
+            # Convert the raw database results into Pydantic models
+            matches = [
+                Match(
+                    **dict(zip([column[0] for column in cursor.description], row))
+                )
+                for row in results
+            ]
+            return matches
             
     def update_match_prediction_request(self, matchId: str, request_time: str):
         """Updates a match prediction request with the status of the request_time."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                now_str = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        with self._writer() as connection:
+            now_str = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
-                cursor = connection.cursor()
-                cursor.execute(
+            cursor = connection.cursor()
+            cursor.execute(
+                f"""
+                INSERT INTO MatchPredictionRequests (matchId, {request_time}, lastUpdated)
+                VALUES (?, TRUE, ?)
+                ON CONFLICT(matchId) DO UPDATE SET
+                {request_time} = TRUE,
+                lastUpdated = ?
+                """,
+                (matchId, now_str, now_str)
+            )
+
+    def update_match_prediction_requests(self, requests: List[Tuple[str, str]]):
+        """Updates match prediction requests with the status of their request_time, as (matchId, request_time) pairs, in one batch."""
+        if not requests:
+            return
+
+        matchIds_by_request_time: Dict[str, List[str]] = defaultdict(list)
+        for matchId, request_time in requests:
+            if request_time not in self.MATCH_PREDICTION_REQUEST_COLUMNS:
+                raise ValueError(f"Unknown match prediction request time {request_time}")
+            matchIds_by_request_time[request_time].append(matchId)
+
+        with self._writer() as connection:
+            now_str = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+            cursor = connection.cursor()
+            for request_time, matchIds in matchIds_by_request_time.items():
+                cursor.executemany(
                     f"""
                     INSERT INTO MatchPredictionRequests (matchId, {request_time}, lastUpdated)
                     VALUES (?, TRUE, ?)
@@ -546,65 +806,61 @@ class SqliteValidatorStorage(ValidatorStorage):
                     {request_time} = TRUE,
                     lastUpdated = ?
                     """,
-                    (matchId, now_str, now_str)
+                    [(matchId, now_str, now_str) for matchId in matchIds]
                 )
-                connection.commit()
 
     def get_match_prediction_requests(self, matchId: Optional[str] = None) -> Dict[str, Dict[str, bool]]:
         """Gets all match prediction requests or a specific match prediction request."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                if matchId:
-                    cursor.execute(
-                        """
-                        SELECT mpr.matchId, mpr.prediction_24_hour, mpr.prediction_12_hour, mpr.prediction_4_hour, mpr.prediction_10_min
-                        FROM MatchPredictionRequests mpr
-                        WHERE mpr.matchId = ?
-                        """,
-                        (matchId,)
-                    )
-                    row = cursor.fetchone()
-                    if row:
-                        return {row[0]: {
-                            '24_hour': bool(row[1]),
-                            '12_hour': bool(row[2]),
-                            '4_hour': bool(row[3]),
-                            '10_min': bool(row[4])
-                        }}
-                    else:
-                        return {}
-                else:
-                    cursor.execute(
-                        """
-                        SELECT mpr.matchId, mpr.prediction_24_hour, mpr.prediction_12_hour, mpr.prediction_4_hour, mpr.prediction_10_min
-                        FROM MatchPredictionRequests mpr
-                        """
-                    )
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            if matchId:
+                cursor.execute(
+                    """
+                    SELECT mpr.matchId, mpr.prediction_24_hour, mpr.prediction_12_hour, mpr.prediction_4_hour, mpr.prediction_10_min
+                    FROM MatchPredictionRequests mpr
+                    WHERE mpr.matchId = ?
+                    """,
+                    (matchId,)
+                )
+                row = cursor.fetchone()
+                if row:
                     return {row[0]: {
                         '24_hour': bool(row[1]),
                         '12_hour': bool(row[2]),
                         '4_hour': bool(row[3]),
                         '10_min': bool(row[4])
-                    } for row in cursor.fetchall()}
-                
-    def delete_match_prediction_requests(self):
-        """Deletes a match prediction requests from matches that are older than 1 day."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
+                    }}
+                else:
+                    return {}
+            else:
                 cursor.execute(
                     """
-                    DELETE FROM MatchPredictionRequests
-                    WHERE matchId IN (
-                        SELECT mpr.matchId
-                        FROM MatchPredictionRequests mpr
-                        JOIN matches m ON mpr.matchId = m.matchId
-                        WHERE datetime(m.matchDate) < datetime('now', '-1 day')
-                    )
+                    SELECT mpr.matchId, mpr.prediction_24_hour, mpr.prediction_12_hour, mpr.prediction_4_hour, mpr.prediction_10_min
+                    FROM MatchPredictionRequests mpr
                     """
                 )
-                connection.commit()
+                return {row[0]: {
+                    '24_hour': bool(row[1]),
+                    '12_hour': bool(row[2]),
+                    '4_hour': bool(row[3]),
+                    '10_min': bool(row[4])
+                } for row in cursor.fetchall()}
+                
+    def delete_match_prediction_requests(self):
+        """Deletes a match prediction requests from matches that are older than 1 day."""
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                """
+                DELETE FROM MatchPredictionRequests
+                WHERE matchId IN (
+                    SELECT mpr.matchId
+                    FROM MatchPredictionRequests mpr
+                    JOIN matches m ON mpr.matchId = m.matchId
+                    WHERE datetime(m.matchDate) < datetime('now', '-1 day')
+                )
+                """
+            )
 
     def insert_match_predictions(self, predictions: List[GetMatchPrediction]):
         """Stores unscored predictions returned from miners."""
@@ -638,159 +894,107 @@ class SqliteValidatorStorage(ValidatorStorage):
                     prediction.match_prediction.probability,
                     prediction.match_prediction.predictionDate,
                     now_str,
+                    to_epoch_us(prediction.match_prediction.matchDate),
+                    to_epoch_us(prediction.match_prediction.predictionDate),
                 ]
             )
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """
-                        INSERT OR IGNORE INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, probabilityChoice, probability, predictionDate, lastUpdated) 
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """
+                    INSERT OR IGNORE INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore, probabilityChoice, probability, predictionDate, lastUpdated, matchDateUs, predictionDateUs) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                values,
+            )
 
     def delete_unscored_deregistered_match_predictions(self, miner_hotkeys: List[str], miner_uids: List[int]):
         """Deletes unscored predictions returned from miners that are no longer registered."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
+        with self._writer() as connection:
+            cursor = connection.cursor()
 
-                # Get the unique hotkeys and count of predictions to be deleted
+            # Get the unique hotkeys and count of predictions to be deleted
+            cursor.execute(
+                """
+                SELECT hotkey, COUNT(*) 
+                FROM MatchPredictions 
+                WHERE isScored = 0 AND hotkey NOT IN ({})
+                GROUP BY hotkey
+                """.format(",".join("?" * len(miner_hotkeys))),
+                list(miner_hotkeys),
+            )
+            deletion_data = cursor.fetchall()
+                
+            if deletion_data:
+                hotkeys_to_delete = [row[0] for row in deletion_data]
+                counts_to_delete = [row[1] for row in deletion_data]
+                total_count_to_delete = sum(counts_to_delete)
+
+                # Delete the predictions that are not from registered hotkeys
                 cursor.execute(
-                    """
-                    SELECT hotkey, COUNT(*) 
-                    FROM MatchPredictions 
-                    WHERE isScored = 0 AND hotkey NOT IN ({})
-                    GROUP BY hotkey
-                    """.format(",".join("?" * len(miner_hotkeys))),
+                    "DELETE FROM MatchPredictions WHERE isScored = 0 AND hotkey NOT IN ({})".format(
+                        ",".join("?" * len(miner_hotkeys))
+                    ),
                     list(miner_hotkeys),
                 )
-                deletion_data = cursor.fetchall()
-                
-                if deletion_data:
-                    hotkeys_to_delete = [row[0] for row in deletion_data]
-                    counts_to_delete = [row[1] for row in deletion_data]
-                    total_count_to_delete = sum(counts_to_delete)
 
-                    # Delete the predictions that are not from registered hotkeys
-                    cursor.execute(
-                        "DELETE FROM MatchPredictions WHERE isScored = 0 AND hotkey NOT IN ({})".format(
-                            ",".join("?" * len(miner_hotkeys))
-                        ),
-                        list(miner_hotkeys),
-                    )
-                    connection.commit()
-
-                    # Log the details
-                    bt.logging.info(f"Deleted a total of {total_count_to_delete} unscored predictions from {len(hotkeys_to_delete)} deregistered miners.")
-                    bt.logging.info(f"Affected hotkeys and their prediction counts: {dict(zip(hotkeys_to_delete, counts_to_delete))}")
-                else:
-                    bt.logging.info("No unscored predictions from deregistered miners found for deletion.")
-
-                # Next, loop through active hotkeys and delete any rows with different uids
-                values = []
-                for miner_hotkey, miner_uid in zip(miner_hotkeys, miner_uids):
-                    # Parse MatchPredictions into a list of values to check/delete
-                    values.append([miner_hotkey, miner_uid])
-
-                with self.lock:
-                    with contextlib.closing(self._create_connection()) as connection:
-                        cursor = connection.cursor()
-                        cursor.executemany(
-                            """DELETE FROM MatchPredictions WHERE isScored = 0 AND hotkey = ? AND minerId != ?""",
-                            values,
-                        )
-                        connection.commit()
+                # Log the details
+                bt.logging.info(f"Deleted a total of {total_count_to_delete} unscored predictions from {len(hotkeys_to_delete)} deregistered miners.")
+                bt.logging.info(f"Affected hotkeys and their prediction counts: {dict(zip(hotkeys_to_delete, counts_to_delete))}")
+            else:
+                bt.logging.info("No unscored predictions from deregistered miners found for deletion.")
+
+            # Next, loop through active hotkeys and delete any rows with different uids
+            values = []
+            for miner_hotkey, miner_uid in zip(miner_hotkeys, miner_uids):
+                # Parse MatchPredictions into a list of values to check/delete
+                values.append([miner_hotkey, miner_uid])
+
+            cursor.executemany(
+                """DELETE FROM MatchPredictions WHERE isScored = 0 AND hotkey = ? AND minerId != ?""",
+                values,
+            )
     
     def get_match_predictions_to_score(
         self, batchsize: int = 10, matchDateCutoff: int = SCORING_CUTOFF_IN_DAYS
-    ) -> Optional[List[MatchPredictionWithMatchData]]:
+    ) -> Optional[List[ScoringRow]]:
         """Gets batchsize number of predictions that need to be scored and are eligible to be scored (the match is complete)"""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
+        with self._reader() as connection:
+            cursor = connection.cursor()
+
+            # Calculate the current timestamp
+            current_timestamp = int(time.time())
+            # Calculate cutoff date timestamp
+            match_cutoff_timestamp = current_timestamp - (
+                matchDateCutoff * 24 * 3600
+            )
 
-                # Calculate the current timestamp
-                current_timestamp = int(time.time())
-                # Calculate cutoff date timestamp
-                match_cutoff_timestamp = current_timestamp - (
-                    matchDateCutoff * 24 * 3600
-                )
-                # Convert timestamps to strings in 'YYYY-MM-DD HH:MM:SS' format
-                match_cutoff_str = dt.datetime.utcfromtimestamp(
-                    match_cutoff_timestamp
-                ).strftime("%Y-%m-%d %H:%M:%S")
+            cursor.execute(
+                f"""
+                SELECT {self.SCORING_ROW_COLUMNS}
+                FROM MatchPredictions mp
+                JOIN Matches m ON (m.matchId = mp.matchId)
+                WHERE mp.isScored = 0
+                AND m.isComplete = 1
+                AND mp.matchDateUs > ?
+                AND mp.probabilityChoice IS NOT NULL
+                AND mp.probability IS NOT NULL
+                AND m.homeTeamScore IS NOT NULL
+                AND m.awayTeamScore IS NOT NULL
+                AND m.homeTeamOdds IS NOT NULL
+                AND m.awayTeamOdds IS NOT NULL
+                ORDER BY RANDOM()
+                LIMIT ?
+                """,
+                [match_cutoff_timestamp * 1_000_000, batchsize],
+            )
+            results = cursor.fetchall()
+            if not results:
+                return []
 
-                cursor.execute(
-                    """
-                    SELECT mp.*, m.homeTeamScore as actualHomeTeamScore, m.awayTeamScore as actualAwayTeamScore, m.homeTeamOdds, m.awayTeamOdds, COALESCE(m.drawOdds, 0) as drawOdds
-                    FROM MatchPredictions mp
-                    JOIN Matches m ON (m.matchId = mp.matchId)
-                    WHERE mp.isScored = 0
-                    AND m.isComplete = 1
-                    AND mp.matchDate > ?
-                    AND mp.probabilityChoice IS NOT NULL
-                    AND mp.probability IS NOT NULL
-                    AND m.homeTeamScore IS NOT NULL
-                    AND m.awayTeamScore IS NOT NULL
-                    AND m.homeTeamOdds IS NOT NULL
-                    AND m.awayTeamOdds IS NOT NULL
-                    ORDER BY RANDOM()
-                    LIMIT ?
-                    """,
-                    [match_cutoff_str, batchsize],
-                )
-                results = cursor.fetchall()
-                if not results:
-                    return []
-
-                # Convert the raw database results into the new combined Pydantic model
-                combined_predictions = []
-                for row in results:
-                    prediction_data = {
-                        "predictionId": row[0],
-                        "minerId": row[1],
-                        "hotkey": row[2],
-                        "matchId": row[3],
-                        "matchDate": row[4],
-                        "sport": row[5],
-                        "league": row[6],
-                        "homeTeamName": row[7],
-                        "awayTeamName": row[8],
-                        "homeTeamScore": row[9],
-                        "awayTeamScore": row[10],
-                        "isScored": row[11],
-                        # row[12] is scoredDate
-                        "lastUpdated": row[13],
-                        "predictionDate": row[14],
-                        "probabilityChoice": row[15],
-                        "probability": row[16],
-                        #"closingEdge": row[17],
-                        #"isArchived": row[18]
-                    }
-                    try:
-                        # Ensure all required fields are present in prediction_data
-                        prediction_data.setdefault('scoredDate', None)
-                        prediction_data.setdefault('closingEdge', None)
-
-                        combined_predictions.append(
-                            MatchPredictionWithMatchData(
-                                prediction=MatchPrediction(**prediction_data),
-                                actualHomeTeamScore=row[19],
-                                actualAwayTeamScore=row[20],
-                                homeTeamOdds=row[21],
-                                awayTeamOdds=row[22],
-                                drawOdds=row[23],
-                            )
-                        )
-                    except ValidationError as e:
-                        bt.logging.error(f"Validation error for row {row}: {e}")
-
-                return combined_predictions
+            # Scoring only reads these rows and sets closingEdge. Build slotted rows straight from the tuples.
+            return [ScoringRow.from_row(row) for row in results]
 
     def update_match_predictions(self, predictions: List[MatchPrediction]):
         """Updates predictions. Typically only used when marking predictions as being scored."""
@@ -805,14 +1009,118 @@ class SqliteValidatorStorage(ValidatorStorage):
             # Parse MatchPredictions into a list of values to update, marking each as scored with a timestamp of now.
             values.append([prediction.closingEdge, 1, now_str, prediction.predictionId])
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """UPDATE MatchPredictions SET closingEdge = ?, isScored = ?, scoredDate = ? WHERE predictionId = ?""",
-                    values,
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """UPDATE MatchPredictions SET closingEdge = ?, isScored = ?, scoredDate = ? WHERE predictionId = ?""",
+                values,
+            )
+
+    def upsert_prediction_score_contributions(
+        self, contributions: List[Tuple[int, float]], scoringKey: str, scoreInputsVersion: Optional[int] = None
+    ) -> bool:
+        """
+        Stores the edge score contribution of scored predictions, computed with the scoring controls identified by scoringKey.
+        Nothing is stored if scoreInputsVersion is given and match odds or results changed since it was read. Returns whether they were stored.
+        """
+        if not contributions:
+            return True
+
+        with self._writer() as connection:
+            if scoreInputsVersion is not None and scoreInputsVersion != self.score_inputs_version:
+                return False
+            cursor = connection.cursor()
+            cursor.executemany(
+                """INSERT INTO MatchPredictionScores (predictionId, scoringKey, contribution) VALUES (?, ?, ?)
+                   ON CONFLICT(predictionId) DO UPDATE SET scoringKey = excluded.scoringKey, contribution = excluded.contribution""",
+                [(predictionId, scoringKey, contribution) for predictionId, contribution in contributions],
+            )
+        return True
+
+    def get_prediction_score_contributions(self, predictionIds: List[int], scoringKey: str) -> Dict[int, float]:
+        """Gets the stored score contributions computed with scoringKey for the provided predictionIds. Predictions without one are omitted."""
+        contributions = {}
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            for i in range(0, len(predictionIds), self.MAX_QUERY_PARAMS):
+                chunk = predictionIds[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    "SELECT predictionId, contribution FROM MatchPredictionScores WHERE scoringKey = ? AND contribution IS NOT NULL AND predictionId IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    [scoringKey] + chunk,
                 )
-                connection.commit()
+                contributions.update(cursor.fetchall())
+
+        return contributions
+
+    def delete_stale_prediction_score_contributions(self, scoringKey: str) -> int:
+        """Deletes score contributions that were not computed with scoringKey. Returns the number of deleted rows."""
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM MatchPredictionScores WHERE scoringKey != ?", [scoringKey])
+            return cursor.rowcount
+
+    def get_copycat_compared_predictions(self, predictionIds: List[int], analysisKey: str) -> Set[int]:
+        """Gets which of the provided predictionIds were already compared by copycat analysis with the criteria identified by analysisKey."""
+        compared = set()
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            for i in range(0, len(predictionIds), self.MAX_QUERY_PARAMS):
+                chunk = predictionIds[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    "SELECT predictionId FROM CopycatComparedPredictions WHERE analysisKey = ? AND predictionId IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    [analysisKey] + chunk,
+                )
+                compared.update(row[0] for row in cursor.fetchall())
+
+        return compared
+
+    def get_copycat_prediction_pairs(self, predictionIds: List[int], analysisKey: str) -> List[Tuple[int, int]]:
+        """Gets the similar prediction pairs found by copycat analysis with analysisKey where both predictions are in predictionIds."""
+        prediction_ids = set(predictionIds)
+        pairs = []
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            for i in range(0, len(predictionIds), self.MAX_QUERY_PARAMS):
+                chunk = predictionIds[i:i + self.MAX_QUERY_PARAMS]
+                cursor.execute(
+                    "SELECT predictionId1, predictionId2 FROM CopycatPredictionPairs WHERE analysisKey = ? AND predictionId1 IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    [analysisKey] + chunk,
+                )
+                pairs.extend(row for row in cursor.fetchall() if row[1] in prediction_ids)
+
+        return pairs
+
+    def upsert_copycat_prediction_pairs(self, pairs: List[Tuple[int, int]], comparedPredictionIds: List[int], analysisKey: str):
+        """Stores similar prediction pairs and the predictions that were compared by copycat analysis with analysisKey."""
+        if not pairs and not comparedPredictionIds:
+            return
+
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """INSERT INTO CopycatPredictionPairs (predictionId1, predictionId2, analysisKey) VALUES (?, ?, ?)
+                   ON CONFLICT(predictionId1, predictionId2) DO UPDATE SET analysisKey = excluded.analysisKey""",
+                [(predictionId1, predictionId2, analysisKey) for predictionId1, predictionId2 in pairs],
+            )
+            cursor.executemany(
+                """INSERT INTO CopycatComparedPredictions (predictionId, analysisKey) VALUES (?, ?)
+                   ON CONFLICT(predictionId) DO UPDATE SET analysisKey = excluded.analysisKey""",
+                [(predictionId, analysisKey) for predictionId in comparedPredictionIds],
+            )
+
+    def delete_stale_copycat_prediction_pairs(self, analysisKey: str) -> int:
+        """Deletes copycat analysis state that was not computed with analysisKey. Returns the number of deleted pairs."""
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM CopycatComparedPredictions WHERE analysisKey != ?", [analysisKey])
+            cursor.execute("DELETE FROM CopycatPredictionPairs WHERE analysisKey != ?", [analysisKey])
+            return cursor.rowcount
 
     def archive_match_predictions(self, miner_hotkeys: List[str], miner_uids: List[int]):
         """Updates predictions with isArchived 1. Typically only used when marking predictions achived after miner has been deregistered."""
@@ -820,17 +1128,15 @@ class SqliteValidatorStorage(ValidatorStorage):
         bt.logging.trace(
             f"Archiving predictions for deregistered miners"
         )
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                params = [1] + miner_hotkeys
-                cursor.execute(
-                    "UPDATE MatchPredictions SET isArchived = ? WHERE isScored = 1 AND hotkey NOT IN ({})".format(
-                        ",".join("?" * len(miner_hotkeys))
-                    ),
-                    params,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            params = [1] + miner_hotkeys
+            cursor.execute(
+                "UPDATE MatchPredictions SET isArchived = ? WHERE isScored = 1 AND hotkey NOT IN ({})".format(
+                    ",".join("?" * len(miner_hotkeys))
+                ),
+                params,
+            )
 
         # Next, loop through active hotkeys and mark any rows with different uids as archived
         values = []
@@ -838,171 +1144,155 @@ class SqliteValidatorStorage(ValidatorStorage):
             # Parse MatchPredictions into a list of values to update
             values.append([1, miner_hotkey, miner_uid])
 
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.executemany(
-                    """UPDATE MatchPredictions SET isArchived = ? WHERE isScored = 1 AND hotkey = ? AND minerId != ?""",
-                    values,
-                )
-                connection.commit()
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.executemany(
+                """UPDATE MatchPredictions SET isArchived = ? WHERE isScored = 1 AND hotkey = ? AND minerId != ?""",
+                values,
+            )
 
     def get_total_match_predictions_by_miner(self, miner_hotkey: str, miner_uid: int) -> int:
         """Gets the total number of predictions a miner has made since being registered. Must be scored and not archived."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.execute(
-                    "SELECT COUNT(*) FROM MatchPredictions WHERE hotkey = ? AND minerId = ? AND isScored = 1 AND isArchived = 0",
-                    [miner_hotkey, miner_uid],
-                )
-                result = cursor.fetchone()
-                if result is not None:
-                    return result[0]
-                else:
-                    return 0
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM MatchPredictions WHERE hotkey = ? AND minerId = ? AND isScored = 1 AND isArchived = 0",
+                [miner_hotkey, miner_uid],
+            )
+            result = cursor.fetchone()
+            if result is not None:
+                return result[0]
+            else:
+                return 0
     
     def get_miner_match_predictions(
         self, miner_hotkey: str, miner_uid: int, league: League=None, scored: bool=False, batchSize: int=None
-    ) -> Optional[List[MatchPredictionWithMatchData]]:
+    ) -> Optional[List[ScoringRow]]:
         """Gets a list of all predictions made by a miner. Include match data."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
+        with self._reader() as connection:
+            cursor = connection.cursor()
+
+            query = f"""
+                SELECT {self.SCORING_ROW_COLUMNS}
+                FROM MatchPredictions mp
+                JOIN Matches m ON (m.matchId = mp.matchId)
+                WHERE mp.hotkey = ?
+                AND mp.minerId = ?
+                AND mp.isArchived = 0
+            """
+
+            params = [miner_hotkey, miner_uid]
+            if league:
+                query += " AND mp.league = ? "
+                params.append(league.value)
+            if scored:
+                query += " AND mp.isScored = 1 "
+                query += " AND mp.closingEdge IS NOT NULL "
+                query += " AND m.isComplete = 1 "
+                query += " AND m.homeTeamOdds IS NOT NULL"
+                query += " AND m.awayTeamOdds IS NOT NULL"
+            else:
+                query += " AND mp.isScored = 0 "
+                
+            query += " ORDER BY mp.predictionDate DESC"
+                
+            if batchSize:
+                query += f" LIMIT {batchSize}"
 
-                query = """
-                    SELECT mp.*, m.homeTeamScore as actualHomeTeamScore, m.awayTeamScore as actualAwayTeamScore, m.homeTeamOdds, m.awayTeamOdds, COALESCE(m.drawOdds, 0) as drawOdds
+            cursor.execute(
+                query,
+                params,
+            )
+            results = cursor.fetchall()
+            if not results:
+                return []
+
+            return [self._scored_row_to_scoring_row(row) for row in results]
+
+    def get_league_miner_match_predictions(
+        self, league: League, miners: Dict[int, str], batchSize: int
+    ) -> Dict[int, List[ScoringRow]]:
+        """Gets the last batchSize scored predictions for every miner in a league in one query. Include match data. Keyed by miner uid."""
+        if not miners:
+            return {}
+
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"""
+                SELECT *
+                FROM (
+                    SELECT {self.SCORING_ROW_COLUMNS},
+                        ROW_NUMBER() OVER (PARTITION BY mp.hotkey, mp.minerId ORDER BY mp.predictionDate DESC) AS rowNum
                     FROM MatchPredictions mp
                     JOIN Matches m ON (m.matchId = mp.matchId)
-                    WHERE mp.hotkey = ?
-                    AND mp.minerId = ?
+                    WHERE mp.league = ?
+                    AND mp.isScored = 1
                     AND mp.isArchived = 0
-                """
+                    AND mp.closingEdge IS NOT NULL
+                    AND m.isComplete = 1
+                    AND m.homeTeamOdds IS NOT NULL
+                    AND m.awayTeamOdds IS NOT NULL
+                )
+                WHERE rowNum <= ?
+                ORDER BY minerId, rowNum
+                """,
+                [league.value, batchSize],
+            )
+            results = cursor.fetchall()
 
-                params = [miner_hotkey, miner_uid]
-                if league:
-                    query += " AND mp.league = ? "
-                    params.append(league.value)
-                if scored:
-                    query += " AND mp.isScored = 1 "
-                    query += " AND mp.closingEdge IS NOT NULL "
-                    query += " AND m.isComplete = 1 "
-                    query += " AND m.homeTeamOdds IS NOT NULL"
-                    query += " AND m.awayTeamOdds IS NOT NULL"
-                else:
-                    query += " AND mp.isScored = 0 "
-                
-                query += " ORDER BY mp.predictionDate DESC"
-                
-                if batchSize:
-                    query += f" LIMIT {batchSize}"
+        # Group by uid, only keeping rows for the miner currently registered to the uid
+        predictions_by_uid: Dict[int, List[ScoringRow]] = {}
+        for row in results:
+            uid, hotkey = row[1], row[2]
+            if miners.get(uid) != hotkey:
+                continue
+            predictions_by_uid.setdefault(uid, []).append(self._scored_row_to_scoring_row(row))
 
-                cursor.execute(
-                    query,
-                    params,
-                )
-                results = cursor.fetchall()
-                if not results:
-                    return []
-
-                # Convert the raw database results into the new combined Pydantic model
-                combined_predictions = []
-                for row in results:
-                    prediction_data = {
-                        "predictionId": row[0],
-                        "minerId": row[1],
-                        "hotkey": row[2],
-                        "matchId": row[3],
-                        "matchDate": row[4],
-                        "sport": row[5],
-                        "league": row[6],
-                        "homeTeamName": row[7],
-                        "awayTeamName": row[8],
-                        "homeTeamScore": row[9],
-                        "awayTeamScore": row[10],
-                        "isScored": row[11],
-                        "scoredDate": row[12],
-                        "lastUpdated": row[13],
-                        "predictionDate": row[14],
-                        "probabilityChoice": row[15],
-                        "probability": round(row[16], 4),
-                        "closingEdge": row[17],
-                        "isArchived": row[18]
-                    }
-                    try:
-                        combined_predictions.append(
-                            MatchPredictionWithMatchData(
-                                prediction=MatchPrediction(**prediction_data),
-                                actualHomeTeamScore=row[19],
-                                actualAwayTeamScore=row[20],
-                                homeTeamOdds=row[21],
-                                awayTeamOdds=row[22],
-                                drawOdds=row[23],
-                            )
-                        )
-                    except ValidationError as e:
-                        bt.logging.error(f"Validation error for row {row}: {e}")
-                
-                return combined_predictions
+        return predictions_by_uid
+
+    def _scored_row_to_scoring_row(self, row: tuple) -> ScoringRow:
+        """Converts a scored MatchPredictions row joined with its match data into a ScoringRow, with the probability rounded to 4 places."""
+        prediction = ScoringPrediction(*row[:16], round(row[16], 4), *row[17:21])
+        return ScoringRow(prediction, *row[21:26])
 
     def read_miner_last_prediction(self, miner_hotkey: str) -> Optional[dt.datetime]:
         """Gets when a specific miner last returned a prediction."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.execute(
-                    "SELECT MAX(lastUpdated) FROM MatchPrediction WHERE hotkey = ?",
-                    [miner_hotkey],
-                )
-                result = cursor.fetchone()
-                if result is not None:
-                    return result[0]
-                else:
-                    return None
+        with self._reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "SELECT MAX(lastUpdated) FROM MatchPrediction WHERE hotkey = ?",
+                [miner_hotkey],
+            )
+            result = cursor.fetchone()
+            if result is not None:
+                return result[0]
+            else:
+                return None
 
     def delete_miner(self, hotkey: str):
         """Removes the predictions and miner information for the specified miner."""
-        with self.lock:
-            with contextlib.closing(self._create_connection()) as connection:
-                cursor = connection.cursor()
-                cursor.execute(
-                    "DELETE FROM MatchPredictions WHERE hotkey = ?", [hotkey]
-                )
+        with self._writer() as connection:
+            cursor = connection.cursor()
+            cursor.execute(
+                "DELETE FROM MatchPredictionScores WHERE predictionId IN (SELECT predictionId FROM MatchPredictions WHERE hotkey = ?)", [hotkey]
+            )
+            cursor.execute(
+                "DELETE FROM CopycatComparedPredictions WHERE predictionId IN (SELECT predictionId FROM MatchPredictions WHERE hotkey = ?)", [hotkey]
+            )
+            cursor.execute(
+                """DELETE FROM CopycatPredictionPairs
+                   WHERE predictionId1 IN (SELECT predictionId FROM MatchPredictions WHERE hotkey = ?)
+                   OR predictionId2 IN (SELECT predictionId FROM MatchPredictions WHERE hotkey = ?)""", [hotkey, hotkey]
+            )
+            cursor.execute(
+                "DELETE FROM MatchPredictions WHERE hotkey = ?", [hotkey]
+            )
 
 
 # Use a timezone aware adapter for timestamp columns.
 def tz_aware_timestamp_adapter(val):
-    datepart, timepart = val.split(b" ")
-    year, month, day = map(int, datepart.split(b"-"))
-
-    if b"+" in timepart:
-        timepart, tz_offset = timepart.rsplit(b"+", 1)
-        if tz_offset == b"00:00":
-            tzinfo = dt.timezone.utc
-        else:
-            hours, minutes = map(int, tz_offset.split(b":", 1))
-            tzinfo = dt.timezone(dt.timedelta(hours=hours, minutes=minutes))
-    elif b"-" in timepart:
-        timepart, tz_offset = timepart.rsplit(b"-", 1)
-        if tz_offset == b"00:00":
-            tzinfo = dt.timezone.utc
-        else:
-            hours, minutes = map(int, tz_offset.split(b":", 1))
-            tzinfo = dt.timezone(dt.timedelta(hours=-hours, minutes=-minutes))
-    else:
-        tzinfo = None
-
-    timepart_full = timepart.split(b".")
-    hours, minutes, seconds = map(int, timepart_full[0].split(b":"))
-
-    if len(timepart_full) == 2:
-        microseconds = int("{:0<6.6}".format(timepart_full[1].decode()))
-    else:
-        microseconds = 0
-
-    val = dt.datetime(year, month, day, hours, minutes, seconds, microseconds, tzinfo)
-
-    return val
+    return parse_timestamp(val)
 
 # Global accessor function
 def get_storage() -> SqliteValidatorStorage:
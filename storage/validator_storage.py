@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple, Union
 import datetime as dt
 
-from common.data import League, Match, MatchPrediction, MatchPredictionWithMatchData
+from common.data import League, Match, MatchPrediction, ScoringRow
 from common.protocol import GetMatchPrediction
 
 
@@ -34,6 +34,11 @@ class ValidatorStorage(ABC):
         """Updates matches. Typically only used when updating final score."""
         raise NotImplemented
 
+    @abstractmethod
+    def upsert_matches(self, matches: List[Match]):
+        """Stores new matches and updates existing ones in one batch."""
+        raise NotImplemented
+
     @abstractmethod
     def check_match(self, matchId: str) -> Match:
         """Check if a match with the given ID exists in the database."""
@@ -58,6 +63,26 @@ class ValidatorStorage(ABC):
     def get_match_odds(self, matchId: str):
         """Gets all the match odds for the provided matchId."""
         return NotImplemented
+    
+    @abstractmethod
+    def get_match_odds_timestamps(self, matchIds: List[str]) -> Set[Tuple[str, int]]:
+        """Gets the (matchId, lastUpdatedUs) of every stored match odds row for the provided matchIds."""
+        return NotImplemented
+
+    @abstractmethod
+    def get_match_odds_for_matches(self, matchIds: List[str]):
+        """Gets all the match odds for the provided matchIds, ordered by matchId and lastUpdated. Timestamps are UTC epoch microseconds."""
+        return NotImplemented
+
+    @abstractmethod
+    def get_sync_watermark(self, name: str) -> Optional[dt.datetime]:
+        """Gets the watermark of the named delta sync, or None if it has never completed."""
+        return NotImplemented
+
+    @abstractmethod
+    def set_sync_watermark(self, name: str, watermark: dt.datetime):
+        """Stores the watermark of the named delta sync."""
+        return NotImplemented
 
     @abstractmethod
     def get_matches_to_predict(self, batchsize: Optional[int]) -> List[Match]:
@@ -65,8 +90,13 @@ class ValidatorStorage(ABC):
         raise NotImplemented
     
     @abstractmethod
-    def get_recently_completed_matches(self, matchDateSince: dt.datetime, league: Optional[League] = None) -> List[Match]:
-        """Gets completed matches since the passed in date."""
+    def get_upcoming_matches(self, matchDateAfter: dt.datetime) -> List[Match]:
+        """Gets incomplete matches starting after the passed in date."""
+        raise NotImplemented
+    
+    @abstractmethod
+    def get_recently_completed_matches(self, matchDateSince: Union[dt.datetime, int], league: Optional[League] = None) -> List[Match]:
+        """Gets completed matches since the passed in date, or UTC epoch microseconds."""
         raise NotImplemented
     
     @abstractmethod
@@ -74,6 +104,11 @@ class ValidatorStorage(ABC):
         """Updates a match prediction request with the status of the request_time."""
         raise NotImplemented
     
+    @abstractmethod
+    def update_match_prediction_requests(self, requests: List[Tuple[str, str]]):
+        """Updates match prediction requests with the status of their request_time, as (matchId, request_time) pairs, in one batch."""
+        raise NotImplemented
+    
     @abstractmethod
     def get_match_prediction_requests(self, matchId: Optional[str] = None) -> Dict[str, Dict[str, bool]]:
         """Gets all match prediction requests or a specific match prediction request."""
@@ -95,7 +130,7 @@ class ValidatorStorage(ABC):
         raise NotImplemented
 
     @abstractmethod
-    def get_match_predictions_to_score(self, batchsize: int) -> Optional[List[MatchPrediction]]:
+    def get_match_predictions_to_score(self, batchsize: int) -> Optional[List[ScoringRow]]:
         """Gets batchsize number of predictions that need to be scored and are eligible to be scored (the match is complete)"""
         raise NotImplemented
 
@@ -104,6 +139,51 @@ class ValidatorStorage(ABC):
         """Updates predictions. Typically only used when marking predictions as being scored."""
         raise NotImplemented
     
+    @abstractmethod
+    def get_score_inputs_version(self) -> int:
+        """Gets the version of the odds and results of completed matches, bumped when they change."""
+        raise NotImplemented
+
+    @abstractmethod
+    def upsert_prediction_score_contributions(
+        self, contributions: List[Tuple[int, float]], scoringKey: str, scoreInputsVersion: Optional[int] = None
+    ) -> bool:
+        """
+        Stores the edge score contribution of scored predictions, computed with the scoring controls identified by scoringKey,
+        unless the score inputs changed since scoreInputsVersion.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def get_prediction_score_contributions(self, predictionIds: List[int], scoringKey: str) -> Dict[int, float]:
+        """Gets the stored score contributions computed with scoringKey for the provided predictionIds."""
+        raise NotImplemented
+
+    @abstractmethod
+    def delete_stale_prediction_score_contributions(self, scoringKey: str) -> int:
+        """Deletes score contributions that were not computed with scoringKey."""
+        raise NotImplemented
+    
+    @abstractmethod
+    def get_copycat_compared_predictions(self, predictionIds: List[int], analysisKey: str) -> Set[int]:
+        """Gets which of the provided predictionIds were already compared by copycat analysis with the criteria identified by analysisKey."""
+        raise NotImplemented
+
+    @abstractmethod
+    def get_copycat_prediction_pairs(self, predictionIds: List[int], analysisKey: str) -> List[Tuple[int, int]]:
+        """Gets the similar prediction pairs found by copycat analysis with analysisKey where both predictions are in predictionIds."""
+        raise NotImplemented
+
+    @abstractmethod
+    def upsert_copycat_prediction_pairs(self, pairs: List[Tuple[int, int]], comparedPredictionIds: List[int], analysisKey: str):
+        """Stores similar prediction pairs and the predictions that were compared by copycat analysis with analysisKey."""
+        raise NotImplemented
+
+    @abstractmethod
+    def delete_stale_copycat_prediction_pairs(self, analysisKey: str) -> int:
+        """Deletes copycat analysis state that was not computed with analysisKey."""
+        raise NotImplemented
+    
     @abstractmethod
     def archive_match_predictions(self, miner_hotkeys: List[str], miner_uids: List[int]):
         """Updates predictions with isArchived 1. Typically only used when marking predictions achived after miner has been deregistered."""
@@ -115,10 +195,15 @@ class ValidatorStorage(ABC):
         raise NotImplemented
     
     @abstractmethod
-    def get_miner_match_predictions(self, miner_hotkey: str, miner_uid: int, league: League=None, scored: bool=False, batchSize: int=None) -> Optional[List[MatchPredictionWithMatchData]]:
+    def get_miner_match_predictions(self, miner_hotkey: str, miner_uid: int, league: League=None, scored: bool=False, batchSize: int=None) -> Optional[List[ScoringRow]]:
         """Gets a list of all predictions made by a miner. Include match data."""
         raise NotImplemented
 
+    @abstractmethod
+    def get_league_miner_match_predictions(self, league: League, miners: Dict[int, str], batchSize: int) -> Dict[int, List[ScoringRow]]:
+        """Gets the last batchSize scored predictions for every miner in a league in one query. Include match data. Keyed by miner uid."""
+        raise NotImplemented
+
     @abstractmethod
     def delete_miner(self, miner_hotkey: str):
         """Removes the predictions and miner information for the specified miner."""
@@ -0,0 +1,153 @@
+"""
+Concurrency benchmark for the API's async handlers.
+
+Serves a FastAPI app with uvicorn on a local port. Its async handlers run a query against the MySQL stand-in of
+tests/bench_api_db_pool.py through a ConnectionPool, either by calling the blocking function directly, as the
+handlers in api/main.py did, or through DatabaseThreads. Concurrent clients hit the query endpoint while a prober
+hits a handler without queries, and the p50/p99 latencies of both are printed. Blocking calls stall every request on
+the event loop, so the prober's latency shows how long the loop was stalled.
+
+Usage: python -m tests.bench_api_async_db [num_clients] [requests_per_client] [pool_size]
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import tempfile
+import threading
+
+import uvicorn
+from aiohttp import ClientSession, TCPConnector
+from fastapi import FastAPI
+from tabulate import tabulate
+
+from api.db_async import DatabaseThreads
+from api.db_pool import ConnectionPool
+from tests.bench_api_db_pool import StandInConnection, query
+
+NUM_CLIENTS = 50
+REQUESTS_PER_CLIENT = 20
+POOL_SIZE = 10
+PROBE_INTERVAL_IN_SECONDS = 0.005
+# Execution time of the query on the server, on top of the stand-in's round trip
+QUERY_EXECUTION_IN_SECONDS = 0.01
+
+
+def build_app(pool: ConnectionPool, db_threads: DatabaseThreads) -> FastAPI:
+    app = FastAPI()
+
+    def get_row():
+        with pool.connection() as conn:
+            time.sleep(QUERY_EXECUTION_IN_SECONDS)
+            query(conn)
+            return {"ok": True}
+
+    @app.get("/blocking")
+    async def blocking():
+        return get_row()
+
+    @app.get("/offloaded")
+    async def offloaded():
+        return await db_threads.run(get_row)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+class Server:
+    """uvicorn on a free local port, running on its own thread."""
+
+    def __init__(self, app: FastAPI):
+        self.socket = socket.socket()
+        self.socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.socket.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *args):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def timed_get(session: ClientSession, url: str) -> float:
+    start = time.perf_counter()
+    async with session.get(url) as response:
+        await response.read()
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def load(url: str, path: str, num_clients: int, requests_per_client: int) -> tuple:
+    async with ClientSession(connector=TCPConnector(limit=0)) as session:
+        # Open the connections first, so connection setup is not measured
+        await asyncio.gather(*[timed_get(session, f"{url}/health") for _ in range(num_clients)])
+
+        done = asyncio.Event()
+        probes = []
+
+        async def probe():
+            while not done.is_set():
+                probes.append(await timed_get(session, f"{url}/health"))
+                await asyncio.sleep(PROBE_INTERVAL_IN_SECONDS)
+
+        async def client():
+            return [await timed_get(session, f"{url}{path}") for _ in range(requests_per_client)]
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        results = await asyncio.gather(*[client() for _ in range(num_clients)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    return elapsed, sorted(latency for latencies in results for latency in latencies), sorted(probes)
+
+
+def percentile(latencies: list, fraction: float) -> str:
+    return f"{latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000:.1f}"
+
+
+def main(num_clients: int, requests_per_client: int, pool_size: int):
+    path = os.path.join(tempfile.mkdtemp(), "standin.db")
+    pool = ConnectionPool(lambda: StandInConnection(path), size=pool_size, timeout=60, health_check_interval=30)
+    db_threads = DatabaseThreads(max_workers=pool_size)
+
+    table = []
+    with Server(build_app(pool, db_threads)) as server:
+        for name, endpoint in [("blocking call", "/blocking"), ("DatabaseThreads", "/offloaded")]:
+            elapsed, latencies, probes = asyncio.run(load(server.url, endpoint, num_clients, requests_per_client))
+            table.append([
+                name,
+                f"{len(latencies) / elapsed:.0f}",
+                percentile(latencies, 0.5),
+                percentile(latencies, 0.99),
+                percentile(probes, 0.5),
+                percentile(probes, 0.99),
+            ])
+    db_threads.shutdown()
+    pool.close()
+
+    print(f"{num_clients} clients x {requests_per_client} requests, pool of {pool_size}")
+    print(tabulate(
+        table,
+        headers=["", "queries/s", "query p50 ms", "query p99 ms", "health p50 ms", "health p99 ms"],
+        tablefmt="grid",
+    ))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        int(args[0]) if len(args) > 0 else NUM_CLIENTS,
+        int(args[1]) if len(args) > 1 else REQUESTS_PER_CLIENT,
+        int(args[2]) if len(args) > 2 else POOL_SIZE,
+    )
@@ -0,0 +1,141 @@
+"""
+Load test for the API's database connection pool.
+
+Worker threads, like the FastAPI threadpool serving requests, each run a stream of short queries. Compares opening a
+connection per call, as the db functions did before api/db_pool.py, with borrowing from a ConnectionPool smaller than
+the number of threads, and prints throughput, call latency and the pool's counters.
+
+By default the database is a local stand-in for MySQL: a SQLite file behind connections that add a connect handshake
+and a per query round trip delay. With "mysql" as the first argument it runs against the database configured in
+api/api.env instead.
+
+Usage: python -m tests.bench_api_db_pool [standin|mysql] [num_threads] [calls_per_thread] [pool_size]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+from tabulate import tabulate
+
+from api.db_pool import ConnectionPool
+
+NUM_THREADS = 40
+CALLS_PER_THREAD = 50
+POOL_SIZE = 10
+CONNECT_LATENCY_IN_SECONDS = 0.02
+QUERY_LATENCY_IN_SECONDS = 0.001
+
+
+class StandInConnection:
+    """A SQLite connection with the mysql-connector methods the pool and db functions use, and network delays."""
+
+    def __init__(self, path: str):
+        time.sleep(CONNECT_LATENCY_IN_SECONDS)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._conn.in_transaction
+
+    def cursor(self, dictionary: bool = False):
+        return self._conn.cursor()
+
+    def ping(self, reconnect: bool = False, attempts: int = 1, delay: int = 0):
+        time.sleep(QUERY_LATENCY_IN_SECONDS)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        time.sleep(QUERY_LATENCY_IN_SECONDS)
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def query(conn):
+    cursor = conn.cursor()
+    try:
+        time.sleep(QUERY_LATENCY_IN_SECONDS)
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def run(call, num_threads: int, calls_per_thread: int) -> tuple:
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(calls_per_thread):
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception as e:
+                errors.append(e)
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies, len(errors)
+
+
+def main(mode: str, num_threads: int, calls_per_thread: int, pool_size: int):
+    if mode == "mysql":
+        from api.db import connect
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "standin.db")
+        connect = lambda: StandInConnection(path)
+
+    def connect_per_call():
+        conn = connect()
+        try:
+            query(conn)
+        finally:
+            conn.close()
+
+    pool = ConnectionPool(connect, size=pool_size, timeout=30, health_check_interval=30)
+
+    def pooled_call():
+        with pool.connection() as conn:
+            query(conn)
+
+    table = []
+    for name, call in [("connect per call", connect_per_call), (f"pool of {pool_size}", pooled_call)]:
+        elapsed, latencies, errors = run(call, num_threads, calls_per_thread)
+        table.append([
+            name,
+            f"{len(latencies) / elapsed:.0f}",
+            f"{latencies[len(latencies) // 2] * 1000:.1f}",
+            f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f}",
+            errors,
+        ])
+    stats = pool.stats()
+    pool.close()
+
+    print(f"{mode}: {num_threads} threads x {calls_per_thread} calls")
+    print(tabulate(table, headers=["", "calls/s", "p50 ms", "p99 ms", "errors"], tablefmt="grid"))
+    print(tabulate(stats.items(), headers=["pool", ""], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        args[0] if len(args) > 0 else "standin",
+        int(args[1]) if len(args) > 1 else NUM_THREADS,
+        int(args[2]) if len(args) > 2 else CALLS_PER_THREAD,
+        int(args[3]) if len(args) > 3 else POOL_SIZE,
+    )
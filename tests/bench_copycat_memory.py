@@ -0,0 +1,80 @@
+"""
+Memory benchmark for the copycat relationship history.
+
+Builds synthetic league predictions and compares the peak and retained memory of building per-pair dict histories with
+the compact RelationshipStore used by StatisticalAnalyzer.analyze_prediction_clusters.
+
+Usage: python -m tests.bench_copycat_memory [num_miners] [num_matches]
+"""
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from tabulate import tabulate
+
+from vali_utils.analysis_utils import StatisticalAnalyzer, format_prediction_date
+from tests.test_copycat_pairing import build_predictions
+
+NUM_MINERS = 256
+NUM_MATCHES = 40
+
+
+def dict_histories(analyzer: StatisticalAnalyzer, predictions, ordered_matches, excluded_miners):
+    """Per-pair dict histories with formatted dates, as built before the RelationshipStore."""
+    matches = defaultdict(list)
+    for pred in predictions:
+        if pred.prediction.minerId in excluded_miners:
+            continue
+        matches[pred.prediction.matchId].append(pred.prediction)
+
+    miner_relationships = defaultdict(lambda: defaultdict(list))
+    for match_id, match_predictions in matches.items():
+        for i, j, difference in analyzer.find_similar_prediction_pairs(match_predictions):
+            pred1, pred2 = match_predictions[i], match_predictions[j]
+            miner_relationships[pred1.minerId][pred2.minerId].append({
+                'match_id': match_id,
+                'match_date': pred1.matchDate,
+                'difference': difference,
+                'absolute_difference': round(abs(pred1.probability - pred2.probability), 4),
+                'choice': pred1.probabilityChoice,
+                'prob1': pred1.probability,
+                'prob2': pred2.probability,
+                'pred1_date': format_prediction_date(pred1.predictionDate),
+                'pred2_date': format_prediction_date(pred2.predictionDate)
+            })
+    return miner_relationships
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained, peak
+
+
+def main():
+    num_miners = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_MINERS
+    num_matches = int(sys.argv[2]) if len(sys.argv) > 2 else NUM_MATCHES
+    predictions, ordered_matches = build_predictions(7, num_miners=num_miners, num_matches=num_matches)
+    analyzer = StatisticalAnalyzer()
+    print(f"{len(predictions)} predictions from {num_miners} miners over {num_matches} matches")
+
+    rows = []
+    relationships, elapsed, retained, peak = measure(dict_histories, analyzer, predictions, ordered_matches, set())
+    num_entries = sum(len(history) for related in relationships.values() for history in related.values())
+    rows.append(["dict histories", num_entries, f"{elapsed:.2f}", f"{retained / 2**20:.1f}", f"{peak / 2**20:.1f}"])
+    del relationships
+
+    suspicious, elapsed, retained, peak = measure(analyzer.analyze_prediction_clusters, predictions, ordered_matches, set())
+    num_entries = len(next(iter(suspicious.values()))['history'].store) if suspicious else 0
+    rows.append(["RelationshipStore", num_entries, f"{elapsed:.2f}", f"{retained / 2**20:.1f}", f"{peak / 2**20:.1f}"])
+
+    print(tabulate(rows, headers=["history", "pairs", "seconds", "retained MiB", "peak MiB"], tablefmt="grid"))
+    print(f"{len(suspicious)} suspicious relationships")
+
+
+if __name__ == "__main__":
+    main()
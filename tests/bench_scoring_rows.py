@@ -0,0 +1,139 @@
+"""
+Benchmark for the prediction rows loaded for scoring.
+
+Compares building MatchPrediction plus MatchPredictionWithMatchData Pydantic models per row, with the timestamps parsed
+like the timestamp converter did, with building slotted ScoringRows straight from the same cursor tuples, where the
+timestamps stay text and scoring reads the epoch columns. Measures construction time, the memory retained by the built
+rows, and a pass over the scoring accessors.
+
+Usage: python -m tests.bench_scoring_rows [num_rows]
+"""
+import gc
+import sys
+import time
+import random
+import tracemalloc
+import datetime as dt
+from tabulate import tabulate
+
+from common.data import MatchPrediction, MatchPredictionWithMatchData, ScoringPrediction, ScoringRow
+from common.constants import LEAGUES_ALLOWING_DRAWS
+from common.timestamps import parse_timestamp, to_epoch_us
+
+NUM_ROWS = 50_000
+LEAGUES = ["MLB", "NFL", "NBA", "English Premier League", "American Major League Soccer"]
+
+
+def build_rows(num_rows: int) -> list:
+    """Scored MatchPredictions rows joined with their match data, as returned by the cursor for SCORING_ROW_COLUMNS."""
+    rng = random.Random(num_rows)
+    start = dt.datetime(2024, 10, 1, 12, 0, 0, tzinfo=dt.timezone.utc)
+    rows = []
+    for i in range(num_rows):
+        match_date = start + dt.timedelta(hours=i % 500)
+        prediction_date = match_date - dt.timedelta(minutes=rng.randrange(10, 1440), microseconds=rng.randrange(1_000_000))
+        rows.append((
+            i + 1, i % 256, f"hotkey_{i % 256}", f"match_{i % 500}", str(match_date), rng.randint(1, 4), rng.choice(LEAGUES),
+            f"Home {i % 30}", f"Away {i % 29}", None, None, 1, str(match_date + dt.timedelta(hours=3)), str(match_date),
+            str(prediction_date), rng.choice(["HomeTeam", "AwayTeam", "Draw"]),
+            rng.uniform(0.1, 0.9), rng.uniform(-1.5, 1.5), 0, to_epoch_us(match_date), to_epoch_us(prediction_date),
+            rng.randint(0, 5), rng.randint(0, 5), round(rng.uniform(1.2, 4.5), 2), round(rng.uniform(1.2, 4.5), 2),
+            round(rng.uniform(2.5, 5.0), 2),
+        ))
+    return rows
+
+
+def build_pydantic(rows: list) -> list:
+    """The storage conversion before ScoringRow, with the timestamps the converter parsed."""
+    predictions = []
+    for row in rows:
+        prediction_data = {
+            "predictionId": row[0],
+            "minerId": row[1],
+            "hotkey": row[2],
+            "matchId": row[3],
+            "matchDate": parse_timestamp(row[4]),
+            "sport": row[5],
+            "league": row[6],
+            "homeTeamName": row[7],
+            "awayTeamName": row[8],
+            "homeTeamScore": row[9],
+            "awayTeamScore": row[10],
+            "isScored": row[11],
+            "scoredDate": parse_timestamp(row[12]),
+            "lastUpdated": parse_timestamp(row[13]),
+            "predictionDate": parse_timestamp(row[14]),
+            "probabilityChoice": row[15],
+            "probability": round(row[16], 4),
+            "closingEdge": row[17],
+            "isArchived": row[18]
+        }
+        predictions.append(MatchPredictionWithMatchData(
+            prediction=MatchPrediction(**prediction_data),
+            actualHomeTeamScore=row[21],
+            actualAwayTeamScore=row[22],
+            homeTeamOdds=row[23],
+            awayTeamOdds=row[24],
+            drawOdds=row[25],
+        ))
+    return predictions
+
+
+def build_scoring_rows(rows: list) -> list:
+    """The storage conversion with ScoringRow."""
+    return [ScoringRow(ScoringPrediction(*row[:16], round(row[16], 4), *row[17:21]), *row[21:26]) for row in rows]
+
+
+def read_accessors(predictions: list) -> tuple:
+    """The accessors a scoring pass reads per prediction."""
+    wins, underdogs, odds, minutes = 0, 0, 0.0, 0.0
+    for pwmd in predictions:
+        if pwmd.prediction.get_predicted_team() == pwmd.get_actual_winner():
+            wins += 1
+        if pwmd.is_prediction_for_underdog(LEAGUES_ALLOWING_DRAWS):
+            underdogs += 1
+        odds += pwmd.get_closing_odds_for_predicted_outcome() or 0.0
+        odds += pwmd.prediction.probability * pwmd.prediction.closingEdge
+        minutes += (pwmd.prediction.matchDateUs - pwmd.prediction.predictionDateUs) / 6e7
+    return wins, underdogs, round(odds, 6), round(minutes, 6)
+
+
+def run(build, rows: list) -> tuple:
+    gc.collect()
+    start = time.perf_counter()
+    predictions = build(rows)
+    build_seconds = time.perf_counter() - start
+    del predictions
+
+    # Tracing slows allocations down, so measure memory on a separate build
+    gc.collect()
+    tracemalloc.start()
+    predictions = build(rows)
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    result = read_accessors(predictions)
+    read_seconds = time.perf_counter() - start
+    return build_seconds, retained_bytes, read_seconds, result
+
+
+def main(num_rows: int):
+    rows = build_rows(num_rows)
+    pydantic = run(build_pydantic, rows)
+    scoring_rows = run(build_scoring_rows, rows)
+
+    assert pydantic[3] == scoring_rows[3], "ScoringRow accessors returned different results"
+
+    mib = 1024 * 1024
+    table = [
+        ["build s", f"{pydantic[0]:.2f}", f"{scoring_rows[0]:.2f}", f"{pydantic[0] / scoring_rows[0]:.1f}x"],
+        ["retained MiB", f"{pydantic[1] / mib:.1f}", f"{scoring_rows[1] / mib:.1f}", f"{pydantic[1] / scoring_rows[1]:.1f}x"],
+        ["accessors s", f"{pydantic[2]:.2f}", f"{scoring_rows[2]:.2f}", f"{pydantic[2] / scoring_rows[2]:.1f}x"],
+    ]
+    print(f"{num_rows} rows")
+    print(tabulate(table, headers=["", "pydantic", "ScoringRow", "savings"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_ROWS)
@@ -0,0 +1,149 @@
+"""
+Benchmark for the SportsTensorEdge.db schema migrations.
+
+Builds a synthetic validator database, then prints the query plan and latency of the hot storage queries
+before and after the migrations in storage/sqlite_migrations.py are applied.
+
+Usage: python -m tests.bench_sqlite_indexes [num_predictions]
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+import datetime as dt
+from tabulate import tabulate
+
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+from storage.sqlite_migrations import apply_migrations
+
+NUM_MINERS = 256
+NUM_MATCHES = 2000
+ODDS_PER_MATCH = 50
+REPEATS = 20
+
+QUERIES = {
+    "get_miner_match_predictions": (
+        """
+        SELECT mp.*, m.homeTeamScore as actualHomeTeamScore, m.awayTeamScore as actualAwayTeamScore, m.homeTeamOdds, m.awayTeamOdds, COALESCE(m.drawOdds, 0) as drawOdds
+        FROM MatchPredictions mp
+        JOIN Matches m ON (m.matchId = mp.matchId)
+        WHERE mp.hotkey = ? AND mp.minerId = ? AND mp.isArchived = 0 AND mp.league = ?
+        AND mp.isScored = 1 AND mp.closingEdge IS NOT NULL AND m.isComplete = 1
+        AND m.homeTeamOdds IS NOT NULL AND m.awayTeamOdds IS NOT NULL
+        ORDER BY mp.predictionDate DESC LIMIT 360
+        """,
+        lambda: ("hotkey_42", 42, "NBA"),
+    ),
+    "get_match_odds": (
+        "SELECT * FROM MatchOdds WHERE matchId = ? ORDER BY lastUpdated ASC",
+        lambda: (f"match_{random.randrange(NUM_MATCHES)}",),
+    ),
+    "check_match_odds": (
+        "SELECT EXISTS(SELECT 1 FROM MatchOdds WHERE matchId = ? AND lastUpdated = ?)",
+        lambda: (f"match_{random.randrange(NUM_MATCHES)}", "2024-10-01 12:00:00"),
+    ),
+    "get_match_predictions_to_score": (
+        """
+        SELECT mp.*, m.homeTeamScore, m.awayTeamScore
+        FROM MatchPredictions mp
+        JOIN Matches m ON (m.matchId = mp.matchId)
+        WHERE mp.isScored = 0 AND m.isComplete = 1 AND mp.matchDate > ?
+        LIMIT 500
+        """,
+        lambda: ("2024-10-20 00:00:00",),
+    ),
+    "get_recently_completed_matches": (
+        "SELECT * FROM Matches WHERE isComplete = 1 AND matchDate > ?",
+        lambda: ("2024-10-20 00:00:00",),
+    ),
+}
+
+
+def build_database(path: str, num_predictions: int):
+    connection = sqlite3.connect(path)
+    cursor = connection.cursor()
+    cursor.execute(SqliteValidatorStorage.MATCHES_TABLE_CREATE)
+    cursor.execute(SqliteValidatorStorage.MATCH_ODDS_CREATE)
+    cursor.execute(SqliteValidatorStorage.MATCHPREDICTIONREQUESTS_TABLE_CREATE)
+    cursor.execute(SqliteValidatorStorage.MATCHPREDICTIONS_TABLE_CREATE)
+
+    start = dt.datetime(2024, 9, 1)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    matches = []
+    for i in range(NUM_MATCHES):
+        match_date = start + dt.timedelta(hours=i)
+        matches.append((f"match_{i}", match_date.strftime(fmt), 4, random.choice(["NBA", "English Premier League"]),
+                        "Home", "Away", random.randint(80, 120), random.randint(80, 120), 1,
+                        match_date.strftime(fmt), 1.8, 2.1, 0.0))
+    cursor.executemany("INSERT INTO Matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", matches)
+
+    odds = []
+    for match_id, match_date, *_ in matches:
+        match_date = dt.datetime.strptime(match_date, fmt)
+        for j in range(ODDS_PER_MATCH):
+            odds.append((match_id, 1.5 + random.random(), 1.5 + random.random(), 0.0,
+                         (match_date - dt.timedelta(minutes=30 * j)).strftime(fmt)))
+    cursor.executemany("INSERT INTO MatchOdds VALUES (?, ?, ?, ?, ?)", odds)
+
+    predictions = []
+    for _ in range(num_predictions):
+        uid = random.randrange(NUM_MINERS)
+        match_id, match_date, sport, league, *_ = random.choice(matches)
+        prediction_date = dt.datetime.strptime(match_date, fmt) - dt.timedelta(minutes=random.choice([10, 240, 720, 1440]))
+        is_scored = 1 if random.random() < 0.95 else 0
+        predictions.append((uid, f"hotkey_{uid}", match_id, match_date, sport, league, "Home", "Away",
+                            is_scored, prediction_date.strftime(fmt), prediction_date.strftime(fmt),
+                            random.choice(["HomeTeam", "AwayTeam"]), round(random.uniform(0.3, 0.8), 4),
+                            random.uniform(-1, 1) if is_scored else None))
+    cursor.executemany(
+        """INSERT INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName,
+           isScored, lastUpdated, predictionDate, probabilityChoice, probability, closingEdge)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        predictions,
+    )
+    connection.commit()
+    return connection
+
+
+def profile_queries(connection: sqlite3.Connection) -> dict:
+    cursor = connection.cursor()
+    results = {}
+    for name, (query, params) in QUERIES.items():
+        cursor.execute("EXPLAIN QUERY PLAN " + query, params())
+        plan = "\n".join(row[3] for row in cursor.fetchall())
+
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            cursor.execute(query, params())
+            cursor.fetchall()
+        latency_ms = (time.perf_counter() - start) / REPEATS * 1000
+        results[name] = (plan, latency_ms)
+    return results
+
+
+def main(num_predictions: int):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bench.db")
+        print(f"Building synthetic database with {num_predictions} predictions, {NUM_MATCHES} matches and {NUM_MATCHES * ODDS_PER_MATCH} odds rows...")
+        connection = build_database(path, num_predictions)
+
+        before = profile_queries(connection)
+        start = time.perf_counter()
+        applied = apply_migrations(connection)
+        print(f"Applied migrations {applied} in {time.perf_counter() - start:.2f}s")
+        after = profile_queries(connection)
+        connection.close()
+
+    table = []
+    for name in QUERIES:
+        plan_before, latency_before = before[name]
+        plan_after, latency_after = after[name]
+        table.append([name, plan_before, f"{latency_before:.2f}", plan_after, f"{latency_after:.2f}",
+                      f"{latency_before / latency_after:.1f}x" if latency_after > 0 else "-"])
+    print(tabulate(table, headers=["Query", "Plan before", "ms before", "Plan after", "ms after", "Speedup"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,132 @@
+"""
+Benchmark for storing the match data returned from the API in sync_match_data.
+
+Compares constructing a Match and calling check_match per item, then insert_matches/update_matches, with validating
+the payload in one batch with parse_matches and storing it with a single upsert_matches, on a first sync into an empty
+database and on a resync where every match already exists.
+
+Usage: python -m tests.bench_sync_match_data [num_matches]
+"""
+import os
+import sys
+import functools
+import time
+import random
+import tempfile
+import datetime as dt
+from tabulate import tabulate
+
+from common.data import Match
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+
+NUM_MATCHES = 10_000
+LEAGUES = [(1, "MLB"), (2, "NFL"), (3, "NBA"), (1, "English Premier League"), (1, "American Major League Soccer")]
+
+
+def build_payload(num_matches: int, completed: bool) -> list:
+    """Match data as returned by the API /matches endpoint."""
+    rng = random.Random(num_matches)
+    start = dt.datetime(2024, 10, 1, 12, 0, 0)
+    payload = []
+    for i in range(num_matches):
+        sport, league = rng.choice(LEAGUES)
+        payload.append({
+            "matchId": f"match_{i}",
+            "matchDate": (start + dt.timedelta(minutes=17 * i)).isoformat(),
+            "sport": sport,
+            "matchLeague": league,
+            "homeTeamName": f"Home {i % 30}",
+            "awayTeamName": f"Away {i % 29}",
+            "homeTeamScore": rng.randint(0, 120) if completed else None,
+            "awayTeamScore": rng.randint(0, 120) if completed else None,
+            "homeTeamOdds": round(rng.uniform(1.2, 4.5), 2),
+            "awayTeamOdds": round(rng.uniform(1.2, 4.5), 2),
+            "drawOdds": round(rng.uniform(2.5, 5.0), 2),
+            "isComplete": completed,
+            "odds_count": rng.randint(0, 50),
+        })
+    return payload
+
+
+def store_per_match(storage: SqliteValidatorStorage, payload: list):
+    """The sync_match_data loop before upsert_matches."""
+    matches_to_insert = []
+    matches_to_update = []
+    for item in payload:
+        match = Match(
+            matchId=item["matchId"],
+            matchDate=item["matchDate"],
+            sport=item["sport"],
+            league=item["matchLeague"],
+            homeTeamName=item["homeTeamName"],
+            awayTeamName=item["awayTeamName"],
+            homeTeamScore=item["homeTeamScore"],
+            awayTeamScore=item["awayTeamScore"],
+            homeTeamOdds=item["homeTeamOdds"],
+            awayTeamOdds=item["awayTeamOdds"],
+            drawOdds=item["drawOdds"],
+            isComplete=item["isComplete"],
+        )
+        if storage.check_match(item["matchId"]):
+            matches_to_update.append(match)
+        else:
+            matches_to_insert.append(match)
+
+    if matches_to_insert:
+        storage.insert_matches(matches_to_insert)
+    if matches_to_update:
+        storage.update_matches(matches_to_update)
+
+
+def store_upsert(storage: SqliteValidatorStorage, payload: list, parse_matches):
+    storage.upsert_matches(parse_matches(payload))
+
+
+def read_matches(storage: SqliteValidatorStorage) -> list:
+    with storage._reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute(
+            """SELECT matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore, awayTeamScore,
+               homeTeamOdds, awayTeamOdds, drawOdds, isComplete FROM Matches ORDER BY matchId"""
+        )
+        return cursor.fetchall()
+
+
+def run(name: str, store, upcoming: list, completed: list) -> tuple:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = f"{name}.db"
+    storage.initialize()
+
+    start = time.perf_counter()
+    store(storage, upcoming)
+    first_sync = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store(storage, completed)
+    resync = time.perf_counter() - start
+
+    return first_sync, resync, read_matches(storage)
+
+
+def main(num_matches: int):
+    upcoming = build_payload(num_matches, completed=False)
+    completed = build_payload(num_matches, completed=True)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # The benchmark databases are created in the working directory. Import parse_matches before timing.
+        os.chdir(tmp_dir)
+        from vali_utils.utils import parse_matches
+        per_match = run("per_match", store_per_match, upcoming, completed)
+        upsert = run("upsert", functools.partial(store_upsert, parse_matches=parse_matches), upcoming, completed)
+
+    assert per_match[2] == upsert[2], "upsert_matches stored different matches"
+
+    rows = []
+    for index, scenario in enumerate(["first sync", "resync"]):
+        rows.append([scenario, num_matches, f"{per_match[index]:.2f}", f"{upsert[index]:.2f}",
+                     f"{per_match[index] / upsert[index]:.1f}x"])
+    print(tabulate(rows, headers=["scenario", "matches", "per match s", "upsert s", "speedup"], tablefmt="grid"))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_MATCHES)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from aiohttp import web, ClientResponseError
+
+from vali_utils.api_client import ApiClient
+
+
+class ApiServer:
+    """Local aiohttp server on its own event loop thread, recording the requests it receives."""
+
+    def __init__(self):
+        self.requests = []
+        self.failures = {}
+        self.peers = set()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.peers.add(request.transport.get_extra_info("peername"))
+        # aiohttp decompresses gzipped request bodies
+        body = await request.read()
+        self.requests.append((request.method, request.path, request.headers.get("Content-Encoding"), body))
+        failures = self.failures.get(request.path)
+        if failures:
+            return web.Response(status=failures.pop(0))
+        if request.path == "/empty":
+            return web.Response(status=200)
+        response = web.json_response({"path": request.path, "query": dict(request.query), "body": json.loads(body or b"null"), "padding": "x" * 2048})
+        response.enable_compression()
+        return response
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    def start(self) -> str:
+        self.thread.start()
+        port = asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+        return f"http://127.0.0.1:{port}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+@pytest.fixture
+def server():
+    server = ApiServer()
+    server.url = server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    client = ApiClient(max_retries=3, backoff_base=0.01, backoff_max=0.05, compress_min_bytes=100)
+    yield client
+    client.close()
+
+
+def test_requests_from_several_event_loops_share_connections(server, client):
+    results = []
+    for index in range(3):
+        results.append(asyncio.run(client.get_json(f"{server.url}/matches", params={"since": str(index)})))
+
+    # The weight setting thread runs its own event loop
+    thread = threading.Thread(target=lambda: results.append(asyncio.run(client.get_json(f"{server.url}/matchOdds"))))
+    thread.start()
+    thread.join()
+
+    assert [result["query"] for result in results] == [{"since": "0"}, {"since": "1"}, {"since": "2"}, {}]
+    assert len(server.peers) == 1
+
+
+def test_large_request_bodies_are_gzipped(server, client):
+    payload = {"predictions": [{"matchId": f"match_{i}"} for i in range(20)]}
+    result = asyncio.run(client.post_json(f"{server.url}/scoredPredictions", payload))
+    assert result["body"] == payload
+    assert server.requests[-1][2] == "gzip"
+
+    result = asyncio.run(client.post_json(f"{server.url}/scoredPredictions", {"small": 1}))
+    assert result["body"] == {"small": 1}
+    assert server.requests[-1][2] is None
+
+
+def test_retryable_statuses_are_retried(server, client):
+    server.failures["/matches"] = [503, 429]
+    result = asyncio.run(client.get_json(f"{server.url}/matches"))
+    assert result["path"] == "/matches"
+    assert len(server.requests) == 3
+
+
+def test_retries_are_exhausted_and_client_errors_are_not_retried(server, client):
+    server.failures["/matches"] = [500, 502, 503, 504]
+    with pytest.raises(ClientResponseError) as error:
+        asyncio.run(client.get_json(f"{server.url}/matches"))
+    assert error.value.status == 504
+    assert len(server.requests) == 4
+
+    server.failures["/predictionEdgeResults"] = [401]
+    with pytest.raises(ClientResponseError) as error:
+        asyncio.run(client.post_json(f"{server.url}/predictionEdgeResults", {}))
+    assert error.value.status == 401
+    assert len(server.requests) == 5
+
+
+def test_empty_responses_decode_to_none(server, client):
+    assert asyncio.run(client.post_json(f"{server.url}/empty", {})) is None
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.db_async import DatabaseThreads
+
+
+def test_calls_run_off_the_event_loop_and_are_bounded():
+    db_threads = DatabaseThreads(max_workers=2)
+    running, peak = [], []
+    lock = threading.Lock()
+
+    def query(value, delay=0.05):
+        with lock:
+            running.append(value)
+            peak.append(len(running))
+        time.sleep(delay)
+        with lock:
+            running.remove(value)
+        return value, threading.current_thread().name
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.create_task(tick())
+        results = await asyncio.gather(*[db_threads.run(query, value, delay=0.05) for value in range(6)])
+        ticker.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(main())
+    assert [value for value, _ in results] == list(range(6))
+    assert all(name.startswith("api-db") for _, name in results)
+    # Three rounds of two queries, during which the event loop kept running
+    assert max(peak) == 2 and ticks >= 10
+    assert db_threads.stats() == {"max_workers": 2, "pending": 0, "peak_pending": 6}
+    db_threads.shutdown()
+
+
+def test_exceptions_propagate():
+    db_threads = DatabaseThreads(max_workers=1)
+
+    def query():
+        raise ValueError("query failed")
+
+    with pytest.raises(ValueError):
+        asyncio.run(db_threads.run(query))
+    assert db_threads.stats()["pending"] == 0
+    db_threads.shutdown()
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+
+from api.db_pool import ConnectionPool, PoolExhaustedError
+
+
+class FakeConnection:
+    """Records the calls the pool makes on a connection."""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.in_transaction = False
+        self.healthy = True
+        self.connected = True
+        self.pings = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self.pings += 1
+        if not self.healthy:
+            raise ConnectionError("server has gone away")
+
+    def rollback(self):
+        if not self.connected:
+            raise ConnectionError("lost connection")
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(size=2, timeout=0.2, health_check_interval=60):
+    connections = []
+
+    def connect():
+        connections.append(FakeConnection(len(connections)))
+        return connections[-1]
+
+    return ConnectionPool(connect, size=size, timeout=timeout, health_check_interval=health_check_interval), connections
+
+
+def test_connections_are_reused_and_rolled_back():
+    pool, connections = make_pool()
+    for _ in range(5):
+        with pool.connection() as conn:
+            conn.in_transaction = True
+    assert len(connections) == 1 and connections[0].rollbacks == 5
+
+    # Failed calls return the connection too
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            raise RuntimeError("query failed")
+    stats = pool.stats()
+    assert stats["checkouts"] == 6 and stats["connects"] == 1
+    assert stats["idle"] == 1 and stats["in_use"] == 0
+
+
+def test_exhausted_pool_waits_then_raises():
+    pool, connections = make_pool(size=2, timeout=0.05)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second and connections == [first, second]
+    start = time.monotonic()
+    with pytest.raises(PoolExhaustedError):
+        pool.acquire()
+    assert time.monotonic() - start >= 0.05
+
+    # A connection released while waiting is handed over
+    threading.Timer(0.02, pool.release, [first]).start()
+    assert pool.acquire(timeout=1) is first
+    stats = pool.stats()
+    assert stats["waits"] == 2 and stats["exhausted"] == 1
+    assert stats["peak_in_use"] == 2 and stats["open"] == 2
+
+
+def test_waiters_are_served_in_order():
+    pool, _ = make_pool(size=1, timeout=5)
+    conn = pool.acquire()
+    served = []
+
+    def borrow(name):
+        with pool.connection():
+            served.append(name)
+
+    threads = []
+    for name in range(5):
+        threads.append(threading.Thread(target=borrow, args=(name,)))
+        threads[-1].start()
+        while pool.stats()["waits"] <= name:
+            time.sleep(0.001)
+    pool.release(conn)
+    for thread in threads:
+        thread.join()
+    assert served == list(range(5))
+
+
+def test_idle_connections_are_health_checked():
+    pool, connections = make_pool(health_check_interval=0)
+    with pool.connection():
+        pass
+    with pool.connection() as conn:
+        assert conn is connections[0] and conn.pings == 1
+
+    connections[0].healthy = False
+    with pool.connection() as conn:
+        assert conn is connections[1]
+    assert connections[0].closed
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1 and stats["open"] == 1
+
+
+def test_broken_connections_are_discarded():
+    pool, connections = make_pool(size=1)
+    conn = pool.acquire()
+    conn.in_transaction = True
+    conn.connected = False
+    pool.release(conn)
+    assert conn.closed and pool.stats()["discarded"] == 1
+
+    # The freed slot opens a new connection
+    with pool.connection() as conn:
+        assert conn is connections[1]
+
+
+def test_failed_connect_frees_its_slot():
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("can't connect")
+        return FakeConnection(len(attempts))
+
+    pool = ConnectionPool(connect, size=1, timeout=0.05, health_check_interval=60)
+    with pytest.raises(ConnectionError):
+        pool.acquire()
+    with pool.connection() as conn:
+        assert conn.number == 2
+    assert pool.stats()["open"] == 1
+
+
+def test_close_fails_waiters_and_closes_connections():
+    pool, connections = make_pool(size=1, timeout=5)
+    conn = pool.acquire()
+    errors = []
+
+    def wait():
+        try:
+            pool.acquire()
+        except PoolExhaustedError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    while pool.stats()["waits"] == 0:
+        time.sleep(0.001)
+    pool.close()
+    waiter.join(1)
+    assert len(errors) == 1
+    pool.release(conn)
+    assert conn.closed and pool.stats()["open"] == 0
@@ -0,0 +1,77 @@
+import datetime as dt
+import os
+import re
+from contextlib import contextmanager
+
+import pytest
+
+# api.config reads it from api.env, which the tests run without
+os.environ.setdefault("TESTNET_VALI_HOTKEYS", "[]")
+import api.db as db
+
+SINCE = dt.datetime(2024, 10, 1, 11, 0, 0)
+
+
+class FakeCursor:
+    """Records the queries executed and returns no rows."""
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((" ".join(query.split()), list(params) if params is not None else []))
+
+    def fetchall(self):
+        return []
+
+
+@pytest.fixture
+def cursor(monkeypatch) -> FakeCursor:
+    cursor = FakeCursor()
+
+    @contextmanager
+    def db_cursor(**cursor_args):
+        yield None, cursor
+
+    monkeypatch.setattr(db, "db_cursor", db_cursor)
+    return cursor
+
+
+def where_clause(cursor: FakeCursor) -> tuple:
+    """The WHERE clause and params of the last query, checking every placeholder has a param."""
+    query, params = cursor.executed[-1]
+    assert query.count("%s") == len(params)
+    match = re.search(r" WHERE (.*?)(?: ORDER BY .*)?$", query)
+    return (match.group(1) if match else None), params
+
+
+def test_get_matches_since_only_returns_changed_matches(cursor):
+    changed = "(mlo.matchLastUpdated > %s OR mlo.lookupLastUpdated > %s OR mo.closingCreatedAt > %s)"
+    window = "mlo.matchDate BETWEEN @current_time_utc - INTERVAL 10 DAY AND @current_time_utc + INTERVAL 48 HOUR"
+
+    assert db.get_matches() == []
+    assert where_clause(cursor) == (window, [])
+
+    assert db.get_matches(since=SINCE) == []
+    assert where_clause(cursor) == (f"{window} AND {changed}", [SINCE] * 3)
+
+    assert db.get_matches(all=True, since=SINCE) == []
+    assert where_clause(cursor) == (changed, [SINCE] * 3)
+
+    assert db.get_matches(all=True) == []
+    assert where_clause(cursor) == (None, [])
+
+
+def test_get_match_odds_since_only_returns_new_or_relinked_odds(cursor):
+    changed = "(mo.createdAt > %s OR ml.lastUpdated > %s)"
+
+    assert db.get_match_odds_by_id(None, since=SINCE) == []
+    assert where_clause(cursor) == (f"mo.lastUpdated IS NOT NULL AND {changed}", [SINCE] * 2)
+    assert cursor.executed[-1][0].endswith("ORDER BY ml.matchId, mo.lastUpdated ASC")
+
+    assert db.get_match_odds_by_id("match", since=SINCE) == []
+    assert where_clause(cursor) == (f"ml.matchId = %s AND mo.lastUpdated IS NOT NULL AND {changed}", ["match", SINCE, SINCE])
+    assert cursor.executed[-1][0].endswith("ORDER BY mo.lastUpdated ASC")
+
+    assert db.get_match_odds_by_id("match") == []
+    assert where_clause(cursor) == ("ml.matchId = %s AND mo.lastUpdated IS NOT NULL", ["match"])
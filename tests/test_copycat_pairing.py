@@ -0,0 +1,226 @@
+import math
+import random
+import datetime as dt
+from collections import defaultdict
+
+import pytest
+
+from common.data import League, Sport, MatchPrediction, MatchPredictionWithMatchData, ProbabilityChoice
+from common.constants import SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD
+from vali_utils.analysis_utils import StatisticalAnalyzer, CopycatPairState
+
+
+def build_predictions(seed: int, num_miners: int = 60, num_matches: int = 15):
+    """Random predictions where groups of miners copy each other with small probability offsets."""
+    rng = random.Random(seed)
+    start = dt.datetime(2024, 11, 1, 18, 0, 0)
+    predictions = []
+    for m in range(num_matches):
+        match_date = start + dt.timedelta(hours=m * 5)
+        base_probability = rng.uniform(0.3, 0.7)
+        for uid in range(num_miners):
+            for hours_before in [0.1, 4, 12, 24]:
+                # Every third miner copies the base probability, the rest predict independently
+                if uid % 3 == 0:
+                    probability = round(base_probability + rng.choice([0, 0, 0.001, -0.004, 0.008, 0.0085]), 4)
+                else:
+                    probability = round(rng.uniform(0.3, 0.7), 4)
+                prediction_date = match_date - dt.timedelta(hours=hours_before, seconds=rng.randrange(0, 3700))
+                if rng.random() < 0.5:
+                    prediction_date = prediction_date.replace(tzinfo=dt.timezone.utc)
+                prediction = MatchPrediction(
+                    predictionId=len(predictions) + 1, minerId=uid, hotkey=f"hotkey_{uid}", predictionDate=prediction_date,
+                    matchId=f"match_{m}", matchDate=match_date, sport=Sport.SOCCER, league=League.EPL,
+                    homeTeamName="Home", awayTeamName="Away", isScored=True,
+                    probabilityChoice=rng.choice([ProbabilityChoice.HOMETEAM, ProbabilityChoice.AWAYTEAM, ProbabilityChoice.DRAW]) if uid % 3 else ProbabilityChoice.HOMETEAM,
+                    probability=probability, closingEdge=0.1,
+                )
+                predictions.append(MatchPredictionWithMatchData(
+                    prediction=prediction, actualHomeTeamScore=1, actualAwayTeamScore=0, homeTeamOdds=2.0, awayTeamOdds=2.5, drawOdds=3.0,
+                ))
+    rng.shuffle(predictions)
+    ordered_matches = [(f"match_{m}", start + dt.timedelta(hours=m * 5)) for m in range(num_matches)]
+    return predictions, ordered_matches
+
+
+def all_pairs_relationships(analyzer: StatisticalAnalyzer, predictions):
+    """The original O(k^2) pairwise comparison per match."""
+    matches = defaultdict(list)
+    for pred in predictions:
+        matches[pred.prediction.matchId].append(pred.prediction)
+
+    miner_relationships = defaultdict(lambda: defaultdict(list))
+    for match_id, match_predictions in matches.items():
+        for i in range(len(match_predictions)):
+            for j in range(i + 1, len(match_predictions)):
+                pred1, pred2 = match_predictions[i], match_predictions[j]
+                if pred1.minerId == pred2.minerId or pred1.probabilityChoice != pred2.probabilityChoice:
+                    continue
+                pred1_date = pred1.predictionDate if pred1.predictionDate.tzinfo else pred1.predictionDate.replace(tzinfo=dt.timezone.utc)
+                pred2_date = pred2.predictionDate if pred2.predictionDate.tzinfo else pred2.predictionDate.replace(tzinfo=dt.timezone.utc)
+                if abs((pred1_date - pred2_date).total_seconds()) > 3600:
+                    continue
+                difference = round(math.exp(-(pred1.probability*100 - pred2.probability*100) ** 2), 2)
+                if difference < analyzer.variance_threshold:
+                    continue
+                miner_relationships[pred1.minerId][pred2.minerId].append({
+                    'match_id': match_id,
+                    'match_date': pred1.matchDate,
+                    'difference': difference,
+                    'absolute_difference': round(abs(pred1.probability - pred2.probability), 4),
+                    'choice': pred1.probabilityChoice,
+                    'prob1': pred1.probability,
+                    'prob2': pred2.probability,
+                    'pred1_date': pred1_date.strftime('%Y-%m-%d %H:%M:%S'),
+                    'pred2_date': pred2_date.strftime('%Y-%m-%d %H:%M:%S')
+                })
+
+    # The original per-pair dict history analysis
+    suspicious_relationships = {}
+    for miner1, related_miners in miner_relationships.items():
+        for miner2, history in related_miners.items():
+            relationship_key = '_'.join(sorted([str(miner1), str(miner2)]))
+            if relationship_key in suspicious_relationships:
+                continue
+            suspicious_matches = set(h['match_id'] for h in history)
+            if len(suspicious_matches) < analyzer.min_suspicious_matches:
+                continue
+            suspicious_relationships[relationship_key] = {
+                'miners': sorted([miner1, miner2]),
+                'num_matches': len(suspicious_matches),
+                'num_predictions': len(history),
+                'predictions_per_match': round(len(history) / len(suspicious_matches), 2),
+                'match_ids': list(suspicious_matches),
+                'num_matches_with_exact': len(set(h['match_id'] for h in history if h['absolute_difference'] == 0)),
+                'num_exact_predictions': sum(1 for h in history if h['absolute_difference'] == 0),
+                'history': history
+            }
+    return suspicious_relationships
+
+
+def consecutive_streaks(relationship, ordered_matches):
+    """The original streak search over dict histories: first history entry per match, grouped into runs of consecutive matches."""
+    match_predictions = {}
+    for pred in relationship['history']:
+        match_predictions.setdefault(pred['match_id'], pred)
+
+    streaks, current, last_match_index = [], [], None
+    for match_idx, (match_id, _) in enumerate(ordered_matches):
+        if match_id not in match_predictions or (last_match_index is not None and match_idx != last_match_index + 1):
+            if len(current) >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:
+                streaks.append(current)
+            current = []
+            if match_id not in match_predictions:
+                continue
+        current.append(match_predictions[match_id])
+        last_match_index = match_idx
+    if len(current) >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:
+        streaks.append(current)
+    return len(match_predictions), streaks
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_windowed_pairing_matches_all_pairs(seed):
+    analyzer = StatisticalAnalyzer()
+    predictions, ordered_matches = build_predictions(seed)
+
+    expected = all_pairs_relationships(analyzer, predictions)
+    actual = analyzer.analyze_prediction_clusters(predictions, ordered_matches, excluded_miners=set())
+
+    assert len(expected) > 0
+    assert list(actual.keys()) == list(expected.keys())
+    num_patterns = 0
+    for key, relationship in actual.items():
+        consecutive_patterns = relationship.pop('consecutive_patterns', None)
+        # History dicts are built on access and must match the eagerly built ones
+        relationship['history'] = list(relationship['history'])
+        assert relationship == expected[key]
+
+        total_matches, streaks = consecutive_streaks(expected[key], ordered_matches)
+        if not streaks:
+            assert consecutive_patterns is None
+            continue
+        num_patterns += 1
+        assert consecutive_patterns['total_matches'] == total_matches
+        assert consecutive_patterns['num_streaks'] == len(streaks)
+        assert consecutive_patterns['max_consecutive'] == max(len(streak) for streak in streaks)
+        assert [list(streak) for streak in consecutive_patterns['streak_details']] == streaks
+        assert consecutive_patterns['streak_match_ids'] == [[h['match_id'] for h in streak] for streak in streaks]
+    assert num_patterns > 0
+
+
+def test_relationship_history_slices_lazily():
+    analyzer = StatisticalAnalyzer()
+    predictions, ordered_matches = build_predictions(1)
+    relationship = next(iter(analyzer.analyze_prediction_clusters(predictions, ordered_matches, excluded_miners=set()).values()))
+
+    history = relationship['history']
+    assert list(history[2:5]) == list(history)[2:5]
+    assert history[-1] == list(history)[-1]
+    assert history.absolute_differences == [h['absolute_difference'] for h in history]
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.004, 0.3, 0.5, 0.99, 1.0])
+def test_max_probability_difference_is_conservative(threshold):
+    bound = StatisticalAnalyzer.get_max_probability_difference(threshold)
+    for step in range(0, 2000):
+        delta = step / 100000
+        if round(math.exp(-(delta * 100) ** 2), 2) >= threshold:
+            assert delta <= bound
+
+
+def materialize(relationships):
+    """Relationships with lazily built histories and streaks turned into plain lists, for comparison."""
+    for relationship in relationships.values():
+        relationship['history'] = list(relationship['history'])
+        if 'consecutive_patterns' in relationship:
+            patterns = relationship['consecutive_patterns']
+            patterns['streak_details'] = [list(streak) for streak in patterns['streak_details']]
+    return relationships
+
+
+@pytest.mark.parametrize("seed", [4, 5])
+def test_incremental_pair_state_matches_full_rebuild(seed):
+    analyzer = StatisticalAnalyzer()
+    predictions, ordered_matches = build_predictions(seed, num_miners=24, num_matches=60)
+    # Score the predictions over three passes. Later passes add new matches and late predictions for already analyzed ones.
+    predictions.sort(key=lambda p: (p.prediction.matchDate, p.prediction.predictionId % 5))
+    passes = [predictions[:len(predictions) // 3], predictions[:2 * len(predictions) // 3], predictions]
+
+    compared_prediction_ids, stored_pairs = set(), []
+    for scored_predictions in passes:
+        pair_state = CopycatPairState(compared_prediction_ids=set(compared_prediction_ids), pairs=stored_pairs)
+        incremental = analyzer.analyze_prediction_clusters(scored_predictions, ordered_matches, excluded_miners=set(), pair_state=pair_state)
+        full = analyzer.analyze_prediction_clusters(scored_predictions, ordered_matches, excluded_miners=set())
+
+        assert len(full) > 0
+        assert list(incremental.keys()) == list(full.keys())
+        assert materialize(incremental) == materialize(full)
+
+        # Persist the pairs as the validator does. Re-compared matches upsert pairs that were already stored.
+        compared_prediction_ids.update(pair_state.new_compared_prediction_ids)
+        stored_pairs = list(dict.fromkeys(stored_pairs + pair_state.new_pairs))
+
+    # Every prediction has been compared, so a further pass reuses all stored pairs
+    pair_state = CopycatPairState(compared_prediction_ids=compared_prediction_ids, pairs=stored_pairs)
+    analyzer.analyze_prediction_clusters(predictions, ordered_matches, excluded_miners=set(), pair_state=pair_state)
+    assert pair_state.num_compared_matches == 0
+    assert pair_state.num_reused_matches == len(ordered_matches)
+    assert pair_state.new_pairs == []
+
+
+def test_incremental_pair_state_skips_pairs_outside_window():
+    analyzer = StatisticalAnalyzer()
+    predictions, ordered_matches = build_predictions(6)
+    pair_state = CopycatPairState()
+    analyzer.analyze_prediction_clusters(predictions, ordered_matches, excluded_miners=set(), pair_state=pair_state)
+
+    # Drop a copier's predictions, as if they slid out of its rolling window
+    window = [p for p in predictions if p.prediction.minerId != 3]
+    pair_state = CopycatPairState(compared_prediction_ids=set(pair_state.new_compared_prediction_ids), pairs=pair_state.new_pairs)
+    incremental = analyzer.analyze_prediction_clusters(window, ordered_matches, excluded_miners=set(), pair_state=pair_state)
+    full = analyzer.analyze_prediction_clusters(window, ordered_matches, excluded_miners=set())
+
+    assert pair_state.num_compared_matches == 0
+    assert not any(3 in relationship['miners'] for relationship in incremental.values())
+    assert materialize(incremental) == materialize(full)
@@ -0,0 +1,168 @@
+import datetime as dt
+import sqlite3
+from datetime import timedelta, timezone
+
+import pytest
+
+from common.data import League, Match, Sport
+from common.timestamps import _parse_timestamp_fallback, from_epoch_us, parse_timestamp, to_epoch_us
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+from vali_utils.odds_timeline import OddsTimeline
+from vali_utils.scoring_utils import find_closest_odds
+
+TIMESTAMPS = [
+    "2024-10-01 12:00:00",
+    "2024-10-01 12:00:00.5",
+    "2024-10-01 12:00:00.123456",
+    "2024-10-01 12:00:00+00:00",
+    "2024-10-01 12:00:00.123456+00:00",
+    "2024-10-01 14:30:00+02:30",
+    "2024-10-01 07:00:00.25-05:00",
+]
+
+
+def reference_timestamp_adapter(val: bytes) -> dt.datetime:
+    """The byte splitting timestamp converter the validator storage used before parse_timestamp."""
+    datepart, timepart = val.split(b" ")
+    year, month, day = map(int, datepart.split(b"-"))
+    if b"+" in timepart:
+        timepart, tz_offset = timepart.rsplit(b"+", 1)
+        hours, minutes = map(int, tz_offset.split(b":", 1))
+        tzinfo = dt.timezone.utc if tz_offset == b"00:00" else dt.timezone(dt.timedelta(hours=hours, minutes=minutes))
+    elif b"-" in timepart:
+        timepart, tz_offset = timepart.rsplit(b"-", 1)
+        hours, minutes = map(int, tz_offset.split(b":", 1))
+        tzinfo = dt.timezone.utc if tz_offset == b"00:00" else dt.timezone(dt.timedelta(hours=-hours, minutes=-minutes))
+    else:
+        tzinfo = None
+    timepart_full = timepart.split(b".")
+    hours, minutes, seconds = map(int, timepart_full[0].split(b":"))
+    microseconds = int("{:0<6.6}".format(timepart_full[1].decode())) if len(timepart_full) == 2 else 0
+    return dt.datetime(year, month, day, hours, minutes, seconds, microseconds, tzinfo)
+
+
+@pytest.mark.parametrize("value", TIMESTAMPS)
+def test_parse_timestamp_matches_the_previous_converter(value):
+    expected = reference_timestamp_adapter(value.encode())
+    parsed = parse_timestamp(value.encode())
+    assert parsed == expected and parsed.tzinfo == expected.tzinfo
+    aware = expected if expected.tzinfo else expected.replace(tzinfo=timezone.utc)
+    assert to_epoch_us(value) == to_epoch_us(parsed) == round(aware.timestamp() * 1_000_000)
+    assert from_epoch_us(to_epoch_us(value)) == aware
+
+
+@pytest.mark.parametrize("value", TIMESTAMPS)
+def test_fallback_parses_the_stored_formats(value):
+    parsed = _parse_timestamp_fallback(value)
+    assert parsed == parse_timestamp(value) and parsed.tzinfo == parse_timestamp(value).tzinfo
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-10-01T12:00:00", dt.datetime(2024, 10, 1, 12)),
+    ("2024-10-01T12:00:00.5+02:00", dt.datetime(2024, 10, 1, 12, 0, 0, 500000, timezone(timedelta(hours=2)))),
+    ("2024-10-01T12:00:00Z", dt.datetime(2024, 10, 1, 12, tzinfo=timezone.utc)),
+    ("2024-10-01 12:00:00.123Z", dt.datetime(2024, 10, 1, 12, 0, 0, 123000, tzinfo=timezone.utc)),
+])
+def test_fallback_parses_the_iso_separator_and_zulu_suffix(value, expected):
+    # fromisoformat accepts these from Python 3.11, the fallback parses them on older versions
+    parsed = _parse_timestamp_fallback(value)
+    assert parsed == expected and parsed.tzinfo == expected.tzinfo
+    assert parse_timestamp(value) == expected
+
+
+def make_storage(tmp_path) -> SqliteValidatorStorage:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    # The zero probability hotfix deletes rows, skip it
+    (tmp_path / "hotfix.txt").write_text("done")
+    return storage
+
+
+def test_migration_backfills_epoch_columns(tmp_path):
+    storage = make_storage(tmp_path)
+    # A database created before the epoch columns existed
+    connection = sqlite3.connect(storage.DATABASE_FILE)
+    for create in (storage.MATCHES_TABLE_CREATE, storage.MATCH_ODDS_CREATE, storage.MATCHPREDICTIONS_TABLE_CREATE):
+        connection.execute(
+            create.replace(",\n                            matchDateUs     INTEGER         NULL", "")
+            .replace(",\n                            lastUpdatedUs   INTEGER         NULL", "")
+            .replace(",\n                            matchDateUs         INTEGER         NULL", "")
+            .replace(",\n                            predictionDateUs    INTEGER         NULL", "")
+        )
+    for index, value in enumerate(TIMESTAMPS):
+        connection.execute(
+            "INSERT INTO Matches (matchId, matchDate, sport, league, homeTeamName, awayTeamName, isComplete, lastUpdated) VALUES (?, ?, 1, 'EPL', 'H', 'A', 1, ?)",
+            (f"match_{index}", value, value),
+        )
+        connection.execute(
+            "INSERT INTO MatchOdds (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated) VALUES (?, 1.5, 2.5, 3.5, ?)",
+            (f"match_{index}", value),
+        )
+        connection.execute(
+            """INSERT INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName,
+               lastUpdated, predictionDate, probabilityChoice, probability) VALUES (1, 'hk', ?, ?, 1, 'EPL', 'H', 'A', ?, ?, 'HomeTeam', 0.5)""",
+            # Recently updated, so cleanup keeps the unscored predictions
+            (f"match_{index}", value, str(dt.datetime.now(timezone.utc)), TIMESTAMPS[-1 - index]),
+        )
+    connection.commit()
+    connection.close()
+
+    storage.initialize()
+    with storage._reader() as connection:
+        matches = connection.execute("SELECT CAST(matchDate AS TEXT), matchDateUs FROM Matches").fetchall()
+        odds = connection.execute("SELECT CAST(lastUpdated AS TEXT), lastUpdatedUs FROM MatchOdds").fetchall()
+        predictions = connection.execute(
+            "SELECT CAST(matchDate AS TEXT), matchDateUs, CAST(predictionDate AS TEXT), predictionDateUs FROM MatchPredictions"
+        ).fetchall()
+        indexes = {row[1] for row in connection.execute("SELECT type, name FROM sqlite_master WHERE type = 'index'")}
+
+    assert len(matches) == len(odds) == len(predictions) == len(TIMESTAMPS)
+    for value, epoch in matches + odds:
+        assert epoch == to_epoch_us(reference_timestamp_adapter(value.encode()))
+    for match_date, match_epoch, prediction_date, prediction_epoch in predictions:
+        assert match_epoch == to_epoch_us(reference_timestamp_adapter(match_date.encode()))
+        assert prediction_epoch == to_epoch_us(reference_timestamp_adapter(prediction_date.encode()))
+    assert {"idx_Matches_complete_matchDateUs", "idx_MatchOdds_matchId_lastUpdatedUs", "idx_MatchPredictions_scored_matchDateUs"} <= indexes
+
+
+def test_scoring_reads_compare_epoch_columns(tmp_path):
+    storage = make_storage(tmp_path)
+    storage.initialize()
+    now = dt.datetime.now(timezone.utc).replace(microsecond=0)
+    match_date = now - timedelta(hours=3)
+    storage.upsert_matches([
+        Match(
+            matchId="match", matchDate=match_date, sport=Sport.SOCCER, league=League.EPL, isComplete=True,
+            homeTeamName="H", awayTeamName="A", homeTeamScore=2, awayTeamScore=1, homeTeamOdds=1.8, awayTeamOdds=4.2, drawOdds=3.4,
+        )
+    ])
+    odds_times = [match_date - timedelta(hours=hours, microseconds=250) for hours in (10, 5, 1)]
+    storage.insert_match_odds([("match", 1.5 + i, 2.5, 3.5, odds_time) for i, odds_time in enumerate(odds_times)])
+    prediction_date = match_date - timedelta(hours=4, microseconds=123456)
+    with storage._writer() as connection:
+        connection.execute(
+            """INSERT INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName,
+               lastUpdated, predictionDate, probabilityChoice, probability, matchDateUs, predictionDateUs)
+               VALUES (1, 'hk', 'match', ?, 1, 'EPL', 'H', 'A', ?, ?, 'HomeTeam', 0.6, ?, ?)""",
+            (match_date, now, prediction_date, to_epoch_us(match_date), to_epoch_us(prediction_date)),
+        )
+
+    [row] = storage.get_match_predictions_to_score()
+    prediction = row.prediction
+    assert prediction.matchDateUs == to_epoch_us(match_date)
+    assert prediction.predictionDateUs == to_epoch_us(prediction_date)
+    # Timestamps are only parsed when read
+    assert isinstance(prediction._predictionDate, str)
+    assert prediction.predictionDate == prediction_date and prediction.scoredDate is None
+
+    match_odds = storage.get_match_odds_for_matches(["match"])
+    assert [odds[4] for odds in match_odds] == [to_epoch_us(odds_time) for odds_time in odds_times]
+    timeline = OddsTimeline.from_rows(match_odds)
+    assert timeline.closest_odds("match", prediction.predictionDateUs, "HomeTeam") == (2.5, to_epoch_us(odds_times[1]))
+    assert find_closest_odds(timeline, prediction.predictionDateUs, "HomeTeam", False, match_id="match") == 2.5
+    assert find_closest_odds(storage.get_match_odds("match"), prediction.predictionDate, "HomeTeam", False) == 2.5
+
+    assert storage.get_match_odds_timestamps(["match"]) == {("match", to_epoch_us(odds_time)) for odds_time in odds_times}
+    assert [match.matchId for match in storage.get_recently_completed_matches(match_date - timedelta(microseconds=1))] == ["match"]
+    assert storage.get_recently_completed_matches(to_epoch_us(match_date)) == []
@@ -0,0 +1,85 @@
+import datetime as dt
+import random
+from datetime import timedelta, timezone
+
+from common.data import League
+from common.timestamps import to_epoch_us
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+
+BATCH_SIZE = 6
+
+
+def make_storage(tmp_path) -> SqliteValidatorStorage:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    # The zero probability hotfix deletes rows, skip it
+    (tmp_path / "hotfix.txt").write_text("done")
+    storage.initialize()
+    return storage
+
+
+def seed(storage: SqliteValidatorStorage, rng: random.Random):
+    """
+    Matches of two leagues and predictions of several (hotkey, uid) pairs, including rows the scoring loaders must
+    skip: unscored, archived, without closing edge, for incomplete matches and for matches without odds.
+    """
+    now = dt.datetime.now(timezone.utc).replace(microsecond=0)
+    matches = []
+    with storage._writer() as connection:
+        for i in range(30):
+            league = League.EPL if i % 5 else League.NBA
+            match_date = now - timedelta(days=30 - i)
+            is_complete = 0 if i == 7 else 1
+            home_odds = None if i == 11 else round(rng.uniform(1.2, 4.5), 2)
+            connection.execute(
+                """INSERT INTO Matches (matchId, matchDate, sport, league, homeTeamName, awayTeamName, homeTeamScore,
+                   awayTeamScore, homeTeamOdds, awayTeamOdds, drawOdds, isComplete, lastUpdated, matchDateUs)
+                   VALUES (?, ?, 1, ?, 'H', 'A', ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (f"match_{i}", match_date, league.value, rng.randrange(4), rng.randrange(4), home_odds,
+                 round(rng.uniform(1.2, 4.5), 2), None if i % 3 else 3.3, is_complete, now, to_epoch_us(match_date)),
+            )
+            matches.append((f"match_{i}", match_date, league))
+
+        # uid 3 was re-registered from "old" to "hk3", and "hk1" also has predictions under uid 4
+        owners = [("hk0", 0, 20), ("hk1", 1, 12), ("hk2", 2, 3), ("old", 3, 20), ("hk3", 3, 20), ("hk1", 4, 20), ("hk5", 5, 0)]
+        for hotkey, uid, count in owners:
+            for match_id, match_date, league in rng.sample(matches, count):
+                prediction_date = match_date - timedelta(minutes=rng.randrange(10, 5000), microseconds=rng.randrange(1_000_000))
+                connection.execute(
+                    """INSERT INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName,
+                       awayTeamName, isScored, scoredDate, lastUpdated, predictionDate, probabilityChoice, probability,
+                       closingEdge, isArchived, matchDateUs, predictionDateUs)
+                       VALUES (?, ?, ?, ?, 1, ?, 'H', 'A', ?, ?, ?, ?, 'HomeTeam', ?, ?, ?, ?, ?)""",
+                    (uid, hotkey, match_id, match_date, league.value, int(rng.random() < 0.85), now, now, prediction_date,
+                     rng.uniform(0.1, 0.9), None if rng.random() < 0.1 else rng.uniform(-1, 1), int(rng.random() < 0.1),
+                     to_epoch_us(match_date), to_epoch_us(prediction_date)),
+                )
+
+
+def as_tuple(row) -> tuple:
+    return (tuple(row.prediction.to_dict().items()), row.actualHomeTeamScore, row.actualAwayTeamScore,
+            row.homeTeamOdds, row.awayTeamOdds, row.drawOdds)
+
+
+def test_league_loader_matches_per_miner_queries(tmp_path):
+    storage = make_storage(tmp_path)
+    seed(storage, random.Random(7))
+    # uid 4 is not in the metagraph, uid 6 has no predictions
+    miners = {0: "hk0", 1: "hk1", 2: "hk2", 3: "hk3", 5: "hk5", 6: "hk6"}
+
+    for league in (League.EPL, League.NBA):
+        expected = {}
+        for uid, hotkey in miners.items():
+            predictions = storage.get_miner_match_predictions(hotkey, uid, league=league, scored=True, batchSize=BATCH_SIZE)
+            if predictions:
+                expected[uid] = [as_tuple(row) for row in predictions]
+
+        loaded = storage.get_league_miner_match_predictions(league, miners, BATCH_SIZE)
+        assert {uid: [as_tuple(row) for row in rows] for uid, rows in loaded.items()} == expected
+
+    # Some miners have more predictions than the batch size, and the previous owner of uid 3 is never included
+    loaded = storage.get_league_miner_match_predictions(League.EPL, miners, BATCH_SIZE)
+    assert any(len(rows) == BATCH_SIZE for rows in loaded.values())
+    assert all(row.prediction.hotkey == miners[uid] for uid, rows in loaded.items() for row in rows)
+    assert storage.get_league_miner_match_predictions(League.EPL, {}, BATCH_SIZE) == {}
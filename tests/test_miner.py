@@ -0,0 +1,31 @@
+import asyncio
+import datetime as dt
+
+from common.constants import PROTOCOL_VERSION
+from common.data import League, MatchPrediction, ProbabilityChoice, Sport
+from common.protocol import GetMatchPredictions
+import neurons.miner as miner
+
+
+def test_miner_answers_every_match_of_a_batched_request(monkeypatch):
+    def make_match_prediction(prediction: MatchPrediction) -> MatchPrediction:
+        prediction.probabilityChoice = ProbabilityChoice.AWAYTEAM
+        prediction.probability = 0.55
+        return prediction
+
+    monkeypatch.setattr(miner, "make_match_prediction", make_match_prediction)
+    match_date = dt.datetime.now(dt.timezone.utc) + dt.timedelta(days=1)
+    request = GetMatchPredictions(match_predictions=[
+        MatchPrediction(matchId=f"match_{i}", matchDate=match_date, sport=Sport.SOCCER, league=League.EPL,
+                        homeTeamName="H", awayTeamName="A")
+        for i in range(3)
+    ])
+    # The request as the miner's axon deserializes it
+    synapse = GetMatchPredictions.model_validate(request.model_dump())
+
+    response = asyncio.run(miner.Miner.get_match_predictions(None, synapse))
+
+    assert response.version == PROTOCOL_VERSION
+    assert [mpr.matchId for mpr in response.match_predictions] == ["match_0", "match_1", "match_2"]
+    assert all(mpr.probabilityChoice == ProbabilityChoice.AWAYTEAM and mpr.probability == 0.55
+               for mpr in response.match_predictions)
@@ -0,0 +1,248 @@
+import asyncio
+import datetime as dt
+import threading
+from datetime import timedelta, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+import bittensor as bt
+
+from common.constants import (
+    BATCHED_PREDICTIONS_PROTOCOL_VERSION,
+    MIN_PREDICTION_TIME_THRESHOLD,
+    NO_PREDICTION_RESPONSE_PENALTY,
+    PROTOCOL_VERSION,
+)
+from common.data import League, MatchPrediction, ProbabilityChoice, Sport
+from common.protocol import GetMatchPrediction, GetMatchPredictions
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+import vali_utils.utils as utils
+
+
+def make_storage(tmp_path) -> SqliteValidatorStorage:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    # The zero probability hotfix deletes rows, skip it
+    (tmp_path / "hotfix.txt").write_text("done")
+    storage.initialize()
+    return storage
+
+
+def predict(uid: int, synapse: bt.Synapse) -> bt.Synapse:
+    """A miner of the current protocol version predicting the home team for every requested match."""
+    for match_prediction in getattr(synapse, "match_predictions", None) or [synapse.match_prediction]:
+        match_prediction.probabilityChoice = ProbabilityChoice.HOMETEAM
+        match_prediction.probability = 0.6
+    synapse.version = PROTOCOL_VERSION
+    return synapse
+
+
+def time_out(uid: int, synapse: bt.Synapse) -> bt.Synapse:
+    """A miner that did not answer within the timeout. The dendrite returns the request without a version."""
+    return synapse
+
+
+class FakeDendrite:
+    """
+    Answers requests like a dendrite, with the synapse the handler returns for each axon after `delay` seconds. Records
+    the requests sent and the most requests that were in flight at once.
+    """
+
+    def __init__(self, handler: Callable[[int, bt.Synapse], Optional[bt.Synapse]], delay: float = 0.05):
+        self.handler = handler
+        self.delay = delay
+        self.requests: List[tuple] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        self.requests.append((synapse, [axon.uid for axon in axons]))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        responses = []
+        for axon in axons:
+            response = synapse.model_copy(deep=True)
+            response.axon.hotkey = axon.hotkey
+            response = self.handler(axon.uid, response)
+            # Received as JSON, which turns the enums the miner set into their values
+            responses.append(None if response is None else type(response).model_validate(response.model_dump()))
+        return responses
+
+
+def make_validator(
+    dendrite: FakeDendrite,
+    miners_by_league: Dict[League, List[int]],
+    batch_size: int,
+    max_concurrent_batches: int,
+    protocol_versions: Optional[Dict[int, int]] = None,
+) -> SimpleNamespace:
+    uids = sorted({uid for miner_uids in miners_by_league.values() for uid in miner_uids})
+    return SimpleNamespace(
+        config=SimpleNamespace(neuron=SimpleNamespace(batch_size=batch_size, max_concurrent_batches=max_concurrent_batches)),
+        metagraph=SimpleNamespace(axons={uid: SimpleNamespace(uid=uid, hotkey=f"hk{uid}") for uid in uids}),
+        dendrite=dendrite,
+        # Requests carry the league value
+        get_miner_uids_committed_to_league=lambda league: list(miners_by_league.get(League(league), [])),
+        uids_to_leagues_lock=threading.Lock(),
+        uids_to_protocol_versions=dict(protocol_versions or {}),
+        accumulated_no_response_penalties={},
+        accumulated_no_response_penalties_lock=threading.Lock(),
+    )
+
+
+def make_request(match_id: str, league: League, seconds_to_deadline: float) -> MatchPrediction:
+    match_date = dt.datetime.now(timezone.utc) + timedelta(seconds=MIN_PREDICTION_TIME_THRESHOLD + seconds_to_deadline)
+    return MatchPrediction(
+        matchId=match_id, matchDate=match_date, sport=Sport.SOCCER, league=league, homeTeamName="H", awayTeamName="A",
+    )
+
+
+def stored_predictions(storage: SqliteValidatorStorage) -> List[tuple]:
+    with storage._reader() as connection:
+        return sorted(connection.execute("SELECT matchId, minerId, hotkey FROM MatchPredictions").fetchall())
+
+
+def test_requests_are_capped_in_flight_and_sent_by_deadline(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    monkeypatch.setattr(utils, "storage", storage)
+    dendrite = FakeDendrite(predict)
+    miners = list(range(10))
+    vali = make_validator(dendrite, {League.EPL: miners, League.MLS: miners}, batch_size=2, max_concurrent_batches=3)
+    requests = [
+        make_request("epl_late", League.EPL, 3000),
+        make_request("mls", League.MLS, 2000),
+        make_request("epl_early", League.EPL, 1000),
+    ]
+
+    asyncio.run(utils.send_match_prediction_requests_to_miners(vali, requests))
+
+    # 5 batches per match, never more than max_concurrent_batches of them in flight
+    assert len(dendrite.requests) == 15
+    assert dendrite.max_in_flight == 3
+    sent_order = [synapse.match_prediction.matchId for synapse, _ in dendrite.requests]
+    assert sent_order == ["epl_early"] * 5 + ["mls"] * 5 + ["epl_late"] * 5
+    assert stored_predictions(storage) == sorted(
+        (mpr.matchId, uid, f"hk{uid}") for mpr in requests for uid in miners
+    )
+    assert vali.accumulated_no_response_penalties == {}
+
+
+def test_batches_left_at_the_deadline_are_unsent_and_not_penalized(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    monkeypatch.setattr(utils, "storage", storage)
+    # One batch in flight at a time, the third batch only gets a slot after the deadline
+    dendrite = FakeDendrite(time_out, delay=0.5)
+    vali = make_validator(dendrite, {League.EPL: [0, 1, 2]}, batch_size=1, max_concurrent_batches=1)
+    request = make_request("match", League.EPL, 0.75)
+
+    result = asyncio.run(
+        utils.send_predictions_to_miners(
+            vali, utils.GetMatchPrediction(match_prediction=request), [0, 1, 2],
+            deadline=utils.get_prediction_request_deadline(request),
+        )
+    )
+    sent_uids = [uid for _, uids in dendrite.requests for uid in uids]
+    assert len(sent_uids) == 2
+    assert result == ([], [], [uid for uid in [0, 1, 2] if uid not in sent_uids])
+
+    # Through the fan-out, only the miners whose requests went out and timed out are penalized
+    dendrite.requests.clear()
+    asyncio.run(utils.send_match_prediction_requests_to_miners(vali, [make_request("match", League.EPL, 0.75)]))
+    sent_uids = [uid for _, uids in dendrite.requests for uid in uids]
+    assert len(sent_uids) == 2
+    assert vali.accumulated_no_response_penalties == {uid: NO_PREDICTION_RESPONSE_PENALTY for uid in sent_uids}
+    assert stored_predictions(storage) == []
+
+
+def answer_batch(uid: int, synapse: bt.Synapse) -> bt.Synapse:
+    """
+    Miners answering a batched request in reverse order. uid 1 only answers one of the matches, uid 2 repeats a match and
+    adds one that was not requested, uid 3 times out.
+    """
+    if uid == 3:
+        return time_out(uid, synapse)
+    synapse = predict(uid, synapse)
+    if isinstance(synapse, GetMatchPredictions):
+        match_predictions = list(reversed(synapse.match_predictions))
+        if uid == 1:
+            match_predictions = match_predictions[:1]
+        elif uid == 2:
+            match_predictions += [match_predictions[0], match_predictions[0].model_copy(update={"matchId": "other"})]
+        synapse.match_predictions = match_predictions
+    return synapse
+
+
+def test_batched_responses_are_matched_to_their_requests(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    monkeypatch.setattr(utils, "storage", storage)
+    dendrite = FakeDendrite(answer_batch)
+    miners = [0, 1, 2, 3]
+    vali = make_validator(
+        dendrite, {League.EPL: miners}, batch_size=2, max_concurrent_batches=2,
+        protocol_versions={uid: BATCHED_PREDICTIONS_PROTOCOL_VERSION for uid in miners},
+    )
+    requests = [make_request("late", League.EPL, 2000), make_request("early", League.EPL, 1000)]
+
+    asyncio.run(utils.send_match_prediction_requests_to_miners(vali, requests))
+
+    # One batched request per batch of miners, for the matches in deadline order
+    assert [type(synapse) for synapse, _ in dendrite.requests] == [GetMatchPredictions] * 2
+    assert all([mpr.matchId for mpr in synapse.match_predictions] == ["early", "late"] for synapse, _ in dendrite.requests)
+    assert stored_predictions(storage) == sorted(
+        [(match_id, uid, f"hk{uid}") for match_id in ["early", "late"] for uid in [0, 2]] + [("late", 1, "hk1")]
+    )
+    # Missing predictions and timeouts are penalized per match
+    assert vali.accumulated_no_response_penalties == {
+        1: NO_PREDICTION_RESPONSE_PENALTY,
+        3: 2 * NO_PREDICTION_RESPONSE_PENALTY,
+    }
+    assert vali.uids_to_protocol_versions == {uid: BATCHED_PREDICTIONS_PROTOCOL_VERSION for uid in miners}
+
+
+def answer_old_protocol(uid: int, synapse: bt.Synapse) -> bt.Synapse:
+    """uid 0 answers batched requests with a protocol version before batching, and single match requests normally."""
+    synapse = predict(uid, synapse)
+    if uid == 0 and isinstance(synapse, GetMatchPredictions):
+        synapse.match_predictions = []
+        synapse.version = BATCHED_PREDICTIONS_PROTOCOL_VERSION - 1
+    return synapse
+
+
+def test_old_protocol_miners_fall_back_to_single_match_requests(tmp_path, monkeypatch):
+    storage = make_storage(tmp_path)
+    monkeypatch.setattr(utils, "storage", storage)
+    dendrite = FakeDendrite(answer_old_protocol)
+    miners = [0, 1, 2]
+    # uid 2 never reported a protocol version
+    vali = make_validator(
+        dendrite, {League.EPL: miners}, batch_size=4, max_concurrent_batches=4,
+        protocol_versions={0: BATCHED_PREDICTIONS_PROTOCOL_VERSION, 1: BATCHED_PREDICTIONS_PROTOCOL_VERSION},
+    )
+    requests = [make_request("first", League.EPL, 1000), make_request("second", League.EPL, 2000)]
+
+    asyncio.run(utils.send_match_prediction_requests_to_miners(vali, requests))
+
+    sent = sorted(
+        (type(synapse).__name__, synapse.match_prediction.matchId if isinstance(synapse, GetMatchPrediction) else None, sorted(uids))
+        for synapse, uids in dendrite.requests
+    )
+    assert sent == [
+        ("GetMatchPrediction", "first", [0]),
+        ("GetMatchPrediction", "first", [2]),
+        ("GetMatchPrediction", "second", [0]),
+        ("GetMatchPrediction", "second", [2]),
+        ("GetMatchPredictions", None, [0, 1]),
+    ]
+    assert stored_predictions(storage) == sorted(
+        (match_id, uid, f"hk{uid}") for match_id in ["first", "second"] for uid in miners
+    )
+    assert vali.accumulated_no_response_penalties == {}
+    # Not sent batched requests again until it reports a batched protocol version
+    assert vali.uids_to_protocol_versions[0] is None
+    assert utils.get_miner_uids_supporting_batched_predictions(vali, miners) == [1]
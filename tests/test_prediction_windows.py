@@ -0,0 +1,115 @@
+import random
+import datetime as dt
+from datetime import timedelta, timezone
+
+from common.data import League, Match, Sport
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+from vali_utils.prediction_windows import PREDICTION_WINDOWS, PredictionWindowQueue
+
+START = dt.datetime(2024, 10, 1, 12, 0, 0)
+STEP = timedelta(seconds=60)
+
+
+def make_match(matchId: str, matchDate: dt.datetime, isComplete: bool = False) -> Match:
+    return Match(
+        matchId=matchId, matchDate=matchDate, sport=Sport.SOCCER, league=League.EPL, isComplete=isComplete,
+        homeTeamName="Home", awayTeamName="Away", homeTeamScore=None, awayTeamScore=None,
+        homeTeamOdds=None, awayTeamOdds=None, drawOdds=None,
+    )
+
+
+def epoch(value: dt.datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def scan_windows(matches, requested, current_time: dt.datetime):
+    """The per-step scan of get_match_prediction_requests before the queue."""
+    due = []
+    current_time = current_time.replace(tzinfo=timezone.utc)
+    for match in matches:
+        time_until_match = match.matchDate.replace(tzinfo=timezone.utc) - current_time
+        # get_matches_to_predict only returned matches between 5 minutes and a day away
+        if not timedelta(minutes=5) <= time_until_match <= timedelta(days=1):
+            continue
+        windows = requested.setdefault(match.matchId, set())
+        for window in PREDICTION_WINDOWS:
+            if window.name not in windows and window.open_before >= time_until_match > window.close_before:
+                windows.add(window.name)
+                due.append((match.matchId, window.name))
+                break
+    return due
+
+
+def test_queue_requests_the_same_windows_as_the_scan():
+    rng = random.Random(7)
+    matches = [make_match(f"match_{i}", START + timedelta(minutes=rng.randrange(0, 3 * 24 * 60))) for i in range(200)]
+    queue = PredictionWindowQueue()
+    queue.load(matches, {}, epoch(START))
+
+    requested = {}
+    current_time = START
+    while current_time < START + timedelta(days=3):
+        expected = scan_windows(matches, requested, current_time)
+        due = [(match.matchId, window.name) for match, window in queue.pop_due(epoch(current_time))]
+        assert sorted(due) == sorted(expected)
+        current_time += STEP * rng.randrange(1, 30)
+
+    assert len(queue) == 0
+
+
+def test_loaded_requests_are_not_requested_again():
+    match = make_match("match", START + timedelta(hours=30))
+    queue = PredictionWindowQueue()
+    queue.load([match], {"match": {"24_hour": True, "12_hour": False, "4_hour": False, "10_min": False}}, epoch(START))
+
+    fire_time, next_match, window = queue.peek()
+    assert window.name == "12_hour" and next_match.matchId == "match"
+    assert fire_time == epoch(START + timedelta(hours=18))
+    assert queue.pop_due(epoch(START + timedelta(hours=7))) == []
+
+
+def test_rescheduled_matches_fire_at_the_new_times():
+    queue = PredictionWindowQueue()
+    queue.load([make_match("match", START + timedelta(hours=30))], {}, epoch(START))
+    [(_, window)] = queue.pop_due(epoch(START + timedelta(hours=6, minutes=30)))
+    assert window.name == "24_hour"
+
+    # Postponed by a day. The 24 hour window was already requested and is not queued again.
+    queue.update([make_match("match", START + timedelta(hours=54))], epoch(START + timedelta(hours=7)))
+    assert queue.pop_due(epoch(START + timedelta(hours=18, minutes=30))) == []
+    fire_time, _, window = queue.peek()
+    assert window.name == "12_hour" and fire_time == epoch(START + timedelta(hours=42))
+    [(match, window)] = queue.pop_due(epoch(START + timedelta(hours=42)))
+    assert window.name == "12_hour" and match.matchDate == START + timedelta(hours=54)
+
+
+def test_completed_matches_leave_the_queue():
+    queue = PredictionWindowQueue()
+    queue.load([make_match("match", START + timedelta(hours=30))], {}, epoch(START))
+    queue.update([make_match("match", START + timedelta(hours=30), isComplete=True)], epoch(START))
+    assert len(queue) == 0
+    assert queue.peek() is None
+    assert queue.pop_due(epoch(START + timedelta(hours=30))) == []
+
+
+def test_storage_batches_request_flags_and_loads_upcoming_matches(tmp_path):
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    storage.initialize()
+
+    now = dt.datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    storage.upsert_matches([
+        make_match("upcoming", now + timedelta(hours=5)),
+        make_match("started", now - timedelta(hours=1)),
+        make_match("complete", now + timedelta(hours=5), isComplete=True),
+    ])
+    assert [match.matchId for match in storage.get_upcoming_matches(now)] == ["upcoming"]
+
+    storage.update_match_prediction_requests([
+        ("upcoming", "prediction_24_hour"), ("upcoming", "prediction_4_hour"), ("other", "prediction_10_min"),
+    ])
+    assert storage.get_match_prediction_requests() == {
+        "upcoming": {"24_hour": True, "12_hour": False, "4_hour": True, "10_min": False},
+        "other": {"24_hour": False, "12_hour": False, "4_hour": False, "10_min": True},
+    }
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from api.response_cache import ResponseCache, etag_matches, make_etag
+
+
+class Versions:
+    """Stands in for the cache_versions table."""
+
+    def __init__(self):
+        self.version = 1
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.version
+
+
+def make_cache(versions, ttl=60, max_entries=8, version_check_interval=0):
+    return ResponseCache(versions.load, ttl=ttl, max_entries=max_entries, version_check_interval=version_check_interval)
+
+
+def test_responses_are_cached_until_the_version_changes():
+    versions = Versions()
+    cache = make_cache(versions)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return b'{"matches": %d}' % len(builds)
+
+    first = cache.get_or_build(("matches", None), build)
+    assert cache.get_or_build(("matches", None), build) == first
+    assert first.etag == make_etag(first.body) and len(builds) == 1
+
+    # Other parameters are other entries
+    cache.get_or_build(("matches", "2024-10-01"), build)
+    assert len(builds) == 2
+
+    # A writer committed new data
+    versions.version += 1
+    second = cache.get_or_build(("matches", None), build)
+    assert second.body == b'{"matches": 3}' and second.etag != first.etag
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3 and stats["entries"] == 1 and stats["version"] == 2
+
+
+def test_entries_expire_and_are_bounded():
+    versions = Versions()
+    cache = make_cache(versions, ttl=0.05, max_entries=2)
+    for key in range(3):
+        cache.get_or_build(key, lambda: b"{}")
+    assert cache.stats()["entries"] == 2
+
+    builds = []
+    cache.get_or_build(2, lambda: builds.append(1) or b"{}")
+    assert builds == []
+    time.sleep(0.06)
+    cache.get_or_build(2, lambda: builds.append(1) or b"{}")
+    assert builds == [1]
+
+
+def test_versions_are_checked_at_most_once_per_interval():
+    versions = Versions()
+    cache = make_cache(versions, version_check_interval=60)
+    for _ in range(5):
+        cache.get_or_build("matches", lambda: b"{}")
+    assert versions.loads == 1
+
+    # Writes made by this process invalidate right away
+    cache.invalidate()
+    cache.get_or_build("matches", lambda: b"{}")
+    assert versions.loads == 2 and cache.stats()["misses"] == 2
+
+
+def test_failed_builds_and_unknown_versions_are_not_cached():
+    versions = Versions()
+    cache = make_cache(versions)
+
+    def failing_build():
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_build("matches", failing_build)
+    assert cache.stats()["entries"] == 0
+
+    # The database is down
+    versions.version = None
+    cache.get_or_build("matches", lambda: b"{}")
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_misses_build_once():
+    versions = Versions()
+    cache = make_cache(versions)
+    builds = []
+    started = threading.Event()
+
+    def build():
+        builds.append(1)
+        started.set()
+        time.sleep(0.05)
+        return b"{}"
+
+    responses = []
+    threads = [threading.Thread(target=lambda: responses.append(cache.get_or_build("matches", build))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(builds) == 1 and len(set(responses)) == 1
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('"xyz"', False),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, 'W/"abc"') == expected
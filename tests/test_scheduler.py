@@ -0,0 +1,140 @@
+import asyncio
+import random
+
+from vali_utils.scheduler import Scheduler, OverrunPolicy
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_scheduler(clock: FakeClock) -> Scheduler:
+    return Scheduler("test", clock=clock, rng=random.Random(0))
+
+
+def test_due_jobs_run_in_fire_time_then_added_order():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    runs = []
+    scheduler.add_job("first", lambda: runs.append("first"), 60)
+    scheduler.add_job("second", lambda: runs.append("second"), 30)
+    scheduler.add_job("later", lambda: runs.append("later"), 60, start=clock.now + 10)
+
+    scheduler.run_due_blocking()
+    assert runs == ["first", "second"]
+    assert scheduler.seconds_until_next() == 10
+
+    clock.now += 30
+    scheduler.run_due_blocking()
+    assert runs == ["first", "second", "later", "second"]
+    assert scheduler.seconds_until_next() == 30
+
+
+def test_delay_policy_schedules_after_the_run_finishes():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    def slow():
+        clock.now += 100
+
+    scheduler.add_job("slow", slow, 60)
+    scheduler.run_due_blocking()
+    stats = scheduler.stats()["slow"]
+    assert stats.runs == 1 and stats.last_duration == 100 and stats.skipped == 0
+    assert stats.next_run == clock.now + 60
+
+
+def test_skip_policy_drops_overrun_fire_times_and_stays_on_the_grid():
+    clock = FakeClock(1_000_000.0 + 5)
+    scheduler = make_scheduler(clock)
+    durations = [250, 10]
+
+    def overrun():
+        clock.now += durations.pop(0)
+
+    scheduler.add_job("aligned", overrun, 100, overrun=OverrunPolicy.SKIP, align=True)
+    assert scheduler.seconds_until_next() == 95
+
+    clock.now = 1_000_100.0
+    scheduler.run_due_blocking()
+    stats = scheduler.stats()["aligned"]
+    # Ran at 1_000_100 until 1_000_350, overrunning the 1_000_200 and 1_000_300 marks
+    assert stats.runs == 1 and stats.skipped == 2
+    assert stats.next_run == 1_000_400.0
+
+    clock.now = 1_000_400.0
+    scheduler.run_due_blocking()
+    stats = scheduler.stats()["aligned"]
+    assert stats.runs == 2 and stats.skipped == 2
+    assert stats.next_run == 1_000_500.0
+
+
+def test_runs_past_their_deadline_are_skipped():
+    clock = FakeClock(1_000_000.0)
+    scheduler = make_scheduler(clock)
+    runs = []
+    scheduler.add_job("deadline", lambda: runs.append(clock.now), 100, overrun=OverrunPolicy.SKIP, deadline=50, align=True)
+
+    clock.now = 1_000_070.0
+    scheduler.run_due_blocking()
+    assert runs == [] and scheduler.stats()["deadline"].skipped == 1
+    assert scheduler.stats()["deadline"].next_run == 1_000_100.0
+
+    clock.now = 1_000_120.0
+    scheduler.run_due_blocking()
+    assert runs == [1_000_120.0]
+    assert scheduler.stats()["deadline"].last_lateness == 20
+
+
+def test_job_can_request_its_next_run_time_and_failures_are_counted():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+
+    def retry_soon():
+        return clock.now + 5.0
+
+    def failing():
+        raise RuntimeError("boom")
+
+    scheduler.add_job("retry", retry_soon, 600)
+    scheduler.add_job("failing", failing, 60)
+    scheduler.run_due_blocking()
+
+    stats = scheduler.stats()
+    assert stats["retry"].next_run == clock.now + 5
+    assert stats["failing"].runs == 1 and stats["failing"].failures == 1
+    assert stats["failing"].next_run == clock.now + 60
+
+
+def test_jitter_delays_fire_times_up_to_the_limit():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    scheduler.add_job("jittered", lambda: None, 60, jitter=10)
+    for _ in range(20):
+        clock.now = scheduler.stats()["jittered"].next_run
+        fire_time = clock.now
+        scheduler.run_due_blocking()
+        assert fire_time + 60 <= scheduler.stats()["jittered"].next_run <= fire_time + 70
+
+
+def test_concurrent_run_due_never_runs_a_job_twice():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    runs = []
+
+    async def job():
+        runs.append(clock.now)
+        await asyncio.sleep(0.01)
+
+    scheduler.add_job("async", job, 60)
+
+    async def run_concurrently():
+        await asyncio.gather(*(scheduler.run_due() for _ in range(3)))
+
+    asyncio.run(run_concurrently())
+    assert len(runs) == 1
+    assert scheduler.stats()["async"].runs == 1
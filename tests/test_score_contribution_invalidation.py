@@ -0,0 +1,121 @@
+import datetime as dt
+from datetime import timedelta, timezone
+
+from common.constants import GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA
+from common.data import League, Match, Sport
+from common.timestamps import to_epoch_us
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+from vali_utils.odds_timeline import OddsTimeline
+from vali_utils.scoring_engine import LeagueScoringColumns, computed_contributions, score_league, scoring_params_key
+
+SCORING_KEY = scoring_params_key(GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA)
+MINERS = {0: "hk0", 1: "hk1"}
+
+
+def make_storage(tmp_path) -> SqliteValidatorStorage:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    # The zero probability hotfix deletes rows, skip it
+    (tmp_path / "hotfix.txt").write_text("done")
+    storage.initialize()
+    return storage
+
+
+def make_match(match_date: dt.datetime, home_odds: float = 1.8, home_score: int = 2) -> Match:
+    return Match(
+        matchId="match", matchDate=match_date, sport=Sport.SOCCER, league=League.EPL, isComplete=True,
+        homeTeamName="H", awayTeamName="A", homeTeamScore=home_score, awayTeamScore=1,
+        homeTeamOdds=home_odds, awayTeamOdds=4.2, drawOdds=3.4,
+    )
+
+
+def seed(storage: SqliteValidatorStorage) -> dt.datetime:
+    """A completed match with odds from 10 hours before, and scored predictions made 4 hours and 1 hour before it."""
+    now = dt.datetime.now(timezone.utc).replace(microsecond=0)
+    match_date = now - timedelta(hours=3)
+    storage.upsert_matches([make_match(match_date)])
+    storage.insert_match_odds([("match", 1.7, 4.4, 3.5, match_date - timedelta(hours=10))])
+    with storage._writer() as connection:
+        for uid, hours in [(0, 4), (1, 1)]:
+            prediction_date = match_date - timedelta(hours=hours)
+            connection.execute(
+                """INSERT INTO MatchPredictions (minerId, hotkey, matchId, matchDate, sport, league, homeTeamName, awayTeamName,
+                   isScored, lastUpdated, predictionDate, probabilityChoice, probability, closingEdge, matchDateUs, predictionDateUs)
+                   VALUES (?, ?, 'match', ?, 1, ?, 'H', 'A', 1, ?, ?, 'HomeTeam', 0.6, 0.4, ?, ?)""",
+                (uid, MINERS[uid], match_date, League.EPL.value, now, prediction_date,
+                 to_epoch_us(match_date), to_epoch_us(prediction_date)),
+            )
+    return match_date
+
+
+def score(storage: SqliteValidatorStorage):
+    """One incentive scoring pass as in prepare_league_scoring_input, persisting the contributions it computed."""
+    score_inputs_version = storage.get_score_inputs_version()
+    predictions = storage.get_league_miner_match_predictions(League.EPL, MINERS, 10)
+    cached = storage.get_prediction_score_contributions(
+        [row.prediction.predictionId for rows in predictions.values() for row in rows], SCORING_KEY
+    )
+    odds_timeline = OddsTimeline.from_rows(storage.get_match_odds_for_matches(["match"]))
+    columns = LeagueScoringColumns.from_predictions(League.EPL, predictions, odds_timeline, cached)
+    result = score_league(columns, len(MINERS), GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, 0)
+    contributions = computed_contributions(columns, result)
+    storage.upsert_prediction_score_contributions(contributions, SCORING_KEY, score_inputs_version)
+    return result.total_scores.tolist(), len(contributions)
+
+
+def stored_contributions(storage: SqliteValidatorStorage):
+    return storage.get_prediction_score_contributions([1, 2], SCORING_KEY)
+
+
+def test_odds_synced_after_scoring_change_the_score(tmp_path):
+    storage = make_storage(tmp_path)
+    match_date = seed(storage)
+    totals, computed = score(storage)
+    assert computed == 2
+    assert score(storage) == (totals, 0)
+
+    # Odds synced late only invalidate the predictions made after them. Odds from 2 hours before the match change the
+    # prediction made 1 hour before, odds from 5 hours before change the prediction made 4 hours before as well.
+    storage.insert_match_odds([("match", 2.4, 3.1, 3.3, match_date - timedelta(hours=2))])
+    assert set(stored_contributions(storage)) == {1}
+    storage.insert_match_odds([("match", 2.1, 3.6, 3.3, match_date - timedelta(hours=5))])
+    assert stored_contributions(storage) == {}
+    rescored, computed = score(storage)
+    assert computed == 2
+    assert rescored != totals
+
+    # The same result as scoring from scratch
+    with storage._writer() as connection:
+        connection.execute("DELETE FROM MatchPredictionScores")
+    assert score(storage) == (rescored, 2)
+
+
+def test_match_updates_only_invalidate_changed_results_and_closing_odds(tmp_path):
+    storage = make_storage(tmp_path)
+    match_date = seed(storage)
+    totals, _ = score(storage)
+
+    storage.upsert_matches([make_match(match_date)])
+    assert len(stored_contributions(storage)) == 2
+
+    storage.upsert_matches([make_match(match_date, home_odds=1.9)])
+    assert stored_contributions(storage) == {}
+    rescored, computed = score(storage)
+    assert computed == 2 and rescored != totals
+
+    storage.upsert_matches([make_match(match_date, home_odds=1.9, home_score=0)])
+    assert stored_contributions(storage) == {}
+
+
+def test_contributions_computed_before_a_change_are_not_stored(tmp_path):
+    storage = make_storage(tmp_path)
+    match_date = seed(storage)
+    score_inputs_version = storage.get_score_inputs_version()
+
+    # Odds arrive while a scoring pass computes contributions from the previous ones
+    storage.insert_match_odds([("match", 2.1, 3.6, 3.3, match_date - timedelta(hours=5))])
+    assert not storage.upsert_prediction_score_contributions([(1, 0.5), (2, 0.25)], SCORING_KEY, score_inputs_version)
+    assert stored_contributions(storage) == {}
+    assert storage.upsert_prediction_score_contributions([(1, 0.5)], SCORING_KEY, storage.get_score_inputs_version())
+    assert stored_contributions(storage) == {1: 0.5}
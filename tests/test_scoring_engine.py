@@ -0,0 +1,207 @@
+import random
+import datetime as dt
+
+import numpy as np
+import pytest
+
+from common.data import League, Sport, MatchPrediction, MatchPredictionWithMatchData, ProbabilityChoice
+from common.constants import (
+    MAX_PREDICTION_DAYS_THRESHOLD,
+    MAX_GFILTER_FOR_WRONG_PREDICTION,
+    MIN_GFILTER_FOR_UNDERDOG_PREDICTION,
+    LEAGUES_ALLOWING_DRAWS,
+    ROI_BET_AMOUNT,
+    ROI_INCR_PRED_COUNT_PERCENTAGE,
+    GAMMA,
+    TRANSITION_KAPPA,
+    EXTREMIS_BETA,
+)
+from vali_utils.odds_timeline import OddsTimeline
+from vali_utils.scoring_engine import LeagueScoringColumns, score_league, computed_contributions
+from vali_utils.scoring_utils import calculate_clv, calculate_incentive_score, apply_gaussian_filter
+
+NUM_MINERS = 12
+NUM_MATCHES = 40
+ROLLING_THRESHOLD = 30
+
+
+def build_league(league: League, seed: int):
+    """Random predictions and odds, including matches without odds, zero closing odds and draws."""
+    rng = random.Random(seed)
+    start = dt.datetime(2024, 10, 1, 12, 0, 0)
+    matches, odds_rows = [], []
+    for i in range(NUM_MATCHES):
+        match_id = f"match_{i}"
+        match_date = start + dt.timedelta(hours=i * 7, microseconds=rng.randrange(1_000_000))
+        home_odds, away_odds = round(rng.uniform(1.2, 4.5), 2), round(rng.uniform(1.2, 4.5), 2)
+        draw_odds = round(rng.uniform(2.5, 5.0), 2) if league in LEAGUES_ALLOWING_DRAWS else 0.0
+        if i % 13 == 0:
+            home_odds = 0.0  # closing odds anomaly
+        scores = rng.choice([(2, 1), (0, 3), (1, 1)] if league in LEAGUES_ALLOWING_DRAWS else [(101, 99), (95, 110)])
+        matches.append((match_id, match_date, home_odds, away_odds, draw_odds, scores))
+        if i % 11 == 5:
+            continue  # no odds synced for this match
+        for j in range(rng.randrange(1, 12)):
+            odds_time = match_date - dt.timedelta(minutes=rng.randrange(0, 2000))
+            odds_rows.append((match_id, rng.choice([None, round(rng.uniform(1.2, 4.5), 2)]),
+                              round(rng.uniform(1.2, 4.5), 2), round(rng.uniform(2.5, 5.0), 2), odds_time))
+
+    choices = [ProbabilityChoice.HOMETEAM, ProbabilityChoice.AWAYTEAM]
+    if league in LEAGUES_ALLOWING_DRAWS:
+        choices.append(ProbabilityChoice.DRAW)
+
+    predictions_by_index = {}
+    prediction_id = 0
+    for index in range(NUM_MINERS):
+        predictions = []
+        for _ in range(rng.randrange(0, 2 * ROLLING_THRESHOLD)):
+            match_id, match_date, home_odds, away_odds, draw_odds, (home_score, away_score) = rng.choice(matches)
+            prediction_date = match_date - dt.timedelta(minutes=rng.choice([5, 200, 700, 1400, 3000]), seconds=rng.randrange(60))
+            if rng.random() < 0.5:
+                prediction_date = prediction_date.replace(tzinfo=dt.timezone.utc)
+            prediction_id += 1
+            prediction = MatchPrediction(
+                predictionId=prediction_id, minerId=index, hotkey=f"hotkey_{index}", predictionDate=prediction_date, matchId=match_id,
+                matchDate=match_date, sport=Sport.SOCCER if league in LEAGUES_ALLOWING_DRAWS else Sport.BASKETBALL,
+                league=league, isScored=True, homeTeamName="Home", awayTeamName="Away",
+                probabilityChoice=rng.choice(choices), probability=round(rng.uniform(0.15, 0.9), 4),
+                closingEdge=rng.uniform(-1.5, 1.5),
+            )
+            predictions.append(MatchPredictionWithMatchData(
+                prediction=prediction, actualHomeTeamScore=home_score, actualAwayTeamScore=away_score,
+                homeTeamOdds=home_odds, awayTeamOdds=away_odds, drawOdds=draw_odds,
+            ))
+        # Most recent first, as loaded from storage
+        predictions.sort(key=lambda p: p.prediction.predictionDate.replace(tzinfo=None), reverse=True)
+        predictions_by_index[index] = predictions
+
+    return predictions_by_index, odds_rows
+
+
+def score_league_scalar(predictions_by_index, odds_rows, roi_incr_count):
+    """The per-prediction loop from calculate_incentives_and_update_scores, on the scalar scoring functions."""
+    totals = {}
+    for index, predictions in predictions_by_index.items():
+        total_score, wins, roi_count, roi_payout, market_payout = 0, 0, 0, 0.0, 0.0
+        incr = (0, 0.0, 0.0)
+        for pwmd in predictions:
+            match_odds = [row for row in odds_rows if row[0] == pwmd.prediction.matchId]
+            if not match_odds:
+                continue
+            if pwmd.get_closing_odds_for_predicted_outcome() == 0:
+                continue
+            if pwmd.prediction.get_predicted_team() == pwmd.get_actual_winner():
+                wins += 1
+            roi_count += 1
+            if pwmd.prediction.get_predicted_team() == pwmd.get_actual_winner():
+                roi_payout += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds() - 1)
+            else:
+                roi_payout -= ROI_BET_AMOUNT
+            if pwmd.actualHomeTeamScore > pwmd.actualAwayTeamScore and pwmd.homeTeamOdds < pwmd.awayTeamOdds:
+                market_payout += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds() - 1)
+            elif pwmd.actualAwayTeamScore > pwmd.actualHomeTeamScore and pwmd.awayTeamOdds < pwmd.homeTeamOdds:
+                market_payout += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds() - 1)
+            elif pwmd.actualHomeTeamScore == pwmd.actualAwayTeamScore and pwmd.drawOdds < pwmd.homeTeamOdds and pwmd.drawOdds < pwmd.awayTeamOdds:
+                market_payout += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds() - 1)
+            else:
+                market_payout -= ROI_BET_AMOUNT
+            if roi_count == roi_incr_count:
+                incr = (roi_count, roi_payout, market_payout)
+
+            match_date = pwmd.prediction.matchDate.replace(tzinfo=dt.timezone.utc) if pwmd.prediction.matchDate.tzinfo is None else pwmd.prediction.matchDate
+            prediction_date = pwmd.prediction.predictionDate.replace(tzinfo=dt.timezone.utc) if pwmd.prediction.predictionDate.tzinfo is None else pwmd.prediction.predictionDate
+            delta_t = min(MAX_PREDICTION_DAYS_THRESHOLD * 24 * 60, (match_date - prediction_date).total_seconds() / 60)
+
+            clv = calculate_clv(match_odds, pwmd)
+            if clv is None:
+                continue
+            v = calculate_incentive_score(delta_t=delta_t, clv=clv, gamma=GAMMA, kappa=TRANSITION_KAPPA, beta=EXTREMIS_BETA)
+            sigma = pwmd.prediction.closingEdge
+            gfilter = apply_gaussian_filter(pwmd)
+            if pwmd.is_prediction_for_underdog(LEAGUES_ALLOWING_DRAWS) and pwmd.get_closing_odds_for_predicted_outcome() > (1 / pwmd.prediction.probability):
+                gfilter = max(MIN_GFILTER_FOR_UNDERDOG_PREDICTION, gfilter)
+            elif pwmd.prediction.get_predicted_team() != pwmd.get_actual_winner() and round(gfilter, 4) > 0 and round(gfilter, 4) < 1 and sigma < 0:
+                gfilter = max(MAX_GFILTER_FOR_WRONG_PREDICTION, gfilter)
+            total_score += v * sigma * gfilter
+
+        totals[index] = (total_score, len(predictions), wins, roi_count, roi_payout, market_payout) + incr
+    return totals
+
+
+@pytest.mark.parametrize("league,seed", [(League.NBA, 1), (League.EPL, 2), (League.EPL, 3)])
+def test_score_league_matches_scalar_loop(league, seed):
+    predictions_by_index, odds_rows = build_league(league, seed)
+    roi_incr_count = round(ROLLING_THRESHOLD * ROI_INCR_PRED_COUNT_PERCENTAGE, 0)
+
+    expected = score_league_scalar(predictions_by_index, odds_rows, roi_incr_count)
+    columns = LeagueScoringColumns.from_predictions(league, predictions_by_index, OddsTimeline.from_rows(odds_rows))
+    result = score_league(columns, NUM_MINERS, GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, roi_incr_count)
+
+    for index in range(NUM_MINERS):
+        total, count, wins, roi_count, roi_payout, market_payout, incr_count, incr_payout, incr_market_payout = expected[index]
+        # Counts and ROI payouts involve no transcendental functions and must match exactly
+        assert result.pred_counts[index] == count
+        assert result.pred_win_counts[index] == wins
+        assert result.roi_counts[index] == roi_count
+        assert result.roi_payouts[index] == roi_payout
+        assert result.roi_market_payouts[index] == market_payout
+        assert result.roi_incr_counts[index] == incr_count
+        assert result.roi_incr_payouts[index] == incr_payout
+        assert result.roi_incr_market_payouts[index] == incr_market_payout
+        # The engine uses math.exp and accumulates in row order, so edge score totals match bit for bit too
+        assert result.total_scores[index] == total
+
+
+@pytest.mark.parametrize("league,seed", [(League.NBA, 4), (League.EPL, 5)])
+def test_score_league_with_cached_contributions(league, seed):
+    predictions_by_index, odds_rows = build_league(league, seed)
+    roi_incr_count = round(ROLLING_THRESHOLD * ROI_INCR_PRED_COUNT_PERCENTAGE, 0)
+    odds_timeline = OddsTimeline.from_rows(odds_rows)
+
+    columns = LeagueScoringColumns.from_predictions(league, predictions_by_index, odds_timeline)
+    uncached = score_league(columns, NUM_MINERS, GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, roi_incr_count)
+    contributions = computed_contributions(columns, uncached)
+    assert len(contributions) == (uncached.computed & ~uncached.missing_odds).sum()
+
+    # Cache half of the contributions, as if some predictions were scored before a restart
+    cached_contributions = dict(contributions[::2])
+    columns = LeagueScoringColumns.from_predictions(league, predictions_by_index, odds_timeline, cached_contributions)
+    cached = score_league(columns, NUM_MINERS, GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, roi_incr_count)
+
+    assert not cached.computed[columns.cached].any()
+    assert sorted(computed_contributions(columns, cached)) == sorted(contributions[1::2])
+    np.testing.assert_array_equal(cached.total_scores, uncached.total_scores)
+    np.testing.assert_array_equal(cached.missing_odds, uncached.missing_odds)
+    for attribute in ["pred_counts", "pred_win_counts", "roi_counts", "roi_payouts", "roi_market_payouts",
+                      "roi_incr_counts", "roi_incr_payouts", "roi_incr_market_payouts"]:
+        np.testing.assert_array_equal(getattr(cached, attribute), getattr(uncached, attribute))
+
+
+def test_missing_odds_contribution_is_computed_once_odds_are_synced():
+    predictions_by_index, _ = build_league(League.EPL, 6)
+    pwmd = next(p for predictions in predictions_by_index.values() for p in predictions if p.homeTeamOdds > 0)
+    prediction = pwmd.prediction
+    prediction_date = prediction.predictionDate.replace(tzinfo=None)
+    predictions_by_index = {0: [pwmd]}
+    roi_incr_count = round(ROLLING_THRESHOLD * ROI_INCR_PRED_COUNT_PERCENTAGE, 0)
+
+    # The match has odds, but none from before the prediction
+    odds_rows = [(prediction.matchId, 2.0, 2.5, 3.0, prediction_date + dt.timedelta(minutes=1))]
+    columns = LeagueScoringColumns.from_predictions(League.EPL, predictions_by_index, OddsTimeline.from_rows(odds_rows))
+    result = score_league(columns, 1, GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, roi_incr_count)
+    assert result.missing_odds.all()
+    contributions = computed_contributions(columns, result)
+    assert contributions == []
+
+    # Odds from before the prediction are synced later. A contribution persisted as None by older versions is ignored.
+    odds_rows.append((prediction.matchId, 2.1, 2.4, 3.1, prediction_date - dt.timedelta(minutes=1)))
+    cached_contributions = dict(contributions)
+    cached_contributions[prediction.predictionId] = None
+    columns = LeagueScoringColumns.from_predictions(
+        League.EPL, predictions_by_index, OddsTimeline.from_rows(odds_rows), cached_contributions
+    )
+    result = score_league(columns, 1, GAMMA, TRANSITION_KAPPA, EXTREMIS_BETA, roi_incr_count)
+    assert not result.missing_odds.any()
+    contributions = computed_contributions(columns, result)
+    assert [prediction_id for prediction_id, _ in contributions] == [prediction.predictionId]
+    assert result.total_scores[0] == contributions[0][1]
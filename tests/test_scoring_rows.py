@@ -0,0 +1,37 @@
+import pickle
+
+import pytest
+
+from common.constants import LEAGUES_ALLOWING_DRAWS
+from common.data import MatchPrediction, ScoringRow
+from tests.bench_scoring_rows import build_pydantic, build_rows, build_scoring_rows
+
+ACCESSORS = ["get_closing_odds_for_predicted_outcome", "get_actual_winner", "get_actual_winner_odds", "get_actual_loser_odds"]
+
+
+def test_scoring_rows_match_the_pydantic_models():
+    rows = build_rows(500)
+    for pwmd, scoring_row in zip(build_pydantic(rows), build_scoring_rows(rows)):
+        assert scoring_row.prediction.get_predicted_team() == pwmd.prediction.get_predicted_team()
+        for accessor in ACCESSORS:
+            assert getattr(scoring_row, accessor)() == getattr(pwmd, accessor)()
+        assert scoring_row.is_prediction_for_underdog(LEAGUES_ALLOWING_DRAWS) == pwmd.is_prediction_for_underdog(LEAGUES_ALLOWING_DRAWS)
+        assert scoring_row.prediction.to_dict() == pwmd.prediction.__dict__
+        for field in ["actualHomeTeamScore", "actualAwayTeamScore", "homeTeamOdds", "awayTeamOdds", "drawOdds"]:
+            assert getattr(scoring_row, field) == getattr(pwmd, field)
+
+
+def test_scoring_rows_are_slotted_and_picklable():
+    [row] = build_rows(1)
+    scoring_row = ScoringRow.from_row(row)
+    assert not hasattr(scoring_row, "__dict__") and not hasattr(scoring_row.prediction, "__dict__")
+    with pytest.raises(AttributeError):
+        scoring_row.prediction.unknownField = 1
+
+    # Scoring sets closingEdge before storing and posting the prediction
+    scoring_row.prediction.closingEdge = 0.25
+    copy = pickle.loads(pickle.dumps(scoring_row))
+    assert copy.prediction.closingEdge == 0.25
+    assert copy.prediction.to_dict() == scoring_row.prediction.to_dict()
+    # The posted dict validates as a MatchPrediction
+    assert MatchPrediction(**copy.prediction.to_dict()).predictionId == row[0]
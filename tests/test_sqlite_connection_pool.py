@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+
+import pytest
+
+from storage.sqlite_connection_pool import SqliteConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = SqliteConnectionPool(str(tmp_path / "pool.db"), timeout=1.0)
+    with pool.writer() as connection:
+        connection.execute("CREATE TABLE Items (id INTEGER PRIMARY KEY, name TEXT)")
+        connection.execute("INSERT INTO Items (name) VALUES ('committed')")
+    yield pool
+    pool.close()
+
+
+def read_names(pool):
+    with pool.reader() as connection:
+        return [row[0] for row in connection.execute("SELECT name FROM Items ORDER BY id")]
+
+
+def in_thread(func):
+    """Runs func on a new thread and returns its result or raises its exception."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "reader blocked"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def test_database_is_in_wal_mode(pool):
+    with pool.reader() as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_reader_reads_while_writer_holds_a_transaction(pool):
+    with pool.writer() as connection:
+        connection.execute("INSERT INTO Items (name) VALUES ('uncommitted')")
+        # The write lock is held, but a reader on another thread neither waits for it nor sees the open transaction
+        assert in_thread(lambda: read_names(pool)) == ["committed"]
+    assert in_thread(lambda: read_names(pool)) == ["committed", "uncommitted"]
+
+
+def test_write_through_a_reader_fails(pool):
+    with pool.reader() as connection:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            connection.execute("INSERT INTO Items (name) VALUES ('from reader')")
+    assert read_names(pool) == ["committed"]
+
+
+def test_readers_are_per_thread(pool):
+    with pool.reader() as first, pool.reader() as second:
+        assert first is second
+    with pool.reader() as connection:
+        assert in_thread(lambda: pool.reader().__enter__()) is not connection
+
+
+def test_writer_rolls_back_on_error(pool):
+    with pytest.raises(RuntimeError):
+        with pool.writer() as connection:
+            connection.execute("INSERT INTO Items (name) VALUES ('rolled back')")
+            raise RuntimeError("failed")
+    assert read_names(pool) == ["committed"]
+
+    # Nested writer blocks join the outer transaction
+    with pool.writer() as outer:
+        outer.execute("INSERT INTO Items (name) VALUES ('outer')")
+        with pool.writer() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO Items (name) VALUES ('inner')")
+    assert read_names(pool) == ["committed", "outer", "inner"]
@@ -0,0 +1,184 @@
+import asyncio
+import datetime as dt
+from typing import Any, Dict, List, Optional
+
+import pytest
+from aiohttp import ClientError
+
+from common.constants import MAX_PREDICTION_DAYS_THRESHOLD, SCORING_CUTOFF_IN_DAYS, SYNC_WATERMARK_OVERLAP_IN_MINUTES
+from common.timestamps import to_epoch_us
+from storage.sqlite_validator_storage import SqliteValidatorStorage
+import vali_utils.utils as utils
+
+MATCHES_URL = "https://api.test/matches"
+MATCH_ODDS_URL = "https://api.test/matchOdds"
+WATERMARK = dt.datetime(2024, 10, 1, 12, 0, 0)
+OVERLAP = dt.timedelta(minutes=SYNC_WATERMARK_OVERLAP_IN_MINUTES)
+
+
+class FakeApiClient:
+    """Returns the queued responses from get_json in order, raising the queued exceptions. Records the params sent."""
+
+    def __init__(self, *responses: Any):
+        self.responses = list(responses)
+        self.params: List[Optional[Dict]] = []
+
+    async def get_json(self, url, params=None, auth=None, timeout=None):
+        self.params.append(params)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch) -> SqliteValidatorStorage:
+    storage = SqliteValidatorStorage()
+    storage.DATABASE_FILE = str(tmp_path / "validator.db")
+    storage.HOTFIX_ZERO_PROB_MARKER_FILE = str(tmp_path / "hotfix.txt")
+    # The zero probability hotfix deletes rows, skip it
+    (tmp_path / "hotfix.txt").write_text("done")
+    storage.initialize()
+    monkeypatch.setattr(utils, "storage", storage)
+    return storage
+
+
+def match_item(match_id: str) -> Dict:
+    """A match as returned by the API /matches endpoint."""
+    return {
+        "matchId": match_id, "matchDate": "2024-10-02T18:00:00", "sport": 1, "matchLeague": "English Premier League",
+        "homeTeamName": "H", "awayTeamName": "A", "homeTeamScore": None, "awayTeamScore": None,
+        "homeTeamOdds": 1.8, "awayTeamOdds": 4.2, "drawOdds": 3.4, "isComplete": False,
+    }
+
+
+def odds_item(match_id: str, last_updated: str) -> Dict:
+    """An odds row as returned by the API /matchOdds endpoint."""
+    return {"matchId": match_id, "homeTeamOdds": 1.8, "awayTeamOdds": 4.2, "drawOdds": 3.4, "lastUpdated": last_updated}
+
+
+def sync_matches(api_client: FakeApiClient) -> bool:
+    return asyncio.run(utils.sync_match_data(api_client, MATCHES_URL))
+
+
+def sync_match_odds(api_client: FakeApiClient) -> bool:
+    return asyncio.run(utils.sync_match_odds_data(api_client, MATCH_ODDS_URL))
+
+
+@pytest.mark.parametrize("watermark, expected", [
+    ("2024-10-01T12:00:00", WATERMARK),
+    ("2024-10-01T12:00:00.250000", WATERMARK.replace(microsecond=250000)),
+    ("2024-10-01T12:00:00+00:00", WATERMARK),
+    ("2024-10-01T14:30:00+02:30", WATERMARK),
+    ("2024-10-01T07:00:00-05:00", WATERMARK),
+])
+def test_watermarks_are_stored_as_naive_utc(storage, watermark, expected):
+    utils.store_sync_watermark(utils.MATCHES_SYNC_WATERMARK, {"watermark": watermark})
+    stored = storage.get_sync_watermark(utils.MATCHES_SYNC_WATERMARK)
+    assert stored == expected and stored.tzinfo is None
+    assert utils.get_sync_since(utils.MATCHES_SYNC_WATERMARK) == expected - OVERLAP
+
+
+def test_responses_without_a_watermark_keep_the_previous_one(storage):
+    assert utils.get_sync_since(utils.MATCHES_SYNC_WATERMARK) is None
+    utils.store_sync_watermark(utils.MATCHES_SYNC_WATERMARK, {"watermark": "2024-10-01T12:00:00"})
+    utils.store_sync_watermark(utils.MATCHES_SYNC_WATERMARK, {"matches": []})
+    utils.store_sync_watermark(utils.MATCHES_SYNC_WATERMARK, {"watermark": None})
+    assert storage.get_sync_watermark(utils.MATCHES_SYNC_WATERMARK) == WATERMARK
+    # Each sync has its own watermark
+    assert utils.get_sync_since(utils.MATCH_ODDS_SYNC_WATERMARK) is None
+
+
+def test_match_sync_requests_everything_first_then_since_the_watermark_overlap(storage):
+    api_client = FakeApiClient(
+        {"matches": [match_item("a"), match_item("b")], "watermark": "2024-10-01T12:00:00"},
+        {"matches": [match_item("b")], "watermark": "2024-10-01T12:05:00"},
+    )
+
+    assert sync_matches(api_client)
+    assert sync_matches(api_client)
+
+    assert api_client.params == [{}, {"since": (WATERMARK - OVERLAP).isoformat()}]
+    assert storage.get_sync_watermark(utils.MATCHES_SYNC_WATERMARK) == WATERMARK + dt.timedelta(minutes=5)
+    assert storage.check_match("a") and storage.check_match("b")
+
+
+def test_match_watermark_does_not_advance_when_the_sync_fails(storage, monkeypatch):
+    utils.store_sync_watermark(utils.MATCHES_SYNC_WATERMARK, {"watermark": "2024-10-01T12:00:00"})
+    since = {"since": (WATERMARK - OVERLAP).isoformat()}
+
+    def fail_upsert(matches):
+        raise RuntimeError("database is locked")
+
+    api_client = FakeApiClient(ClientError("unavailable"), {"watermark": "2024-10-01T13:00:00"})
+    assert not sync_matches(api_client)
+    assert not sync_matches(api_client)
+    monkeypatch.setattr(storage, "upsert_matches", fail_upsert)
+    api_client.responses.append({"matches": [match_item("a")], "watermark": "2024-10-01T13:00:00"})
+    assert not sync_matches(api_client)
+
+    assert api_client.params == [since, since, since]
+    assert storage.get_sync_watermark(utils.MATCHES_SYNC_WATERMARK) == WATERMARK
+
+
+def test_first_odds_sync_requests_the_scoring_window(storage):
+    api_client = FakeApiClient({"match_odds": [], "watermark": "2024-10-01T12:00:00"}, {"match_odds": []})
+    before = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+    assert sync_match_odds(api_client)
+    since = dt.datetime.fromisoformat(api_client.params[0]["since"])
+    window = dt.timedelta(days=SCORING_CUTOFF_IN_DAYS + MAX_PREDICTION_DAYS_THRESHOLD)
+    assert since.tzinfo is None
+    assert before - window <= since <= dt.datetime.now(dt.timezone.utc).replace(tzinfo=None) - window
+
+    # Then since the watermark overlap
+    assert sync_match_odds(api_client)
+    assert api_client.params[1] == {"since": (WATERMARK - OVERLAP).isoformat()}
+
+
+def test_odds_in_the_overlap_are_not_inserted_again(storage, monkeypatch):
+    storage.insert_match_odds([("a", 1.8, 4.2, 3.4, dt.datetime(2024, 10, 1, 11, 30))])
+    utils.store_sync_watermark(utils.MATCH_ODDS_SYNC_WATERMARK, {"watermark": "2024-10-01T12:00:00"})
+    inserted = []
+    insert_match_odds = storage.insert_match_odds
+    monkeypatch.setattr(storage, "insert_match_odds", lambda rows: inserted.extend(rows) or insert_match_odds(rows))
+
+    api_client = FakeApiClient({
+        "match_odds": [
+            odds_item("a", "2024-10-01T11:30:00"),
+            odds_item("a", "2024-10-01T12:10:00"),
+            odds_item("b", "2024-10-01T11:30:00"),
+            # Returned twice in the same response
+            odds_item("a", "2024-10-01T12:10:00"),
+        ],
+        "watermark": "2024-10-01T12:15:00",
+    })
+    assert sync_match_odds(api_client)
+
+    assert [(match_id, last_updated) for match_id, _, _, _, last_updated in inserted] == [
+        ("a", dt.datetime(2024, 10, 1, 12, 10)),
+        ("b", dt.datetime(2024, 10, 1, 11, 30)),
+    ]
+    assert storage.get_match_odds_timestamps(["a", "b"]) == {
+        ("a", to_epoch_us(dt.datetime(2024, 10, 1, 11, 30))),
+        ("a", to_epoch_us(dt.datetime(2024, 10, 1, 12, 10))),
+        ("b", to_epoch_us(dt.datetime(2024, 10, 1, 11, 30))),
+    }
+    assert storage.get_sync_watermark(utils.MATCH_ODDS_SYNC_WATERMARK) == WATERMARK + dt.timedelta(minutes=15)
+
+
+def test_odds_watermark_does_not_advance_when_the_sync_fails(storage):
+    utils.store_sync_watermark(utils.MATCH_ODDS_SYNC_WATERMARK, {"watermark": "2024-10-01T12:00:00"})
+    api_client = FakeApiClient(
+        asyncio.TimeoutError(),
+        {"watermark": "2024-10-01T13:00:00"},
+        # An odds row without lastUpdated fails the whole sync, so it is requested again
+        {"match_odds": [odds_item("a", "2024-10-01T12:10:00"), {"matchId": "b"}], "watermark": "2024-10-01T13:00:00"},
+    )
+
+    assert not sync_match_odds(api_client)
+    assert not sync_match_odds(api_client)
+    assert not sync_match_odds(api_client)
+
+    assert storage.get_sync_watermark(utils.MATCH_ODDS_SYNC_WATERMARK) == WATERMARK
+    assert storage.get_match_odds_timestamps(["a", "b"]) == set()
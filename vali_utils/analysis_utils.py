@@ -1,26 +1,277 @@
 import math
+from array import array
 from collections import defaultdict
-from typing import List
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime, timezone
 
-from common.data import MatchPredictionWithMatchData
+from common.data import MatchPrediction, ScoringRow
 from common.constants import COPYCAT_VARIANCE_THRESHOLD, EXACT_MATCH_PREDICTIONS_THRESHOLD, SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD
-  
+
+# Only predictions made within this many seconds of each other are compared
+PREDICTION_WINDOW_SECONDS = 3600
+# Bump when the similar pair criteria change so persisted copycat pairs are recomputed
+COPYCAT_ANALYSIS_VERSION = 1
+
+
+class RelationshipStore:
+    """
+    Compact history of similar prediction pairs found during one copycat analysis.
+
+    Every similar pair is an entry in parallel arrays holding the directed miner pair index, the match index, the indexes
+    of both predictions and the two difference scores. History dicts are only built when a RelationshipHistory is read.
+    """
+
+    def __init__(self):
+        self.predictions: List[MatchPrediction] = []
+        self.match_ids: List[str] = []
+        # Directed (pred1 miner, pred2 miner) pairs, in the order they were first seen
+        self.pair_index: Dict[Tuple[int, int], int] = {}
+        self.pair_miners: List[Tuple[int, int]] = []
+        # First-seen rank of each pred1 miner, to visit pairs in the order a nested miner1 -> miner2 mapping would
+        self.miner_rank: Dict[int, int] = {}
+
+        self.entry_pair = array('i')
+        self.entry_match = array('i')
+        self.entry_pred1 = array('i')
+        self.entry_pred2 = array('i')
+        self.entry_difference = array('d')
+        self.entry_absolute_difference = array('d')
+
+    def __len__(self) -> int:
+        return len(self.entry_pair)
+
+    def add_match(self, match_id: str, match_predictions: List[MatchPrediction]) -> Tuple[int, int]:
+        """Stores the predictions for a match. Returns the match index and the offset of its first prediction."""
+        match_index = len(self.match_ids)
+        offset = len(self.predictions)
+        self.match_ids.append(match_id)
+        self.predictions.extend(match_predictions)
+        return match_index, offset
+
+    def add_entry(self, match_index: int, pred1_index: int, pred2_index: int, difference: float):
+        """Records a similar pair of predictions, by their global prediction indexes."""
+        miner1 = self.predictions[pred1_index].minerId
+        miner2 = self.predictions[pred2_index].minerId
+        pair = self.pair_index.get((miner1, miner2))
+        if pair is None:
+            pair = len(self.pair_miners)
+            self.pair_index[(miner1, miner2)] = pair
+            self.pair_miners.append((miner1, miner2))
+            self.miner_rank.setdefault(miner1, len(self.miner_rank))
+
+        self.entry_pair.append(pair)
+        self.entry_match.append(match_index)
+        self.entry_pred1.append(pred1_index)
+        self.entry_pred2.append(pred2_index)
+        self.entry_difference.append(difference)
+        self.entry_absolute_difference.append(
+            round(abs(self.predictions[pred1_index].probability - self.predictions[pred2_index].probability), 4)
+        )
+
+    def entry(self, index: int) -> dict:
+        """Builds the history dict for an entry."""
+        pred1 = self.predictions[self.entry_pred1[index]]
+        pred2 = self.predictions[self.entry_pred2[index]]
+        return {
+            'match_id': self.match_ids[self.entry_match[index]],
+            'match_date': pred1.matchDate,
+            'difference': self.entry_difference[index],
+            'absolute_difference': self.entry_absolute_difference[index],
+            'choice': pred1.probabilityChoice,
+            'prob1': pred1.probability,
+            'prob2': pred2.probability,
+            'pred1_date': format_prediction_date(pred1.predictionDate),
+            'pred2_date': format_prediction_date(pred2.predictionDate)
+        }
+
+
+class CopycatPairState:
+    """
+    Similar prediction pairs persisted from previous copycat analysis passes.
+
+    Pairs only ever involve two predictions for the same match, so a match whose predictions were all compared in an
+    earlier pass reuses its stored pairs. Matches with a prediction that was not compared yet are compared again, and the
+    pairs and newly compared predictions are collected so the caller can persist them.
+    """
+
+    def __init__(self, compared_prediction_ids: Set[int] = None, pairs: Iterable[Tuple[int, int]] = None):
+        self.compared_prediction_ids = compared_prediction_ids if compared_prediction_ids is not None else set()
+        self.pairs = list(pairs) if pairs is not None else []
+        # Filled during analysis
+        self.new_pairs: List[Tuple[int, int]] = []
+        self.new_compared_prediction_ids: List[int] = []
+        self.num_reused_matches = 0
+        self.num_compared_matches = 0
+
+    def is_compared(self, match_predictions: List[MatchPrediction]) -> bool:
+        """Whether every prediction for the match was compared in an earlier pass."""
+        return all(pred.predictionId in self.compared_prediction_ids for pred in match_predictions)
+
+    def pairs_by_match(self, matches: Dict[str, List[MatchPrediction]]) -> Dict[str, List[Tuple[int, int]]]:
+        """Groups the stored pairs by the match of their predictions."""
+        prediction_matches = {pred.predictionId: match_id for match_id, match_predictions in matches.items() for pred in match_predictions}
+        pairs = defaultdict(list)
+        for predictionId1, predictionId2 in self.pairs:
+            match_id = prediction_matches.get(predictionId1)
+            if match_id is not None:
+                pairs[match_id].append((predictionId1, predictionId2))
+        return pairs
+
+    def record_match(self, match_predictions: List[MatchPrediction], pairs: List[Tuple[int, int, float]]):
+        """Records the similar pairs found by comparing all predictions for a match."""
+        self.num_compared_matches += 1
+        self.new_pairs.extend((match_predictions[i].predictionId, match_predictions[j].predictionId) for i, j, _ in pairs)
+        for pred in match_predictions:
+            if pred.predictionId not in self.compared_prediction_ids:
+                self.compared_prediction_ids.add(pred.predictionId)
+                self.new_compared_prediction_ids.append(pred.predictionId)
+
+
+class RelationshipHistory(Sequence):
+    """Read-only list of history dicts for a set of RelationshipStore entries. Dicts are built on access."""
+
+    __slots__ = ("store", "entries")
+
+    def __init__(self, store: RelationshipStore, entries: array):
+        self.store = store
+        self.entries = entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RelationshipHistory(self.store, self.entries[index])
+        return self.store.entry(self.entries[index])
+
+    def __repr__(self) -> str:
+        return f"RelationshipHistory({len(self.entries)} entries)"
+
+    @property
+    def match_ids(self) -> List[str]:
+        return [self.store.match_ids[self.store.entry_match[entry]] for entry in self.entries]
+
+    @property
+    def differences(self) -> List[float]:
+        return [self.store.entry_difference[entry] for entry in self.entries]
+
+    @property
+    def absolute_differences(self) -> List[float]:
+        return [self.store.entry_absolute_difference[entry] for entry in self.entries]
+
+
+def format_prediction_date(prediction_date: datetime) -> str:
+    """Formats a prediction date for copycat history output, treating naive datetimes as UTC."""
+    if prediction_date.tzinfo is None:
+        prediction_date = prediction_date.replace(tzinfo=timezone.utc)
+    return prediction_date.strftime('%Y-%m-%d %H:%M:%S')
+
+
 
 class StatisticalAnalyzer:
     def __init__(self, variance_threshold: float = COPYCAT_VARIANCE_THRESHOLD, min_suspicious_matches: int = EXACT_MATCH_PREDICTIONS_THRESHOLD):
         self.variance_threshold = variance_threshold
         self.min_suspicious_matches = min_suspicious_matches
+        self.max_probability_difference = self.get_max_probability_difference(variance_threshold)
+
+    @staticmethod
+    def get_max_probability_difference(variance_threshold: float) -> float:
+        """
+        Largest probability difference that can still pass the variance threshold.
+
+        The difference score is round(exp(-(100 * delta) ** 2), 2), which is at least the threshold only if
+        exp(-(100 * delta) ** 2) >= threshold - 0.005. Slightly widened so float rounding never excludes a valid pair.
+        """
+        lower_bound = variance_threshold - 0.005
+        if lower_bound <= 0:
+            return math.inf
+        if lower_bound >= 1:
+            return 1e-9
+        return math.sqrt(-math.log(lower_bound)) / 100 + 1e-9
+
+    @property
+    def analysis_key(self) -> str:
+        """Identifies the similar pair criteria that persisted copycat pairs were computed with."""
+        return f"v{COPYCAT_ANALYSIS_VERSION}:{self.variance_threshold!r}:{PREDICTION_WINDOW_SECONDS}"
+
+    @staticmethod
+    def get_difference(pred1: MatchPrediction, pred2: MatchPrediction) -> float:
+        """Similarity score of two probabilities, 1 for identical predictions."""
+        return round(math.exp(-(pred1.probability*100 - pred2.probability*100) ** 2), 2)
+
+    def find_stored_prediction_pairs(self, match_predictions: list, stored_pairs: List[Tuple[int, int]]) -> List[Tuple[int, int, float]]:
+        """
+        Map similar pairs persisted by an earlier pass onto the predictions for a match.
+
+        :param match_predictions: MatchPredictions for a single match
+        :param stored_pairs: List of (predictionId1, predictionId2) for the match
+        :return: List of (i, j, difference) as returned by find_similar_prediction_pairs, skipping pairs with a prediction no longer analyzed
+        """
+        indexes = {pred.predictionId: index for index, pred in enumerate(match_predictions)}
+        pairs = []
+        for predictionId1, predictionId2 in stored_pairs:
+            index1, index2 = indexes.get(predictionId1), indexes.get(predictionId2)
+            if index1 is None or index2 is None:
+                continue
+            i, j = (index1, index2) if index1 < index2 else (index2, index1)
+            pairs.append((i, j, self.get_difference(match_predictions[i], match_predictions[j])))
+
+        pairs.sort()
+        return pairs
+
+    def find_similar_prediction_pairs(self, match_predictions: list) -> List[Tuple[int, int, float]]:
+        """
+        Find all pairs of predictions for a match that are by different miners, have the same choice, were made within
+        an hour of each other and pass the variance threshold.
+
+        Predictions are bucketed by choice and sorted by probability, so only neighbours within the maximum probability
+        difference are compared instead of every pair.
+
+        :param match_predictions: MatchPredictions for a single match
+        :return: List of (i, j, difference) with i < j indexes into match_predictions, in (i, j) order
+        """
+        buckets = defaultdict(list)
+        for index, pred in enumerate(match_predictions):
+            # Integer epoch microseconds keep the window comparison exact
+            buckets[pred.probabilityChoice].append((pred.probability, pred.predictionDateUs, pred.minerId, index))
+
+        window = PREDICTION_WINDOW_SECONDS * 1_000_000
+        pairs = []
+        for bucket in buckets.values():
+            bucket.sort()
+            for a in range(len(bucket)):
+                prob_a, time_a, miner_a, index_a = bucket[a]
+                for b in range(a + 1, len(bucket)):
+                    prob_b, time_b, miner_b, index_b = bucket[b]
+                    if prob_b - prob_a > self.max_probability_difference:
+                        break
+                    if miner_a == miner_b or abs(time_a - time_b) > window:
+                        continue
+
+                    i, j = (index_a, index_b) if index_a < index_b else (index_b, index_a)
+                    pred1, pred2 = match_predictions[i], match_predictions[j]
+                    difference = self.get_difference(pred1, pred2)
+                    if difference < self.variance_threshold:
+                        continue
+                    pairs.append((i, j, difference))
+
+        pairs.sort()
+        return pairs
 
     def analyze_prediction_clusters(
         self,
-        predictions: list[MatchPredictionWithMatchData],
+        predictions: list[ScoringRow],
         ordered_matches: List[tuple[str, datetime]],
-        excluded_miners: set[int] = None
+        excluded_miners: set[int] = None,
+        pair_state: Optional[CopycatPairState] = None
     ) -> dict[str, list[tuple]]:
         """
         Analyze predictions to find statistically suspicious clusters.
         Returns groups of miners that show unnaturally low variance in their differences.
+
+        If pair_state is provided, matches whose predictions were all compared in an earlier pass reuse the stored
+        similar pairs, and the pairs of the matches compared now are recorded in it. Otherwise every match is compared.
         """
         # Group predictions by match
         matches = defaultdict(list)
@@ -30,64 +281,31 @@ class StatisticalAnalyzer:
                 continue
             matches[pred.prediction.matchId].append(pred.prediction)
 
+        stored_pairs = pair_state.pairs_by_match(matches) if pair_state is not None else {}
+
         # Track miner relationships over time
-        miner_relationships = defaultdict(lambda: defaultdict(list))
+        store = RelationshipStore()
 
         for match_id, match_predictions in matches.items():
-            if len(match_predictions) < 2:
-                continue
-
-            # Calculate all pairwise differences for this match
-            for i in range(len(match_predictions)):
-                for j in range(i + 1, len(match_predictions)):
-                    # Skip comparisons between the same miner
-                    if match_predictions[i].minerId == match_predictions[j].minerId:
-                        continue
-
-                    pred1 = match_predictions[i]
-                    pred2 = match_predictions[j]
-                    
-                    # Only compare predictions with same choice
-                    if pred1.probabilityChoice != pred2.probabilityChoice:
-                        continue
-
-                    # Ensure pred1.predictionDate is offset-aware
-                    if pred1.predictionDate.tzinfo is None:
-                        pred1_predictionDate = pred1.predictionDate.replace(tzinfo=timezone.utc)
-                    else:
-                        pred1_predictionDate = pred1.predictionDate
+            if pair_state is None:
+                pairs = self.find_similar_prediction_pairs(match_predictions) if len(match_predictions) >= 2 else []
+            elif pair_state.is_compared(match_predictions):
+                pair_state.num_reused_matches += 1
+                pairs = self.find_stored_prediction_pairs(match_predictions, stored_pairs.get(match_id, []))
+            else:
+                pairs = self.find_similar_prediction_pairs(match_predictions) if len(match_predictions) >= 2 else []
+                pair_state.record_match(match_predictions, pairs)
 
-                    # Ensure pred2.predictionDate is offset-aware
-                    if pred2.predictionDate.tzinfo is None:
-                        pred2_predictionDate = pred2.predictionDate.replace(tzinfo=timezone.utc)
-                    else:
-                        pred2_predictionDate = pred2.predictionDate
+            if not pairs:
+                continue
 
-                    # Only compare if predictions are within 1 hour of each other
-                    if abs((pred1_predictionDate - pred2_predictionDate).total_seconds()) > 3600:
-                        continue
-                    
-                    absolute_difference = round(abs(pred1.probability - pred2.probability), 4)
-                    difference = round(math.exp(-(pred1.probability*100 - pred2.probability*100) ** 2), 2)
-                    
-                    if difference < self.variance_threshold:
-                        continue
-                    
-                    # Track the difference between these miners
-                    miner_relationships[pred1.minerId][pred2.minerId].append({
-                        'match_id': match_id,
-                        'match_date': pred1.matchDate,
-                        'difference': difference,
-                        'absolute_difference': absolute_difference,
-                        'choice': pred1.probabilityChoice,
-                        'prob1': pred1.probability,
-                        'prob2': pred2.probability,
-                        'pred1_date': pred1_predictionDate.strftime('%Y-%m-%d %H:%M:%S'),
-                        'pred2_date': pred2_predictionDate.strftime('%Y-%m-%d %H:%M:%S')
-                    })
+            match_index, offset = store.add_match(match_id, match_predictions)
+            # Candidate pairs are in the same order an all-pairs comparison would visit them
+            for i, j, difference in pairs:
+                store.add_entry(match_index, offset + i, offset + j, difference)
 
         # Analyze the relationships
-        suspicious_relationships = self.analyze_miner_relationships(miner_relationships)
+        suspicious_relationships = self.analyze_miner_relationships(store)
 
         # Add consecutive match analysis
         consecutive_patterns = self.analyze_consecutive_matches(suspicious_relationships, ordered_matches)
@@ -101,47 +319,71 @@ class StatisticalAnalyzer:
     
     def analyze_miner_relationships(
         self,
-        relationships: dict
+        store: RelationshipStore
     ) -> dict[str, list[tuple]]:
         """
         Analyze the history of differences between miners to find suspicious patterns.
         
         Args:
-            relationships: Dictionary mapping miner pairs to their prediction history
+            store: RelationshipStore with the similar prediction pairs of every miner pair
             
         Returns:
             Dictionary of suspicious relationships with details about matching predictions
         """
         suspicious_relationships = {}
-        
-        for miner1, related_miners in relationships.items():
-            for miner2, history in related_miners.items():
-                # Skip if we've already analyzed this pair
-                relationship_key = '_'.join(sorted([str(miner1), str(miner2)]))
-                if relationship_key in suspicious_relationships:
-                    continue
-                
-                # Get unique matches where predictions are similar
-                suspicious_matches = set(h['match_id'] for h in history)
-                if len(suspicious_matches) < self.min_suspicious_matches:
-                    continue
-                
-                # Calculate predictions per match for additional context
-                predictions_per_match = round(len(history) / len(suspicious_matches), 2)
 
-                # Calculate the number of matches with exact predictions
-                num_matches_with_exact = len(set(h['match_id'] for h in history if h['absolute_difference'] == 0))
-                
-                suspicious_relationships[relationship_key] = {
-                    'miners': sorted([miner1, miner2]),  # Sort for consistency
-                    'num_matches': len(suspicious_matches),
-                    'num_predictions': len(history),
-                    'predictions_per_match': predictions_per_match,
-                    'match_ids': list(suspicious_matches),  # Store match IDs for reference
-                    'num_matches_with_exact': num_matches_with_exact,
-                    'num_exact_predictions': sum(1 for h in history if h['absolute_difference'] == 0),
-                    'history': history
-                }
+        num_pairs = len(store.pair_miners)
+        num_predictions = [0] * num_pairs
+        num_matches = [0] * num_pairs
+        num_exact_predictions = [0] * num_pairs
+        num_matches_with_exact = [0] * num_pairs
+        last_match = [-1] * num_pairs
+        last_exact_match = [-1] * num_pairs
+
+        # Entries are added match by match, so a pair's match indexes never decrease
+        for pair, match_index, absolute_difference in zip(store.entry_pair, store.entry_match, store.entry_absolute_difference):
+            num_predictions[pair] += 1
+            if last_match[pair] != match_index:
+                last_match[pair] = match_index
+                num_matches[pair] += 1
+            if absolute_difference == 0:
+                num_exact_predictions[pair] += 1
+                if last_exact_match[pair] != match_index:
+                    last_exact_match[pair] = match_index
+                    num_matches_with_exact[pair] += 1
+
+        candidate_entries = {
+            pair: array('i') for pair in range(num_pairs) if num_matches[pair] >= self.min_suspicious_matches
+        }
+        if not candidate_entries:
+            return suspicious_relationships
+
+        for entry, pair in enumerate(store.entry_pair):
+            if pair in candidate_entries:
+                candidate_entries[pair].append(entry)
+
+        for pair in sorted(candidate_entries, key=lambda pair: (store.miner_rank[store.pair_miners[pair][0]], pair)):
+            miner1, miner2 = store.pair_miners[pair]
+            # Skip if we've already analyzed this pair
+            relationship_key = '_'.join(sorted([str(miner1), str(miner2)]))
+            if relationship_key in suspicious_relationships:
+                continue
+
+            history = RelationshipHistory(store, candidate_entries[pair])
+            # Get unique matches where predictions are similar
+            suspicious_matches = set(history.match_ids)
+
+            suspicious_relationships[relationship_key] = {
+                'miners': sorted([miner1, miner2]),  # Sort for consistency
+                'num_matches': num_matches[pair],
+                'num_predictions': num_predictions[pair],
+                # Predictions per match for additional context
+                'predictions_per_match': round(num_predictions[pair] / num_matches[pair], 2),
+                'match_ids': list(suspicious_matches),  # Store match IDs for reference
+                'num_matches_with_exact': num_matches_with_exact[pair],
+                'num_exact_predictions': num_exact_predictions[pair],
+                'history': history
+            }
                         
         return suspicious_relationships
     
@@ -166,64 +408,65 @@ class StatisticalAnalyzer:
             return consecutive_patterns
         
         for key, relationship in relationships.items():
-            # Create a mapping of match_id to prediction details
-            match_predictions = defaultdict(list)
-            for pred in relationship['history']:
-                # Skip if we've already analyzed this match
-                if pred['match_id'] not in match_predictions:
-                    match_predictions[pred['match_id']].append(pred)
+            history = relationship['history']
+            store = history.store
+            # Map each match to the first similar prediction pair for it
+            match_entries = {}
+            for entry in history.entries:
+                match_entries.setdefault(store.match_ids[store.entry_match[entry]], entry)
             
             current_streak = 0
             max_streak = 0
             streak_details = []
-            current_streak_details = []
+            current_streak_entries = array('i')
             last_match_index = None
             
             # Iterate through matches in chronological order
             for match_idx, (match_id, _) in enumerate(ordered_matches):
-                if match_id not in match_predictions:
+                entry = match_entries.get(match_id)
+                if entry is None:
                     # If we hit a match without predictions, check if we need to save the current streak
                     if current_streak >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:
-                        streak_details.append(current_streak_details)
+                        streak_details.append(RelationshipHistory(store, current_streak_entries))
                     current_streak = 0
-                    current_streak_details = []
+                    current_streak_entries = array('i')
                     continue
                 
                 # Check if this match is consecutive with the last one
                 if last_match_index is not None and match_idx != last_match_index + 1:
                     # Break in consecutive matches
                     if current_streak >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:
-                        streak_details.append(current_streak_details)
+                        streak_details.append(RelationshipHistory(store, current_streak_entries))
                     current_streak = 0
-                    current_streak_details = []
+                    current_streak_entries = array('i')
                 
                 # Add current match to streak
                 current_streak += 1
-                current_streak_details.extend(match_predictions[match_id])
+                current_streak_entries.append(entry)
                 max_streak = max(max_streak, current_streak)
                 last_match_index = match_idx
             
             # Check final streak
             if current_streak >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:
-                streak_details.append(current_streak_details)
+                streak_details.append(RelationshipHistory(store, current_streak_entries))
             
             if max_streak >= SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD:  # Only store if we found meaningful streaks
                 consecutive_patterns[key] = {
                     'miners': relationship['miners'],
                     'max_consecutive': max_streak,
-                    'total_matches': len(match_predictions),
+                    'total_matches': len(match_entries),
                     'num_streaks': len(streak_details),
                     'streak_details': streak_details,
                     'exact_matches_in_streaks': sum(
                         1 for streak in streak_details 
-                        for match in streak if match['difference'] == 0
+                        for difference in streak.differences if difference == 0
                     ),
                     'average_streak_length': (
                         sum(len(streak) for streak in streak_details) / len(streak_details)
                         if streak_details else 0
                     ),
                     'streak_match_ids': [
-                        [match['match_id'] for match in streak]
+                        streak.match_ids
                         for streak in streak_details
                     ]
                 }
@@ -0,0 +1,152 @@
+import asyncio
+import gzip
+import json
+import random
+import threading
+from typing import Any, Dict, Optional
+
+import bittensor as bt
+from aiohttp import BasicAuth, ClientConnectionError, ClientResponseError, ClientSession, ClientTimeout, TCPConnector
+
+from common.constants import (
+    API_REQUEST_TIMEOUT,
+    API_MAX_RETRIES,
+    API_RETRY_BACKOFF_BASE_IN_SECONDS,
+    API_RETRY_BACKOFF_MAX_IN_SECONDS,
+    API_CONNECTION_LIMIT,
+    API_KEEPALIVE_TIMEOUT,
+    API_COMPRESS_REQUESTS_MIN_BYTES,
+)
+
+# Statuses worth retrying: rate limiting and server side errors
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class ApiClient:
+    """
+    Shared HTTP client for the Sportstensor API calls of a validator.
+
+    One aiohttp session, with a keep-alive connection pool, runs on a private event loop thread. The forward loop and
+    the weight setting thread, each with their own event loop, await requests on it, so connections and TLS sessions are
+    reused across every sync and post instead of being set up per call.
+
+    JSON request bodies over API_COMPRESS_REQUESTS_MIN_BYTES are gzipped. Responses are decompressed by aiohttp, which
+    accepts gzip and deflate, and br when the brotli package is installed. Connection errors, timeouts and retryable
+    statuses are retried with exponential backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = API_MAX_RETRIES,
+        backoff_base: float = API_RETRY_BACKOFF_BASE_IN_SECONDS,
+        backoff_max: float = API_RETRY_BACKOFF_MAX_IN_SECONDS,
+        compress_min_bytes: Optional[int] = API_COMPRESS_REQUESTS_MIN_BYTES,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.compress_min_bytes = compress_min_bytes
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[ClientSession] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the client's event loop thread and session. Requests start the client if it is not running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="api-client", daemon=True)
+            self._thread.start()
+            self._session = asyncio.run_coroutine_threadsafe(self._create_session(), self._loop).result()
+
+    async def _create_session(self) -> ClientSession:
+        return ClientSession(
+            connector=TCPConnector(limit=API_CONNECTION_LIMIT, keepalive_timeout=API_KEEPALIVE_TIMEOUT),
+            timeout=ClientTimeout(total=API_REQUEST_TIMEOUT),
+        )
+
+    def close(self):
+        """Closes the session and stops the event loop thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop, self._thread, self._session = None, None, None
+
+    async def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        auth: Optional[BasicAuth] = None,
+        timeout: Optional[ClientTimeout] = None,
+    ) -> Any:
+        """GETs the url and returns the decoded JSON response. Raises the last error once retries are exhausted."""
+        return await self._submit(self._request("GET", url, params=params, auth=auth, timeout=timeout))
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Any,
+        auth: Optional[BasicAuth] = None,
+        timeout: Optional[ClientTimeout] = None,
+    ) -> Any:
+        """POSTs the payload as JSON and returns the decoded JSON response, or None if the response is not JSON."""
+        return await self._submit(self._request("POST", url, payload=payload, auth=auth, timeout=timeout))
+
+    async def _submit(self, coroutine) -> Any:
+        """Runs the request on the client's event loop and waits for it on the caller's event loop."""
+        self.start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, self._loop))
+
+    def _encode(self, payload: Any) -> tuple:
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.compress_min_bytes is not None and len(body) >= self.compress_min_bytes:
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        return body, headers
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps validators that failed together from retrying together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Any = None,
+        auth: Optional[BasicAuth] = None,
+        timeout: Optional[ClientTimeout] = None,
+    ) -> Any:
+        body, headers = self._encode(payload) if payload is not None else (None, None)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._session.request(
+                    method, url, params=params, data=body, headers=headers, auth=auth, timeout=timeout
+                ) as response:
+                    retry_after = response.headers.get("Retry-After")
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (ClientConnectionError, ClientResponseError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, ClientResponseError) or e.status in RETRY_STATUSES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, retry_after)
+                attempt += 1
+                bt.logging.warning(
+                    f"{method} {url} failed: {e}. Retrying in {delay:.1f}s ({attempt}/{self.max_retries})."
+                )
+                await asyncio.sleep(delay)
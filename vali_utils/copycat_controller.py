@@ -6,12 +6,12 @@ from collections import defaultdict
 
 import bittensor as bt
 
-from common.data import League, MatchPredictionWithMatchData
+from common.data import League, ScoringRow
 from common.constants import (
     EXACT_MATCH_PREDICTIONS_THRESHOLD,
     SUSPICIOUS_CONSECUTIVE_MATCHES_THRESHOLD
 )
-from vali_utils.analysis_utils import StatisticalAnalyzer
+from vali_utils.analysis_utils import StatisticalAnalyzer, CopycatPairState
 
 
 class CopycatDetectionController:
@@ -24,8 +24,9 @@ class CopycatDetectionController:
     def analyze_league(
         self,
         league: League,
-        league_predictions: List[MatchPredictionWithMatchData] = None,
-        ordered_matches: List[tuple[str, datetime]] = None
+        league_predictions: List[ScoringRow] = None,
+        ordered_matches: List[tuple[str, datetime]] = None,
+        pair_state: CopycatPairState = None
     ) -> tuple[Set[int], Set[int], Set[int]]:
         """
         Analyze a specific league for duplicate predictions and copycat patterns.
@@ -33,6 +34,9 @@ class CopycatDetectionController:
         Args:
             league: League to analyze
             league_predictions: list of predictions with match data to analyze.
+            ordered_matches: list of (match_id, match_date) tuples in chronological order.
+            pair_state: similar prediction pairs persisted from earlier passes. Only matches with newly scored
+                predictions are compared again, and their pairs are recorded in it. None compares every match.
             
         Returns:
             Tuple of suspicious miner ids and miners to penalize.
@@ -45,7 +49,7 @@ class CopycatDetectionController:
         
         # Analyze statistical patterns for miner predictions
         cleared_miners = set()
-        suspicious_relationships = self.statistical_analyzer.analyze_prediction_clusters(league_predictions, ordered_matches, excluded_miners=cleared_miners)
+        suspicious_relationships = self.statistical_analyzer.analyze_prediction_clusters(league_predictions, ordered_matches, excluded_miners=cleared_miners, pair_state=pair_state)
 
         suspicious_miner_ids = set()
         miners_to_penalize = set()
@@ -86,12 +90,13 @@ class CopycatDetectionController:
         abs_diff_count = 0
         greatest_abs_diff = 0
         for key, value in suspicious_relationships.items():
-            for history in value['history']:
-                if history['absolute_difference'] > 0:
-                    abs_diff += history['absolute_difference']
+            # Read the differences directly so history entries are only formatted when printed
+            for absolute_difference in value['history'].absolute_differences:
+                if absolute_difference > 0:
+                    abs_diff += absolute_difference
                     abs_diff_count += 1
-                    if history['absolute_difference'] > greatest_abs_diff:
-                        greatest_abs_diff = history['absolute_difference']
+                    if absolute_difference > greatest_abs_diff:
+                        greatest_abs_diff = absolute_difference
             
             if value['num_exact_predictions'] >= EXACT_MATCH_PREDICTIONS_THRESHOLD or ('consecutive_patterns' in value and len(value['consecutive_patterns']['streak_details']) > 0):
                 print(f"\nMiners: {value['miners']}, Matches: {value['num_matches']}, Predictions: {value['num_predictions']}, Predictions per match: {value['predictions_per_match']}, Exact predictions: {value['num_exact_predictions']}")
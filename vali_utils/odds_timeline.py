@@ -0,0 +1,106 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from common.data import ProbabilityChoice
+from common.timestamps import TimestampValue, to_epoch_us
+
+
+class MatchOddsTimeline:
+    """Sorted odds history for a single match. Parallel arrays indexed by odds update, with UTC epoch microsecond times."""
+
+    __slots__ = ("times", "home", "away", "draw")
+
+    def __init__(self):
+        self.times: List[int] = []
+        self.home: List[Optional[float]] = []
+        self.away: List[Optional[float]] = []
+        self.draw: List[Optional[float]] = []
+
+    def odds_for_choice(self, probability_choice) -> Optional[List[Optional[float]]]:
+        if probability_choice in [ProbabilityChoice.HOMETEAM, ProbabilityChoice.HOMETEAM.value]:
+            return self.home
+        elif probability_choice in [ProbabilityChoice.AWAYTEAM, ProbabilityChoice.AWAYTEAM.value]:
+            return self.away
+        elif probability_choice in [ProbabilityChoice.DRAW, ProbabilityChoice.DRAW.value]:
+            return self.draw
+        return None
+
+
+class OddsTimeline:
+    """
+    In-memory index of match odds built once per scoring pass.
+
+    Maps matchId to sorted epoch microsecond timestamps plus home/away/draw odds arrays so that
+    "latest odds at or before t" is a bisect instead of a SQL query and a linear scan per prediction.
+    """
+
+    def __init__(self):
+        self._matches: Dict[str, MatchOddsTimeline] = {}
+
+    @classmethod
+    def from_rows(cls, match_odds: Iterable[Tuple[str, float, float, float, TimestampValue]]) -> "OddsTimeline":
+        """
+        Builds the index from MatchOdds rows.
+
+        :param match_odds: Iterable of tuples (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated), where
+            lastUpdated is the lastUpdatedUs epoch column or a datetime
+        """
+        rows_by_match: Dict[str, List[Tuple[int, Optional[float], Optional[float], Optional[float]]]] = {}
+        for matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated in match_odds:
+            rows_by_match.setdefault(matchId, []).append((to_epoch_us(lastUpdated), homeTeamOdds, awayTeamOdds, drawOdds))
+
+        timeline = cls()
+        for matchId, rows in rows_by_match.items():
+            # Stable sort keeps the original row order for equal timestamps
+            rows.sort(key=lambda row: row[0])
+            match_timeline = MatchOddsTimeline()
+            for epoch, home, away, draw in rows:
+                if match_timeline.times and match_timeline.times[-1] == epoch:
+                    # Collapse updates with the same timestamp, keeping the first available odds for each outcome
+                    if match_timeline.home[-1] is None:
+                        match_timeline.home[-1] = home
+                    if match_timeline.away[-1] is None:
+                        match_timeline.away[-1] = away
+                    if match_timeline.draw[-1] is None:
+                        match_timeline.draw[-1] = draw
+                    continue
+                match_timeline.times.append(epoch)
+                match_timeline.home.append(home)
+                match_timeline.away.append(away)
+                match_timeline.draw.append(draw)
+            timeline._matches[matchId] = match_timeline
+
+        return timeline
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def has_odds(self, matchId: str) -> bool:
+        """Whether any odds were loaded for the match."""
+        return matchId in self._matches
+
+    def closest_odds(self, matchId: str, prediction_time: TimestampValue, probability_choice) -> Optional[Tuple[float, int]]:
+        """
+        Find the latest odds for the chosen outcome at or before the prediction time.
+
+        :param matchId: The match to look up
+        :param prediction_time: UTC epoch microseconds of the prediction, or its DateTime
+        :param probability_choice: ProbabilityChoice selection of the prediction
+        :return: Tuple of (odds, odds epoch microseconds), or None if no suitable odds are found
+        """
+        match_timeline = self._matches.get(matchId)
+        if match_timeline is None:
+            return None
+
+        odds = match_timeline.odds_for_choice(probability_choice)
+        if odds is None:
+            return None  # invalid probability choice
+
+        index = bisect_right(match_timeline.times, to_epoch_us(prediction_time)) - 1
+        # Step back over updates that have no odds for this outcome
+        while index >= 0 and odds[index] is None:
+            index -= 1
+        if index < 0:
+            return None
+
+        return odds[index], match_timeline.times[index]
@@ -0,0 +1,158 @@
+import heapq
+import threading
+from datetime import timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from common.data import Match
+from common.timestamps import to_epoch
+
+
+class PredictionWindow(NamedTuple):
+    """A window before kick off in which miners are asked once for a prediction on a match."""
+
+    name: str
+    # MatchPredictionRequests column flagging the window as requested
+    column: str
+    # The window opens this long before the match and closes close_before it
+    open_before: timedelta
+    close_before: timedelta
+    display: str
+
+
+PREDICTION_WINDOWS = [
+    PredictionWindow("24_hour", "prediction_24_hour", timedelta(hours=24), timedelta(hours=23), "T-24h"),
+    PredictionWindow("12_hour", "prediction_12_hour", timedelta(hours=12), timedelta(hours=11), "T-12h"),
+    PredictionWindow("4_hour", "prediction_4_hour", timedelta(hours=4), timedelta(hours=3), "T-4h"),
+    PredictionWindow("10_min", "prediction_10_min", timedelta(minutes=10), timedelta(minutes=5), "T-10m"),
+]
+
+
+class PredictionWindowQueue:
+    """
+    Heap of prediction window fire times (matchDate - 24h/12h/4h/10m) of the upcoming matches.
+
+    Entries are never removed from the middle of the heap. When a match is rescheduled its windows are pushed again,
+    and entries whose match was rescheduled, completed or already requested are dropped when they reach the top.
+    Times are UTC epoch seconds.
+    """
+
+    def __init__(self):
+        self._matches: Dict[str, Match] = {}
+        # matchDate of every queued match, as epoch seconds. Heap entries for another matchDate are stale.
+        self._match_times: Dict[str, float] = {}
+        # Names of the windows already requested for each match. Kept after the match leaves the queue, so a resync
+        # of the match before kick off does not queue its requested windows again.
+        self._requested: Dict[str, Set[str]] = {}
+        # Index of the last window queued for each match. The match is dropped once it is popped.
+        self._last_windows: Dict[str, int] = {}
+        # (fire time, window index, matchId, matchDate epoch)
+        self._heap: List[Tuple[float, int, str, float]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def load(self, matches: Iterable[Match], requested: Dict[str, Dict[str, bool]], now: float):
+        """
+        Rebuilds the queue from stored matches and match prediction requests.
+
+        :param requested: Window flags by matchId, as returned by get_match_prediction_requests
+        """
+        with self._lock:
+            self._matches.clear()
+            self._match_times.clear()
+            self._last_windows.clear()
+            self._heap.clear()
+            self._requested = {
+                matchId: {name for name, is_requested in windows.items() if is_requested}
+                for matchId, windows in requested.items()
+            }
+            for match in matches:
+                self._add(match, now)
+            heapq.heapify(self._heap)
+
+    def update(self, matches: Iterable[Match], now: float):
+        """Applies synced matches. Rescheduled matches get their windows queued at the new fire times."""
+        with self._lock:
+            for match in matches:
+                if match.isComplete:
+                    self._remove(match.matchId)
+                    self._requested.pop(match.matchId, None)
+                    continue
+                match_time = to_epoch(match.matchDate)
+                if self._match_times.get(match.matchId) == match_time:
+                    # Same fire times. Keep the latest team names and league for the requests.
+                    self._matches[match.matchId] = match
+                    continue
+                entries = self._entries(match, match_time, now)
+                for entry in entries:
+                    heapq.heappush(self._heap, entry)
+                self._track(match, match_time, entries)
+
+    def _add(self, match: Match, now: float):
+        """Queues the open windows of a match without restoring the heap order. Callers must heapify."""
+        if match.isComplete:
+            return
+        match_time = to_epoch(match.matchDate)
+        entries = self._entries(match, match_time, now)
+        self._heap.extend(entries)
+        self._track(match, match_time, entries)
+
+    def _track(self, match: Match, match_time: float, entries: List[Tuple[float, int, str, float]]):
+        if not entries:
+            # Every window was requested or has closed
+            self._remove(match.matchId)
+            return
+        self._matches[match.matchId] = match
+        self._match_times[match.matchId] = match_time
+        self._last_windows[match.matchId] = entries[-1][1]
+
+    def _entries(self, match: Match, match_time: float, now: float) -> List[Tuple[float, int, str, float]]:
+        requested = self._requested.get(match.matchId, ())
+        return [
+            (match_time - window.open_before.total_seconds(), index, match.matchId, match_time)
+            for index, window in enumerate(PREDICTION_WINDOWS)
+            if window.name not in requested and match_time - window.close_before.total_seconds() > now
+        ]
+
+    def _remove(self, matchId: str):
+        self._matches.pop(matchId, None)
+        self._match_times.pop(matchId, None)
+        self._last_windows.pop(matchId, None)
+
+    def _is_stale(self, entry: Tuple[float, int, str, float]) -> bool:
+        _, index, matchId, match_time = entry
+        return (
+            self._match_times.get(matchId) != match_time
+            or PREDICTION_WINDOWS[index].name in self._requested.get(matchId, ())
+        )
+
+    def pop_due(self, now: float) -> List[Tuple[Match, PredictionWindow]]:
+        """
+        Pops the windows that are open now and marks them requested. Windows that closed before they were popped are
+        dropped, as are matches whose last window has been popped.
+        """
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if self._is_stale(entry):
+                    continue
+                _, index, matchId, match_time = entry
+                window = PREDICTION_WINDOWS[index]
+                if match_time - window.close_before.total_seconds() > now:
+                    self._requested.setdefault(matchId, set()).add(window.name)
+                    due.append((self._matches[matchId], window))
+                if index == self._last_windows[matchId]:
+                    self._remove(matchId)
+        return due
+
+    def peek(self) -> Optional[Tuple[float, Match, PredictionWindow]]:
+        """The next window to open as (fire time, match, window), or None if no window is queued."""
+        with self._lock:
+            while self._heap and self._is_stale(self._heap[0]):
+                heapq.heappop(self._heap)
+            if not self._heap:
+                return None
+            fire_time, index, matchId, _ = self._heap[0]
+            return fire_time, self._matches[matchId], PREDICTION_WINDOWS[index]
@@ -0,0 +1,240 @@
+import asyncio
+import enum
+import heapq
+import inspect
+import itertools
+import math
+import random
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import bittensor as bt
+
+
+class OverrunPolicy(enum.Enum):
+    """How a job is rescheduled after it runs."""
+
+    # Fixed delay: the next run is one interval after the previous run finished.
+    DELAY = "delay"
+    # Fixed rate: the next run is the first fire time on the job's grid after the previous run finished.
+    # Fire times that passed while the job was running are skipped and counted, never run back to back.
+    SKIP = "skip"
+
+
+@dataclass
+class JobStats:
+    """Timing stats of a scheduled job. Times are epoch seconds, durations and lateness are seconds."""
+
+    runs: int = 0
+    failures: int = 0
+    # Fire times dropped because the job overran them or started after its deadline
+    skipped: int = 0
+    total_duration: float = 0.0
+    last_duration: float = 0.0
+    max_duration: float = 0.0
+    # How long after its fire time the job started
+    last_lateness: float = 0.0
+    max_lateness: float = 0.0
+    last_started: Optional[float] = None
+    next_run: Optional[float] = None
+
+    @property
+    def mean_duration(self) -> float:
+        return self.total_duration / self.runs if self.runs else 0.0
+
+
+@dataclass
+class ScheduledJob:
+    """A periodic job. The function may return an epoch time (float) to run it next instead of following its interval."""
+
+    name: str
+    function: Callable[[], Any]
+    interval: float
+    overrun: OverrunPolicy
+    jitter: float
+    deadline: Optional[float]
+    # Start of the job's fixed rate grid
+    origin: float
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class Scheduler:
+    """
+    Heap of timed jobs, run by whoever owns the scheduler: the validator forward loop or a dedicated thread.
+
+    Due jobs are popped off the heap before they run, so concurrent callers never run the same job twice,
+    and callers can sleep until the next fire time instead of polling.
+    """
+
+    def __init__(self, name: str, clock: Callable[[], float] = time.time, rng: Optional[random.Random] = None):
+        self.name = name
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.jobs: Dict[str, ScheduledJob] = {}
+        # (fire time, sequence, job name). The sequence keeps jobs with the same fire time in the order they were added.
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add_job(
+        self,
+        name: str,
+        function: Callable[[], Any],
+        interval: float,
+        overrun: OverrunPolicy = OverrunPolicy.DELAY,
+        jitter: float = 0.0,
+        deadline: Optional[float] = None,
+        align: bool = False,
+        start: Optional[float] = None,
+    ):
+        """
+        Schedules a periodic job.
+
+        :param interval: Seconds between runs
+        :param overrun: How the next run is scheduled after a run
+        :param jitter: Random seconds, up to this many, added to every fire time to spread load
+        :param deadline: Seconds after its fire time after which a run is skipped rather than started late
+        :param align: Put the grid on multiples of interval since the epoch, i.e. the 30-minute marks for 1800
+        :param start: Epoch time of the first run. Defaults to now, or the next grid mark if aligned
+        """
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already scheduled.")
+        if interval <= 0:
+            raise ValueError(f"Job {name} interval must be positive.")
+
+        now = self.clock()
+        origin = math.ceil(now / interval) * interval if align else now
+        job = ScheduledJob(
+            name=name, function=function, interval=interval, overrun=overrun,
+            jitter=jitter, deadline=deadline, origin=origin,
+        )
+        with self._lock:
+            self.jobs[name] = job
+            self._push(job, origin if start is None else start)
+
+    def _push(self, job: ScheduledJob, fire_time: float):
+        if job.jitter > 0:
+            fire_time += self.rng.uniform(0, job.jitter)
+        job.stats.next_run = fire_time
+        heapq.heappush(self._heap, (fire_time, next(self._sequence), job.name))
+
+    def _next_grid_time(self, job: ScheduledJob, after: float) -> Tuple[float, int]:
+        """First fire time on the job's grid after the given time, and its index on the grid."""
+        periods = math.floor((after - job.origin) / job.interval) + 1
+        return job.origin + periods * job.interval, periods
+
+    def _reschedule(self, job: ScheduledJob, fire_time: float, finished: float, requested: Optional[float]):
+        if requested is not None:
+            next_time = max(requested, finished)
+        elif job.overrun == OverrunPolicy.SKIP:
+            next_time, periods = self._next_grid_time(job, finished)
+            _, fired_periods = self._next_grid_time(job, fire_time)
+            # Grid fire times between the one that ran and the next one were overrun
+            job.stats.skipped += max(0, periods - fired_periods)
+        else:
+            next_time = finished + job.interval
+        with self._lock:
+            self._push(job, next_time)
+
+    def seconds_until_next(self) -> Optional[float]:
+        """Seconds until the next job is due, 0 if one is already due, or None if no job is scheduled."""
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self._heap[0][0] - self.clock())
+
+    def _pop_due(self) -> Optional[Tuple[float, ScheduledJob]]:
+        with self._lock:
+            if not self._heap or self._heap[0][0] > self.clock():
+                return None
+            fire_time, _, name = heapq.heappop(self._heap)
+            job = self.jobs[name]
+            job.stats.next_run = None
+            return fire_time, job
+
+    def _start(self, job: ScheduledJob, fire_time: float) -> Optional[float]:
+        """Records the start of a run. Returns the start time, or None if the run missed its deadline and was skipped."""
+        started = self.clock()
+        lateness = started - fire_time
+        if job.deadline is not None and lateness > job.deadline:
+            bt.logging.warning(f"Skipping {self.name} job {job.name}, {lateness:.0f}s past its fire time.")
+            job.stats.skipped += 1
+            self._reschedule(job, fire_time, started, None)
+            return None
+        job.stats.last_lateness = lateness
+        job.stats.max_lateness = max(job.stats.max_lateness, lateness)
+        job.stats.last_started = started
+        return started
+
+    def _finish(self, job: ScheduledJob, fire_time: float, started: float, result: Any, failed: bool):
+        finished = self.clock()
+        duration = finished - started
+        stats = job.stats
+        stats.runs += 1
+        stats.failures += 1 if failed else 0
+        stats.total_duration += duration
+        stats.last_duration = duration
+        stats.max_duration = max(stats.max_duration, duration)
+        requested = result if isinstance(result, float) else None
+        self._reschedule(job, fire_time, finished, requested)
+
+    async def run_due(self):
+        """Runs every due job in fire time order. Coroutine functions are awaited."""
+        while (due := self._pop_due()) is not None:
+            fire_time, job = due
+            started = self._start(job, fire_time)
+            if started is None:
+                continue
+            result, failed = None, False
+            try:
+                result = job.function()
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                failed = True
+                bt.logging.error(f"Error running {self.name} job {job.name}: {e}")
+                bt.logging.debug(traceback.format_exc())
+            self._finish(job, fire_time, started, result, failed)
+
+    def run_due_blocking(self):
+        """Runs every due job in fire time order, on the calling thread. Coroutine functions are run to completion."""
+        while (due := self._pop_due()) is not None:
+            fire_time, job = due
+            started = self._start(job, fire_time)
+            if started is None:
+                continue
+            result, failed = None, False
+            try:
+                result = job.function()
+                if inspect.isawaitable(result):
+                    result = asyncio.run(result)
+            except Exception as e:
+                failed = True
+                bt.logging.error(f"Error running {self.name} job {job.name}: {e}")
+                bt.logging.debug(traceback.format_exc())
+            self._finish(job, fire_time, started, result, failed)
+
+    def run_forever(self, stop_event: threading.Event):
+        """Runs jobs as they come due on the calling thread, sleeping until the next fire time, until stop_event is set."""
+        while not stop_event.is_set():
+            self.run_due_blocking()
+            stop_event.wait(timeout=self.seconds_until_next())
+
+    def stats(self) -> Dict[str, JobStats]:
+        """Snapshot of the timing stats of every job."""
+        with self._lock:
+            return {name: replace(job.stats) for name, job in self.jobs.items()}
+
+    def format_stats(self) -> str:
+        lines = [f"{self.name} scheduler jobs:"]
+        for name, stats in self.stats().items():
+            next_run = f"in {stats.next_run - self.clock():.0f}s" if stats.next_run is not None else "running"
+            lines.append(
+                f"  {name}: runs={stats.runs} failures={stats.failures} skipped={stats.skipped} "
+                f"duration mean={stats.mean_duration:.2f}s max={stats.max_duration:.2f}s last={stats.last_duration:.2f}s "
+                f"lateness max={stats.max_lateness:.2f}s last={stats.last_lateness:.2f}s next {next_run}"
+            )
+        return "\n".join(lines)
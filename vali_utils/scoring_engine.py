@@ -0,0 +1,342 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from common.data import League, ScoringRow, ProbabilityChoice
+from common.constants import (
+    MAX_PREDICTION_DAYS_THRESHOLD,
+    MAX_GFILTER_FOR_WRONG_PREDICTION,
+    MIN_GFILTER_FOR_UNDERDOG_PREDICTION,
+    LEAGUES_ALLOWING_DRAWS,
+    ROI_BET_AMOUNT,
+)
+from vali_utils.odds_timeline import OddsTimeline
+
+# Integer codes for the predicted and actual outcome columns
+OUTCOME_HOME = 0
+OUTCOME_AWAY = 1
+OUTCOME_DRAW = 2
+OUTCOME_UNKNOWN = -1
+
+# Bump when the contribution formula changes so persisted contributions are recomputed
+SCORING_ENGINE_VERSION = 2
+
+CHOICE_CODES = {
+    ProbabilityChoice.HOMETEAM: OUTCOME_HOME,
+    ProbabilityChoice.HOMETEAM.value: OUTCOME_HOME,
+    ProbabilityChoice.AWAYTEAM: OUTCOME_AWAY,
+    ProbabilityChoice.AWAYTEAM.value: OUTCOME_AWAY,
+    ProbabilityChoice.DRAW: OUTCOME_DRAW,
+    ProbabilityChoice.DRAW.value: OUTCOME_DRAW,
+}
+
+
+def scoring_params_key(gamma: float, kappa: float, beta: float) -> str:
+    """Identifies the scoring controls a persisted score contribution was computed with."""
+    return f"v{SCORING_ENGINE_VERSION}:{gamma!r}:{kappa!r}:{beta!r}"
+
+
+class LeagueScoringColumns:
+    """
+    Columnar view of one league's scored predictions. Every attribute is a NumPy array with one entry per prediction.
+
+    Rows are grouped by miner in the same order as the per-miner prediction lists (most recent first),
+    so running per-miner counts match the order the scalar loop visits predictions in.
+    """
+
+    __slots__ = (
+        "league", "miner_index", "group_starts", "group_sizes", "match_ids", "prediction_ids", "cached", "cached_contribution",
+        "probability", "choice", "outcome", "closing_edge", "closing_odds", "prediction_odds",
+        "home_odds", "away_odds", "draw_odds", "minutes_to_match", "has_odds",
+    )
+
+    def __init__(self, league: League):
+        self.league = league
+
+    def __len__(self) -> int:
+        return len(self.probability)
+
+    @classmethod
+    def from_predictions(
+        cls,
+        league: League,
+        predictions_by_index: Dict[int, List[ScoringRow]],
+        odds_timeline: OddsTimeline,
+        cached_contributions: Optional[Dict[int, float]] = None,
+    ) -> "LeagueScoringColumns":
+        """
+        Extracts the scoring inputs from the prediction models in a single pass.
+
+        :param league: League the predictions belong to
+        :param predictions_by_index: Predictions keyed by the miner's index in the score arrays
+        :param odds_timeline: Odds index used to look up the odds at prediction time. Only needs odds for predictions without a cached contribution
+        :param cached_contributions: Persisted score contributions keyed by predictionId
+        """
+        cached_contributions = cached_contributions or {}
+        miner_index, group_starts, group_sizes, match_ids = [], [], [], []
+        prediction_ids, cached, cached_contribution = [], [], []
+        probability, choice, outcome, closing_edge = [], [], [], []
+        home_odds, away_odds, draw_odds, prediction_odds, has_odds = [], [], [], [], []
+        match_times, prediction_times = [], []
+
+        for index, predictions in predictions_by_index.items():
+            if not predictions:
+                continue
+            group_starts.append(len(probability))
+            group_sizes.append(len(predictions))
+            for pwmd in predictions:
+                prediction = pwmd.prediction
+                miner_index.append(index)
+                match_ids.append(prediction.matchId)
+                prediction_ids.append(prediction.predictionId)
+                probability.append(prediction.probability)
+                choice.append(CHOICE_CODES.get(prediction.probabilityChoice, OUTCOME_UNKNOWN))
+                closing_edge.append(prediction.closingEdge)
+                if pwmd.actualHomeTeamScore > pwmd.actualAwayTeamScore:
+                    outcome.append(OUTCOME_HOME)
+                elif pwmd.actualHomeTeamScore < pwmd.actualAwayTeamScore:
+                    outcome.append(OUTCOME_AWAY)
+                else:
+                    outcome.append(OUTCOME_DRAW)
+                home_odds.append(pwmd.homeTeamOdds)
+                away_odds.append(pwmd.awayTeamOdds)
+                draw_odds.append(pwmd.drawOdds)
+                match_times.append(prediction.matchDateUs)
+                prediction_times.append(prediction.predictionDateUs)
+
+                contribution = cached_contributions.get(prediction.predictionId)
+                if contribution is not None:
+                    # Already scored with the current controls. No odds lookup needed.
+                    cached.append(True)
+                    cached_contribution.append(contribution)
+                    has_odds.append(True)
+                    prediction_odds.append(np.nan)
+                    continue
+
+                cached.append(False)
+                cached_contribution.append(np.nan)
+                match_has_odds = odds_timeline.has_odds(prediction.matchId)
+                has_odds.append(match_has_odds)
+                closest = odds_timeline.closest_odds(prediction.matchId, prediction.predictionDateUs, prediction.probabilityChoice) if match_has_odds else None
+                prediction_odds.append(closest[0] if closest is not None else np.nan)
+
+        columns = cls(league)
+        columns.miner_index = np.array(miner_index, dtype=np.int64)
+        columns.group_starts = np.array(group_starts, dtype=np.int64)
+        columns.group_sizes = np.array(group_sizes, dtype=np.int64)
+        columns.match_ids = match_ids
+        columns.prediction_ids = np.array(prediction_ids, dtype=np.int64)
+        columns.cached = np.array(cached, dtype=bool)
+        columns.cached_contribution = np.array(cached_contribution, dtype=np.float64)
+        columns.probability = np.array(probability, dtype=np.float64)
+        columns.choice = np.array(choice, dtype=np.int8)
+        columns.outcome = np.array(outcome, dtype=np.int8)
+        columns.closing_edge = np.array(closing_edge, dtype=np.float64)
+        columns.home_odds = np.array(home_odds, dtype=np.float64)
+        columns.away_odds = np.array(away_odds, dtype=np.float64)
+        columns.draw_odds = np.array(draw_odds, dtype=np.float64)
+        columns.prediction_odds = np.array(prediction_odds, dtype=np.float64)
+        columns.has_odds = np.array(has_odds, dtype=bool)
+        # Integer epoch microsecond differences keep the time delta identical to timedelta.total_seconds()
+        delta = np.array(match_times, dtype=np.int64) - np.array(prediction_times, dtype=np.int64)
+        columns.minutes_to_match = delta / 1e6 / 60
+        # Closing odds for the predicted outcome. NaN when the choice is unknown.
+        columns.closing_odds = np.select(
+            [columns.choice == OUTCOME_HOME, columns.choice == OUTCOME_AWAY, columns.choice == OUTCOME_DRAW],
+            [columns.home_odds, columns.away_odds, columns.draw_odds],
+            default=np.nan,
+        )
+        return columns
+
+
+class LeagueScoringResult:
+    """Per-miner aggregates (indexed like the validator score arrays) and per-prediction components of a league scoring pass."""
+
+    def __init__(self, num_miners: int, num_rows: int):
+        self.total_scores = np.zeros(num_miners, dtype=np.float64)
+        self.pred_counts = np.zeros(num_miners, dtype=np.int64)
+        self.pred_win_counts = np.zeros(num_miners, dtype=np.int64)
+        self.roi_counts = np.zeros(num_miners, dtype=np.int64)
+        self.roi_payouts = np.zeros(num_miners, dtype=np.float64)
+        self.roi_market_payouts = np.zeros(num_miners, dtype=np.float64)
+        self.roi_incr_counts = np.zeros(num_miners, dtype=np.int64)
+        self.roi_incr_payouts = np.zeros(num_miners, dtype=np.float64)
+        self.roi_incr_market_payouts = np.zeros(num_miners, dtype=np.float64)
+
+        # Per-prediction components, NaN where the prediction was skipped
+        self.delta_t = np.full(num_rows, np.nan)
+        self.clv = np.full(num_rows, np.nan)
+        self.v = np.full(num_rows, np.nan)
+        self.gfilter = np.full(num_rows, np.nan)
+        self.contribution = np.full(num_rows, np.nan)
+        # Predictions that were counted towards ROI but could not be scored because odds were missing at prediction time
+        self.missing_odds = np.zeros(num_rows, dtype=bool)
+        # Predictions whose contribution was computed in this pass rather than read from the cache
+        self.computed = np.zeros(num_rows, dtype=bool)
+
+
+def gaussian_filter(closing_odds: np.ndarray, probability: np.ndarray) -> np.ndarray:
+    """Array version of scoring_utils.apply_gaussian_filter."""
+    t = 0.5
+    t2 = 0.05
+    a = 0.25
+    b = 0.3
+    c = 0.25
+    pwr = 1.1
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        implied_odds = 1 / probability
+        w = c - a * np.exp(-b * (closing_odds - 1))
+        diff = np.abs(closing_odds - implied_odds)
+        t = np.where(closing_odds < implied_odds, t2, t)
+        decay = np.exp(-(diff - w) / (t * np.power((closing_odds - 1), pwr)))
+    return np.where(diff <= w, 1.0, decay)
+
+
+def _exp(x: float) -> float:
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
+# np.exp can differ from math.exp in the last ulp, so the incentive score uses math.exp to match the scalar loop exactly
+_math_exp = np.frompyfunc(_exp, 1, 1)
+
+
+def exact_exp(x: np.ndarray) -> np.ndarray:
+    """math.exp of every element, inf where it overflows."""
+    return _math_exp(x).astype(np.float64)
+
+
+def incentive_score(delta_t: np.ndarray, clv: np.ndarray, gamma: float, kappa: float, beta: float) -> np.ndarray:
+    """Array version of scoring_utils.calculate_incentive_score, with identical results."""
+    time_component = exact_exp(-gamma * delta_t)
+    clv_component = (1 - (2 * beta)) / (1 + exact_exp(kappa * clv)) + beta
+    return time_component + (1 - time_component) * clv_component
+
+
+def score_league(columns: LeagueScoringColumns, num_miners: int, gamma: float, kappa: float, beta: float, roi_incr_count: float) -> LeagueScoringResult:
+    """
+    Computes the edge score sums, prediction counts and ROI payouts for every miner in a league.
+
+    Mirrors the per-prediction loop in calculate_incentives_and_update_scores. Sums are accumulated with np.add.at,
+    which adds in row order, so per-miner totals are accumulated in the same order as the scalar loop.
+    Rows with a cached contribution reuse it instead of recomputing v, sigma and gfilter.
+
+    :param columns: LeagueScoringColumns for the league
+    :param num_miners: Length of the validator score arrays
+    :param gamma: float, the time decay gamma
+    :param kappa: float, the transition kappa
+    :param beta: float, the extremis beta
+    :param roi_incr_count: Number of most recent ROI predictions that make up the incremental ROI
+    :return: LeagueScoringResult
+    """
+    result = LeagueScoringResult(num_miners, len(columns))
+    if len(columns) == 0:
+        return result
+
+    miner_index = columns.miner_index
+    closing_odds = columns.closing_odds
+    probability = columns.probability
+    np.add.at(result.pred_counts, columns.miner_index[columns.group_starts], columns.group_sizes)
+
+    # Predictions without any odds or with a closing odds anomaly are skipped entirely. Cached rows passed these checks when they were computed.
+    cached = columns.cached
+    counted = cached | (columns.has_odds & (closing_odds != 0))
+    correct = columns.choice == columns.outcome
+    np.add.at(result.pred_win_counts, miner_index[counted & correct], 1)
+    np.add.at(result.roi_counts, miner_index[counted], 1)
+
+    # ROI payout for the miner's pick and for always betting the market favorite
+    winner_odds = np.select(
+        [columns.outcome == OUTCOME_HOME, columns.outcome == OUTCOME_AWAY],
+        [columns.home_odds, columns.away_odds],
+        default=columns.draw_odds,
+    )
+    win_payout = ROI_BET_AMOUNT * (winner_odds - 1)
+    roi_payout = np.where(correct, win_payout, -ROI_BET_AMOUNT)
+    market_correct = (
+        ((columns.outcome == OUTCOME_HOME) & (columns.home_odds < columns.away_odds))
+        | ((columns.outcome == OUTCOME_AWAY) & (columns.away_odds < columns.home_odds))
+        | ((columns.outcome == OUTCOME_DRAW) & (columns.draw_odds < columns.home_odds) & (columns.draw_odds < columns.away_odds))
+    )
+    market_payout = np.where(market_correct, win_payout, -ROI_BET_AMOUNT)
+    np.add.at(result.roi_payouts, miner_index[counted], roi_payout[counted])
+    np.add.at(result.roi_market_payouts, miner_index[counted], market_payout[counted])
+
+    # Incremental ROI is a snapshot of the running ROI once a miner's counted predictions reach roi_incr_count
+    if roi_incr_count >= 1:
+        counted_before_group = np.concatenate(([0], np.cumsum(counted)))[columns.group_starts]
+        running_count = np.cumsum(counted) - np.repeat(counted_before_group, columns.group_sizes)
+        in_increment = counted & (running_count <= roi_incr_count)
+        reached = result.roi_counts >= roi_incr_count
+        incr_rows = in_increment & reached[miner_index]
+        result.roi_incr_counts[reached] = int(roi_incr_count)
+        np.add.at(result.roi_incr_payouts, miner_index[incr_rows], roi_payout[incr_rows])
+        np.add.at(result.roi_incr_market_payouts, miner_index[incr_rows], market_payout[incr_rows])
+
+    delta_t = np.minimum(MAX_PREDICTION_DAYS_THRESHOLD * 24 * 60, columns.minutes_to_match)
+    clv = columns.prediction_odds - closing_odds
+    computed = counted & ~cached
+    scored = (computed & ~np.isnan(clv)) | (cached & ~np.isnan(columns.cached_contribution))
+    result.missing_odds = counted & ~scored
+    result.computed = computed
+    result.delta_t[counted] = delta_t[counted]
+
+    sigma = columns.closing_edge
+    # Only rows computed in this pass need the incentive score, its exp is not vectorized
+    v = np.full(len(columns), np.nan)
+    v[computed] = incentive_score(delta_t[computed], clv[computed], gamma, kappa, beta)
+    gfilter = gaussian_filter(closing_odds, probability)
+
+    # Set minimum value for Gaussian filter if the prediction was for the underdog
+    favorite_odds = np.minimum(columns.home_odds, columns.away_odds)
+    if columns.league in LEAGUES_ALLOWING_DRAWS:
+        favorite_odds = np.where(columns.draw_odds > 0, np.minimum(favorite_odds, columns.draw_odds), favorite_odds)
+    with np.errstate(divide="ignore"):
+        underdog = (closing_odds > favorite_odds) & (closing_odds > (1 / probability))
+    # Apply a penalty if the prediction was incorrect and the Gaussian filter is less than 1 and greater than 0
+    rounded_gfilter = np.round(gfilter, 4)
+    wrong = ~correct & (rounded_gfilter > 0) & (rounded_gfilter < 1) & (sigma < 0)
+    gfilter = np.where(
+        underdog,
+        np.maximum(MIN_GFILTER_FOR_UNDERDOG_PREDICTION, gfilter),
+        np.where(wrong, np.maximum(MAX_GFILTER_FOR_WRONG_PREDICTION, gfilter), gfilter),
+    )
+
+    contribution = np.where(cached, columns.cached_contribution, v * sigma * gfilter)
+    np.add.at(result.total_scores, miner_index[scored], contribution[scored])
+
+    fresh = scored & ~cached
+    result.clv[fresh] = clv[fresh]
+    result.v[fresh] = v[fresh]
+    result.gfilter[fresh] = gfilter[fresh]
+    result.contribution[scored] = contribution[scored]
+    return result
+
+
+def computed_contributions(columns: LeagueScoringColumns, result: LeagueScoringResult) -> List[Tuple[int, float]]:
+    """
+    (predictionId, contribution) for every prediction scored in this pass, to be persisted. Predictions that were missing
+    odds at prediction time are left out, so they are scored again once the odds are synced.
+    """
+    computed = result.computed & ~np.isnan(result.contribution)
+    return [
+        (int(prediction_id), float(contribution))
+        for prediction_id, contribution in zip(columns.prediction_ids[computed], result.contribution[computed])
+    ]
+
+
+def time_interval_label(minutes_to_match: float) -> str:
+    """Maps minutes between prediction and match start to the prediction request interval."""
+    if minutes_to_match <= 10:
+        return "T-10m"
+    elif minutes_to_match <= 240:
+        return "T-4h"
+    elif minutes_to_match <= 720:
+        return "T-12h"
+    elif minutes_to_match <= 1440:
+        return "T-24h"
+    return ">T-24h"
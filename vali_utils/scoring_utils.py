@@ -1,26 +1,25 @@
 import math
+import dataclasses
 import numpy as np
 from scipy.stats import pareto
 import datetime as dt
 from datetime import datetime, timezone
-import pytz
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Set, Tuple, Optional, Union
 from tabulate import tabulate
-import random
 
 import bittensor as bt
 from storage.sqlite_validator_storage import get_storage
 from vali_utils.copycat_controller import CopycatDetectionController
-from common.data import League, MatchPredictionWithMatchData, ProbabilityChoice
+from vali_utils.analysis_utils import StatisticalAnalyzer, CopycatPairState
+from vali_utils.odds_timeline import OddsTimeline
+from vali_utils.scoring_engine import LeagueScoringColumns, score_league, computed_contributions, scoring_params_key, time_interval_label
+from common.data import League, MatchPredictionWithMatchData, ScoringRow, ProbabilityChoice
+from common.timestamps import TimestampValue, from_epoch_us, to_epoch_us
 from common.constants import (
-    MAX_PREDICTION_DAYS_THRESHOLD,
     NO_LEAGUE_COMMITMENT_PENALTY,
     NO_LEAGUE_COMMITMENT_GRACE_PERIOD,
     COPYCAT_PENALTY_SCORE,
     COPYCAT_PUNISHMENT_START_DATE,
-    MAX_GFILTER_FOR_WRONG_PREDICTION,
-    MIN_GFILTER_FOR_UNDERDOG_PREDICTION,
-    LEAGUES_ALLOWING_DRAWS,
     MIN_EDGE_SCORE,
     ROI_BET_AMOUNT,
     ROI_INCR_PRED_COUNT_PERCENTAGE,
@@ -28,6 +27,8 @@ from common.constants import (
     ROI_SCORING_WEIGHT
 )
 
+COPYCAT_PUNISHMENT_START_US = to_epoch_us(COPYCAT_PUNISHMENT_START_DATE)
+
 def calculate_edge(prediction_team: str, prediction_prob: float, actual_team: str, closing_odds: float | None) -> Tuple[float, int]:
     """
     Calculate the edge for a prediction on a three-sided market.
@@ -106,17 +107,17 @@ def calculate_incentive_score(delta_t: int, clv: float, gamma: float, kappa: flo
     clv_component = (1 - (2 * beta)) / (1 + math.exp(kappa * clv)) + beta
     return time_component + (1 - time_component) * clv_component
 
-def calculate_clv(match_odds: List[Tuple[str, float, float, float, datetime]], pwmd: MatchPredictionWithMatchData, log_prediction: bool = False) -> Optional[float]:
+def calculate_clv(match_odds: Union[List[Tuple[str, float, float, float, datetime]], OddsTimeline], pwmd: MatchPredictionWithMatchData, log_prediction: bool = False) -> Optional[float]:
     """
     Calculate the closing line value for this prediction.
 
-    :param match_odds: List of tuples (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated)
+    :param match_odds: List of tuples (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated), or an OddsTimeline index
     :param pwmd: MatchPredictionWithMatchData
     :return: float, closing line value, or None if unable to calculate
     """
     
     # Find the odds for the match at the time of the prediction
-    prediction_odds = find_closest_odds(match_odds, pwmd.prediction.predictionDate, pwmd.prediction.probabilityChoice, log_prediction)
+    prediction_odds = find_closest_odds(match_odds, pwmd.prediction.predictionDateUs, pwmd.prediction.probabilityChoice, log_prediction, match_id=pwmd.prediction.matchId)
     
     if prediction_odds is None:
         return None
@@ -137,29 +138,42 @@ def calculate_clv(match_odds: List[Tuple[str, float, float, float, datetime]], p
      # clv is the distance between the odds at the time of prediction to the closing odds. Anything above 0 is derived value based on temporal drift of information
     return prediction_odds - closing_odds
 
-def find_closest_odds(match_odds: List[Tuple[str, float, float, float, datetime]], prediction_time: datetime, probability_choice: str, log_prediction: bool) -> Optional[float]:
+def find_closest_odds(match_odds: Union[List[Tuple[str, float, float, float, TimestampValue]], OddsTimeline], prediction_time: TimestampValue, probability_choice: str, log_prediction: bool, match_id: Optional[str] = None) -> Optional[float]:
     """
     Find the closest odds to the prediction time, ensuring the odds are before or at the prediction time.
+    Times are compared as UTC epoch microseconds. Datetimes are only built for logging.
 
-    :param match_odds: List of tuples (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated)
-    :param prediction_time: DateTime of the prediction
+    :param match_odds: List of tuples (matchId, homeTeamOdds, awayTeamOdds, drawOdds, lastUpdated), or an OddsTimeline index
+    :param prediction_time: UTC epoch microseconds of the prediction, or its DateTime
     :param probability_choice: ProbabilityChoice selection of the prediction
+    :param match_id: The match to look up. Required when match_odds is an OddsTimeline
     :return: The closest odds value before or at the prediction time, or None if no suitable odds are found
     """
+    if isinstance(match_odds, OddsTimeline):
+        result = match_odds.closest_odds(match_id, prediction_time, probability_choice)
+        if result is None:
+            return None
+        closest_odds, closest_odds_time = result
+        if log_prediction:
+            prediction_time = to_epoch_us(prediction_time)
+            bt.logging.debug(f"  ---- Randomly logged prediction ----")
+            bt.logging.debug(f"      • Prediction Time: {from_epoch_us(prediction_time)}")
+            bt.logging.debug(f"      • Closest Odds Time: {from_epoch_us(closest_odds_time)}")
+            bt.logging.debug(f"      • Time Difference: {str(dt.timedelta(microseconds=prediction_time - closest_odds_time))}")
+            bt.logging.debug(f"      • Prediction Time Odds: {closest_odds}")
+            bt.logging.debug(f"      • Probability Choice: {probability_choice}")
+        return closest_odds
+
     closest_odds = None
     closest_odds_time = None
 
-    # Ensure prediction_time is offset-aware
-    if prediction_time.tzinfo is None:
-        prediction_time = prediction_time.replace(tzinfo=pytz.UTC)
+    prediction_time = to_epoch_us(prediction_time)
 
     for _, homeTeamOdds, awayTeamOdds, drawOdds, odds_datetime in match_odds:
-        # Ensure odds_datetime is offset-aware
-        if odds_datetime.tzinfo is None:
-            odds_datetime = odds_datetime.replace(tzinfo=pytz.UTC)
+        odds_time = to_epoch_us(odds_datetime)
 
         # Skip odds that are after the prediction time
-        if odds_datetime > prediction_time:
+        if odds_time > prediction_time:
             continue
         
         if probability_choice in [ProbabilityChoice.HOMETEAM, ProbabilityChoice.HOMETEAM.value]:
@@ -175,17 +189,16 @@ def find_closest_odds(match_odds: List[Tuple[str, float, float, float, datetime]
             continue
 
         # Update closest odds if this is the first valid odds or if it's closer to the prediction time
-        if closest_odds_time is None or odds_datetime > closest_odds_time:
+        if closest_odds_time is None or odds_time > closest_odds_time:
             closest_odds = odds
-            closest_odds_time = odds_datetime
+            closest_odds_time = odds_time
 
     if closest_odds is not None:
-        time_diff = prediction_time - closest_odds_time
-        time_diff_readable = str(time_diff)
         if log_prediction:
+            time_diff_readable = str(dt.timedelta(microseconds=prediction_time - closest_odds_time))
             bt.logging.debug(f"  ---- Randomly logged prediction ----")
-            bt.logging.debug(f"      • Prediction Time: {prediction_time}")
-            bt.logging.debug(f"      • Closest Odds Time: {closest_odds_time}")
+            bt.logging.debug(f"      • Prediction Time: {from_epoch_us(prediction_time)}")
+            bt.logging.debug(f"      • Closest Odds Time: {from_epoch_us(closest_odds_time)}")
             bt.logging.debug(f"      • Time Difference: {time_diff_readable}")
             bt.logging.debug(f"      • Prediction Time Odds: {closest_odds}")
             bt.logging.debug(f"      • Probability Choice: {probability_choice}")
@@ -300,14 +313,414 @@ def apply_no_prediction_response_penalties(vali, all_scores: List[float], all_ui
     
     return all_scores
 
+def calculate_score_contributions(vali, predictions_with_match_data: List[ScoringRow], score_inputs_version: Optional[int] = None):
+    """
+    Calculate and persist the edge score contribution (v * sigma * gfilter) of newly scored predictions.
+
+    calculate_incentives_and_update_scores then only has to aggregate them. Storage deletes the contributions of a
+    match's predictions when its closing odds, result or odds history change, and they are computed again.
+
+    :param vali: Validator, the validator object
+    :param predictions_with_match_data: Predictions that were just scored, with closingEdge set
+    :param score_inputs_version: storage.get_score_inputs_version() from before the predictions were loaded
+    """
+    storage = get_storage()
+    scoring_key = scoring_params_key(vali.GAMMA, vali.TRANSITION_KAPPA, vali.EXTREMIS_BETA)
+    odds_timeline = OddsTimeline.from_rows(
+        storage.get_match_odds_for_matches(list({pwmd.prediction.matchId for pwmd in predictions_with_match_data}))
+    )
+
+    predictions_by_league: Dict[League, List[ScoringRow]] = {}
+    for pwmd in predictions_with_match_data:
+        predictions_by_league.setdefault(League(pwmd.prediction.league), []).append(pwmd)
+
+    for league, predictions in predictions_by_league.items():
+        columns = LeagueScoringColumns.from_predictions(league, {0: predictions}, odds_timeline)
+        result = score_league(
+            columns,
+            num_miners=1,
+            gamma=vali.GAMMA,
+            kappa=vali.TRANSITION_KAPPA,
+            beta=vali.EXTREMIS_BETA,
+            roi_incr_count=0
+        )
+        storage.upsert_prediction_score_contributions(computed_contributions(columns, result), scoring_key, score_inputs_version)
+
+def invalidate_stale_score_contributions(vali):
+    """
+    Delete persisted score contributions that were computed with different scoring controls than the validator's current ones.
+
+    :param vali: Validator, the validator object
+    """
+    storage = get_storage()
+    deleted = storage.delete_stale_prediction_score_contributions(
+        scoring_params_key(vali.GAMMA, vali.TRANSITION_KAPPA, vali.EXTREMIS_BETA)
+    )
+    if deleted > 0:
+        bt.logging.info(f"Scoring controls changed. Invalidated {deleted} persisted score contributions.")
+
+def invalidate_stale_copycat_prediction_pairs():
+    """Delete persisted copycat analysis state that was computed with different similarity criteria than the current ones."""
+    storage = get_storage()
+    deleted = storage.delete_stale_copycat_prediction_pairs(StatisticalAnalyzer().analysis_key)
+    if deleted > 0:
+        bt.logging.info(f"Copycat similarity criteria changed. Invalidated {deleted} persisted copycat prediction pairs.")
+
+@dataclasses.dataclass
+class LeagueScoringInput:
+    """Everything needed to score a single league. Plain data only, so it can be sent to a scoring worker process."""
+    league: League
+    all_uids: List[int]
+    league_miner_uids: List[int]
+    columns: LeagueScoringColumns
+    rolling_prediction_threshold: int
+    sensitivity_alpha: float
+    gamma: float
+    kappa: float
+    beta: float
+    copycat_predictions: List[ScoringRow]
+    ordered_matches: List[Tuple[str, datetime]]
+    # Similar prediction pairs persisted by earlier passes. Empty for a full rebuild.
+    copycat_pair_state: CopycatPairState
+
+
+@dataclasses.dataclass
+class LeagueScoringOutput:
+    """Per-miner results of scoring a single league, indexed like all_uids."""
+    league: League
+    league_scores: List[float]
+    edge_scores: List[float]
+    roi_scores: List[float]
+    rhos: List[float]
+    pred_counts: List[int]
+    pred_win_counts: List[int]
+    roi_counts: List[int]
+    roi_payouts: List[float]
+    roi_market_payouts: List[float]
+    # (predictionId, contribution) pairs computed in this pass, to be persisted by the caller
+    contributions: List[Tuple[int, float]]
+    suspicious_miners: Set[int]
+    copycat_penalties: Set[int]
+    exact_matches: Set[int]
+    # Similar prediction pairs and newly compared predictions from this pass, to be persisted by the caller
+    copycat_pairs: List[Tuple[int, int]]
+    copycat_compared_prediction_ids: List[int]
+    # (level, message) pairs, logged by the caller so worker process output ends up in the validator logs
+    logs: List[Tuple[str, str]]
+
+
+def prepare_league_scoring_input(vali, league: League, all_uids: List[int]) -> LeagueScoringInput:
+    """
+    Load everything needed to score a league from the validator and local storage.
+
+    :param vali: Validator, the validator object
+    :param league: League to load
+    :param all_uids: List of all miner UIDs
+    :return: LeagueScoringInput
+    """
+    storage = get_storage()
+    bt.logging.info(f"Processing league: {league.name} (Rolling Pred Threshold: {vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league]}, Rho Sensitivity Alpha: {vali.LEAGUE_SENSITIVITY_ALPHAS[league]:.4f})")
+
+    # Get all miners committed to this league within the grace period
+    league_miner_uids = []
+    for uid in all_uids:
+        if uid not in vali.uids_to_last_leagues:
+            continue
+        if league in vali.uids_to_last_leagues[uid] and vali.uids_to_leagues_last_updated[uid] >= (datetime.now(timezone.utc) - dt.timedelta(seconds=NO_LEAGUE_COMMITMENT_GRACE_PERIOD)):
+            league_miner_uids.append(uid)
+        elif league in vali.uids_to_leagues[uid] and vali.uids_to_leagues_last_updated[uid] < (datetime.now(timezone.utc) - dt.timedelta(seconds=NO_LEAGUE_COMMITMENT_GRACE_PERIOD)):
+            bt.logging.info(f"Miner {uid} has not committed to league {league.name} within the grace period. Last updated: {vali.uids_to_leagues_last_updated[uid]}. Miner's predictions will not be considered.")
+
+    # Load the rolling window of scored predictions for every committed miner in one query
+    league_predictions = storage.get_league_miner_match_predictions(
+        league=league,
+        miners={uid: vali.metagraph.hotkeys[uid] for uid in league_miner_uids},
+        batchSize=(vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league] * 2)
+    )
+
+    # Reuse the persisted contributions of predictions already scored with the current controls
+    scoring_key = scoring_params_key(vali.GAMMA, vali.TRANSITION_KAPPA, vali.EXTREMIS_BETA)
+    cached_contributions = storage.get_prediction_score_contributions(
+        [pwmd.prediction.predictionId for predictions in league_predictions.values() for pwmd in predictions],
+        scoring_key
+    )
+
+    # Index the odds for every match with uncached predictions once instead of querying per prediction
+    league_match_ids = {
+        pwmd.prediction.matchId
+        for predictions in league_predictions.values() for pwmd in predictions
+        if pwmd.prediction.predictionId not in cached_contributions
+    }
+    odds_timeline = OddsTimeline.from_rows(storage.get_match_odds_for_matches(list(league_match_ids)))
+
+    uid_to_index = {uid: index for index, uid in enumerate(all_uids)}
+    columns = LeagueScoringColumns.from_predictions(
+        league,
+        {uid_to_index[uid]: league_predictions.get(uid, []) for uid in league_miner_uids},
+        odds_timeline,
+        cached_contributions
+    )
+
+    # Add eligible predictions to predictions_for_copycat_analysis
+    predictions_for_copycat_analysis = [
+        p for uid in league_miner_uids for p in league_predictions.get(uid, [])
+        if p.prediction.predictionDateUs >= COPYCAT_PUNISHMENT_START_US
+    ]
+    earliest_match_time = min([p.prediction.matchDateUs for p in predictions_for_copycat_analysis], default=None)
+    pred_matches = []
+    if earliest_match_time is not None:
+        pred_matches = storage.get_recently_completed_matches(earliest_match_time, league)
+    ordered_matches = [(match.matchId, match.matchDate) for match in pred_matches]
+    ordered_matches.sort(key=lambda x: x[1])  # Ensure chronological order
+
+    # Load the similar prediction pairs from earlier passes, so only matches with newly scored predictions are compared.
+    # A full rebuild compares every match again and overwrites the persisted pairs.
+    copycat_pair_state = CopycatPairState()
+    if not vali.config.neuron.copycat_full_rebuild:
+        analysis_key = StatisticalAnalyzer().analysis_key
+        copycat_prediction_ids = [p.prediction.predictionId for p in predictions_for_copycat_analysis]
+        copycat_pair_state = CopycatPairState(
+            compared_prediction_ids=storage.get_copycat_compared_predictions(copycat_prediction_ids, analysis_key),
+            pairs=storage.get_copycat_prediction_pairs(copycat_prediction_ids, analysis_key),
+        )
+
+    return LeagueScoringInput(
+        league=league,
+        all_uids=all_uids,
+        league_miner_uids=league_miner_uids,
+        columns=columns,
+        rolling_prediction_threshold=vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league],
+        sensitivity_alpha=vali.LEAGUE_SENSITIVITY_ALPHAS[league],
+        gamma=vali.GAMMA,
+        kappa=vali.TRANSITION_KAPPA,
+        beta=vali.EXTREMIS_BETA,
+        copycat_predictions=predictions_for_copycat_analysis,
+        ordered_matches=ordered_matches,
+        copycat_pair_state=copycat_pair_state,
+    )
+
+def score_league_and_detect_copycats(league_input: LeagueScoringInput) -> LeagueScoringOutput:
+    """
+    Score every miner committed to a league and analyze the league for copycat patterns.
+
+    Does not touch the validator or storage, so it can run in a worker process.
+
+    :param league_input: LeagueScoringInput from prepare_league_scoring_input
+    :return: LeagueScoringOutput
+    """
+    league = league_input.league
+    all_uids = league_input.all_uids
+    league_miner_uids = set(league_input.league_miner_uids)
+    scoring_columns = league_input.columns
+    logs = []
+    league_table_data = []
+    matches_without_odds = []
+
+    rho_by_index = [0.0] * len(all_uids)
+    edge_scores = [0.0] * len(all_uids)
+    roi_scores = [0.0] * len(all_uids)
+    roi_incr_count = round(league_input.rolling_prediction_threshold * ROI_INCR_PRED_COUNT_PERCENTAGE, 0)
+
+    # Score every prediction in the league with array operations, then read the per-miner aggregates below
+    league_result = score_league(
+        scoring_columns,
+        num_miners=len(all_uids),
+        gamma=league_input.gamma,
+        kappa=league_input.kappa,
+        beta=league_input.beta,
+        roi_incr_count=roi_incr_count
+    )
+    pred_counts = league_result.pred_counts.tolist()
+    roi_counts = league_result.roi_counts.tolist()
+    roi_payouts = league_result.roi_payouts.tolist()
+    roi_market_payouts = league_result.roi_market_payouts.tolist()
+    roi_incr_counts = league_result.roi_incr_counts.tolist()
+    roi_incr_payouts = league_result.roi_incr_payouts.tolist()
+    roi_incr_market_payouts = league_result.roi_incr_market_payouts.tolist()
+
+    # Collect matches that had odds, but none at the time of prediction
+    for row in np.flatnonzero(league_result.missing_odds):
+        mwo = (scoring_columns.match_ids[row], time_interval_label(scoring_columns.minutes_to_match[row]))
+        # only add to matches_without_odds if the match and t-interval are not already in the list
+        if mwo not in matches_without_odds:
+            matches_without_odds.append(mwo)
+
+    # Randomly log the scoring components of a sample of predictions
+    for row in np.flatnonzero(np.random.random(len(scoring_columns)) < 0.005):
+        logs.append(("debug", f"Randomly logged prediction for miner {all_uids[scoring_columns.miner_index[row]]} in league {league.name}:"))
+        logs.append(("debug", f"      • Match: {scoring_columns.match_ids[row]}"))
+        logs.append(("debug", f"      • Probability: {scoring_columns.probability[row]}"))
+        logs.append(("debug", f"      • Prediction Time Odds: {scoring_columns.prediction_odds[row]}"))
+        logs.append(("debug", f"      • Closing Odds: {scoring_columns.closing_odds[row]}"))
+        logs.append(("debug", f"      • Time delta: {league_result.delta_t[row]:.4f}"))
+        logs.append(("debug", f"      • Closing line value: {league_result.clv[row]:.4f}"))
+        logs.append(("debug", f"      • Incentive score (v): {league_result.v[row]:.4f}"))
+        logs.append(("debug", f"      • Sigma (aka Closing Edge): {scoring_columns.closing_edge[row]:.4f}"))
+        logs.append(("debug", f"      • Gaussian filter: {league_result.gfilter[row]:.4f}"))
+        logs.append(("debug", f"      • Total prediction score: {league_result.contribution[row]:.4f}"))
+        logs.append(("debug", "-" * 50))
+
+    for index, uid in enumerate(all_uids):
+        total_score, rho = 0, 0
+        # Only process miners that are committed to the league
+        if uid in league_miner_uids:
+            if pred_counts[index] == 0:
+                continue  # No predictions for this league, keep score as 0
+
+            # Calculate rho
+            rho = compute_significance_score(
+                num_miner_predictions=pred_counts[index],
+                num_threshold_predictions=league_input.rolling_prediction_threshold,
+                alpha=league_input.sensitivity_alpha
+            )
+
+            total_score = float(league_result.total_scores[index])
+
+        # Store rho for this miner
+        rho_by_index[index] = rho
+        # Calculate final edge score
+        final_edge_score = rho * total_score
+        edge_scores[index] = final_edge_score
+        # Calculate market ROI
+        market_roi = roi_market_payouts[index] / (roi_counts[index] * ROI_BET_AMOUNT) if roi_counts[index] > 0 else 0.0
+        # Calculate final ROI score
+        roi = roi_payouts[index] / (roi_counts[index] * ROI_BET_AMOUNT) if roi_counts[index] > 0 else 0.0
+        # Calculate the difference between the miner's ROI and the market ROI
+        roi_diff = roi - market_roi
+        # Base ROI score requires the miner is beating the market
+        final_roi_score = round(rho * ((roi_diff if roi_diff>0 else 0)*100), 4)
+
+        # If ROI is less than 0, but greater than market ROI, penalize the ROI score by distance from 0
+        if roi < 0 and roi_diff > 0:
+            logs.append(("info", f"Penalizing ROI score for miner {uid} in league {league.name} by {roi:.4f} ({final_roi_score * roi:.4f}): {final_roi_score:.4f} -> {final_roi_score + (final_roi_score * roi):.4f}"))
+            final_roi_score = final_roi_score + (final_roi_score * roi)
+        
+        roi_incr = roi
+        market_roi_incr = market_roi
+        # Calculate incremental ROI score for miner and market. Penalize if too similar.
+        if roi_incr_counts[index] == roi_incr_count and final_roi_score > 0:
+            market_roi_incr = roi_incr_market_payouts[index] / (roi_incr_counts[index] * ROI_BET_AMOUNT) if roi_incr_counts[index] > 0 else 0.0
+            roi_incr = roi_incr_payouts[index] / (roi_incr_counts[index] * ROI_BET_AMOUNT) if roi_incr_counts[index] > 0 else 0.0
+            roi_incr_diff = roi_incr - market_roi_incr
+            # if incremental ROI and incremental market ROI is within the difference threshold, calculate penalty
+            if abs(roi_incr_diff) <= MAX_INCR_ROI_DIFF_PERCENTAGE:
+                # Exponential decay scaling
+                k = 30  # Decay constant; increase for steeper decay
+                # Scale the penalty factor to max at 0.99
+                penalty_factor = 0.99 * np.exp(-k * abs(roi_incr_diff))
+                adjustment_factor = 1 - penalty_factor
+                logs.append(("info", f"Incremental ROI score penalty for miner {uid} in league {league.name}: {roi_incr:.4f} vs {market_roi_incr} ({roi_incr_diff:.4f}), adj. factor {adjustment_factor:.4f}: {final_roi_score:.4f} -> {final_roi_score * adjustment_factor:.4f}"))
+                final_roi_score *= adjustment_factor
+
+        roi_scores[index] = final_roi_score
+
+        # Only log scores for miners committed to the league
+        if uid in league_miner_uids:
+            league_table_data.append([
+                uid,
+                round(final_edge_score, 2),
+                round(final_roi_score, 2),
+                str(round(roi*100, 2)) + "%",
+                str(round(market_roi*100, 2)) + "%",
+                str(round(roi_diff*100, 2)) + "%", 
+                str(round(roi_incr*100, 2)) + "%", 
+                str(round(market_roi_incr*100, 2)) + "%",
+                pred_counts[index],
+                round(rho, 2)
+            ])
+
+    # Log league scores
+    if league_table_data:
+        logs.append(("info", f"\nScores for {league.name}:"))
+        logs.append(("info", "\n" + tabulate(league_table_data, headers=['UID', 'Edge Score', 'ROI Score', 'ROI', 'Mkt ROI', 'ROI Diff', 'ROI Incr', 'Mkt ROI Incr', '# Predictions', 'Rho'], tablefmt='grid')))
+    else:
+        logs.append(("info", f"No non-zero scores for {league.name}"))
+
+    # Normalize league scores and weight for Edge and ROI scores
+    # Normalize edge scores
+    min_edge, max_edge = min(edge_scores), max(edge_scores)
+    if max_edge - min_edge == 0:
+        normalized_edge = [0 for score in edge_scores]
+    else:
+        # If edge score is better than our minimum, normalize it, otherwise set to 0
+        normalized_edge = [(score - min_edge) / (max_edge - min_edge) if score > MIN_EDGE_SCORE else 0 for score in edge_scores]
+    # Normalize ROI scores
+    min_roi, max_roi = min(roi_scores), max(roi_scores)
+    if max_roi - min_roi == 0:
+        normalized_roi = [0 for score in roi_scores]
+    else:
+        normalized_roi = [(score - min_roi) / (max_roi - min_roi) if (max_roi - min_roi) > 0 else 0 for score in roi_scores]
+
+    # Apply weights and combine and set to final league scores
+    league_scores = [
+        ((1-ROI_SCORING_WEIGHT) * e + ROI_SCORING_WEIGHT * r) * rho
+        if e > 0 and r > 0 else 0 # if edge score <= 0 or roi score is <= 0, set to 0. beat the market first
+        for e, r, rho in zip(normalized_edge, normalized_roi, rho_by_index)
+    ]
+
+    # Create top 10 scores table
+    top_scores_table = []
+    # Sort the final scores in descending order. We need to sort the uids as well so they match
+    top_scores, top_uids = zip(*sorted(zip(league_scores, all_uids), reverse=True))
+    for i in range(min(10, len(top_scores))):
+        top_scores_table.append([i+1, top_uids[i], top_scores[i]])
+    logs.append(("info", f"\nTop 10 Scores for {league.name}:"))
+    logs.append(("info", "\n" + tabulate(top_scores_table, headers=['#', 'UID', 'Final Score'], tablefmt='grid')))
+
+    if len(matches_without_odds) > 0:
+        logs.append(("info", f"\n=============================================================================="))
+        logs.append(("info", f"Odds were not found for the following matches within {league.name}:"))
+        for mwo in matches_without_odds:
+            logs.append(("info", f"{mwo[0]} - {mwo[1]}"))
+        logs.append(("info", f"=============================================================================="))
+
+    # Analyze league for copycat patterns
+    copycat_controller = CopycatDetectionController()
+    copycat_pair_state = league_input.copycat_pair_state
+    suspicious_miners, penalties, exact_matches = copycat_controller.analyze_league(
+        league, league_input.copycat_predictions, league_input.ordered_matches, pair_state=copycat_pair_state
+    )
+    logs.append(("info", f"Copycat analysis for {league.name} compared {copycat_pair_state.num_compared_matches} matches and reused stored pairs for {copycat_pair_state.num_reused_matches} matches."))
+    # Log league results
+    logs.append(("info", f"\n=============================================================================="))
+    logs.append(("info", f"Total suspicious miners in {league.name}: {len(suspicious_miners)}"))
+    logs.append(("info", f"Miners: {', '.join(str(m) for m in sorted(suspicious_miners))}"))
+
+    logs.append(("info", f"\nTotal miners with exact matches in {league.name}: {len(exact_matches)}"))
+    logs.append(("info", f"Miners: {', '.join(str(m) for m in sorted(exact_matches))}"))
+
+    logs.append(("info", f"\nTotal miners to penalize in {league.name}: {len(penalties)}"))
+    logs.append(("info", f"Miners: {', '.join(str(m) for m in sorted(penalties))}"))
+    logs.append(("info", f"=============================================================================="))
+
+    return LeagueScoringOutput(
+        league=league,
+        league_scores=league_scores,
+        edge_scores=edge_scores,
+        roi_scores=roi_scores,
+        rhos=rho_by_index,
+        pred_counts=pred_counts,
+        pred_win_counts=league_result.pred_win_counts.tolist(),
+        roi_counts=roi_counts,
+        roi_payouts=roi_payouts,
+        roi_market_payouts=roi_market_payouts,
+        contributions=computed_contributions(scoring_columns, league_result),
+        suspicious_miners=suspicious_miners,
+        copycat_penalties=penalties,
+        exact_matches=exact_matches,
+        copycat_pairs=copycat_pair_state.new_pairs,
+        copycat_compared_prediction_ids=copycat_pair_state.new_compared_prediction_ids,
+        logs=logs,
+    )
+
 def calculate_incentives_and_update_scores(vali):
     """
     Calculate the incentives and update the scores for all miners with predictions.
 
     This function:
-    1. Loops through every league
-    2. For each league, loops through every miner
-    4. Calculates incentives for miners committed to the league
+    1. Loads the scoring inputs for every league
+    2. Scores every league and analyzes it for copycats, in worker processes if vali.scoring_executor is set
+    4. Applies penalties for copycats, missing league commitments and missing prediction responses
     5. Updates scores for each miner for each league
     6. Updates the validator scores for each miner to set their weights
     7. Logs detailed results for each league and final scores
@@ -317,8 +730,6 @@ def calculate_incentives_and_update_scores(vali):
     storage = get_storage()
     all_uids = vali.metagraph.uids.tolist()
 
-    # Initialize Copycat Detection Controller
-    copycat_controller = CopycatDetectionController()
     final_suspicious_miners = set()
     final_copycat_penalties = set()
     final_exact_matches = set()
@@ -332,303 +743,44 @@ def calculate_incentives_and_update_scores(vali):
     league_roi_counts: Dict[League, List[int]] = {league: [0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
     league_roi_payouts: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
     league_roi_market_payouts: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
-    # Initialize incremental ROI dictionaries
-    league_roi_incr_counts: Dict[League, List[int]] = {league: [0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
-    league_roi_incr_payouts: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
-    league_roi_incr_market_payouts: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
     league_roi_scores: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
-    # Initialize league_rhos dictionary
-    league_rhos: Dict[League, List[float]] = {league: [0.0] * len(all_uids) for league in vali.ACTIVE_LEAGUES}
 
-    for league in vali.ACTIVE_LEAGUES:
-        bt.logging.info(f"Processing league: {league.name} (Rolling Pred Threshold: {vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league]}, Rho Sensitivity Alpha: {vali.LEAGUE_SENSITIVITY_ALPHAS[league]:.4f})")
-        league_table_data = []
-        predictions_for_copycat_analysis = []
-        matches_without_odds = []
-
-        # Get all miners committed to this league within the grace period
-        league_miner_uids = []
-        for uid in all_uids:
-            if uid not in vali.uids_to_last_leagues:
-                continue
-            if league in vali.uids_to_last_leagues[uid] and vali.uids_to_leagues_last_updated[uid] >= (datetime.now(timezone.utc) - dt.timedelta(seconds=NO_LEAGUE_COMMITMENT_GRACE_PERIOD)):
-                league_miner_uids.append(uid)
-            elif league in vali.uids_to_leagues[uid] and vali.uids_to_leagues_last_updated[uid] < (datetime.now(timezone.utc) - dt.timedelta(seconds=NO_LEAGUE_COMMITMENT_GRACE_PERIOD)):
-                bt.logging.info(f"Miner {uid} has not committed to league {league.name} within the grace period. Last updated: {vali.uids_to_leagues_last_updated[uid]}. Miner's predictions will not be considered.")
-
-        for index, uid in enumerate(all_uids):
-            total_score, rho = 0, 0
-            predictions_with_match_data = []
-            # Only process miners that are committed to the league
-            if uid in league_miner_uids:
-                hotkey = vali.metagraph.hotkeys[uid]
-
-                predictions_with_match_data = storage.get_miner_match_predictions(
-                    miner_hotkey=hotkey,
-                    miner_uid=uid,
-                    league=league,
-                    scored=True,
-                    batchSize=(vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league] * 2)
-                )
-
-                if not predictions_with_match_data:
-                    continue  # No predictions for this league, keep score as 0
-
-                # Add eligible predictions to predictions_for_copycat_analysis
-                predictions_for_copycat_analysis.extend([p for p in predictions_with_match_data if p.prediction.predictionDate.replace(tzinfo=timezone.utc) >= COPYCAT_PUNISHMENT_START_DATE])
-
-                # Calculate rho
-                rho = compute_significance_score(
-                    num_miner_predictions=len(predictions_with_match_data),
-                    num_threshold_predictions=vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league],
-                    alpha=vali.LEAGUE_SENSITIVITY_ALPHAS[league]
-                )
-                
-                total_score = 0
-                for pwmd in predictions_with_match_data:
-                    log_prediction = random.random() < 0.005
-                    if log_prediction:
-                        bt.logging.debug(f"Randomly logged prediction for miner {uid} in league {league.name}:")
-                        bt.logging.debug(f"  • Number of predictions: {len(predictions_with_match_data)}")
-                        bt.logging.debug(f"  • League rolling threshold count: {vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league]}")
-                        bt.logging.debug(f"  • League rho sensitivity alpha: {vali.LEAGUE_SENSITIVITY_ALPHAS[league]:.4f}")
-                        bt.logging.debug(f"  • Rho: {rho:.4f}")
-
-                    # Grab the match odds from local db
-                    match_odds = storage.get_match_odds(matchId=pwmd.prediction.matchId)
-                    if match_odds is None or len(match_odds) == 0:
-                        bt.logging.debug(f"Odds were not found for matchId {pwmd.prediction.matchId}. Skipping calculation of this prediction.")
-                        continue
-
-                    # Check if there is an odds anomaly and skip if so.
-                    if pwmd.get_closing_odds_for_predicted_outcome() == 0:
-                        bt.logging.debug(f"Closing odds were found to be 0 for matchId {pwmd.prediction.matchId}. homeTeamOdds: {pwmd.homeTeamOdds}, awayTeamOdds: {pwmd.awayTeamOdds}, drawOdds: {pwmd.drawOdds}")
-                        bt.logging.debug(f"Skipping calculation of this prediction.")
-                        continue
-
-                    # Add to total prediction wins, if applicable
-                    if pwmd.prediction.get_predicted_team() == pwmd.get_actual_winner():
-                        league_pred_win_counts[league][index] += 1
-
-                    # Calculate ROI for the prediction
-                    league_roi_counts[league][index] += 1
-                    if pwmd.prediction.get_predicted_team() == pwmd.get_actual_winner():
-                        league_roi_payouts[league][index] += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds()-1)
-                    else:
-                        league_roi_payouts[league][index] -= ROI_BET_AMOUNT
-
-                    # Calculate the market ROI for the prediction
-                    if pwmd.actualHomeTeamScore > pwmd.actualAwayTeamScore and pwmd.homeTeamOdds < pwmd.awayTeamOdds:
-                        league_roi_market_payouts[league][index] += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds()-1)
-                    elif pwmd.actualAwayTeamScore > pwmd.actualHomeTeamScore and pwmd.awayTeamOdds < pwmd.homeTeamOdds:
-                        league_roi_market_payouts[league][index] += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds()-1)
-                    elif pwmd.actualHomeTeamScore == pwmd.actualAwayTeamScore and pwmd.drawOdds < pwmd.homeTeamOdds and pwmd.drawOdds < pwmd.awayTeamOdds:
-                        league_roi_market_payouts[league][index] += ROI_BET_AMOUNT * (pwmd.get_actual_winner_odds()-1)
-                    else:
-                        league_roi_market_payouts[league][index] -= ROI_BET_AMOUNT
-
-                    # Store the ROI incremental counts and payouts. Incremental ROI is a subset of the most recent prediction ROI
-                    if league_roi_counts[league][index] == round(vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league] * ROI_INCR_PRED_COUNT_PERCENTAGE, 0):
-                        league_roi_incr_counts[league][index] = league_roi_counts[league][index]
-                        league_roi_incr_payouts[league][index] = league_roi_payouts[league][index]
-                        league_roi_incr_market_payouts[league][index] = league_roi_market_payouts[league][index]
-
-                    # Ensure prediction.matchDate is offset-aware
-                    if pwmd.prediction.matchDate.tzinfo is None:
-                        match_date = pwmd.prediction.matchDate.replace(tzinfo=dt.timezone.utc)
-                    else:
-                        match_date = pwmd.prediction.matchDate
-                    # Ensure prediction.predictionDate is offset-aware
-                    if pwmd.prediction.predictionDate.tzinfo is None:
-                        prediction_date = pwmd.prediction.predictionDate.replace(tzinfo=dt.timezone.utc)
-                    else:
-                        prediction_date = pwmd.prediction.predictionDate
-
-                    # Calculate time delta in minutes    
-                    delta_t = min(MAX_PREDICTION_DAYS_THRESHOLD * 24 * 60, (match_date - prediction_date).total_seconds() / 60)
-                    if log_prediction:
-                        bt.logging.debug(f"      • Time delta: {delta_t:.4f}")
-                    
-                    # Calculate closing line value
-                    clv = calculate_clv(match_odds, pwmd, log_prediction)
-                    if clv is None:
-                        if (match_date - prediction_date).total_seconds() / 60 <= 10:
-                            t_interval = "T-10m"
-                        elif (match_date - prediction_date).total_seconds() / 60 <= 240:
-                            t_interval = "T-4h"
-                        elif (match_date - prediction_date).total_seconds() / 60 <= 720:
-                            t_interval = "T-12h"
-                        elif (match_date - prediction_date).total_seconds() / 60 <= 1440:
-                            t_interval = "T-24h"
-                        # only add to matches_without_odds if the match and t-interval are not already in the list
-                        if (pwmd.prediction.matchId, t_interval) not in matches_without_odds:
-                            matches_without_odds.append((pwmd.prediction.matchId, t_interval))
-                        continue
-                    elif log_prediction:
-                        bt.logging.debug(f"      • Closing line value: {clv:.4f}")
-
-                    v = calculate_incentive_score(
-                        delta_t=delta_t,
-                        clv=clv,
-                        gamma=vali.GAMMA,
-                        kappa=vali.TRANSITION_KAPPA, 
-                        beta=vali.EXTREMIS_BETA
-                    )
-                    if log_prediction:
-                        bt.logging.debug(f"      • Incentive score (v): {v:.4f}")
-
-                    # Get sigma, aka the closing edge
-                    sigma = pwmd.prediction.closingEdge
-                    if log_prediction:
-                        bt.logging.debug(f"      • Sigma (aka Closing Edge): {sigma:.4f}")
-
-                    # Calculate the Gaussian filter
-                    gfilter = apply_gaussian_filter(pwmd)
-                    if log_prediction:
-                        bt.logging.debug(f"      • Gaussian filter: {gfilter:.4f}")
-                    
-                    # Set minimum value for Gaussian filter if the prediction was for the underdog
-                    if pwmd.is_prediction_for_underdog(LEAGUES_ALLOWING_DRAWS) and pwmd.get_closing_odds_for_predicted_outcome() > (1 / pwmd.prediction.probability):
-                        prev_gfilter = gfilter
-                        gfilter =  max(MIN_GFILTER_FOR_UNDERDOG_PREDICTION, gfilter)
-                        if log_prediction:
-                            bt.logging.debug(f"      • Underdog prediction detected. gfilter: {gfilter:.4f} | old_gfilter: {prev_gfilter:.4f}")
-                    
-                    # Apply a penalty if the prediction was incorrect and the Gaussian filter is less than 1 and greater than 0
-                    elif pwmd.prediction.get_predicted_team() != pwmd.get_actual_winner() and round(gfilter, 4) > 0 and round(gfilter, 4) < 1 and sigma < 0:
-                        gfilter = max(MAX_GFILTER_FOR_WRONG_PREDICTION, gfilter)
-                        if log_prediction:
-                            bt.logging.debug(f"      • Penalty applied for wrong prediction. gfilter: {gfilter:.4f}")
-
-                    # Apply sigma and G (gaussian filter) to v
-                    total_score += v * sigma * gfilter
-                    
-                    if log_prediction:
-                        bt.logging.debug(f"      • Total prediction score: {(v * sigma * gfilter):.4f}")
-                        bt.logging.debug("-" * 50)
-
-            # Store rho for this miner
-            league_rhos[league][index] = rho
-            # Calculate final edge score
-            final_edge_score = rho * total_score
-            league_scores[league][index] = final_edge_score
-            league_edge_scores[league][index] = final_edge_score
-            league_pred_counts[league][index] = len(predictions_with_match_data)
-            # Calculate market ROI
-            market_roi = league_roi_market_payouts[league][index] / (league_roi_counts[league][index] * ROI_BET_AMOUNT) if league_roi_counts[league][index] > 0 else 0.0
-            # Calculate final ROI score
-            roi = league_roi_payouts[league][index] / (league_roi_counts[league][index] * ROI_BET_AMOUNT) if league_roi_counts[league][index] > 0 else 0.0
-            # Calculate the difference between the miner's ROI and the market ROI
-            roi_diff = roi - market_roi
-            # Base ROI score requires the miner is beating the market
-            final_roi_score = round(rho * ((roi_diff if roi_diff>0 else 0)*100), 4)
-
-            # If ROI is less than 0, but greater than market ROI, penalize the ROI score by distance from 0
-            if roi < 0 and roi_diff > 0:
-                bt.logging.info(f"Penalizing ROI score for miner {uid} in league {league.name} by {roi:.4f} ({final_roi_score * roi:.4f}): {final_roi_score:.4f} -> {final_roi_score + (final_roi_score * roi):.4f}")
-                final_roi_score = final_roi_score + (final_roi_score * roi)
-            
-            roi_incr = roi
-            market_roi_incr = market_roi
-            # Calculate incremental ROI score for miner and market. Penalize if too similar.
-            if league_roi_incr_counts[league][index] == round(vali.ROLLING_PREDICTION_THRESHOLD_BY_LEAGUE[league] * ROI_INCR_PRED_COUNT_PERCENTAGE, 0) and final_roi_score > 0:
-                market_roi_incr = league_roi_incr_market_payouts[league][index] / (league_roi_incr_counts[league][index] * ROI_BET_AMOUNT) if league_roi_incr_counts[league][index] > 0 else 0.0
-                roi_incr = league_roi_incr_payouts[league][index] / (league_roi_incr_counts[league][index] * ROI_BET_AMOUNT) if league_roi_incr_counts[league][index] > 0 else 0.0
-                roi_incr_diff = roi_incr - market_roi_incr
-                # if incremental ROI and incremental market ROI is within the difference threshold, calculate penalty
-                if abs(roi_incr_diff) <= MAX_INCR_ROI_DIFF_PERCENTAGE:
-                    # Exponential decay scaling
-                    k = 30  # Decay constant; increase for steeper decay
-                    # Scale the penalty factor to max at 0.99
-                    penalty_factor = 0.99 * np.exp(-k * abs(roi_incr_diff))
-                    adjustment_factor = 1 - penalty_factor
-                    bt.logging.info(f"Incremental ROI score penalty for miner {uid} in league {league.name}: {roi_incr:.4f} vs {market_roi_incr} ({roi_incr_diff:.4f}), adj. factor {adjustment_factor:.4f}: {final_roi_score:.4f} -> {final_roi_score * adjustment_factor:.4f}")
-                    final_roi_score *= adjustment_factor
-
-            league_roi_scores[league][index] = final_roi_score
-
-            # Only log scores for miners committed to the league
-            if uid in league_miner_uids:
-                league_table_data.append([
-                    uid,
-                    round(final_edge_score, 2),
-                    round(final_roi_score, 2),
-                    str(round(roi*100, 2)) + "%",
-                    str(round(market_roi*100, 2)) + "%",
-                    str(round(roi_diff*100, 2)) + "%", 
-                    str(round(roi_incr*100, 2)) + "%", 
-                    str(round(market_roi_incr*100, 2)) + "%",
-                    len(predictions_with_match_data),
-                    round(rho, 2)
-                ])
-
-        # Log league scores
-        if league_table_data:
-            bt.logging.info(f"\nScores for {league.name}:")
-            bt.logging.info("\n" + tabulate(league_table_data, headers=['UID', 'Edge Score', 'ROI Score', 'ROI', 'Mkt ROI', 'ROI Diff', 'ROI Incr', 'Mkt ROI Incr', '# Predictions', 'Rho'], tablefmt='grid'))
-        else:
-            bt.logging.info(f"No non-zero scores for {league.name}")
-
-        # Normalize league scores and weight for Edge and ROI scores
-        # Normalize edge scores
-        min_edge, max_edge = min(league_scores[league]), max(league_scores[league])
-        if max_edge - min_edge == 0:
-            normalized_edge = [0 for score in league_scores[league]]
-        else:
-            # If edge score is better than our minimum, normalize it, otherwise set to 0
-            normalized_edge = [(score - min_edge) / (max_edge - min_edge) if score > MIN_EDGE_SCORE else 0 for score in league_scores[league]]
-        # Normalize ROI scores
-        min_roi, max_roi = min(league_roi_scores[league]), max(league_roi_scores[league])
-        if max_roi - min_roi == 0:
-            normalized_roi = [0 for score in league_roi_scores[league]]
-        else:
-            normalized_roi = [(score - min_roi) / (max_roi - min_roi) if (max_roi - min_roi) > 0 else 0 for score in league_roi_scores[league]]
-
-        # Apply weights and combine and set to final league scores
-        league_scores[league] = [
-            ((1-ROI_SCORING_WEIGHT) * e + ROI_SCORING_WEIGHT * r) * rho
-            if e > 0 and r > 0 else 0 # if edge score <= 0 or roi score is <= 0, set to 0. beat the market first
-            for e, r, rho in zip(normalized_edge, normalized_roi, league_rhos[league])
-        ]
-
-        # Create top 10 scores table
-        top_scores_table = []
-        # Sort the final scores in descending order. We need to sort the uids as well so they match
-        top_scores, top_uids = zip(*sorted(zip(league_scores[league], all_uids), reverse=True))
-        for i in range(10):
-            top_scores_table.append([i+1, top_uids[i], top_scores[i]])
-        bt.logging.info(f"\nTop 10 Scores for {league.name}:")
-        bt.logging.info("\n" + tabulate(top_scores_table, headers=['#', 'UID', 'Final Score'], tablefmt='grid'))
-
-        if len(matches_without_odds) > 0:
-            print(f"\n==============================================================================")
-            print(f"Odds were not found for the following matches within {league.name}:")
-            for mwo in matches_without_odds:
-                print(f"{mwo[0]} - {mwo[1]}")
-            print(f"==============================================================================")
-
-        # Analyze league for copycat patterns
-        earliest_match_date = min([p.prediction.matchDate for p in predictions_for_copycat_analysis], default=None)
-        pred_matches = []
-        if earliest_match_date is not None:
-            pred_matches = storage.get_recently_completed_matches(earliest_match_date, league)
-        ordered_matches = [(match.matchId, match.matchDate) for match in pred_matches]
-        ordered_matches.sort(key=lambda x: x[1])  # Ensure chronological order
-        suspicious_miners, penalties, exact_matches = copycat_controller.analyze_league(league, predictions_for_copycat_analysis, ordered_matches)
-        # Print league results
-        print(f"\n==============================================================================")
-        print(f"Total suspicious miners in {league.name}: {len(suspicious_miners)}")
-        print(f"Miners: {', '.join(str(m) for m in sorted(suspicious_miners))}")
-
-        print(f"\nTotal miners with exact matches in {league.name}: {len(exact_matches)}")
-        print(f"Miners: {', '.join(str(m) for m in sorted(exact_matches))}")
-        
-        print(f"\nTotal miners to penalize in {league.name}: {len(penalties)}")
-        print(f"Miners: {', '.join(str(m) for m in sorted(penalties))}")
-        print(f"==============================================================================")
-        final_suspicious_miners.update(suspicious_miners)
-        final_copycat_penalties.update(penalties)
-        final_exact_matches.update(exact_matches)
+    # Storage access stays in this process. Only plain columnar inputs are sent to the scoring workers.
+    score_inputs_version = storage.get_score_inputs_version()
+    league_inputs = [prepare_league_scoring_input(vali, league, all_uids) for league in vali.ACTIVE_LEAGUES]
+    if vali.scoring_executor is not None:
+        league_outputs = list(vali.scoring_executor.map(score_league_and_detect_copycats, league_inputs))
+    else:
+        league_outputs = [score_league_and_detect_copycats(league_input) for league_input in league_inputs]
+
+    # Merge the league results for the penalty, allocation and Pareto stages
+    scoring_key = scoring_params_key(vali.GAMMA, vali.TRANSITION_KAPPA, vali.EXTREMIS_BETA)
+    copycat_analysis_key = StatisticalAnalyzer().analysis_key
+    for league_output in league_outputs:
+        league = league_output.league
+        for level, message in league_output.logs:
+            getattr(bt.logging, level)(message)
+
+        # Persist contributions computed in this pass (i.e. after the scoring controls changed) so the next pass only aggregates
+        if league_output.contributions:
+            bt.logging.info(f"Computed {len(league_output.contributions)} uncached score contributions for {league.name}.")
+            if not storage.upsert_prediction_score_contributions(league_output.contributions, scoring_key, score_inputs_version):
+                bt.logging.info(f"Match odds or results changed while scoring {league.name}. Its contributions will be computed again next pass.")
+
+        # Persist the copycat pairs of matches compared in this pass so the next pass only compares newly scored matches
+        storage.upsert_copycat_prediction_pairs(league_output.copycat_pairs, league_output.copycat_compared_prediction_ids, copycat_analysis_key)
+
+        league_scores[league] = league_output.league_scores
+        league_edge_scores[league] = league_output.edge_scores
+        league_roi_scores[league] = league_output.roi_scores
+        league_pred_counts[league] = league_output.pred_counts
+        league_pred_win_counts[league] = league_output.pred_win_counts
+        league_roi_counts[league] = league_output.roi_counts
+        league_roi_payouts[league] = league_output.roi_payouts
+        league_roi_market_payouts[league] = league_output.roi_market_payouts
+        final_suspicious_miners.update(league_output.suspicious_miners)
+        final_copycat_penalties.update(league_output.copycat_penalties)
+        final_exact_matches.update(league_output.exact_matches)
 
 
     # Update all_scores with weighted sum of league scores for each miner
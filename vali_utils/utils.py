@@ -1,149 +1,193 @@
 import os
-from aiohttp import ClientSession, BasicAuth
+from aiohttp import ClientTimeout, BasicAuth
 import asyncio
-import requests
-from requests.auth import HTTPBasicAuth
 import bittensor as bt
 import random
 import traceback
 from typing import List, Optional, Tuple, Dict
+from collections import defaultdict
 import datetime as dt
 from datetime import timedelta, timezone
 import time
 import copy
+from pydantic import TypeAdapter, ValidationError
 
 from common.data import League, Match, MatchPrediction, ProbabilityChoice, get_probablity_choice_from_string
-from common.protocol import GetLeagueCommitments, GetMatchPrediction
+from common.protocol import GetLeagueCommitments, GetMatchPrediction, GetMatchPredictions
+from common.timestamps import to_epoch_us
 import storage.validator_storage as storage
 from storage.sqlite_validator_storage import SqliteValidatorStorage
 
 from common.constants import (
     IS_DEV,
     VALIDATOR_TIMEOUT,
+    MIN_PREDICTION_TIME_THRESHOLD,
+    NO_PREDICTION_RESPONSE_PENALTY,
+    BATCHED_PREDICTIONS_PROTOCOL_VERSION,
+    MATCH_ODDS_REQUEST_TIMEOUT,
+    SYNC_WATERMARK_OVERLAP_IN_MINUTES,
     SCORING_CUTOFF_IN_DAYS,
+    MAX_PREDICTION_DAYS_THRESHOLD,
     LEAGUES_ALLOWING_DRAWS,
     ROI_BET_AMOUNT,
 )
 
 from neurons.validator import Validator
 from vali_utils import scoring_utils
+from vali_utils.prediction_windows import PredictionWindowQueue
+from vali_utils.api_client import ApiClient
 
-# initialize our validator storage class
+# our validator storage class, initialized by the Validator at startup
 storage = SqliteValidatorStorage.get_instance()
-storage.initialize()
 
 
-async def sync_match_data(match_data_endpoint) -> bool:
+# Names of the delta sync watermarks stored in SyncWatermarks
+MATCHES_SYNC_WATERMARK = "matches"
+MATCH_ODDS_SYNC_WATERMARK = "matchOdds"
+
+def get_sync_since(name: str) -> Optional[dt.datetime]:
+    """Gets the since cursor of the next delta sync, or None if the sync has never completed."""
+    watermark = storage.get_sync_watermark(name)
+    if watermark is None:
+        return None
+    # Re-request an overlap before the watermark to pick up rows the API committed after it was taken
+    return watermark - dt.timedelta(minutes=SYNC_WATERMARK_OVERLAP_IN_MINUTES)
+
+def store_sync_watermark(name: str, data: Dict):
+    """Stores the watermark returned with a sync response, as a naive UTC datetime."""
+    watermark = data.get("watermark")
+    if not watermark:
+        return
+    watermark = dt.datetime.fromisoformat(watermark)
+    if watermark.tzinfo is not None:
+        watermark = watermark.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    storage.set_sync_watermark(name, watermark)
+
+# Validates a whole match payload in one call instead of constructing a Match per item
+MATCH_LIST_ADAPTER = TypeAdapter(List[Match])
+
+def parse_matches(match_data: List[Dict]) -> List[Match]:
+    """Validates match data returned from the API into Matches in one batch. Invalid items are logged and skipped."""
+    rows = []
+    for item in match_data:
+        if "matchId" not in item:
+            bt.logging.error(f"Skipping match data missing matchId: {item}")
+            continue
+        rows.append({
+            "matchId": item["matchId"],
+            "matchDate": item.get("matchDate"),
+            "sport": item.get("sport"),
+            "league": item.get("matchLeague"),
+            "homeTeamName": item.get("homeTeamName"),
+            "awayTeamName": item.get("awayTeamName"),
+            "homeTeamScore": item.get("homeTeamScore"),
+            "awayTeamScore": item.get("awayTeamScore"),
+            "homeTeamOdds": item.get("homeTeamOdds"),
+            "awayTeamOdds": item.get("awayTeamOdds"),
+            "drawOdds": item.get("drawOdds"),
+            "isComplete": item.get("isComplete", False),
+        })
+
+    try:
+        return MATCH_LIST_ADAPTER.validate_python(rows)
+    except ValidationError as e:
+        invalid_indexes = {error["loc"][0] for error in e.errors()}
+        for index in sorted(invalid_indexes):
+            bt.logging.error(f"Skipping invalid match data for match {rows[index]['matchId']}")
+        return MATCH_LIST_ADAPTER.validate_python([row for index, row in enumerate(rows) if index not in invalid_indexes])
+
+async def sync_match_data(api_client: ApiClient, match_data_endpoint: str) -> bool:
     try:
-        async with ClientSession() as session:
-            # TODO: add in authentication
-            async with session.get(match_data_endpoint) as response:
-                response.raise_for_status()
-                match_data = await response.json()
+        # Only request the matches that changed since the last sync, once there has been one
+        since = get_sync_since(MATCHES_SYNC_WATERMARK)
+        params = {"since": since.isoformat()} if since else {}
+        # TODO: add in authentication
+        response_data = await api_client.get_json(match_data_endpoint, params=params)
 
-        if not match_data or "matches" not in match_data:
+        if not response_data or "matches" not in response_data:
             bt.logging.info("No match data returned from API")
             return False
 
-        match_data = match_data["matches"]
-
-        # UPSERT logic
-        matches_to_insert = []
-        matches_to_update = []
-        for item in match_data:
-            if "matchId" not in item:
-                bt.logging.error(f"Skipping match data missing matchId: {item}")
-                continue
-
-            match = Match(
-                matchId=item["matchId"],
-                matchDate=item["matchDate"],
-                sport=item["sport"],
-                league=item["matchLeague"],
-                homeTeamName=item["homeTeamName"],
-                awayTeamName=item["awayTeamName"],
-                homeTeamScore=item["homeTeamScore"],
-                awayTeamScore=item["awayTeamScore"],
-                homeTeamOdds=item["homeTeamOdds"],
-                awayTeamOdds=item["awayTeamOdds"],
-                drawOdds=item["drawOdds"],
-                isComplete=item["isComplete"],
-            )
-            if storage.check_match(item["matchId"]):
-                matches_to_update.append(match)
-            else:
-                matches_to_insert.append(match)
+        match_data = response_data["matches"]
 
-        if matches_to_insert:
-            storage.insert_matches(matches_to_insert)
-            bt.logging.info(f"Inserted {len(matches_to_insert)} new matches.")
-        if matches_to_update:
-            storage.update_matches(matches_to_update)
-            bt.logging.info(f"Updated {len(matches_to_update)} existing matches.")
+        matches = parse_matches(match_data)
+        if matches:
+            storage.upsert_matches(matches)
+            bt.logging.info(f"Upserted {len(matches)} matches.")
+            # Queue the prediction windows of new and rescheduled matches. An unloaded queue reads them from storage.
+            if prediction_window_queue_loaded:
+                prediction_window_queue.update(matches, time.time())
 
+        store_sync_watermark(MATCHES_SYNC_WATERMARK, response_data)
         return True
 
     except Exception as e:
         bt.logging.error(f"Error getting match data: {e}")
         return False
     
-def fetch_match_odds(match_odds_data_endpoint: str, match_id: str) -> Dict:
-    url = f"{match_odds_data_endpoint}?matchId={match_id}"
+async def fetch_match_odds(api_client: ApiClient, match_odds_data_endpoint: str, since: dt.datetime) -> Dict:
     # TODO: add in authentication?
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-    return response.json()
-
-def sync_match_odds_data(match_odds_data_endpoint: str) -> bool:
+    # No total timeout, the first sync can be large. Only time out when the API stops sending data.
+    return await api_client.get_json(
+        match_odds_data_endpoint,
+        params={"since": since.isoformat()},
+        timeout=ClientTimeout(total=None, sock_read=MATCH_ODDS_REQUEST_TIMEOUT),
+    )
+
+async def sync_match_odds_data(api_client: ApiClient, match_odds_data_endpoint: str) -> bool:
     try:
-        # Get matches from the last SCORING_CUTOFF_IN_DAYS days
-        x_days_ago = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=SCORING_CUTOFF_IN_DAYS)
-        recent_matches = storage.get_recently_completed_matches(x_days_ago)
+        start_time = time.perf_counter()
 
-        if not recent_matches:
-            bt.logging.debug("No recent matches found in the database")
-            return False
+        # Only request the odds the API stored since the last sync. The first sync gets the odds stored within the scoring window.
+        since = get_sync_since(MATCH_ODDS_SYNC_WATERMARK)
+        if since is None:
+            since = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None) - dt.timedelta(
+                days=SCORING_CUTOFF_IN_DAYS + MAX_PREDICTION_DAYS_THRESHOLD
+            )
 
-        odds_to_insert = []
+        odds_data = await fetch_match_odds(api_client, match_odds_data_endpoint, since)
+        fetch_seconds = time.perf_counter() - start_time
 
-        for match in recent_matches:
-            try:
-                odds_data = fetch_match_odds(match_odds_data_endpoint, match.matchId)
-            except Exception as e:
-                bt.logging.error(f"Error fetching odds for match {match.matchId}: {e}")
-                continue
+        if not odds_data or "match_odds" not in odds_data:
+            bt.logging.info("No odds data returned from API")
+            return False
 
-            if not odds_data or "match_odds" not in odds_data:
-                bt.logging.debug(f"No odds data returned from API for match {match.matchId}")
-                continue
+        match_odds = odds_data["match_odds"]
 
-            match_odds = odds_data["match_odds"]
-            if not match_odds:
-                bt.logging.debug(f"Empty odds data returned from API for match {match.matchId}")
-                continue
+        # Preload the odds we already have once, e.g. rows re-requested in the watermark overlap, instead of checking every returned row
+        existing_odds = storage.get_match_odds_timestamps(list({item["matchId"] for item in match_odds if "matchId" in item}))
 
-            for item in match_odds:
-                if "matchId" not in item:
-                    bt.logging.error(f"Skipping odds data missing matchId: {item}")
-                    continue
+        odds_to_insert = []
+        for item in match_odds:
+            if "matchId" not in item:
+                bt.logging.error(f"Skipping odds data missing matchId: {item}")
+                continue
 
-                lastUpdated = dt.datetime.strptime(item["lastUpdated"], "%Y-%m-%dT%H:%M:%S")
-                if not storage.check_match_odds(item["matchId"], lastUpdated):
-                    odds_to_insert.append((
-                        item["matchId"],
-                        float(item.get("homeTeamOdds", 0) or 0),
-                        float(item.get("awayTeamOdds", 0) or 0),
-                        float(item.get("drawOdds", 0) or 0),
-                        lastUpdated
-                    ))
+            lastUpdated = dt.datetime.strptime(item["lastUpdated"], "%Y-%m-%dT%H:%M:%S")
+            odds_key = (item["matchId"], to_epoch_us(lastUpdated))
+            if odds_key not in existing_odds:
+                existing_odds.add(odds_key)
+                odds_to_insert.append((
+                    item["matchId"],
+                    float(item.get("homeTeamOdds", 0) or 0),
+                    float(item.get("awayTeamOdds", 0) or 0),
+                    float(item.get("drawOdds", 0) or 0),
+                    lastUpdated
+                ))
 
         if odds_to_insert:
             storage.insert_match_odds(odds_to_insert)
             bt.logging.info(f"Inserted {len(odds_to_insert)} odds for matches.")
-            return True
         else:
             bt.logging.info("No new odds data collected from API.")
-            return True
+
+        store_sync_watermark(MATCH_ODDS_SYNC_WATERMARK, odds_data)
+
+        bt.logging.info(
+            f"Synced {len(match_odds)} odds rows stored since {since} in {time.perf_counter() - start_time:.2f}s "
+            f"({fetch_seconds:.2f}s fetching)."
+        )
+        return True
 
     except Exception as e:
         bt.logging.error(f"Unexpected error in sync_match_odds_data: {e}")
@@ -158,12 +202,9 @@ async def process_app_prediction_requests(
     hotkey = keypair.ss58_address
     signature = f"0x{keypair.sign(hotkey).hex()}"
     try:
-        async with ClientSession() as session:
-            async with session.get(
-                app_prediction_requests_endpoint, auth=BasicAuth(hotkey, signature)
-            ) as response:
-                response.raise_for_status()
-                prediction_requests = await response.json()
+        prediction_requests = await vali.api_client.get_json(
+            app_prediction_requests_endpoint, auth=BasicAuth(hotkey, signature)
+        )
 
         if not prediction_requests or "requests" not in prediction_requests:
             bt.logging.info("No app prediction requests returned from API")
@@ -199,7 +240,7 @@ async def process_app_prediction_requests(
                 )
                 input_synapse = GetMatchPrediction(match_prediction=match_prediction)
                 # Send prediction requests to miners and store their responses. TODO: do we need to mark the stored prediction as being an app request prediction? not sure it matters
-                finished_responses, working_miner_uids = await send_predictions_to_miners(
+                finished_responses, working_miner_uids, _ = await send_predictions_to_miners(
                     vali, input_synapse, miner_uids
                 )
                 # Add the responses to the list of responses
@@ -225,27 +266,10 @@ async def process_app_prediction_requests(
                 )
 
         if len(prediction_responses) > 0:
-            max_retries = 3
-            # Post the prediction responses back to API
-            for attempt in range(max_retries):
-                try:
-                    # Attempt to post the prediction responses
-                    post_result = await post_app_prediction_responses(
-                        vali, app_prediction_responses_endpoint, prediction_responses
-                    )
-                    return post_result
-                except Exception as e:
-                    bt.logging.error(f"Attempt {attempt + 1} failed: {e}")
-                    if attempt < max_retries - 1:
-                        # Wait before retrying
-                        await asyncio.sleep(2)
-                    else:
-                        # Raise the exception if the maximum number of retries is reached
-                        bt.logging.error(
-                            f"Failed to post app prediction responses after {max_retries} attempts."
-                        )
-                        # Return False to indicate that the post failed
-                        return False
+            # Post the prediction responses back to API. The API client retries failed posts.
+            return await post_app_prediction_responses(
+                vali, app_prediction_responses_endpoint, prediction_responses
+            )
 
         return True
 
@@ -281,15 +305,13 @@ async def post_app_prediction_responses(
             }
         ]
         """
-        async with ClientSession() as session:
-            async with session.post(
-                prediction_responses_endpoint,
-                auth=BasicAuth(hotkey, signature),
-                json=prediction_responses,
-            ) as response:
-                response.raise_for_status()
-                bt.logging.info("Successfully posted app prediction responses to API.")
-                return True
+        await vali.api_client.post_json(
+            prediction_responses_endpoint,
+            prediction_responses,
+            auth=BasicAuth(hotkey, signature),
+        )
+        bt.logging.info("Successfully posted app prediction responses to API.")
+        return True
 
     except Exception as e:
         bt.logging.error(f"Error posting app prediction responses to API: {e}")
@@ -315,6 +337,7 @@ async def send_league_commitments_to_miners(
             working_miner_uids = []
             finished_responses = []
             uid_league_updates = {}
+            uid_protocol_versions = {}
 
             for response, uid in zip(responses, batch_uids):
                 if (
@@ -327,9 +350,11 @@ async def send_league_commitments_to_miners(
                         f"UID {uid}: Miner failed to respond to league commitments."
                     )
                     uid_league_updates[uid] = []
+                    uid_protocol_versions[uid] = None
                     continue
                 else:
                     working_miner_uids.append(uid)
+                    uid_protocol_versions[uid] = response.version
                     finished_responses.append(response)
                     valid_leagues = [league for league in response.leagues if league in vali.ACTIVE_LEAGUES]
                     if len(valid_leagues) != len(response.leagues):
@@ -338,20 +363,22 @@ async def send_league_commitments_to_miners(
                         )
                     uid_league_updates[uid] = [valid_leagues[0]] if valid_leagues else [] # Only one league commitment per miner
 
-            return finished_responses, working_miner_uids, uid_league_updates
+            return finished_responses, working_miner_uids, uid_league_updates, uid_protocol_versions
 
         all_finished_responses = []
         all_working_miner_uids = []
         all_uid_league_updates: Dict[int, List[League]] = {}
+        all_uid_protocol_versions: Dict[int, Optional[int]] = {}
 
         for i in range(0, len(miner_uids), vali.config.neuron.batch_size):
             batch = miner_uids[i:i+vali.config.neuron.batch_size]
             bt.logging.info(f"Sending league commitment requests to miners batch {batch}")
-            finished_responses, working_miner_uids, uid_league_updates = await process_batch(batch)
+            finished_responses, working_miner_uids, uid_league_updates, uid_protocol_versions = await process_batch(batch)
             
             all_finished_responses.extend(finished_responses)
             all_working_miner_uids.extend(working_miner_uids)
             all_uid_league_updates.update(uid_league_updates)
+            all_uid_protocol_versions.update(uid_protocol_versions)
 
         if len(all_working_miner_uids) == 0:
             bt.logging.info("No miner responses available.")
@@ -367,6 +394,8 @@ async def send_league_commitments_to_miners(
                 if len(leagues) > 0:
                     vali.uids_to_last_leagues[uid] = leagues
                     vali.uids_to_leagues_last_updated[uid] = dt.datetime.now(dt.timezone.utc)
+            # The protocol version decides whether a miner is sent batched prediction requests
+            vali.uids_to_protocol_versions.update(all_uid_protocol_versions)
 
         return (all_finished_responses, all_working_miner_uids)
 
@@ -386,105 +415,366 @@ def clean_up_unscored_deregistered_match_predictions(active_miner_hotkeys: List[
         bt.logging.error(f"Error cleaning up unscored deregistered predictions: {e}")
 
 
+# Prediction window fire times of the upcoming matches. Loaded from storage on first use, then kept up to date with
+# the matches returned by sync_match_data.
+prediction_window_queue = PredictionWindowQueue()
+prediction_window_queue_loaded = False
+
+def load_prediction_window_queue():
+    """Rebuilds the prediction window queue from the stored upcoming matches and match prediction requests."""
+    global prediction_window_queue_loaded
+    now = time.time()
+    # The last window of a match closes MIN_PREDICTION_TIME_THRESHOLD before kick off
+    matches = storage.get_upcoming_matches(dt.datetime.utcfromtimestamp(now + MIN_PREDICTION_TIME_THRESHOLD))
+    prediction_window_queue.load(matches, storage.get_match_prediction_requests(), now)
+    prediction_window_queue_loaded = True
+    bt.logging.debug(f"Loaded prediction windows of {len(prediction_window_queue)} upcoming matches.")
+
+
 def get_match_prediction_requests(vali: Validator) -> Tuple[List[MatchPrediction], str]:
-    matches = storage.get_matches_to_predict()
-    if not matches:
-        return [], "No upcoming matches scheduled."
-    
-    current_time = dt.datetime.now(dt.timezone.utc)
-    match_prediction_requests = storage.get_match_prediction_requests()
+    if not prediction_window_queue_loaded:
+        load_prediction_window_queue()
 
+    current_time = time.time()
     match_predictions = []
-    next_prediction_time = None
-    next_prediction_match = None
-    next_prediction_window = None
-
-    prediction_windows = [
-        ('24_hour', timedelta(hours=24), timedelta(hours=23), 'prediction_24_hour'),
-        ('12_hour', timedelta(hours=12), timedelta(hours=11), 'prediction_12_hour'),
-        ('4_hour', timedelta(hours=4), timedelta(hours=3), 'prediction_4_hour'),
-        ('10_min', timedelta(minutes=10), timedelta(minutes=5), 'prediction_10_min')
-    ]
-
-    for match in matches:
+    request_flags = []
+    for match, window in prediction_window_queue.pop_due(current_time):
         if match.league not in vali.ACTIVE_LEAGUES:
             continue
 
-        if match.matchId not in match_prediction_requests:
-            match_prediction_requests[match.matchId] = {window[0]: False for window in prediction_windows}
-
-        match_date_aware = match.matchDate.replace(tzinfo=timezone.utc)
-        time_until_match = match_date_aware - current_time
-
-        for window, upper_bound, lower_bound, update_key in prediction_windows:
-            if not match_prediction_requests[match.matchId][window]:
-                prediction_time = match_date_aware - upper_bound
-                if prediction_time > current_time:
-                    if next_prediction_time is None or prediction_time < next_prediction_time:
-                        next_prediction_time = prediction_time
-                        next_prediction_match = match
-                        next_prediction_window = window
-
-            # Check if this match needs a prediction in the current cycle
-            if (not match_prediction_requests[match.matchId][window] and
-                upper_bound >= time_until_match > lower_bound):
-                bt.logging.debug(f"Match found in prediction window {window}: {match.awayTeamName} at {match.homeTeamName} on {match.matchDate}")
-                match_predictions.append(
-                    MatchPrediction(
-                        matchId=match.matchId,
-                        matchDate=match.matchDate,
-                        sport=match.sport,
-                        league=match.league,
-                        homeTeamName=match.homeTeamName,
-                        awayTeamName=match.awayTeamName
-                    )
-                )
-                storage.update_match_prediction_request(match.matchId, update_key)
-                break  # Only one prediction per match per cycle
+        bt.logging.debug(f"Match found in prediction window {window.name}: {match.awayTeamName} at {match.homeTeamName} on {match.matchDate}")
+        match_predictions.append(
+            MatchPrediction(
+                matchId=match.matchId,
+                matchDate=match.matchDate,
+                sport=match.sport,
+                league=match.league,
+                homeTeamName=match.homeTeamName,
+                awayTeamName=match.awayTeamName
+            )
+        )
+        request_flags.append((match.matchId, window.column))
+
+    # Flag every window that is being requested in one write
+    storage.update_match_prediction_requests(request_flags)
 
     # Prepare next match info string
-    next_match_info = ""
-    if next_prediction_match:
-        time_until_next = next_prediction_time - current_time
-        hours, remainder = divmod(time_until_next.total_seconds(), 3600)
+    next_window = prediction_window_queue.peek()
+    if next_window:
+        next_prediction_time, next_prediction_match, next_prediction_window = next_window
+        hours, remainder = divmod(next_prediction_time - current_time, 3600)
         minutes, _ = divmod(remainder, 60)
-        
-        window_display = {
-            '24_hour': 'T-24h',
-            '12_hour': 'T-12h',
-            '4_hour': 'T-4h',
-            '10_min': 'T-10m'
-        }
 
         next_match_info = (
             f"Next match prediction request: "
             f"{int(hours)}h {int(minutes)}m | "
-            f"{window_display.get(next_prediction_window, '?')} | "
+            f"{next_prediction_window.display} | "
             f"{next_prediction_match.homeTeamName} vs {next_prediction_match.awayTeamName} "
-            f"({next_prediction_time.strftime('%Y-%m-%d %H:%M')} UTC) | "
+            f"({dt.datetime.utcfromtimestamp(next_prediction_time).strftime('%Y-%m-%d %H:%M')} UTC) | "
             f"{next_prediction_match.league}"
         )
+    elif len(prediction_window_queue) == 0:
+        next_match_info = "No upcoming matches scheduled."
     else:
         next_match_info = "No upcoming matches scheduled for prediction requests."
 
     return match_predictions, next_match_info
 
 
-async def send_predictions_to_miners(
-    vali: Validator, input_synapse: GetMatchPrediction, miner_uids: List[int]
-) -> Tuple[List[MatchPrediction], List[int]]:
+def get_next_match_prediction_request_time() -> Optional[float]:
+    """Epoch time the next prediction window opens, or None if no window is queued."""
+    next_window = prediction_window_queue.peek()
+    return next_window[0] if next_window else None
+
+
+def get_prediction_request_deadline(match_prediction: MatchPrediction) -> dt.datetime:
+    """Latest time a prediction request for the match can be sent, MIN_PREDICTION_TIME_THRESHOLD seconds before it starts."""
+    match_date = match_prediction.matchDate
+    if match_date.tzinfo is None:
+        match_date = match_date.replace(tzinfo=dt.timezone.utc)
+    return match_date - timedelta(seconds=MIN_PREDICTION_TIME_THRESHOLD)
+
+
+def get_miner_uids_supporting_batched_predictions(vali: Validator, miner_uids: List[int]) -> List[int]:
+    """Returns the miner uids that last reported a protocol version that answers GetMatchPredictions requests."""
+    with vali.uids_to_leagues_lock:
+        return [
+            uid for uid in miner_uids
+            if (vali.uids_to_protocol_versions.get(uid) or 0) >= BATCHED_PREDICTIONS_PROTOCOL_VERSION
+        ]
+
+
+def apply_no_response_penalties(vali: Validator, miner_uids: List[int]):
+    """Penalizes miners who commit to a league but don't respond to a prediction request."""
+    for uid in miner_uids:
+        with vali.accumulated_no_response_penalties_lock:
+            if uid not in vali.accumulated_no_response_penalties:
+                vali.accumulated_no_response_penalties[uid] = 0.0
+            vali.accumulated_no_response_penalties[uid] += NO_PREDICTION_RESPONSE_PENALTY
+
+    if len(miner_uids) > 0:
+        bt.logging.info(
+            f"Penalizing miners {miner_uids} that did not respond."
+        )
+
+
+async def send_match_prediction_requests_to_miners(
+    vali: Validator, match_prediction_requests: List[MatchPrediction]
+):
+    """
+    Send the prediction requests for several matches to their committed miners concurrently.
+
+    Miners that support it get a single GetMatchPredictions request for all matches of their league. Other miners get
+    one GetMatchPrediction request per match. At most neuron.max_concurrent_batches dendrite batches are in flight
+    across all matches. Matches closest to their deadline are dispatched first. Miners in batches that could not be
+    sent before the deadline are not penalized.
+    """
+    semaphore = asyncio.Semaphore(max(1, vali.config.neuron.max_concurrent_batches))
+
+    async def send_match(mpr: MatchPrediction, miner_uids: List[int]):
+        bt.logging.info(f"Sending miners {miner_uids} prediction request for match: {mpr}")
+
+        # Send prediction requests to miners and store their responses
+        result = await send_predictions_to_miners(
+            vali, GetMatchPrediction(match_prediction=mpr), miner_uids, semaphore=semaphore, deadline=get_prediction_request_deadline(mpr)
+        )
+        if result is None:
+            return
+        finished_responses, working_miner_uids, unsent_miner_uids = result
+
+        if len(unsent_miner_uids) > 0:
+            bt.logging.warning(
+                f"Prediction requests for match {mpr.matchId} could not be sent to miners {unsent_miner_uids} before the deadline."
+            )
+
+        # Update the scores of miner uids NOT working. Default to 0.
+        apply_no_response_penalties(
+            vali, [uid for uid in miner_uids if uid not in working_miner_uids and uid not in unsent_miner_uids]
+        )
+
+    async def send_matches(mprs: List[MatchPrediction], miner_uids: List[int]):
+        bt.logging.info(f"Sending miners {miner_uids} batched prediction request for matches: {[mpr.matchId for mpr in mprs]}")
+
+        # The batch must go out before the earliest deadline of its matches
+        result = await send_batched_predictions_to_miners(
+            vali, mprs, miner_uids, semaphore=semaphore, deadline=min(get_prediction_request_deadline(mpr) for mpr in mprs)
+        )
+        if result is None:
+            return
+        working_miner_uids_by_match, unsent_miner_uids, fallback_miner_uids = result
+
+        if len(unsent_miner_uids) > 0:
+            bt.logging.warning(
+                f"Batched prediction requests could not be sent to miners {unsent_miner_uids} before the deadline."
+            )
+
+        # Miners that answered with an older protocol version get the single match requests instead
+        if len(fallback_miner_uids) > 0:
+            bt.logging.info(f"Falling back to single match prediction requests for miners {fallback_miner_uids}.")
+            await asyncio.gather(*(send_match(mpr, list(fallback_miner_uids)) for mpr in mprs))
+
+        for mpr in mprs:
+            working_miner_uids = working_miner_uids_by_match.get(mpr.matchId, [])
+            apply_no_response_penalties(
+                vali,
+                [
+                    uid for uid in miner_uids
+                    if uid not in working_miner_uids and uid not in unsent_miner_uids and uid not in fallback_miner_uids
+                ]
+            )
+
+    # The semaphore wakes waiters in order, so batches for earlier deadlines go out first
+    requests_by_league: Dict[League, List[MatchPrediction]] = defaultdict(list)
+    for mpr in sorted(match_prediction_requests, key=get_prediction_request_deadline):
+        requests_by_league[mpr.league].append(mpr)
+
+    sends = []
+    for league, mprs in requests_by_league.items():
+        # Gather all miner uids that have committed to the league in the match predictions
+        miner_uids = vali.get_miner_uids_committed_to_league(league)
+        if len(miner_uids) == 0:
+            bt.logging.info(f"No miners committed to send requests to for league: {league}")
+            continue
+
+        batched_miner_uids = get_miner_uids_supporting_batched_predictions(vali, miner_uids) if len(mprs) > 1 else []
+        single_miner_uids = [uid for uid in miner_uids if uid not in batched_miner_uids]
+        if len(batched_miner_uids) > 0:
+            sends.append((get_prediction_request_deadline(mprs[0]), send_matches(mprs, batched_miner_uids)))
+        if len(single_miner_uids) > 0:
+            sends.extend((get_prediction_request_deadline(mpr), send_match(mpr, list(single_miner_uids))) for mpr in mprs)
+
+    sends.sort(key=lambda send: send[0])
+    await asyncio.gather(*(send for _, send in sends))
+
+
+async def send_batched_predictions_to_miners(
+    vali: Validator,
+    match_prediction_requests: List[MatchPrediction],
+    miner_uids: List[int],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    deadline: Optional[dt.datetime] = None,
+) -> Tuple[Dict[str, List[int]], List[int], List[int]]:
+    """
+    Query miners for predictions on several matches with one GetMatchPredictions request each, in batches of
+    neuron.batch_size, and store the valid predictions.
+
+    Returns a tuple of (working_miner_uids_by_match, unsent_miner_uids, fallback_miner_uids). Fallback miners responded
+    with a protocol version below BATCHED_PREDICTIONS_PROTOCOL_VERSION and should be sent the single match requests
+    instead. Miners that did not respond are in neither list.
+    """
     try:
         random.shuffle(miner_uids)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, vali.config.neuron.max_concurrent_batches))
+
+        input_synapse = GetMatchPredictions(match_predictions=match_prediction_requests)
+        # Every returned prediction is validated against the single match request it answers
+        request_synapses = {mpr.matchId: GetMatchPrediction(match_prediction=mpr) for mpr in match_prediction_requests}
 
         async def process_batch(batch_uids: List[int]):
-            axons = [vali.metagraph.axons[uid] for uid in batch_uids]
+            async with semaphore:
+                if deadline is not None and dt.datetime.now(dt.timezone.utc) >= deadline:
+                    return [], {}, batch_uids, []
+
+                bt.logging.info(f"Sending batched prediction requests to miners batch {batch_uids}")
+                axons = [vali.metagraph.axons[uid] for uid in batch_uids]
+
+                responses = await vali.dendrite(
+                    axons=axons,
+                    synapse=input_synapse,
+                    deserialize=True,
+                    timeout=VALIDATOR_TIMEOUT,
+                )
 
-            responses = await vali.dendrite(
-                axons=axons,
-                synapse=input_synapse,
-                deserialize=True,
-                timeout=VALIDATOR_TIMEOUT,
-            )
+            working_miner_uids_by_match = defaultdict(list)
+            finished_responses = []
+            fallback_miner_uids = []
+
+            for response, uid in zip(responses, batch_uids):
+                if response is None or response.axon is None or response.axon.hotkey is None or response.version is None:
+                    # Timed out or failed without a response, penalized like a missing single match response
+                    bt.logging.info(
+                        f"UID {uid}: Miner failed to respond to the batched prediction request."
+                    )
+                    continue
+                if response.version < BATCHED_PREDICTIONS_PROTOCOL_VERSION:
+                    fallback_miner_uids.append(uid)
+                    continue
+
+                for match_prediction in response.match_predictions or []:
+                    request_synapse = request_synapses.get(match_prediction.matchId) if match_prediction is not None else None
+                    if request_synapse is None or uid in working_miner_uids_by_match[match_prediction.matchId]:
+                        bt.logging.info(
+                            f"UID {uid}: Miner responded with a prediction that was not requested."
+                        )
+                        continue
+                    if (
+                        match_prediction.probabilityChoice is None
+                        or match_prediction.probability is None
+                    ):
+                        bt.logging.info(
+                            f"UID {uid}: Miner failed to respond with a valid prediction for match {match_prediction.matchId}."
+                        )
+                        continue
+                    is_prediction_valid, error_msg = is_match_prediction_valid(
+                        match_prediction,
+                        request_synapse,
+                    )
+                    if not is_prediction_valid:
+                        bt.logging.info(
+                            f"UID {uid}: Miner prediction for match {match_prediction.matchId} failed validation: {error_msg}"
+                        )
+                        continue
+
+                    working_miner_uids_by_match[match_prediction.matchId].append(uid)
+                    match_prediction.minerId = uid
+                    match_prediction.hotkey = response.axon.hotkey
+                    match_prediction.predictionDate = dt.datetime.now(dt.timezone.utc)
+                    # round the probability to 4 decimal places
+                    match_prediction.probability = round(match_prediction.probability, 4)
+                    finished_responses.append(GetMatchPrediction(match_prediction=match_prediction))
+
+            return finished_responses, working_miner_uids_by_match, [], fallback_miner_uids
+
+        all_finished_responses = []
+        all_working_miner_uids_by_match: Dict[str, List[int]] = defaultdict(list)
+        all_unsent_miner_uids = []
+        all_fallback_miner_uids = []
+
+        batches = [
+            miner_uids[i:i+vali.config.neuron.batch_size]
+            for i in range(0, len(miner_uids), vali.config.neuron.batch_size)
+        ]
+        for finished_responses, working_miner_uids_by_match, unsent_miner_uids, fallback_miner_uids in await asyncio.gather(
+            *(process_batch(batch) for batch in batches)
+        ):
+            all_finished_responses.extend(finished_responses)
+            for matchId, working_miner_uids in working_miner_uids_by_match.items():
+                all_working_miner_uids_by_match[matchId].extend(working_miner_uids)
+            all_unsent_miner_uids.extend(unsent_miner_uids)
+            all_fallback_miner_uids.extend(fallback_miner_uids)
+
+        if len(all_fallback_miner_uids) > 0:
+            # Don't send batched requests to these miners again until they report a batched protocol version
+            with vali.uids_to_leagues_lock:
+                for uid in all_fallback_miner_uids:
+                    vali.uids_to_protocol_versions[uid] = None
+
+        if len(all_finished_responses) == 0:
+            bt.logging.info("No miner responses available.")
+            return (all_working_miner_uids_by_match, all_unsent_miner_uids, all_fallback_miner_uids)
+
+        bt.logging.info(f"Received {len(all_finished_responses)} predictions from batched requests")
+        bt.logging.info(f"Responses: {redact_scores(all_finished_responses)}")
+
+        # store miner predictions in validator database to be scored when applicable
+        bt.logging.info(f"Storing predictions in validator database.")
+        storage.insert_match_predictions(all_finished_responses)
+
+        return (all_working_miner_uids_by_match, all_unsent_miner_uids, all_fallback_miner_uids)
+
+    except Exception as e:
+        bt.logging.error(
+            f"Failed to send batched predictions to miners and store in validator database: {str(e)}",
+            traceback.format_exc(),
+        )
+        return None
+
+
+async def send_predictions_to_miners(
+    vali: Validator,
+    input_synapse: GetMatchPrediction,
+    miner_uids: List[int],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    deadline: Optional[dt.datetime] = None,
+) -> Tuple[List[MatchPrediction], List[int], List[int]]:
+    """
+    Query miners for a prediction in batches of neuron.batch_size and store the valid responses.
+
+    Batches are sent concurrently, holding the semaphore while in flight. Batches that only get a slot at or after
+    the deadline are not sent.
+
+    Returns a tuple of (finished_responses, working_miner_uids, unsent_miner_uids).
+    """
+    try:
+        random.shuffle(miner_uids)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, vali.config.neuron.max_concurrent_batches))
+
+        async def process_batch(batch_uids: List[int]):
+            async with semaphore:
+                if deadline is not None and dt.datetime.now(dt.timezone.utc) >= deadline:
+                    return [], [], batch_uids
+
+                bt.logging.info(f"Sending prediction requests to miners batch {batch_uids}")
+                axons = [vali.metagraph.axons[uid] for uid in batch_uids]
+
+                responses = await vali.dendrite(
+                    axons=axons,
+                    synapse=input_synapse,
+                    deserialize=True,
+                    timeout=VALIDATOR_TIMEOUT,
+                )
 
             working_miner_uids = []
             finished_responses = []
@@ -520,25 +810,26 @@ async def send_predictions_to_miners(
                     response.match_prediction.probability = round(response.match_prediction.probability, 4)
                     finished_responses.append(response)
 
-            return finished_responses, working_miner_uids
+            return finished_responses, working_miner_uids, []
 
         all_finished_responses = []
         all_working_miner_uids = []
+        all_unsent_miner_uids = []
 
-        for i in range(0, len(miner_uids), vali.config.neuron.batch_size):
-            batch = miner_uids[i:i+vali.config.neuron.batch_size]
-            bt.logging.info(f"Sending prediction requests to miners batch {batch}")
-            finished_responses, working_miner_uids = await process_batch(batch)
-            
+        batches = [
+            miner_uids[i:i+vali.config.neuron.batch_size]
+            for i in range(0, len(miner_uids), vali.config.neuron.batch_size)
+        ]
+        for finished_responses, working_miner_uids, unsent_miner_uids in await asyncio.gather(
+            *(process_batch(batch) for batch in batches)
+        ):
             all_finished_responses.extend(finished_responses)
             all_working_miner_uids.extend(working_miner_uids)
-
-            # add a random delay between batches to spread out the requests
-            await asyncio.sleep(random.uniform(1.0, 30.0)) # 1-30 seconds
+            all_unsent_miner_uids.extend(unsent_miner_uids)
 
         if len(all_working_miner_uids) == 0:
             bt.logging.info("No miner responses available.")
-            return (all_finished_responses, all_working_miner_uids)
+            return (all_finished_responses, all_working_miner_uids, all_unsent_miner_uids)
 
         bt.logging.info(f"Received responses from {len(all_working_miner_uids)} miners")
         bt.logging.info(f"Responses: {redact_scores(all_finished_responses)}")
@@ -547,7 +838,7 @@ async def send_predictions_to_miners(
         bt.logging.info(f"Storing predictions in validator database.")
         storage.insert_match_predictions(all_finished_responses)
 
-        return (all_finished_responses, all_working_miner_uids)
+        return (all_finished_responses, all_working_miner_uids, all_unsent_miner_uids)
 
     except Exception as e:
         bt.logging.error(
@@ -573,13 +864,14 @@ def archive_deregistered_match_predictions(active_miner_hotkeys: List[str], acti
         bt.logging.error(f"Error archiving unscored deregistered predictions: {e}")
 
 
-def find_and_score_edge_match_predictions(batchsize: int) -> Tuple[List[float], List[int], List[int], List[str], List[str]]:
+def find_and_score_edge_match_predictions(vali, batchsize: int) -> Tuple[List[float], List[int], List[int], List[str], List[str]]:
     """Query the validator's local storage for a list of qualifying MatchPredictions that can be scored.
 
-    Then run Closing Edge calculations and return results
+    Then run Closing Edge calculations, persist each prediction's score contribution and return results
     """
 
     # Query for scorable match predictions with actual match data
+    score_inputs_version = storage.get_score_inputs_version()
     predictions_with_match_data = storage.get_match_predictions_to_score(batchsize)
 
     edge_scores = []
@@ -612,6 +904,13 @@ def find_and_score_edge_match_predictions(batchsize: int) -> Tuple[List[float],
     if len(predictions) > 0:
         storage.update_match_predictions(predictions)
 
+        # Store the score contributions now so the incentive scoring pass only has to aggregate them.
+        # If this fails, the scoring pass computes and stores the missing contributions itself.
+        try:
+            scoring_utils.calculate_score_contributions(vali, predictions_with_match_data, score_inputs_version)
+        except Exception as e:
+            bt.logging.error(f"Error calculating score contributions: {e}")
+
     return [
         predictions,
         edge_scores,
@@ -703,7 +1002,7 @@ def is_match_prediction_valid(
     return (True, "")
 
 
-def post_prediction_edge_results(
+async def post_prediction_edge_results(
     vali,
     prediction_edge_results_endpoint: str,
     league_scores: Dict[League, List[float]],
@@ -719,7 +1018,6 @@ def post_prediction_edge_results(
     keypair = vali.dendrite.keypair
     hotkey = keypair.ss58_address
     signature = f"0x{keypair.sign(hotkey).hex()}"
-    max_retries = 3
     
     # Get current timestamp for lastUpdated field
     current_time = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
@@ -799,34 +1097,25 @@ def post_prediction_edge_results(
                 f"{league_name}_pred_win_count": league_pred_win_counts[league][uid],
             })
 
-    for attempt in range(max_retries):
-        try:
-            # Post the scoring results back to the api
-            scoring_results = {
-                "miner_scores": miner_scores,
-            }
-            
-            response = requests.post(
-                prediction_edge_results_endpoint,
-                auth=HTTPBasicAuth(hotkey, signature),
-                json=scoring_results,
-            )
-            response.raise_for_status()
-            bt.logging.info("Successfully posted prediction edge results to API.")
-            return response
+    try:
+        # Post the scoring results back to the api. The API client retries failed posts.
+        scoring_results = {
+            "miner_scores": miner_scores,
+        }
 
-        except Exception as e:
-            bt.logging.error(
-                f"Error posting prediction edge results to API, attempt {attempt + 1}: {e}"
-            )
-            if attempt < max_retries - 1:
-                # Wait before retrying
-                time.sleep(2)
-            else:
-                bt.logging.error(
-                    f"Max retries attempted posting prediction edge results to API. Contact a Sportstensor admin."
-                )
-                raise  # Re-raise the last exception after all retries are exhausted
+        response = await vali.api_client.post_json(
+            prediction_edge_results_endpoint,
+            scoring_results,
+            auth=BasicAuth(hotkey, signature),
+        )
+        bt.logging.info("Successfully posted prediction edge results to API.")
+        return response
+
+    except Exception as e:
+        bt.logging.error(
+            f"Error posting prediction edge results to API: {e}. Contact a Sportstensor admin."
+        )
+        raise  # Re-raise the last exception after all retries are exhausted
 
 
 async def post_scored_predictions(
@@ -837,54 +1126,35 @@ async def post_scored_predictions(
     keypair = vali.dendrite.keypair
     hotkey = keypair.ss58_address
     signature = f"0x{keypair.sign(hotkey).hex()}"
-    max_retries = 3
 
     # Filter down our scored predictions to only those predicted within 10 minutes of the match start
     filtered_predictions = []
     for prediction in predictions:
-        # Ensure our dates are offset-aware
-        match_datetime = prediction.matchDate
-        if prediction.matchDate.tzinfo is None:
-            match_datetime = prediction.matchDate.replace(tzinfo=dt.timezone.utc)
-        prediction_datetime = prediction.predictionDate
-        if prediction.predictionDate.tzinfo is None:
-            prediction_datetime = prediction.predictionDate.replace(tzinfo=dt.timezone.utc)
-
-        # Filter down our predictions to only those predicted within 10 minutes of the match start
-        if (match_datetime - prediction_datetime).total_seconds() < 600:
-            prediction_dict = prediction.__dict__
+        # Compare the epoch columns, so only the posted predictions parse their timestamps
+        if prediction.matchDateUs - prediction.predictionDateUs < 600 * 1_000_000:
+            prediction_dict = prediction.to_dict()
             prediction_dict["predictionDate"] = str(prediction_dict["predictionDate"]) # convert predictionDate to string for serialization
             prediction_dict["matchDate"] = str(prediction_dict["matchDate"]) # convert matchDate to string for serialization
             prediction_dict["scoredDate"] = str(prediction_dict["scoredDate"]) # convert scoredDate to string for serialization
             filtered_predictions.append(prediction_dict)
 
-    for attempt in range(max_retries):
-        try:
-            # Post the scored predictions back to the api
-            results = {
-                "predictions": filtered_predictions,
-            }
-            async with ClientSession() as session:
-                async with session.post(
-                    scored_predictions_endpoint,
-                    auth=BasicAuth(hotkey, signature),
-                    json=results,
-                ) as response:
-                    response.raise_for_status()
-                    bt.logging.info("Successfully posted scored predictions to API.")
-                    return response
+    try:
+        # Post the scored predictions back to the api. The API client retries failed posts.
+        results = {
+            "predictions": filtered_predictions,
+        }
+        response = await vali.api_client.post_json(
+            scored_predictions_endpoint,
+            results,
+            auth=BasicAuth(hotkey, signature),
+        )
+        bt.logging.info("Successfully posted scored predictions to API.")
+        return response
 
-        except Exception as e:
-            bt.logging.error(
-                f"Error posting scored predictions to API, attempt {attempt + 1}: {e}"
-            )
-            if attempt < max_retries - 1:
-                # Wait before retrying
-                await asyncio.sleep(2)
-            else:
-                bt.logging.error(
-                    f"Max retries attempted posting scored predictions to API. Contact a Sportstensor admin."
-                )
+    except Exception as e:
+        bt.logging.error(
+            f"Error posting scored predictions to API: {e}. Contact a Sportstensor admin."
+        )
 
 
 def redact_scores(responses):